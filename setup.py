@@ -52,6 +52,8 @@ setup(
             "tox>=3.17.1",
             "importlib-metadata<5.0",
         ],
+        "fast-json": ["ujson>=5.4.0"],
+        "token-cache": ["cryptography"],
         "docs": [
             "sphinx==8.1.3",
             "myst-parser==4.0.0",
@@ -71,5 +73,10 @@ setup(
         "Programming Language :: Python :: 3.12",
         "Programming Language :: Python :: Implementation :: CPython",
     ],
-    entry_points={"console_scripts": ["code42=code42cli.main:cli"]},
+    entry_points={
+        "console_scripts": [
+            "code42=code42cli.main:cli",
+            "code42-client=code42cli.daemon_client:main",
+        ]
+    },
 )
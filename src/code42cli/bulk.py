@@ -1,13 +1,33 @@
+import hashlib
+import json
 import os
+from os import path
+from threading import Lock
+from time import time
+from uuid import uuid4
 
 import click
+from py42.exceptions import Py42HTTPError
 
+from code42cli.errors import Code42CLIError
 from code42cli.errors import LoggedCLIError
 from code42cli.logger import get_main_cli_logger
+from code42cli.util import get_user_project_path
+from code42cli.worker import DEFAULT_MAX_WORKERS
+from code42cli.worker import is_retryable_error
 from code42cli.worker import Worker
 
 _logger = get_main_cli_logger()
 
+_BULK_JOBS_DIR = "bulk_jobs"
+
+DEFAULT_BATCH_SIZE = 100
+
+# Journals of jobs that haven't been run for this many seconds are removed.
+JOURNAL_MAX_AGE = 7 * 24 * 60 * 60
+
+_FINGERPRINT = "fingerprint"
+
 
 class BulkCommandType:
     ADD = "add"
@@ -58,8 +78,178 @@ def generate_template_cmd_factory(group_name, commands_dict, help_message=None):
     return generate_template
 
 
+class BulkJournal:
+    """An append-only record of the outcome of each row processed by a bulk job, stored in the
+    user project directory. Running a bulk command again with the journal's job ID (using
+    `--resume`) skips the rows that already succeeded.
+
+    The journal starts with a fingerprint of the job's rows (see :func:`get_rows_fingerprint`),
+    so that a job can't be resumed with a different or edited file. Outcomes are buffered and
+    appended to the journal file in batches of `flush_size`. Journals are removed when their job
+    succeeds, or once they're `JOURNAL_MAX_AGE` seconds old.
+
+    Args:
+        job_id (str): The ID of the job. Defaults to a new random ID.
+        flush_size (int): The number of outcomes to buffer before writing them to the file.
+    """
+
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+    def __init__(self, job_id=None, flush_size=100):
+        self.job_id = job_id or uuid4().hex
+        self._flush_size = flush_size
+        self._pending = []
+        self._lock = Lock()
+        self._location = None
+
+    @classmethod
+    def resume(cls, job_id):
+        """Gets the journal for an existing job."""
+        journal = cls(job_id)
+        if not path.isfile(journal.location):
+            raise Code42CLIError(f"No bulk job with ID '{job_id}' exists.")
+        return journal
+
+    @property
+    def location(self):
+        # Resolved lazily so that nothing is created on disk until the journal is used.
+        if self._location is None:
+            job_dir = get_user_project_path(_BULK_JOBS_DIR)
+            self._location = path.join(job_dir, self.job_id)
+        return self._location
+
+    def check_fingerprint(self, fingerprint):
+        """Records the fingerprint of the job's rows if the job is new, or raises
+        `Code42CLIError` if the job was started with rows that have a different fingerprint."""
+        with self._lock:
+            try:
+                with open(self.location, encoding="utf8") as journal:
+                    name, _, recorded = journal.readline().strip().partition(",")
+            except FileNotFoundError:
+                self._pending.insert(0, f"{_FINGERPRINT},{fingerprint}\n")
+                return
+        if name != _FINGERPRINT or recorded != fingerprint:
+            raise Code42CLIError(
+                f"Bulk job '{self.job_id}' was started with a different file. Resume it with "
+                "the same, unedited file, or run the command without `--resume`."
+            )
+
+    def prune(self, max_age=JOURNAL_MAX_AGE):
+        """Removes the journals of other jobs that haven't been written to for `max_age`
+        seconds."""
+        job_dir = path.dirname(self.location)
+        expires_before = time() - max_age
+        for job_id in os.listdir(job_dir):
+            location = path.join(job_dir, job_id)
+            if location == self.location:
+                continue
+            try:
+                if path.getmtime(location) < expires_before:
+                    os.remove(location)
+            except OSError:
+                # e.g. removed by a job that was pruning at the same time
+                pass
+
+    def get_succeeded_rows(self):
+        """Returns the indices of the rows that succeeded in previous runs of this job."""
+        succeeded = set()
+        try:
+            with open(self.location) as journal:
+                for line in journal:
+                    index, _, outcome = line.strip().partition(",")
+                    # a partial line is left if a run is killed mid-write
+                    if outcome == self.SUCCEEDED and index.isdigit():
+                        succeeded.add(int(index))
+        except FileNotFoundError:
+            pass
+        return succeeded
+
+    def record(self, row_index, succeeded):
+        """Records the outcome of processing the row at the given index."""
+        outcome = self.SUCCEEDED if succeeded else self.FAILED
+        with self._lock:
+            self._pending.append(f"{row_index},{outcome}\n")
+            if len(self._pending) >= self._flush_size:
+                self._flush()
+
+    def flush(self):
+        """Writes any buffered outcomes to the journal file."""
+        with self._lock:
+            self._flush()
+
+    def delete(self):
+        """Removes the journal file."""
+        with self._lock:
+            self._pending = []
+            try:
+                os.remove(self.location)
+            except FileNotFoundError:
+                pass
+
+    def _flush(self):
+        if not self._pending:
+            return
+        with open(self.location, "a", encoding="utf8") as journal:
+            journal.writelines(self._pending)
+        self._pending = []
+
+
+def get_rows_fingerprint(rows):
+    """Returns a hash of the contents of a bulk job's rows. Uses the rows' own `fingerprint()`
+    (e.g. :meth:`code42cli.file_readers.CSVRows.fingerprint`) if they have one."""
+    if hasattr(rows, "fingerprint"):
+        return rows.fingerprint()
+    digest = hashlib.sha256()
+    for row in rows:
+        digest.update(json.dumps(row, sort_keys=True, default=str).encode("utf8"))
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+
+class RowBatcher:
+    """Groups the rows of a bulk process into batches that can each be handled with a single
+    request, for APIs that accept many items at once.
+
+    A batch is handed to the worker as soon as it fills up, and any partial batches are handed to
+    it after the last row is read. Outcomes are still counted per row: a row that `resolve` fails
+    for fails on its own, and if the request for a batch fails (other than by being throttled,
+    which the worker retries), each of its rows is retried on its own with the bulk process's row
+    handler, so only the rows that fail then are counted as failed.
+
+    Args:
+        handler (callable): Called with a batch's key and the list of its rows (as dicts, or the
+            values `resolve` returned for them) to process the batch.
+        key (callable): Called with each row's values as **kwargs and returns the key of the batch
+            the row belongs in. Rows with the same key must be able to be handled by the same
+            request (e.g. alerts being updated to the same state). Return None to process the
+            row on its own with the bulk process's row handler instead.
+        size (int): The max number of rows in a batch. Defaults to 100.
+        resolve (callable): Called in the worker thread with each batched row's values as
+            **kwargs, before the batch is handled, to look up what the batch request needs for
+            the row (e.g. a user's ID from their username). Defaults to passing the rows to
+            `handler` as they are.
+    """
+
+    __slots__ = ("handler", "key", "size", "resolve")
+
+    def __init__(self, handler, key, size=DEFAULT_BATCH_SIZE, resolve=None):
+        self.handler = handler
+        self.key = key
+        self.size = size
+        self.resolve = resolve
+
+
 def run_bulk_process(
-    row_handler, rows, progress_label=None, stats=None, raise_global_error=True
+    row_handler,
+    rows,
+    progress_label=None,
+    stats=None,
+    raise_global_error=True,
+    max_workers=None,
+    journal=None,
+    rate_limit=None,
+    batcher=None,
 ):
     """Runs a bulk process.
 
@@ -71,6 +261,13 @@ def run_bulk_process(
         stats (WorkerStats): Pass in WorkerStats if doing error handling outside of the worker.
         raise_global_error (bool): Set to False to *NOT* raise a CLI error if any rows fail.
             This is useful if doing error handling outside of the worker class.
+        max_workers (int): The number of rows to process concurrently. Defaults to 5.
+        journal (BulkJournal): Pass in a BulkJournal to record the outcome of each row and to
+            skip rows that succeeded in a previous run of the same job.
+        rate_limit (float): The max number of rows to start processing per second. Defaults to
+            no limit.
+        batcher (RowBatcher): Pass in a RowBatcher to handle rows in batches instead of one at
+            a time.
 
     Returns:
         :class:`WorkerStats`: A class containing the successes and failures count.
@@ -81,12 +278,24 @@ def run_bulk_process(
         progress_label,
         stats=stats,
         raise_global_error=raise_global_error,
+        max_workers=max_workers,
+        journal=journal,
+        rate_limit=rate_limit,
+        batcher=batcher,
     )
     return processor.run()
 
 
 def _create_bulk_processor(
-    row_handler, rows, progress_label, stats=None, raise_global_error=True
+    row_handler,
+    rows,
+    progress_label,
+    stats=None,
+    raise_global_error=True,
+    max_workers=None,
+    journal=None,
+    rate_limit=None,
+    batcher=None,
 ):
     """A factory method to create the bulk processor, useful for testing purposes."""
     return BulkProcessor(
@@ -95,6 +304,10 @@ def _create_bulk_processor(
         progress_label=progress_label,
         stats=stats,
         raise_global_error=raise_global_error,
+        max_workers=max_workers,
+        journal=journal,
+        rate_limit=rate_limit,
+        batcher=batcher,
     )
 
 
@@ -107,6 +320,14 @@ class BulkProcessor:
             and first row `1,test`, then `row_handler` should receive kwargs
             `prop_a: '1', prop_b: 'test'` when processing the first row. If it's a flat file, then
             `row_handler` only needs to take an extra arg.
+        max_workers (int): The number of rows to process concurrently. Defaults to 5.
+        journal (BulkJournal): A journal to record the outcome of each row in. Rows that the
+            journal shows have already succeeded are skipped.
+        rate_limit (float): The max number of rows to start processing per second. Defaults to
+            no limit.
+        batcher (RowBatcher): Groups rows into batches that are each handled by one call to
+            the batcher's handler. Rows the batcher doesn't put in a batch are handled by
+            `row_handler`.
     """
 
     def __init__(
@@ -117,47 +338,186 @@ class BulkProcessor:
         progress_label=None,
         stats=None,
         raise_global_error=True,
+        max_workers=None,
+        journal=None,
+        rate_limit=None,
+        batcher=None,
     ):
         total = len(rows)
         self._rows = rows
         self._row_handler = row_handler
+        self._batcher = batcher
+        self._batches = {}
+        self._journal = journal
+        if journal:
+            journal.check_fingerprint(get_rows_fingerprint(rows))
+        self._rows_to_skip = journal.get_succeeded_rows() if journal else set()
         self._progress_bar = click.progressbar(
-            length=len(self._rows),
+            length=total - len(self._rows_to_skip),
             item_show_func=self._show_stats,
             label=progress_label,
         )
         self._raise_global_error = raise_global_error
-        self.__worker = worker or Worker(5, total, bar=self._progress_bar, stats=stats)
+        self.__worker = worker or Worker(
+            max_workers or DEFAULT_MAX_WORKERS,
+            total,
+            bar=self._progress_bar,
+            stats=stats,
+            rate_limit=rate_limit,
+        )
         self._stats = self.__worker.stats
 
     def run(self):
         """Processes the csv rows specified in the ctor, calling `self.row_handler` on each row."""
         self._stats.reset_results()
-        for row in self._rows:
-            self._process_row(row)
-        self.__worker.wait()
+        if self._journal:
+            self._journal.prune()
+        self._report_job()
+        try:
+            for row_index, row in enumerate(self._rows):
+                if row_index not in self._rows_to_skip:
+                    self._process_row(row_index, row)
+            for key in list(self._batches):
+                self._process_batch(key)
+            self.__worker.wait()
+        finally:
+            if self._journal:
+                self._journal.flush()
+        self._report_stats()
+        if self._journal and not self._stats.total_errors:
+            self._journal.delete()
         self._handle_if_errors()
-        return self._stats._results
+        return self._stats.results
 
-    def _process_row(self, row):
-        self._process_csv_row(row)
+    def _process_row(self, row_index, row):
+        self._process_csv_row(row_index, row)
 
-    def _process_csv_row(self, row):
+    def _process_csv_row(self, row_index, row):
         # Removes problems from including extra columns. Error messages from out of order args
         # are more indicative this way too.
         row.pop(None, None)
 
         row_values = {key: val if val != "" else None for key, val in row.items()}
+        batch_key = self._batcher.key(**row_values) if self._batcher else None
+        if batch_key is not None:
+            self._add_to_batch(batch_key, row_index, row_values)
+            return
+
         self.__worker.do_async(
-            lambda *args, **kwargs: self._handle_row(*args, **kwargs), **row_values
+            lambda *args, **kwargs: self._handle_row(row_index, *args, **kwargs),
+            **row_values,
+        )
+
+    def _add_to_batch(self, key, row_index, row_values):
+        batch = self._batches.setdefault(key, [])
+        batch.append((row_index, row_values))
+        if len(batch) >= self._batcher.size:
+            self._process_batch(key)
+
+    def _process_batch(self, key):
+        batch = self._batches.pop(key)
+        resolved = {}
+        self.__worker.do_async_batch(
+            lambda: self._handle_batch(key, batch, resolved), len(batch)
         )
 
-    def _handle_row(self, *args, **kwargs):
-        return self._row_handler(*args, **kwargs)
+    def _handle_batch(self, key, batch, resolved):
+        # The worker calls this again to retry a throttled batch, so the rows are only resolved
+        # the first time. The rows that can't be resolved are counted as errors once the batch
+        # is done, because if it's throttled more times than the worker retries it, the worker
+        # counts every row in the batch as an error.
+        if "rows" not in resolved:
+            resolved["rows"], resolved["unresolved"] = self._resolve_batch(batch)
+        rows = resolved["rows"]
+        result = None
+        if rows:
+            row_indices = [row_index for row_index, _, _ in rows]
+            errors = self._stats.get_total_errors_for_current_thread()
+            try:
+                result = self._batcher.handler(key, [value for _, _, value in rows])
+            except Exception as err:
+                if isinstance(err, Py42HTTPError) and is_retryable_error(err):
+                    self._record(row_indices, False)
+                    raise
+                _logger.log_verbose_error()
+                # Find out which of the rows fail on their own.
+                for row_index, row_values, _ in rows:
+                    self._handle_batched_row(row_index, row_values)
+            else:
+                succeeded = self._stats.get_total_errors_for_current_thread() == errors
+                self._record(row_indices, succeeded)
+        self._stats.increment_total_errors(resolved["unresolved"])
+        return result
+
+    def _resolve_batch(self, batch):
+        if not self._batcher.resolve:
+            return [(row_index, values, values) for row_index, values in batch], 0
+        rows = []
+        unresolved = 0
+        for row_index, row_values in batch:
+            try:
+                rows.append(
+                    (row_index, row_values, self._batcher.resolve(**row_values))
+                )
+            except Exception as err:
+                self.__worker.log_error(err)
+                self._record([row_index], False)
+                unresolved += 1
+        return rows, unresolved
+
+    def _handle_batched_row(self, row_index, row_values):
+        try:
+            self._handle_row(row_index, **row_values)
+        except Exception as err:
+            self._stats.increment_total_errors()
+            self.__worker.log_error(err)
+
+    def _handle_row(self, row_index, *args, **kwargs):
+        return self._handle([row_index], self._row_handler, *args, **kwargs)
+
+    def _handle(self, row_indices, handler, *args, **kwargs):
+        if not self._journal:
+            return handler(*args, **kwargs)
+
+        # Row handlers that do their own error handling report errors through the stats.
+        errors = self._stats.get_total_errors_for_current_thread()
+        try:
+            result = handler(*args, **kwargs)
+        except Exception:
+            self._record(row_indices, False)
+            raise
+        succeeded = self._stats.get_total_errors_for_current_thread() == errors
+        self._record(row_indices, succeeded)
+        return result
+
+    def _record(self, row_indices, succeeded):
+        if not self._journal:
+            return
+        for row_index in row_indices:
+            self._journal.record(row_index, succeeded)
+
+    def _report_job(self):
+        if not self._journal:
+            return
+        click.echo(
+            f"Bulk job ID: {self._journal.job_id}. If the job is interrupted or any rows "
+            f"fail, re-run the command with the same file and `--resume "
+            f"{self._journal.job_id}` within {JOURNAL_MAX_AGE // 86400} days to resume it.",
+            err=True,
+        )
+        if self._rows_to_skip:
+            click.echo(
+                f"Skipping {len(self._rows_to_skip)} rows that already succeeded.",
+                err=True,
+            )
 
     def _show_stats(self, _):
         return str(self._stats)
 
+    def _report_stats(self):
+        if self._stats.total_processed:
+            click.echo(f"\n{self._stats.get_summary()}", err=True)
+
     def _handle_if_errors(self):
         click.echo("")
         if self._stats.total_errors and self._raise_global_error:
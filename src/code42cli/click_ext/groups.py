@@ -2,6 +2,7 @@ import difflib
 import platform
 import re
 from collections import OrderedDict
+from importlib import import_module
 
 import click
 from py42.exceptions import Py42ActiveLegalHoldError
@@ -137,7 +138,8 @@ class ExceptionHandlingGroup(click.Group):
             match = re.match("No such command '(.*)'.", usage_err.message)
             if match:
                 bad_arg = match.groups()[0]
-                available_commands = list(usage_err.ctx.command.commands.keys())
+                ctx = usage_err.ctx
+                available_commands = list(ctx.command.list_commands(ctx))
                 suggested_commands = difflib.get_close_matches(
                     bad_arg, available_commands, cutoff=_DIFFLIB_CUT_OFF
                 )
@@ -150,6 +152,38 @@ class ExceptionHandlingGroup(click.Group):
         raise usage_err
 
 
+class LazyGroup(ExceptionHandlingGroup):
+    """An `ExceptionHandlingGroup` that imports each of its lazy subcommands the first time it's
+    looked up by name, so that running a command only imports the modules that command needs.
+
+    Args:
+        lazy_commands (dict): The import paths of the lazy subcommands by their names, in the form
+            `"module:attribute"`.
+    """
+
+    def __init__(self, *args, lazy_commands=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lazy_commands = dict(lazy_commands or {})
+
+    def list_commands(self, ctx):
+        return sorted({*self.commands, *self.lazy_commands})
+
+    def get_command(self, ctx, cmd_name):
+        if cmd_name not in self.commands and cmd_name in self.lazy_commands:
+            self.add_command(self._load_command(cmd_name), cmd_name)
+        return super().get_command(ctx, cmd_name)
+
+    def _load_command(self, cmd_name):
+        module_name, _, attribute = self.lazy_commands[cmd_name].partition(":")
+        command = getattr(import_module(module_name), attribute)
+        if not isinstance(command, click.Command):
+            raise TypeError(
+                f"Lazy command '{cmd_name}' must be a click.Command, not "
+                f"{type(command).__name__}."
+            )
+        return command
+
+
 class OrderedGroup(click.Group):
     """A `click.Group` subclass that uses an `OrderedDict` to store commands so the help text lists
     them in the order they were defined/added to the group.
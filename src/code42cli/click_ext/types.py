@@ -10,16 +10,29 @@ from click.exceptions import BadParameter
 from code42cli.logger import CliLogger
 from code42cli.util import print_numbered_list
 
+# The number of bytes from the start of a file used to detect its encoding.
+ENCODING_SAMPLE_SIZE = 64 * 1024
+
 
 class AutoDecodedFile(click.File):
-    """Attempts to autodetect file's encoding prior to normal click.File processing."""
+    """Attempts to autodetect file's encoding prior to normal click.File processing. Only the
+    first `ENCODING_SAMPLE_SIZE` bytes of the file are used for detection, so a file whose
+    sample is ASCII is read as UTF-8, in case there are non-ASCII characters after it."""
 
     def convert(self, value, param, ctx):
         try:
             with open(value, "rb") as file:
-                self.encoding = chardet.detect(file.read())["encoding"]
-            if self.encoding is None:
+                sample = file.read(ENCODING_SAMPLE_SIZE)
+            if len(sample) == ENCODING_SAMPLE_SIZE:
+                # don't let a character cut off at the end of the sample skew detection
+                sample = sample[: sample.rfind(b"\n") + 1] or sample
+            encoding = chardet.detect(sample)["encoding"]
+            if encoding is None:
                 CliLogger().log_error(f"Failed to detect encoding of file: {value}")
+            # UTF-8 is a superset of ASCII
+            self.encoding = (
+                "utf-8" if encoding is None or encoding == "ascii" else encoding
+            )
         except Exception:
             pass  # we'll let click.File do it's own exception handling for the filepath
 
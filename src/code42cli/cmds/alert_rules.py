@@ -10,9 +10,13 @@ from code42cli.bulk import generate_template_cmd_factory
 from code42cli.bulk import run_bulk_process
 from code42cli.click_ext.groups import OrderedGroup
 from code42cli.cmds.shared import get_user_id
+from code42cli.cmds.shared import prewarm_user_cache
 from code42cli.errors import Code42CLIError
 from code42cli.file_readers import read_csv_arg
 from code42cli.options import format_option
+from code42cli.options import max_workers_option
+from code42cli.options import rate_limit_option
+from code42cli.options import resume_option
 from code42cli.options import sdk_options
 from code42cli.output_formats import OutputFormatter
 from code42cli.util import deprecation_warning
@@ -126,15 +130,24 @@ bulk.add_command(alert_rules_generate_template)
     f"CSV file format: {','.join(ALERT_RULES_CSV_HEADERS)}"
 )
 @read_csv_arg(headers=ALERT_RULES_CSV_HEADERS)
+@max_workers_option
+@resume_option
+@rate_limit_option
 @sdk_options()
-def add(state, csv_rows):
+def add(state, csv_rows, max_workers, journal, rate_limit):
     sdk = state.sdk
+    prewarm_user_cache(sdk, csv_rows)
 
     def handle_row(rule_id, username):
         _add_user(sdk, rule_id, username)
 
     run_bulk_process(
-        handle_row, csv_rows, progress_label="Adding users to alert-rules:"
+        handle_row,
+        csv_rows,
+        progress_label="Adding users to alert-rules:",
+        max_workers=max_workers,
+        journal=journal,
+        rate_limit=rate_limit,
     )
 
 
@@ -143,15 +156,24 @@ def add(state, csv_rows):
     "CSV file format: {','.join(ALERT_RULES_CSV_HEADERS)}"
 )
 @read_csv_arg(headers=ALERT_RULES_CSV_HEADERS)
+@max_workers_option
+@resume_option
+@rate_limit_option
 @sdk_options()
-def remove(state, csv_rows):
+def remove(state, csv_rows, max_workers, journal, rate_limit):
     sdk = state.sdk
+    prewarm_user_cache(sdk, csv_rows)
 
     def handle_row(rule_id, username):
         _remove_user(sdk, rule_id, username)
 
     run_bulk_process(
-        handle_row, csv_rows, progress_label="Removing users from alert-rules:"
+        handle_row,
+        csv_rows,
+        progress_label="Removing users from alert-rules:",
+        max_workers=max_workers,
+        journal=journal,
+        rate_limit=rate_limit,
     )
 
 
@@ -1,3 +1,5 @@
+from functools import partial
+
 import click
 import py42.sdk.queries.alerts.filters as f
 from py42.exceptions import Py42NotFoundError
@@ -11,10 +13,13 @@ import code42cli.cmds.search.options as searchopt
 import code42cli.errors as errors
 import code42cli.options as opt
 from code42cli.bulk import generate_template_cmd_factory
+from code42cli.bulk import RowBatcher
 from code42cli.bulk import run_bulk_process
 from code42cli.click_ext.groups import OrderedGroup
 from code42cli.cmds.search import SendToCommand
-from code42cli.cmds.search.cursor_store import AlertCursorStore
+from code42cli.cmds.search.cursor_store import checkpoint_writer
+from code42cli.cmds.search.cursor_store import dedupe_checkpointed_events
+from code42cli.cmds.search.cursor_store import get_alert_cursor_store
 from code42cli.cmds.search.options import server_options
 from code42cli.cmds.util import convert_to_or_query
 from code42cli.cmds.util import create_time_range_filter
@@ -24,17 +29,20 @@ from code42cli.date_helper import limit_date_range
 from code42cli.enums import JsonOutputFormat
 from code42cli.enums import OutputFormat
 from code42cli.file_readers import read_csv_arg
+from code42cli.logger import flush_logger
 from code42cli.options import format_option
 from code42cli.output_formats import OutputFormatter
 from code42cli.util import deprecation_warning
-from code42cli.util import hash_event
-from code42cli.util import parse_timestamp
+from code42cli.util import map_concurrently
 from code42cli.util import warn_interrupt
 
 DEPRECATION_TEXT = "Incydr functionality is deprecated. Use the Incydr CLI instead (https://developer.code42.com/)."
 
 ALERTS_KEYWORD = "alerts"
-ALERT_PAGE_SIZE = 25
+# The max number of alerts whose details can be requested at once.
+ALERT_PAGE_SIZE = 100
+# The number of pages of alert details to request at once.
+ALERT_DETAILS_MAX_WORKERS = 4
 
 begin = opt.begin_option(
     ALERTS_KEYWORD,
@@ -249,21 +257,18 @@ def search(
             begin = checkpoint
 
     query = _construct_query(cli_state, begin, end, advanced_query, or_query)
-    alerts_gen = cli_state.sdk.alerts.get_all_alert_details(query)
-
-    if use_checkpoint:
-        checkpoint_name = use_checkpoint
-        # update checkpoint to alertId of last event retrieved
-        alerts_gen = _dedupe_checkpointed_events_and_store_updated_checkpoint(
-            cursor, checkpoint_name, alerts_gen
-        )
-    alerts_list = []
-    for alert in alerts_gen:
-        alerts_list.append(alert)
-    if not alerts_list:
+    alerts_gen = _get_all_alert_details(cli_state.sdk, query)
+
+    with checkpoint_writer(cursor) as cursor:
+        if use_checkpoint:
+            checkpoint_name = use_checkpoint
+            # update checkpoint to alertId of last event retrieved
+            alerts_gen = _dedupe_checkpointed_events_and_store_updated_checkpoint(
+                cursor, checkpoint_name, alerts_gen
+            )
+        output_count = formatter.echo_formatted_iterable(alerts_gen)
+    if not output_count:
         click.echo("No results found.")
-        return
-    formatter.echo_formatted_list(alerts_list)
 
 
 def _construct_query(state, begin, end, advanced_query, or_query):
@@ -284,31 +289,51 @@ def _construct_query(state, begin, end, advanced_query, or_query):
     return query
 
 
+def _get_all_alert_details(sdk, query):
+    """Like `sdk.alerts.get_all_alert_details()`, but requests the details of up to
+    `ALERT_DETAILS_MAX_WORKERS` pages of alerts at once while the next pages of alerts are
+    searched. Alerts are yielded in the query's sort order.
+    """
+    sort_key = query.sort_key[0].lower() + query.sort_key[1:]
+    if sort_key == "alertId":
+        sort_key = "id"
+    reverse = query.sort_direction == "desc"
+
+    def get_sort_value(alert):
+        # Alerts without a value for the sort key are sorted after the rest.
+        value = alert.get(sort_key)
+        return (value is None, "" if value is None else value)
+
+    def get_details(alert_ids):
+        alert_details = sdk.alerts.get_details(alert_ids)["alerts"]
+        return sorted(alert_details, key=get_sort_value, reverse=reverse)
+
+    pages = (
+        [alert["id"] for alert in page["alerts"]]
+        for page in sdk.alerts.search_all_pages(query)
+    )
+    pages = (alert_ids for alert_ids in pages if alert_ids)
+    for alert_details in map_concurrently(
+        get_details, pages, ALERT_DETAILS_MAX_WORKERS
+    ):
+        yield from alert_details
+
+
 def _dedupe_checkpointed_events_and_store_updated_checkpoint(
     cursor, checkpoint_name, alerts_gen
 ):
-    """De-duplicates events across checkpointed runs. Since using the timestamp of the last event
-    processed as the `--begin` time of the next run causes the last event to show up again in the
-    next results, we hash the last event(s) of each run and store those hashes in the cursor to
-    filter out on the next run. It's also possible that two events have the exact same timestamp, so
-    `checkpoint_events` needs to be a list of hashes so we can filter out everything that's actually
-    been processed.
+    """De-duplicates events across checkpointed runs. See
+    :func:`~code42cli.cmds.search.cursor_store.dedupe_checkpointed_events`.
     """
-
-    checkpoint_alerts = cursor.get_alerts(checkpoint_name)
-    new_timestamp = None
-    new_alerts = []
-    for alert in alerts_gen:
-        event_hash = hash_event(alert)
-        if event_hash not in checkpoint_alerts:
-            if alert[f.DateObserved._term] != new_timestamp:
-                new_timestamp = alert[f.DateObserved._term]
-                new_alerts.clear()
-            new_alerts.append(event_hash)
-            yield alert
-            ts = parse_timestamp(new_timestamp)
-            cursor.replace(checkpoint_name, ts)
-            cursor.replace_alerts(checkpoint_name, new_alerts)
+    return dedupe_checkpointed_events(
+        cursor,
+        checkpoint_name,
+        alerts_gen,
+        cursor.get_alerts,
+        cursor.replace_alerts,
+        "id",
+        f.DateObserved._term,
+    )
 
 
 @alerts.command(cls=SendToCommand)
@@ -340,19 +365,22 @@ def send_to(cli_state, begin, end, advanced_query, use_checkpoint, or_query, **k
             begin = checkpoint
 
     query = _construct_query(cli_state, begin, end, advanced_query, or_query)
-    alerts_gen = cli_state.sdk.alerts.get_all_alert_details(query)
-
-    if use_checkpoint:
-        checkpoint_name = use_checkpoint
-        alerts_gen = _dedupe_checkpointed_events_and_store_updated_checkpoint(
-            cursor, checkpoint_name, alerts_gen
-        )
-    with warn_interrupt():
-        alert = None
-        for alert in alerts_gen:
-            cli_state.logger.info(alert)
-        if alert is None:  # generator was empty
-            click.echo("No results found.")
+    alerts_gen = _get_all_alert_details(cli_state.sdk, query)
+
+    # checkpoints are only written for alerts that have been sent
+    flush = partial(flush_logger, cli_state.logger)
+    with checkpoint_writer(cursor, before_flush=flush) as cursor:
+        if use_checkpoint:
+            checkpoint_name = use_checkpoint
+            alerts_gen = _dedupe_checkpointed_events_and_store_updated_checkpoint(
+                cursor, checkpoint_name, alerts_gen
+            )
+        with warn_interrupt():
+            alert = None
+            for alert in alerts_gen:
+                cli_state.logger.info(alert)
+            if alert is None:  # generator was empty
+                click.echo("No results found.")
 
 
 def _get_cursor(state, use_checkpoint):
@@ -360,7 +388,7 @@ def _get_cursor(state, use_checkpoint):
 
 
 def _get_alert_cursor_store(profile_name):
-    return AlertCursorStore(profile_name)
+    return get_alert_cursor_store(profile_name)
 
 
 @alerts.command()
@@ -414,6 +442,8 @@ def bulk(state):
 
 
 UPDATE_ALERT_CSV_HEADERS = ["id", "state", "note"]
+# The alerts backend accepts at most 100 alerts per state update request.
+_MAX_ALERTS_PER_UPDATE = 100
 update_alerts_generate_template = generate_template_cmd_factory(
     group_name=ALERTS_KEYWORD,
     commands_dict={"update": UPDATE_ALERT_CSV_HEADERS},
@@ -426,19 +456,40 @@ bulk.add_command(update_alerts_generate_template)
     name="update",
     help=f"Bulk update alerts using a CSV file with format: {','.join(UPDATE_ALERT_CSV_HEADERS)}",
 )
+@opt.max_workers_option
+@opt.resume_option
+@opt.rate_limit_option
+@opt.batch_size_option
 @opt.sdk_options()
 @read_csv_arg(headers=UPDATE_ALERT_CSV_HEADERS)
-def bulk_update(cli_state, csv_rows):
+def bulk_update(cli_state, csv_rows, max_workers, journal, rate_limit, batch_size):
     """Bulk update alerts."""
     sdk = cli_state.sdk
 
     def handle_row(id, state, note):
         _update_alert(sdk, id, state, note)
 
+    def get_batch_key(id, state, note):
+        # Alerts being updated to the same state with the same note can be updated together.
+        # Rows that only update the note are handled one at a time.
+        return (state, note) if state else None
+
+    def handle_batch(key, rows):
+        state, note = key
+        sdk.alerts.update_state(state, [row["id"] for row in rows], note=note)
+
     run_bulk_process(
         handle_row,
         csv_rows,
         progress_label="Updating alerts:",
+        max_workers=max_workers,
+        journal=journal,
+        rate_limit=rate_limit,
+        batcher=RowBatcher(
+            handle_batch,
+            get_batch_key,
+            size=min(batch_size, _MAX_ALERTS_PER_UPDATE),
+        ),
     )
 
 
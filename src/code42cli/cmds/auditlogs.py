@@ -1,18 +1,24 @@
+from functools import partial
+from time import time
+
 import click
 
 import code42cli.options as opt
 from code42cli.click_ext.groups import OrderedGroup
 from code42cli.cmds.search import SendToCommand
-from code42cli.cmds.search.cursor_store import AuditLogCursorStore
+from code42cli.cmds.search.cursor_store import checkpoint_writer
+from code42cli.cmds.search.cursor_store import dedupe_checkpointed_events
+from code42cli.cmds.search.cursor_store import get_audit_log_cursor_store
 from code42cli.cmds.search.options import server_options
 from code42cli.date_helper import convert_datetime_to_timestamp
+from code42cli.logger import flush_logger
 from code42cli.options import checkpoint_option
 from code42cli.options import format_option
 from code42cli.options import sdk_options
 from code42cli.output_formats import OutputFormatter
 from code42cli.util import deprecation_warning
-from code42cli.util import hash_event
 from code42cli.util import parse_timestamp
+from code42cli.util import prefetch
 from code42cli.util import warn_interrupt
 
 DEPRECATION_TEXT = "Incydr functionality is deprecated. Use the Incydr CLI instead (https://developer.code42.com/)."
@@ -20,6 +26,13 @@ DEPRECATION_TEXT = "Incydr functionality is deprecated. Use the Incydr CLI inste
 EVENT_KEY = "events"
 AUDIT_LOGS_KEYWORD = "audit-logs"
 
+# With --stream, events are requested in time windows that start at an hour long and then grow or
+# shrink so that each window holds about this many events.
+STREAM_WINDOW_TARGET_SIZE = 10000
+_STREAM_INITIAL_WINDOW = 60 * 60
+_STREAM_MIN_WINDOW = 60
+_STREAM_MAX_WINDOW = 30 * 24 * 60 * 60
+
 
 def _get_audit_logs_default_header():
     return {
@@ -77,6 +90,15 @@ filter_option_event_types = click.option(
     multiple=True,
 )
 
+stream_option = click.option(
+    "--stream",
+    is_flag=True,
+    default=False,
+    help="Request events in time windows, oldest first, and output each window's events as soon as "
+    "it's retrieved instead of retrieving every event before outputting any. TABLE output from "
+    "`search` is not streamed.",
+)
+
 
 def filter_options(f):
     f = filter_option_event_types(f)
@@ -111,6 +133,7 @@ def clear_checkpoint(state, checkpoint_name):
 @filter_options
 @format_option
 @checkpoint_option(AUDIT_LOGS_KEYWORD)
+@stream_option
 @sdk_options()
 def search(
     state,
@@ -124,6 +147,7 @@ def search(
     affected_username,
     format,
     use_checkpoint,
+    stream,
 ):
     """Search audit log events."""
     formatter = OutputFormatter(format, _get_audit_logs_default_header())
@@ -144,26 +168,31 @@ def search(
         user_ip_addresses=actor_ip,
         affected_user_ids=affected_user_id,
         affected_usernames=affected_username,
+        stream=stream,
     )
 
-    if use_checkpoint:
-        checkpoint_name = use_checkpoint
-        events = list(
-            _dedupe_checkpointed_events_and_store_updated_checkpoint(
-                cursor, checkpoint_name, events
+    with checkpoint_writer(cursor if use_checkpoint else None) as writer:
+        if use_checkpoint:
+            checkpoint_name = use_checkpoint
+            events = _dedupe_checkpointed_events_and_store_updated_checkpoint(
+                writer, checkpoint_name, events
             )
-        )
-
-    if not events:
+        if stream:
+            output_count = formatter.echo_formatted_iterable(events)
+        else:
+            events = list(events)
+            output_count = len(events)
+            if output_count:
+                formatter.echo_formatted_list(events)
+
+    if not output_count:
         click.echo("No results found.", err=True)
-        return
-
-    formatter.echo_formatted_list(events)
 
 
 @audit_logs.command(cls=SendToCommand)
 @filter_options
 @checkpoint_option(AUDIT_LOGS_KEYWORD)
+@stream_option
 @server_options
 @sdk_options()
 def send_to(
@@ -177,6 +206,7 @@ def send_to(
     affected_user_id,
     affected_username,
     use_checkpoint,
+    stream,
     **kwargs,
 ):
     """Send audit log events to the given server address in JSON format.
@@ -200,21 +230,63 @@ def send_to(
         user_ip_addresses=actor_ip,
         affected_user_ids=affected_user_id,
         affected_usernames=affected_username,
+        stream=stream,
     )
-    if use_checkpoint:
-        checkpoint_name = use_checkpoint
-        events = _dedupe_checkpointed_events_and_store_updated_checkpoint(
-            cursor, checkpoint_name, events
+    # checkpoints are only written for events that have been sent
+    flush = partial(flush_logger, state.logger)
+    with checkpoint_writer(
+        cursor if use_checkpoint else None, before_flush=flush
+    ) as writer:
+        if use_checkpoint:
+            checkpoint_name = use_checkpoint
+            events = _dedupe_checkpointed_events_and_store_updated_checkpoint(
+                writer, checkpoint_name, events
+            )
+        with warn_interrupt():
+            event = None
+            for event in events:
+                state.logger.info(event)
+            if event is None:  # generator was empty
+                click.echo("No results found.")
+
+
+def _get_all_audit_log_events(sdk, stream=False, **filter_args):
+    if stream and filter_args.get("begin_time") is not None:
+        return prefetch(_iter_audit_log_events_in_windows(sdk, **filter_args), size=1)
+    return _get_audit_log_events(sdk, **filter_args)
+
+
+def _iter_audit_log_events_in_windows(sdk, begin_time, end_time=None, **filter_args):
+    """Yields the events between `begin_time` and `end_time` in timestamp order by requesting
+    them in consecutive time windows, so that only one window's events are held at a time. The
+    length of each window is adjusted so that it holds about `STREAM_WINDOW_TARGET_SIZE` events.
+    """
+    end_time = end_time or time()
+    window = _STREAM_INITIAL_WINDOW
+    window_begin = begin_time
+    while window_begin < end_time:
+        window_end = min(window_begin + window, end_time)
+        events = _get_audit_log_events(
+            sdk, begin_time=window_begin, end_time=window_end, **filter_args
         )
-    with warn_interrupt():
-        event = None
-        for event in events:
-            state.logger.info(event)
-        if event is None:  # generator was empty
-            click.echo("No results found.")
+        if window_end < end_time:
+            # events at the window's end are output with the next window
+            while events and parse_timestamp(events[-1]["timestamp"]) >= window_end:
+                events.pop()
+        yield from events
+        window = _get_next_stream_window(window, len(events))
+        window_begin = window_end
+
+
+def _get_next_stream_window(window, event_count):
+    if event_count > STREAM_WINDOW_TARGET_SIZE:
+        window /= 2
+    elif event_count < STREAM_WINDOW_TARGET_SIZE / 2:
+        window *= 2
+    return min(max(window, _STREAM_MIN_WINDOW), _STREAM_MAX_WINDOW)
 
 
-def _get_all_audit_log_events(sdk, **filter_args):
+def _get_audit_log_events(sdk, **filter_args):
     response_gen = sdk.auditlogs.get_all(**filter_args)
     events = []
     try:
@@ -236,29 +308,19 @@ def _get_all_audit_log_events(sdk, **filter_args):
 def _dedupe_checkpointed_events_and_store_updated_checkpoint(
     cursor, checkpoint_name, events
 ):
-    """De-duplicates events across checkpointed runs. Since using the timestamp of the last event
-    processed as the `--begin` time of the next run causes the last event to show up again in the
-    next results, we hash the last event(s) of each run and store those hashes in the cursor to
-    filter out on the next run. It's also possible that two events have the exact same timestamp, so
-    `checkpoint_events` needs to be a list of hashes so we can filter out everything that's actually
-    been processed.
+    """De-duplicates events across checkpointed runs. See
+    :func:`~code42cli.cmds.search.cursor_store.dedupe_checkpointed_events`.
     """
-
-    checkpoint_events = cursor.get_events(checkpoint_name)
-    new_timestamp = None
-    new_events = []
-    for event in events:
-        event_hash = hash_event(event)
-        if event_hash not in checkpoint_events:
-            if event["timestamp"] != new_timestamp:
-                new_timestamp = event["timestamp"]
-                new_events.clear()
-            new_events.append(event_hash)
-            yield event
-            ts = parse_timestamp(new_timestamp)
-            cursor.replace(checkpoint_name, ts)
-            cursor.replace_events(checkpoint_name, new_events)
+    return dedupe_checkpointed_events(
+        cursor,
+        checkpoint_name,
+        events,
+        cursor.get_events,
+        cursor.replace_events,
+        "id",
+        "timestamp",
+    )
 
 
 def _get_audit_log_cursor_store(profile_name):
-    return AuditLogCursorStore(profile_name)
+    return get_audit_log_cursor_store(profile_name)
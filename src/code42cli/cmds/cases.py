@@ -14,6 +14,9 @@ from code42cli.click_ext.groups import OrderedGroup
 from code42cli.errors import Code42CLIError
 from code42cli.file_readers import read_csv_arg
 from code42cli.options import format_option
+from code42cli.options import max_workers_option
+from code42cli.options import rate_limit_option
+from code42cli.options import resume_option
 from code42cli.options import sdk_options
 from code42cli.options import set_begin_default_dict
 from code42cli.options import set_end_default_dict
@@ -299,8 +302,11 @@ bulk.add_command(case_file_events_generate_template)
     f"format: {','.join(FILE_EVENTS_HEADERS)}.",
 )
 @read_csv_arg(headers=FILE_EVENTS_HEADERS)
+@max_workers_option
+@resume_option
+@rate_limit_option
 @sdk_options()
-def bulk_add(state, csv_rows):
+def bulk_add(state, csv_rows, max_workers, journal, rate_limit):
     sdk = state.sdk
 
     def handle_row(number, event_id):
@@ -310,6 +316,9 @@ def bulk_add(state, csv_rows):
         handle_row,
         csv_rows,
         progress_label="Associating file events to cases:",
+        max_workers=max_workers,
+        journal=journal,
+        rate_limit=rate_limit,
     )
 
 
@@ -319,8 +328,11 @@ def bulk_add(state, csv_rows):
     f"format: {','.join(FILE_EVENTS_HEADERS)}.",
 )
 @read_csv_arg(headers=FILE_EVENTS_HEADERS)
+@max_workers_option
+@resume_option
+@rate_limit_option
 @sdk_options()
-def bulk_remove(state, csv_rows):
+def bulk_remove(state, csv_rows, max_workers, journal, rate_limit):
     sdk = state.sdk
 
     def handle_row(number, event_id):
@@ -330,4 +342,7 @@ def bulk_remove(state, csv_rows):
         handle_row,
         csv_rows,
         progress_label="Removing the file event association from cases:",
+        max_workers=max_workers,
+        journal=journal,
+        rate_limit=rate_limit,
     )
@@ -1,10 +1,10 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date
 
 import click
 import numpy as np
 from pandas import concat
 from pandas import DataFrame
-from pandas import json_normalize
 from pandas import Series
 from pandas import to_datetime
 from py42 import exceptions
@@ -16,15 +16,21 @@ from code42cli.bulk import run_bulk_process
 from code42cli.click_ext.groups import OrderedGroup
 from code42cli.click_ext.options import incompatible_with
 from code42cli.click_ext.types import MagicDate
+from code42cli.custodian_index import get_custodian_index
+from code42cli.custodian_index import get_legal_hold_membership_dataframe
 from code42cli.date_helper import round_datetime_to_day_end
 from code42cli.date_helper import round_datetime_to_day_start
 from code42cli.errors import Code42CLIError
 from code42cli.file_readers import read_csv_arg
 from code42cli.options import format_option
+from code42cli.options import max_workers_option
+from code42cli.options import rate_limit_option
+from code42cli.options import resume_option
 from code42cli.options import sdk_options
 from code42cli.output_formats import DataFrameOutputFormatter
 from code42cli.output_formats import OutputFormat
 from code42cli.output_formats import OutputFormatter
+from code42cli.util import StageTimer
 from code42cli.worker import create_worker_stats
 
 
@@ -368,14 +374,67 @@ def list_devices(
         "osVersion",
         "userUid",
     ]
-    df = _get_device_dataframe(
-        sdk=state.sdk,
-        columns=columns,
-        page_size=page_size,
-        active=active,
-        org_uid=org_uid,
-        include_backup_usage=(include_backup_usage or include_total_storage),
-    )
+    sdk = state.sdk
+    timer = StageTimer(state.debug)
+    # The enrichments that don't depend on which devices are listed are fetched in the
+    # background while the devices are.
+    executor = ThreadPoolExecutor(max_workers=2)
+    try:
+        usernames = legal_hold_memberships = None
+        if include_usernames:
+            usernames = executor.submit(
+                timer.timed("Getting usernames", _get_usernames_by_user_uid), sdk
+            )
+        if include_legal_hold_membership:
+            legal_hold_memberships = executor.submit(
+                timer.timed(
+                    "Getting legal hold memberships",
+                    _get_legal_hold_memberships_by_user_uid,
+                ),
+                sdk,
+                state.profile,
+            )
+        with timer.time("Getting devices"):
+            df = _get_device_dataframe(
+                sdk=sdk,
+                columns=columns,
+                page_size=page_size,
+                active=active,
+                org_uid=org_uid,
+                include_backup_usage=(include_backup_usage or include_total_storage),
+            )
+        df = _filter_devices(
+            df,
+            exclude_most_recently_connected,
+            last_connected_after,
+            last_connected_before,
+            created_after,
+            created_before,
+        )
+        if include_total_storage:
+            df = _add_storage_totals_to_dataframe(df, include_backup_usage)
+        if include_settings:
+            with timer.time("Getting device settings"):
+                df = _add_settings_to_dataframe(sdk, df)
+        if usernames:
+            df = _join_usernames(df, usernames.result())
+        if legal_hold_memberships:
+            df = _join_legal_hold_memberships(df, legal_hold_memberships.result())
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    timer.report()
+    formatter = DataFrameOutputFormatter(format)
+    formatter.echo_formatted_dataframes(df)
+
+
+def _filter_devices(
+    df,
+    exclude_most_recently_connected,
+    last_connected_after,
+    last_connected_before,
+    created_after,
+    created_before,
+):
     if exclude_most_recently_connected:
         most_recent = (
             df.sort_values(["userUid", "lastConnected"], ascending=False)
@@ -391,62 +450,25 @@ def list_devices(
         df = df.loc[to_datetime(df.creationDate) > created_after]
     if created_before:
         df = df.loc[to_datetime(df.creationDate) < created_before]
-    if include_total_storage:
-        df = _add_storage_totals_to_dataframe(df, include_backup_usage)
-    if include_settings:
-        df = _add_settings_to_dataframe(state.sdk, df)
-    if include_usernames:
-        df = _add_usernames_to_device_dataframe(state.sdk, df)
-    if include_legal_hold_membership:
-        df = _add_legal_hold_membership_to_device_dataframe(state.sdk, df)
-    formatter = DataFrameOutputFormatter(format)
-    formatter.echo_formatted_dataframes(df)
-
+    return df
 
-def _add_legal_hold_membership_to_device_dataframe(sdk, df):
-    columns = ["legalHold.legalHoldUid", "legalHold.name", "user.userUid"]
 
-    legal_hold_member_dataframe = (
-        json_normalize(list(_get_all_active_hold_memberships(sdk)))[columns]
-        .groupby(["user.userUid"])
-        .agg(",".join)
-        .rename(
-            {
-                "legalHold.legalHoldUid": "legalHoldUid",
-                "legalHold.name": "legalHoldName",
-            },
-            axis=1,
-        )
-    )
-    df = df.merge(
-        legal_hold_member_dataframe,
-        how="left",
-        left_on="userUid",
-        right_on="user.userUid",
+def _add_legal_hold_membership_to_device_dataframe(sdk, df, profile=None):
+    return _join_legal_hold_memberships(
+        df, _get_legal_hold_memberships_by_user_uid(sdk, profile)
     )
 
-    df.loc[df["status"] == "Deactivated", ["legalHoldUid", "legalHoldName"]] = np.nan
 
-    return df
+def _get_legal_hold_memberships_by_user_uid(sdk, profile=None):
+    """Returns a DataFrame of the comma-separated UIDs and names of the active legal holds that
+    each user is a custodian of, indexed by the user's UID."""
+    return get_legal_hold_membership_dataframe(get_custodian_index(sdk, profile))
 
 
-def _get_all_active_hold_memberships(sdk):
-    for page in sdk.legalhold.get_all_matters(active=True):
-        if sdk._auth_flag == 1:  # noqa: api client endpoint returns a list directly
-            matters = page.data
-        else:
-            matters = page["legalHolds"]
-        for matter in matters:
-            if sdk._auth_flag == 1:  # noqa: api client endpoint returns a list directly
-                for _page in sdk.legalhold.get_all_matter_custodians(
-                    legal_hold_matter_uid=matter["legalHoldUid"], active=True
-                ):
-                    yield from _page.data
-            else:
-                for _page in sdk.legalhold.get_all_matter_custodians(
-                    legal_hold_uid=matter["legalHoldUid"], active=True
-                ):
-                    yield from _page["legalHoldMemberships"]
+def _join_legal_hold_memberships(df, legal_hold_memberships):
+    df = df.join(legal_hold_memberships, on="userUid")
+    df.loc[df["status"] == "Deactivated", ["legalHoldUid", "legalHoldName"]] = np.nan
+    return df
 
 
 def _get_device_dataframe(
@@ -500,14 +522,20 @@ def _add_settings_to_dataframe(sdk, device_dataframe):
 
 
 def _add_usernames_to_device_dataframe(sdk, device_dataframe):
-    users_generator = sdk.users.get_all()
-    users_list = []
-    for page in users_generator:
-        users_list.extend(page["users"])
-    users_dataframe = DataFrame.from_records(
-        users_list, columns=["username", "userUid"]
-    )
-    return device_dataframe.merge(users_dataframe, how="left", on="userUid")
+    return _join_usernames(device_dataframe, _get_usernames_by_user_uid(sdk))
+
+
+def _get_usernames_by_user_uid(sdk):
+    """Returns a Series of the usernames of all users, indexed by their UIDs."""
+    usernames = {}
+    for page in sdk.users.get_all():
+        for user in page["users"]:
+            usernames.setdefault(user.get("userUid"), user.get("username"))
+    return Series(usernames, dtype=object)
+
+
+def _join_usernames(device_dataframe, usernames):
+    return device_dataframe.assign(username=device_dataframe["userUid"].map(usernames))
 
 
 def _add_storage_totals_to_dataframe(df, include_backup_usage):
@@ -630,26 +658,34 @@ bulk.add_command(devices_generate_template)
 )
 @purge_date_option
 @format_option
+@max_workers_option
+@resume_option
+@rate_limit_option
 @sdk_options()
-def bulk_deactivate(state, csv_rows, change_device_name, purge_date, format):
+def bulk_deactivate(
+    state,
+    csv_rows,
+    change_device_name,
+    purge_date,
+    format,
+    max_workers,
+    journal,
+    rate_limit,
+):
     """Deactivate all devices from the provided CSV containing a 'guid' column."""
 
     # Initialize the SDK before starting any bulk processes
     # to prevent multiple instances and having to enter 2fa multiple times.
     sdk = state.sdk
 
-    csv_rows[0]["deactivated"] = "False"
-    formatter = OutputFormatter(format, {key: key for key in csv_rows[0].keys()})
+    formatter = OutputFormatter(
+        format, {key: key for key in [*csv_rows.headers, "deactivated"]}
+    )
     stats = create_worker_stats(len(csv_rows))
-    for row in csv_rows:
-        row["change_device_name"] = change_device_name
-        row["purge_date"] = purge_date
 
     def handle_row(**row):
         try:
-            _deactivate_device(
-                sdk, row["guid"], row["change_device_name"], row["purge_date"]
-            )
+            _deactivate_device(sdk, row["guid"], change_device_name, purge_date)
             row["deactivated"] = "True"
         except Exception as err:
             row["deactivated"] = f"False: {err}"
@@ -662,6 +698,9 @@ def bulk_deactivate(state, csv_rows, change_device_name, purge_date, format):
         progress_label="Deactivating devices:",
         stats=stats,
         raise_global_error=False,
+        max_workers=max_workers,
+        journal=journal,
+        rate_limit=rate_limit,
     )
     formatter.echo_formatted_list(result_rows)
 
@@ -669,16 +708,20 @@ def bulk_deactivate(state, csv_rows, change_device_name, purge_date, format):
 @bulk.command(name="reactivate")
 @read_csv_arg(headers=_bulk_device_activation_headers)
 @format_option
+@max_workers_option
+@resume_option
+@rate_limit_option
 @sdk_options()
-def bulk_reactivate(state, csv_rows, format):
+def bulk_reactivate(state, csv_rows, format, max_workers, journal, rate_limit):
     """Reactivate all devices from the provided CSV containing a 'guid' column."""
 
     # Initialize the SDK before starting any bulk processes
     # to prevent multiple instances and having to enter 2fa multiple times.
     sdk = state.sdk
 
-    csv_rows[0]["reactivated"] = "False"
-    formatter = OutputFormatter(format, {key: key for key in csv_rows[0].keys()})
+    formatter = OutputFormatter(
+        format, {key: key for key in [*csv_rows.headers, "reactivated"]}
+    )
     stats = create_worker_stats(len(csv_rows))
 
     def handle_row(**row):
@@ -696,6 +739,9 @@ def bulk_reactivate(state, csv_rows, format):
         progress_label="Reactivating devices:",
         stats=stats,
         raise_global_error=False,
+        max_workers=max_workers,
+        journal=journal,
+        rate_limit=rate_limit,
     )
     formatter.echo_formatted_list(result_rows)
 
@@ -703,16 +749,20 @@ def bulk_reactivate(state, csv_rows, format):
 @bulk.command(name="rename")
 @read_csv_arg(headers=_bulk_device_rename_headers)
 @format_option
+@max_workers_option
+@resume_option
+@rate_limit_option
 @sdk_options()
-def bulk_rename(state, csv_rows, format):
+def bulk_rename(state, csv_rows, format, max_workers, journal, rate_limit):
     """Rename all devices from the provided CSV containing a 'guid' and a 'name' column."""
 
     # Initialize the SDK before starting any bulk processes
     # to prevent multiple instances and having to enter 2fa multiple times.
     sdk = state.sdk
 
-    csv_rows[0]["renamed"] = "False"
-    formatter = OutputFormatter(format, {key: key for key in csv_rows[0].keys()})
+    formatter = OutputFormatter(
+        format, {key: key for key in [*csv_rows.headers, "renamed"]}
+    )
     stats = create_worker_stats(len(csv_rows))
 
     def handle_row(**row):
@@ -730,5 +780,8 @@ def bulk_rename(state, csv_rows, format):
         progress_label="Renaming devices:",
         stats=stats,
         raise_global_error=False,
+        max_workers=max_workers,
+        journal=journal,
+        rate_limit=rate_limit,
     )
     formatter.echo_formatted_list(result_rows)
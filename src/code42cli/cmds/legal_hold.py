@@ -10,9 +10,13 @@ from code42cli.bulk import generate_template_cmd_factory
 from code42cli.bulk import run_bulk_process
 from code42cli.click_ext.groups import OrderedGroup
 from code42cli.cmds.shared import get_user_id
+from code42cli.cmds.shared import prewarm_user_cache
 from code42cli.errors import UserNotInLegalHoldError
 from code42cli.file_readers import read_csv_arg
 from code42cli.options import format_option
+from code42cli.options import max_workers_option
+from code42cli.options import rate_limit_option
+from code42cli.options import resume_option
 from code42cli.options import sdk_options
 from code42cli.options import set_begin_default_dict
 from code42cli.options import set_end_default_dict
@@ -211,14 +215,25 @@ bulk.add_command(legal_hold_generate_template)
     f"CSV file format: {','.join(LEGAL_HOLD_CSV_HEADERS)}",
 )
 @read_csv_arg(headers=LEGAL_HOLD_CSV_HEADERS)
+@max_workers_option
+@resume_option
+@rate_limit_option
 @sdk_options()
-def bulk_add(state, csv_rows):
+def bulk_add(state, csv_rows, max_workers, journal, rate_limit):
     sdk = state.sdk
+    prewarm_user_cache(sdk, csv_rows)
 
     def handle_row(matter_id, username):
         _add_user_to_legal_hold(sdk, matter_id, username)
 
-    run_bulk_process(handle_row, csv_rows, progress_label="Adding users to legal hold:")
+    run_bulk_process(
+        handle_row,
+        csv_rows,
+        progress_label="Adding users to legal hold:",
+        max_workers=max_workers,
+        journal=journal,
+        rate_limit=rate_limit,
+    )
 
 
 @bulk.command(
@@ -226,15 +241,24 @@ def bulk_add(state, csv_rows):
     f"CSV file format: {','.join(LEGAL_HOLD_CSV_HEADERS)}"
 )
 @read_csv_arg(headers=LEGAL_HOLD_CSV_HEADERS)
+@max_workers_option
+@resume_option
+@rate_limit_option
 @sdk_options()
-def remove(state, csv_rows):
+def remove(state, csv_rows, max_workers, journal, rate_limit):
     sdk = state.sdk
+    prewarm_user_cache(sdk, csv_rows)
 
     def handle_row(matter_id, username):
         _remove_user_from_legal_hold(state, sdk, matter_id, username)
 
     run_bulk_process(
-        handle_row, csv_rows, progress_label="Removing users from legal hold:"
+        handle_row,
+        csv_rows,
+        progress_label="Removing users from legal hold:",
+        max_workers=max_workers,
+        journal=journal,
+        rate_limit=rate_limit,
     )
 
 
@@ -8,6 +8,7 @@ import code42cli.profile as cliprofile
 from code42cli.click_ext.options import incompatible_with
 from code42cli.click_ext.types import PromptChoice
 from code42cli.click_ext.types import TOTP
+from code42cli.cmds.search.cursor_store import migrate_to_checkpoint_database
 from code42cli.errors import Code42CLIError
 from code42cli.options import yes_option
 from code42cli.profile import CREATE_PROFILE_HELP
@@ -338,6 +339,21 @@ def reset_pw(profile_name, debug):
     echo(f"Password updated for profile '{profile_name_saved}'.")
 
 
+@profile.command()
+@profile_name_arg()
+def migrate_checkpoints(profile_name):
+    """\b
+    Move a profile's checkpoints into a single database. The database is safe for many
+    `send-to` commands using the same profile to update at the same time. After migrating, the
+    profile's checkpoints are always stored in the database. If not providing a profile-name,
+    uses the default profile."""
+    c42profile = cliprofile.get_profile(profile_name)
+    count = migrate_to_checkpoint_database(c42profile.name)
+    echo(
+        f"Migrated {count} checkpoint files for profile '{c42profile.name}' to a checkpoint database."
+    )
+
+
 @profile.command("list")
 def _list():
     """Show all existing stored profiles."""
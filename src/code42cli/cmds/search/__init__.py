@@ -1,20 +1,34 @@
 import click
 
+from code42cli.enums import OutputFormat
 from code42cli.errors import Code42CLIError
+from code42cli.logger import flush_logger
 from code42cli.logger import get_logger_for_server
+from code42cli.logger import get_logger_for_servers
+from code42cli.logger import SyslogServer
+from code42cli.logger.enums import MessageFraming
 from code42cli.logger.enums import ServerProtocol
-from code42cli.output_formats import OutputFormat
 
 
-def _try_get_logger_for_server(hostname, protocol, output_format, certs):
+def _try_get_logger_for_server(hostname, protocol, output_format, certs, **kwargs):
     try:
-        return get_logger_for_server(hostname, protocol, output_format, certs)
+        return get_logger_for_server(hostname, protocol, output_format, certs, **kwargs)
     except Exception as err:
         raise Code42CLIError(
             f"Unable to connect to {hostname}. Failed with error: {err}."
         )
 
 
+def _try_get_logger_for_servers(servers, **kwargs):
+    try:
+        return get_logger_for_servers(servers, **kwargs)
+    except Exception as err:
+        hostnames = ", ".join(server.hostname for server in servers)
+        raise Code42CLIError(
+            f"Unable to connect to {hostnames}. Failed with error: {err}."
+        )
+
+
 class SendToCommand(click.Command):
     def invoke(self, ctx):
         certs = ctx.params.get("certs")
@@ -22,15 +36,39 @@ class SendToCommand(click.Command):
         protocol = ctx.params.get("protocol")
         output_format = ctx.params.get("format", OutputFormat.RAW)
         ignore_cert_validation = ctx.params.get("ignore_cert_validation")
+        framing = ctx.params.get("framing")
         _handle_incompatible_args(protocol, ignore_cert_validation, certs)
+        _handle_incompatible_framing(protocol, framing)
 
         if ignore_cert_validation:
             certs = "ignore"
 
-        ctx.obj.logger = _try_get_logger_for_server(
-            hostname, protocol, output_format, certs
-        )
-        return super().invoke(ctx)
+        batch_options = {
+            "max_batch_bytes": ctx.params.get("max_batch_bytes"),
+            "max_batch_latency": ctx.params.get("max_batch_latency"),
+        }
+        destinations = ctx.params.get("destination")
+        if destinations:
+            servers = [SyslogServer(hostname, protocol, output_format, certs, framing)]
+            for destination in destinations:
+                servers.append(
+                    _get_destination_server(
+                        destination, protocol, output_format, "format" in ctx.params
+                    )
+                )
+            ctx.obj.logger = _try_get_logger_for_servers(servers, **batch_options)
+        else:
+            ctx.obj.logger = _try_get_logger_for_server(
+                hostname,
+                protocol,
+                output_format,
+                certs,
+                framing=framing,
+                **batch_options,
+            )
+        result = super().invoke(ctx)
+        flush_logger(ctx.obj.logger)
+        return result
 
 
 def _handle_incompatible_args(protocol, ignore_cert_validation, certs):
@@ -46,3 +84,43 @@ def _handle_incompatible_args(protocol, ignore_cert_validation, certs):
         raise click.BadOptionUsage(
             arg, f"'{arg}' can only be used with '--protocol {ServerProtocol.TLS_TCP}'."
         )
+
+
+def _handle_incompatible_framing(protocol, framing):
+    if protocol == ServerProtocol.UDP and framing == MessageFraming.OCTET_COUNTING:
+        raise click.BadOptionUsage(
+            "--framing",
+            f"'--framing {MessageFraming.OCTET_COUNTING}' can only be used with TCP and "
+            f"{ServerProtocol.TLS_TCP}.",
+        )
+
+
+def _get_destination_server(destination, protocol, output_format, has_format_option):
+    if "format" in destination and not has_format_option:
+        raise click.BadParameter(
+            "The `format` setting can't be used with this command.",
+            param_hint="--destination",
+        )
+    protocol = destination.get("protocol", protocol)
+    certs = destination.get("certs")
+    framing = destination.get("framing", MessageFraming.NEWLINE)
+    hostname = destination["hostname"]
+    if certs is not None and protocol != ServerProtocol.TLS_TCP:
+        raise click.BadParameter(
+            f"The `certs` setting of {hostname} can only be used with "
+            f"`protocol={ServerProtocol.TLS_TCP}`.",
+            param_hint="--destination",
+        )
+    if protocol == ServerProtocol.UDP and framing == MessageFraming.OCTET_COUNTING:
+        raise click.BadParameter(
+            f"The `framing={MessageFraming.OCTET_COUNTING}` setting of {hostname} can only be "
+            f"used with TCP and {ServerProtocol.TLS_TCP}.",
+            param_hint="--destination",
+        )
+    return SyslogServer(
+        hostname,
+        protocol,
+        destination.get("format", output_format),
+        certs,
+        framing,
+    )
@@ -1,9 +1,32 @@
 import json
 import os
+import sqlite3
+from contextlib import contextmanager
+from contextlib import nullcontext
 from os import path
+from tempfile import mkstemp
+from threading import Lock
+from time import monotonic
+from time import time
 
 from code42cli.errors import Code42CLIError
 from code42cli.util import get_user_project_path
+from code42cli.util import hash_event
+from code42cli.util import hash_event_identity
+from code42cli.util import parse_timestamp
+
+# CheckpointWriter writes pending checkpoints after this many updates or seconds, whichever
+# comes first.
+DEFAULT_CHECKPOINT_FLUSH_SIZE = 1000
+DEFAULT_CHECKPOINT_FLUSH_INTERVAL = 1.0
+
+# The max number of event hashes stored with an alert or audit log checkpoint.
+MAX_CHECKPOINT_HASHES = 10000
+
+_CHECKPOINT_DATABASES_DIR = "checkpoint_databases"
+
+# The CheckpointWriter methods that replace the hashes stored with a checkpoint.
+_REPLACE_HASHES_METHODS = ("replace_alerts", "replace_events")
 
 
 class Cursor:
@@ -45,8 +68,7 @@ class BaseCursorStore:
     def replace(self, cursor_name, new_checkpoint):
         """Replaces the last stored date observed timestamp with the given one."""
         location = path.join(self._dir_path, cursor_name)
-        with open(location, "w") as checkpoint:
-            checkpoint.write(str(new_checkpoint))
+        _write_atomically(location, str(new_checkpoint))
 
     def delete(self, cursor_name):
         """Removes a single cursor from the store."""
@@ -66,7 +88,12 @@ class BaseCursorStore:
     def get_all_cursors(self):
         """Returns a list of all cursors stored in this directory (which is typically scoped to a profile)."""
         dir_contents = os.listdir(self._dir_path)
-        return [Cursor(f) for f in dir_contents if self._is_file(f)]
+        # hidden files are temporary files from writes that are in progress (or were interrupted)
+        return [
+            Cursor(f)
+            for f in dir_contents
+            if self._is_file(f) and not f.startswith(".")
+        ]
 
     def _is_file(self, node_name):
         return path.isfile(path.join(self._dir_path, node_name))
@@ -108,8 +135,13 @@ class AlertCursorStore(BaseCursorStore):
 
     def replace_alerts(self, cursor_name, new_alerts):
         location = path.join(self._dir_path, cursor_name) + "_alerts"
-        with open(location, "w") as checkpoint:
-            checkpoint.write(json.dumps(new_alerts))
+        _write_atomically(location, json.dumps(new_alerts))
+
+    def replace_with_hashes(self, cursor_name, new_checkpoint, new_alerts):
+        """Replaces the checkpoint and the hashes stored with it. The hashes are written first,
+        so an interrupted write can only cause events to be output again, not skipped."""
+        self.replace_alerts(cursor_name, new_alerts)
+        self.replace(cursor_name, new_checkpoint)
 
 
 class AuditLogCursorStore(BaseCursorStore):
@@ -130,13 +162,496 @@ class AuditLogCursorStore(BaseCursorStore):
 
     def replace_events(self, cursor_name, new_events):
         location = path.join(self._dir_path, cursor_name) + "_events"
-        with open(location, "w") as checkpoint:
-            checkpoint.write(json.dumps(new_events))
+        _write_atomically(location, json.dumps(new_events))
+
+    def replace_with_hashes(self, cursor_name, new_checkpoint, new_events):
+        """Replaces the checkpoint and the hashes stored with it. The hashes are written first,
+        so an interrupted write can only cause events to be output again, not skipped."""
+        self.replace_events(cursor_name, new_events)
+        self.replace(cursor_name, new_checkpoint)
+
+
+class CheckpointWriter:
+    """Wraps a cursor store to coalesce checkpoint updates, which are made for every event that's
+    output. Only the latest value for each checkpoint is kept, and the pending values are written
+    to the store every `flush_size` updates or `flush_interval` seconds. Reading a checkpoint
+    returns its pending value, if it has one.
+
+    Use it as a context manager so that the pending values are written when the block exits,
+    including when it exits because of an error or an interrupt.
+
+    Args:
+        cursor_store (BaseCursorStore): The store to write checkpoints to.
+        flush_size (int): The number of updates to coalesce before writing them.
+        flush_interval (float): The max number of seconds to hold an update before writing it.
+        before_flush (callable): Called before the pending values are written, e.g. to make
+            sure the events they checkpoint have been sent. If it raises an error, the pending
+            values aren't written.
+    """
+
+    def __init__(
+        self,
+        cursor_store,
+        flush_size=DEFAULT_CHECKPOINT_FLUSH_SIZE,
+        flush_interval=DEFAULT_CHECKPOINT_FLUSH_INTERVAL,
+        before_flush=None,
+    ):
+        self._store = cursor_store
+        self._before_flush = before_flush
+        self._flush_size = flush_size
+        self._flush_interval = flush_interval
+        self._pending = {}
+        self._update_count = 0
+        self._last_flush = monotonic()
+        self._lock = Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.flush()
+        return False
+
+    def __getattr__(self, name):
+        # e.g. delete() and clean() go straight to the store
+        return getattr(self._store, name)
+
+    def get(self, cursor_name):
+        return self._get_pending("replace", cursor_name, self._store.get)
+
+    def replace(self, cursor_name, new_checkpoint):
+        self._update("replace", cursor_name, new_checkpoint)
+
+    def get_alerts(self, cursor_name):
+        return self._get_pending("replace_alerts", cursor_name, self._store.get_alerts)
+
+    def replace_alerts(self, cursor_name, new_alerts):
+        self._update_hashes("replace_alerts", cursor_name, new_alerts)
+
+    def get_events(self, cursor_name):
+        return self._get_pending("replace_events", cursor_name, self._store.get_events)
+
+    def replace_events(self, cursor_name, new_events):
+        self._update_hashes("replace_events", cursor_name, new_events)
+
+    def flush(self):
+        """Writes the pending checkpoints to the store."""
+        if self._before_flush is not None:
+            self._before_flush()
+        with self._lock:
+            pending = {key: self._read_pending(key) for key in self._pending}
+            self._pending = {}
+            self._update_count = 0
+            self._last_flush = monotonic()
+        updates = {}
+        for (method, cursor_name), value in pending.items():
+            updates.setdefault(cursor_name, {})[method] = value
+        for cursor_name, values in updates.items():
+            hashes_method = next(
+                (m for m in _REPLACE_HASHES_METHODS if m in values), None
+            )
+            if "replace" in values and hashes_method:
+                # written together so that a checkpoint is never stored with the hashes of
+                # another checkpoint's events
+                self._store.replace_with_hashes(
+                    cursor_name, values.pop("replace"), values.pop(hashes_method)
+                )
+            for method, value in values.items():
+                getattr(self._store, method)(cursor_name, value)
+
+    def _get_pending(self, method, cursor_name, get):
+        with self._lock:
+            key = (method, cursor_name)
+            if key in self._pending:
+                return self._read_pending(key)
+        return get(cursor_name)
+
+    def _read_pending(self, key):
+        value = self._pending[key]
+        if key[0] in _REPLACE_HASHES_METHODS:
+            hashes, count = value
+            return hashes[:count]
+        return value
+
+    def _update_hashes(self, method, cursor_name, hashes):
+        # Callers keep adding to the list of hashes they pass in, including the hash of an event
+        # before it's output. Only the list's length is kept for each update, and the list is
+        # copied up to that length when it's read or written, so that the list isn't copied for
+        # every event.
+        self._update(method, cursor_name, (hashes, len(hashes)))
+
+    def _update(self, method, cursor_name, value):
+        with self._lock:
+            self._pending[(method, cursor_name)] = value
+            self._update_count += 1
+            should_flush = (
+                self._update_count >= self._flush_size
+                or monotonic() - self._last_flush >= self._flush_interval
+            )
+        if should_flush:
+            self.flush()
+
+
+def checkpoint_writer(cursor_store, before_flush=None):
+    """Returns a :class:`CheckpointWriter` for the store to use as a context manager, or a context
+    manager for None if `cursor_store` is None (when not using a checkpoint)."""
+    if cursor_store is None:
+        return nullcontext()
+    return CheckpointWriter(cursor_store, before_flush=before_flush)
+
+
+def dedupe_checkpointed_events(
+    cursor,
+    checkpoint_name,
+    events,
+    get_hashes,
+    replace_hashes,
+    id_key,
+    timestamp_key,
+    max_hashes=MAX_CHECKPOINT_HASHES,
+):
+    """De-duplicates events across checkpointed runs and updates the checkpoint as each event is
+    yielded. The events must be sorted by timestamp.
+
+    Since the timestamp of the last event processed is the `--begin` time of the next run, the
+    events at that timestamp show up again in the next results. The hashes of the events at the
+    checkpoint's timestamp are stored with it so that the next run can skip them. Only events at
+    the checkpoint's timestamp are checked against the stored hashes, and at most `max_hashes`
+    hashes are stored, so a burst of events with the same timestamp can't make the checkpoint
+    grow without limit (events past the limit may be output again by the next run).
+
+    Args:
+        cursor: The cursor store to update the checkpoint in.
+        checkpoint_name (str): The name of the checkpoint.
+        events (iterable): The events, sorted by timestamp.
+        get_hashes (callable): Gets the stored hashes for a checkpoint name, e.g.
+            `cursor.get_alerts`.
+        replace_hashes (callable): Replaces the stored hashes for a checkpoint name, e.g.
+            `cursor.replace_alerts`.
+        id_key (str): The key of the events' IDs.
+        timestamp_key (str): The key of the events' timestamps.
+        max_hashes (int): The max number of hashes to store with the checkpoint.
+    """
+    checkpoint = cursor.get(checkpoint_name)
+    checkpoint_hashes = set(get_hashes(checkpoint_name))
+    new_timestamp = None
+    new_hashes = []
+    for event in events:
+        event_timestamp = event[timestamp_key]
+        if event_timestamp != new_timestamp:
+            new_timestamp = event_timestamp
+            # parsed once per timestamp, and only after the event is yielded unless it's needed
+            # to compare against the checkpoint
+            parsed_timestamp = None
+            new_hashes = []
+            if checkpoint_hashes:
+                parsed_timestamp = parse_timestamp(new_timestamp)
+                if checkpoint is None or parsed_timestamp > checkpoint:
+                    # past the checkpoint, so nothing else can have been processed already
+                    checkpoint_hashes = set()
+                elif parsed_timestamp == checkpoint:
+                    # the events skipped at this timestamp still need skipping next time
+                    new_hashes = list(checkpoint_hashes)[:max_hashes]
+        event_hash = hash_event_identity(event, id_key, timestamp_key)
+        # checkpoints from older versions store hashes of the whole event
+        if checkpoint_hashes and (
+            event_hash in checkpoint_hashes or hash_event(event) in checkpoint_hashes
+        ):
+            continue
+        if len(new_hashes) < max_hashes:
+            new_hashes.append(event_hash)
+        yield event
+        if parsed_timestamp is None:
+            parsed_timestamp = parse_timestamp(new_timestamp)
+        cursor.replace(checkpoint_name, parsed_timestamp)
+        replace_hashes(checkpoint_name, new_hashes)
+
+
+def _write_atomically(location, content):
+    # Writes to a temporary file that then replaces the checkpoint, so that the checkpoint is
+    # never left partly written if the process is killed.
+    dir_path, name = path.split(location)
+    fd, temp_location = mkstemp(dir=dir_path, prefix=f".{name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as temp_file:
+            temp_file.write(content)
+            temp_file.flush()
+            os.fsync(temp_file.fileno())
+        os.replace(temp_location, location)
+    except BaseException:
+        try:
+            os.remove(temp_location)
+        except OSError:
+            pass
+        raise
+
+
+class DatabaseCursor:
+    __slots__ = ("name", "value")
+
+    def __init__(self, name, value):
+        self.name = name
+        self.value = value
+
+
+class BaseDatabaseCursorStore:
+    """A cursor store that keeps a profile's checkpoints in a SQLite database instead of in a
+    file per checkpoint. The database is shared by all the kinds of checkpoints for the profile,
+    and uses write-ahead logging so that many commands can use it at the same time.
+
+    Each checkpoint's row holds its value, the hashes of the last events it saw (for alert and
+    audit log checkpoints), when it was last updated and how many times it has been updated.
+
+    Args:
+        database_path (str): The location of the database file.
+    """
+
+    kind = None
+
+    def __init__(self, database_path):
+        self._database_path = database_path
+        self._lock = Lock()
+        self._connection = None
+
+    def get(self, cursor_name):
+        """Gets the last stored date observed timestamp."""
+        value = self._get_column(cursor_name, "value")
+        if not value:
+            return None
+        try:
+            return float(value)
+        except ValueError:
+            raise Code42CLIError(
+                f"Unable to parse checkpoint '{cursor_name}', expected a unix-epoch timestamp, got '{value}'."
+            )
+
+    def replace(self, cursor_name, new_checkpoint):
+        """Replaces the last stored date observed timestamp with the given one."""
+        self._set_column(cursor_name, "value", str(new_checkpoint))
+
+    def delete(self, cursor_name):
+        """Removes a single cursor from the store."""
+        with self._transaction() as connection:
+            deleted = connection.execute(
+                "DELETE FROM cursors WHERE kind = ? AND name = ?",
+                (self.kind, cursor_name),
+            ).rowcount
+        if not deleted:
+            msg = f"No checkpoint named {cursor_name} exists for this profile."
+            raise Code42CLIError(msg)
+
+    def clean(self):
+        """Removes all cursors from this store."""
+        with self._transaction() as connection:
+            connection.execute("DELETE FROM cursors WHERE kind = ?", (self.kind,))
+
+    def get_all_cursors(self):
+        """Returns a list of all cursors stored in this store."""
+        with self._transaction() as connection:
+            rows = connection.execute(
+                "SELECT name, value FROM cursors WHERE kind = ? ORDER BY name",
+                (self.kind,),
+            ).fetchall()
+        return [DatabaseCursor(name, value) for name, value in rows]
+
+    def _get_hashes(self, cursor_name):
+        hashes = self._get_column(cursor_name, "hashes")
+        try:
+            return json.loads(hashes) if hashes else []
+        except json.JSONDecodeError:
+            return []
+
+    def _replace_hashes(self, cursor_name, hashes):
+        self._set_column(cursor_name, "hashes", json.dumps(hashes))
+
+    def _replace_with_hashes(self, cursor_name, new_checkpoint, hashes):
+        self._set_columns(
+            cursor_name, {"value": str(new_checkpoint), "hashes": json.dumps(hashes)}
+        )
+
+    def _get_column(self, cursor_name, column):
+        with self._transaction() as connection:
+            row = connection.execute(
+                f"SELECT {column} FROM cursors WHERE kind = ? AND name = ?",
+                (self.kind, cursor_name),
+            ).fetchone()
+        return row[0] if row else None
+
+    def _set_column(self, cursor_name, column, value):
+        self._set_columns(cursor_name, {column: value})
+
+    def _set_columns(self, cursor_name, values):
+        # a single statement, so the columns are always updated together
+        columns = ", ".join(values)
+        placeholders = ", ".join("?" for _ in values)
+        updates = "".join(f"{c} = excluded.{c}, " for c in values)
+        with self._transaction() as connection:
+            connection.execute(
+                f"INSERT INTO cursors (kind, name, {columns}, updated_at, update_count) "
+                f"VALUES (?, ?, {placeholders}, ?, 1) "
+                f"ON CONFLICT (kind, name) DO UPDATE SET {updates}"
+                "updated_at = excluded.updated_at, update_count = update_count + 1",
+                (self.kind, cursor_name, *values.values(), time()),
+            )
+
+    @contextmanager
+    def _transaction(self):
+        with self._lock:
+            if self._connection is None:
+                self._connection = connect_to_checkpoint_database(self._database_path)
+            with self._connection:
+                yield self._connection
+
+
+class FileEventDatabaseCursorStore(BaseDatabaseCursorStore):
+    kind = "file_events"
+
+    def get(self, cursor_name):
+        """Gets the last stored date observed timestamp."""
+        return self._get_column(cursor_name, "value") or None
+
+
+class AlertDatabaseCursorStore(BaseDatabaseCursorStore):
+    kind = "alerts"
+
+    def get_alerts(self, cursor_name):
+        return self._get_hashes(cursor_name)
+
+    def replace_alerts(self, cursor_name, new_alerts):
+        self._replace_hashes(cursor_name, new_alerts)
+
+    def replace_with_hashes(self, cursor_name, new_checkpoint, new_alerts):
+        """Replaces the checkpoint and the hashes stored with it in one transaction."""
+        self._replace_with_hashes(cursor_name, new_checkpoint, new_alerts)
+
+
+class AuditLogDatabaseCursorStore(BaseDatabaseCursorStore):
+    kind = "audit_logs"
+
+    def get_events(self, cursor_name):
+        return self._get_hashes(cursor_name)
+
+    def replace_events(self, cursor_name, new_events):
+        self._replace_hashes(cursor_name, new_events)
+
+    def replace_with_hashes(self, cursor_name, new_checkpoint, new_events):
+        """Replaces the checkpoint and the hashes stored with it in one transaction."""
+        self._replace_with_hashes(cursor_name, new_checkpoint, new_events)
+
+
+def get_checkpoint_database_path(profile_name):
+    return path.join(
+        get_user_project_path(_CHECKPOINT_DATABASES_DIR), f"{profile_name}.db"
+    )
+
+
+def connect_to_checkpoint_database(database_path):
+    """Opens the checkpoint database at the given path, creating it if it doesn't exist."""
+    # Commands wait up to 30 seconds for another command to finish writing to the database.
+    connection = sqlite3.connect(database_path, timeout=30, check_same_thread=False)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute(
+        "CREATE TABLE IF NOT EXISTS cursors ("
+        "kind TEXT NOT NULL, "
+        "name TEXT NOT NULL, "
+        "value TEXT, "
+        "hashes TEXT, "
+        "updated_at REAL NOT NULL, "
+        "update_count INTEGER NOT NULL DEFAULT 0, "
+        "PRIMARY KEY (kind, name))"
+    )
+    return connection
+
+
+def uses_checkpoint_database(profile_name):
+    """Returns True if the profile's checkpoints have been migrated to a checkpoint database."""
+    return path.isfile(get_checkpoint_database_path(profile_name))
+
+
+def get_file_event_cursor_store(profile_name):
+    if uses_checkpoint_database(profile_name):
+        return FileEventDatabaseCursorStore(get_checkpoint_database_path(profile_name))
+    return FileEventCursorStore(profile_name)
+
+
+def get_alert_cursor_store(profile_name):
+    if uses_checkpoint_database(profile_name):
+        return AlertDatabaseCursorStore(get_checkpoint_database_path(profile_name))
+    return AlertCursorStore(profile_name)
+
+
+def get_audit_log_cursor_store(profile_name):
+    if uses_checkpoint_database(profile_name):
+        return AuditLogDatabaseCursorStore(get_checkpoint_database_path(profile_name))
+    return AuditLogCursorStore(profile_name)
+
+
+def migrate_to_checkpoint_database(profile_name):
+    """Moves the profile's checkpoints from their files into a checkpoint database, after which
+    the profile's checkpoints are always stored in the database. The files are only removed once
+    every checkpoint has been copied to the database.
+
+    Returns:
+        int: The number of checkpoints that were migrated.
+    """
+    if uses_checkpoint_database(profile_name):
+        raise Code42CLIError(
+            f"The checkpoints for profile '{profile_name}' are already stored in a database."
+        )
+    file_stores = [
+        (FileEventCursorStore(profile_name), FileEventDatabaseCursorStore, None),
+        (AlertCursorStore(profile_name), AlertDatabaseCursorStore, "_alerts"),
+        (AuditLogCursorStore(profile_name), AuditLogDatabaseCursorStore, "_events"),
+    ]
+    database_path = get_checkpoint_database_path(profile_name)
+    # Written to a temporary database that's only put in place once it's complete, so that
+    # commands keep using the files until then.
+    temp_database_path = f"{database_path}.migrating"
+    if path.exists(temp_database_path):
+        # left by a migration that failed
+        os.remove(temp_database_path)
+    migrated_files = []
+    connection = connect_to_checkpoint_database(temp_database_path)
+    try:
+        with connection:
+            for file_store, database_store_class, hashes_suffix in file_stores:
+                for cursor in file_store.get_all_cursors():
+                    location = path.join(file_store._dir_path, cursor.name)
+                    value = Cursor(location).value
+                    name, column = cursor.name, "value"
+                    if hashes_suffix and name.endswith(hashes_suffix):
+                        name, column = name[: -len(hashes_suffix)], "hashes"
+                    connection.execute(
+                        f"INSERT INTO cursors (kind, name, {column}, updated_at) "
+                        "VALUES (?, ?, ?, ?) "
+                        f"ON CONFLICT (kind, name) DO UPDATE SET {column} = excluded.{column}",
+                        (
+                            database_store_class.kind,
+                            name,
+                            value,
+                            path.getmtime(location),
+                        ),
+                    )
+                    migrated_files.append(location)
+        # write the log into the database file, so that the file can be moved
+        connection.execute("PRAGMA journal_mode=DELETE")
+    finally:
+        connection.close()
+    os.replace(temp_database_path, database_path)
+    for location in migrated_files:
+        os.remove(location)
+    return len(migrated_files)
+
+
+def delete_checkpoint_database(profile_name):
+    """Deletes the profile's checkpoint database, if it has one."""
+    if uses_checkpoint_database(profile_name):
+        os.remove(get_checkpoint_database_path(profile_name))
 
 
 def get_all_cursor_stores_for_profile(profile_name):
     return [
-        FileEventCursorStore(profile_name),
-        AlertCursorStore(profile_name),
-        AuditLogCursorStore(profile_name),
+        get_file_event_cursor_store(profile_name),
+        get_alert_cursor_store(profile_name),
+        get_audit_log_cursor_store(profile_name),
     ]
@@ -7,7 +7,10 @@ from py42.sdk.queries.query_filter import FilterGroup
 from code42cli.click_ext.options import incompatible_with
 from code42cli.click_ext.types import FileOrString
 from code42cli.enums import SendToFileEventsOutputFormat
+from code42cli.logger.enums import MessageFraming
 from code42cli.logger.enums import ServerProtocol
+from code42cli.logger.handlers import DEFAULT_MAX_BATCH_BYTES
+from code42cli.logger.handlers import DEFAULT_MAX_BATCH_LATENCY
 
 
 def is_in_filter(filter_cls, filter_cls_v2=None):
@@ -181,6 +184,45 @@ include_all_option = click.option(
 )
 
 
+_DESTINATION_SETTING_CHOICES = {
+    "protocol": ServerProtocol(),
+    "format": SendToFileEventsOutputFormat(),
+    "certs": None,
+    "framing": MessageFraming(),
+}
+
+
+def _parse_destinations(ctx, param, value):
+    return [_parse_destination(destination) for destination in value]
+
+
+def _parse_destination(destination):
+    hostname, *settings = destination.split(",")
+    parsed = {"hostname": hostname.strip()}
+    for setting in settings:
+        key, separator, setting_value = setting.partition("=")
+        key = key.strip().lower()
+        setting_value = setting_value.strip()
+        if not separator or key not in _DESTINATION_SETTING_CHOICES:
+            raise click.BadParameter(
+                f"Invalid setting '{setting}' in '{destination}'. Expected settings of "
+                f"the form SETTING=VALUE, where SETTING is one of "
+                f"{list(_DESTINATION_SETTING_CHOICES)}."
+            )
+        choices = _DESTINATION_SETTING_CHOICES[key]
+        if choices is not None:
+            setting_value = setting_value.upper()
+            if setting_value not in list(choices):
+                raise click.BadParameter(
+                    f"Invalid {key} '{setting_value}' in '{destination}'. Expected one of "
+                    f"{list(choices)}."
+                )
+        parsed[key] = setting_value
+    if not parsed["hostname"]:
+        raise click.BadParameter(f"Missing hostname in '{destination}'.")
+    return parsed
+
+
 def server_options(f):
     hostname_arg = click.argument("hostname")
     protocol_option = click.option(
@@ -204,10 +246,47 @@ def server_options(f):
         default=None,
         cls=incompatible_with(["certs"]),
     )
+    framing_option = click.option(
+        "--framing",
+        type=click.Choice(MessageFraming(), case_sensitive=False),
+        default=MessageFraming.NEWLINE,
+        help="How messages are delimited when using TCP or TLS-TCP. OCTET-COUNTING prefixes "
+        "each message with its length in bytes (RFC 6587). Defaults to NEWLINE.",
+    )
+    max_batch_bytes_option = click.option(
+        "--max-batch-bytes",
+        type=click.IntRange(min=0),
+        default=DEFAULT_MAX_BATCH_BYTES,
+        help="Messages sent with TCP or TLS-TCP are combined into writes of up to this many "
+        f"bytes. Use 0 to send each message on its own. Defaults to {DEFAULT_MAX_BATCH_BYTES}.",
+    )
+    max_batch_latency_option = click.option(
+        "--max-batch-latency",
+        type=click.FloatRange(min=0),
+        default=DEFAULT_MAX_BATCH_LATENCY,
+        help="The max number of seconds to hold a message sent with TCP or TLS-TCP before "
+        f"sending it. Defaults to {DEFAULT_MAX_BATCH_LATENCY}.",
+    )
+    destination_option = click.option(
+        "--destination",
+        multiple=True,
+        callback=_parse_destinations,
+        metavar="HOSTNAME[:PORT][,SETTING=VALUE...]",
+        help="An additional server to send the same results to. The results are only retrieved "
+        "once. Add comma-separated `protocol`, `format`, `certs` and `framing` settings to "
+        "the server's address to configure it like the options of the same names, e.g. "
+        "'siem.example.com:6514,protocol=TLS-TCP,format=CEF'. `protocol` and `format` default "
+        "to those used for HOSTNAME. Use `certs=ignore` to skip CA certificate validation. "
+        "Can be used more than once.",
+    )
     f = hostname_arg(f)
     f = protocol_option(f)
     f = certs_option(f)
     f = ignore_cert_validation(f)
+    f = destination_option(f)
+    f = framing_option(f)
+    f = max_batch_bytes_option(f)
+    f = max_batch_latency_option(f)
     return f
 
 
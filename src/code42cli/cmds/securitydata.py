@@ -1,10 +1,17 @@
+import json
+from bisect import bisect_right
+from datetime import datetime
+from datetime import timezone
+from functools import partial
 from pprint import pformat
+from time import time
 
 import click
 import py42.sdk.queries.fileevents.filters as f
 from click import echo
 from pandas import DataFrame
 from pandas import json_normalize
+from pandas import to_datetime
 from py42.exceptions import Py42InvalidPageTokenError
 from py42.sdk.queries.fileevents.file_event_query import FileEventQuery
 from py42.sdk.queries.fileevents.filters import InsertionTimestamp
@@ -21,13 +28,15 @@ from code42cli.click_ext.groups import OrderedGroup
 from code42cli.click_ext.options import incompatible_with
 from code42cli.click_ext.types import MapChoice
 from code42cli.cmds.search import SendToCommand
-from code42cli.cmds.search.cursor_store import FileEventCursorStore
+from code42cli.cmds.search.cursor_store import checkpoint_writer
+from code42cli.cmds.search.cursor_store import get_file_event_cursor_store
 from code42cli.cmds.util import convert_to_or_query
 from code42cli.cmds.util import create_time_range_filter
 from code42cli.date_helper import convert_datetime_to_timestamp
 from code42cli.date_helper import limit_date_range
 from code42cli.enums import OutputFormat
 from code42cli.errors import Code42CLIError
+from code42cli.logger import flush_logger
 from code42cli.logger import get_main_cli_logger
 from code42cli.options import column_option
 from code42cli.options import format_option
@@ -36,11 +45,16 @@ from code42cli.output_formats import DataFrameOutputFormatter
 from code42cli.output_formats import FileEventsOutputFormat
 from code42cli.output_formats import FileEventsOutputFormatter
 from code42cli.util import deprecation_warning
+from code42cli.util import prefetch
+from code42cli.util import prefetch_many
 from code42cli.util import warn_interrupt
 
 logger = get_main_cli_logger()
 MAX_EVENT_PAGE_SIZE = 10000
 
+# How many pages of file events to fetch ahead of the page being output.
+_FILE_EVENT_PAGES_AHEAD = 2
+
 SECURITY_DATA_KEYWORD = "file events"
 
 DEPRECATION_TEXT = "Incydr functionality is deprecated. Use the Incydr CLI instead (https://developer.code42.com/)."
@@ -323,6 +337,25 @@ checkpoint_option = opt.checkpoint_option(
     SECURITY_DATA_KEYWORD, cls=searchopt.AdvancedQueryAndSavedSearchIncompatible
 )
 advanced_query_option = searchopt.advanced_query_option(SECURITY_DATA_KEYWORD)
+parallel_option = click.option(
+    "--parallel",
+    type=click.IntRange(min=1),
+    default=1,
+    cls=searchopt.AdvancedQueryAndSavedSearchIncompatible,
+    help="Split the date range into this many time slices and search them concurrently, which "
+    "speeds up getting events from large date ranges. Unless `--unordered` is used, the events "
+    "of later slices are held in temporary files until the earlier slices have been output. "
+    "When used with `--use-checkpoint`, a "
+    "checkpoint is saved for each slice, and the checkpoint can only be resumed with `--parallel`. "
+    "Defaults to 1.",
+)
+unordered_option = click.option(
+    "--unordered",
+    is_flag=True,
+    cls=searchopt.AdvancedQueryAndSavedSearchIncompatible,
+    help="When used with `--parallel`, output events as soon as any time slice returns them "
+    "instead of in timestamp order.",
+)
 
 
 def _get_saved_search_option():
@@ -348,6 +381,8 @@ def search_options(f):
     f = checkpoint_option(f)
     f = advanced_query_option(f)
     f = searchopt.or_query_option(f)
+    f = unordered_option(f)
+    f = parallel_option(f)
     f = end_option(f)
     f = begin_option(f)
     return f
@@ -387,7 +422,16 @@ def security_data(state):
 @sdk_options()
 def clear_checkpoint(state, checkpoint_name):
     """Remove the saved file event checkpoint from `--use-checkpoint/-c` mode."""
-    _get_file_event_cursor_store(state.profile.name).delete(checkpoint_name)
+    cursor = _get_file_event_cursor_store(state.profile.name)
+    time_slices = _load_time_slices(cursor.get(checkpoint_name))
+    cursor.delete(checkpoint_name)
+    if time_slices:
+        for index in range(len(time_slices["slices"])):
+            # slices that haven't returned any events yet don't have a checkpoint
+            try:
+                cursor.delete(_get_time_slice_cursor_name(checkpoint_name, index))
+            except Code42CLIError:
+                pass
 
 
 @security_data.command()
@@ -406,6 +450,8 @@ def search(
     use_checkpoint,
     saved_search,
     or_query,
+    parallel,
+    unordered,
     columns,
     include_all,
     **kwargs,
@@ -459,33 +505,33 @@ def search(
                 ]
 
     flatten = format in (OutputFormat.TABLE, OutputFormat.CSV)
-
-    if use_checkpoint:
-        cursor = _get_file_event_cursor_store(state.profile.name)
-        checkpoint = _handle_timestamp_checkpoint(cursor.get(use_checkpoint), state)
-
-        if state.profile.use_v2_file_events == "True":
-
-            def checkpoint_func(event):
-                event_id = event["event.id"] if flatten else event["event"]["id"]
-                cursor.replace(use_checkpoint, event_id)
-
-        else:
-
-            def checkpoint_func(event):
-                cursor.replace(use_checkpoint, event["eventId"])
-
-    else:
-        checkpoint = checkpoint_func = None
-
-    query = _construct_query(state, begin, end, saved_search, advanced_query, or_query)
-    dfs = _get_all_file_events(state, query, checkpoint, flatten)
-    formatter = FileEventsOutputFormatter(format, checkpoint_func=checkpoint_func)
-    # sending to pager when checkpointing can be inaccurate due to pager buffering, so disallow pager
-    force_no_pager = use_checkpoint
-    formatter.echo_formatted_dataframes(
-        dfs, columns=columns, force_no_pager=force_no_pager
+    cursor = (
+        _get_file_event_cursor_store(state.profile.name) if use_checkpoint else None
     )
+    with checkpoint_writer(cursor) as cursor:
+        dfs, checkpoint_func = _get_file_events_and_checkpoint_func(
+            state,
+            begin,
+            end,
+            advanced_query,
+            use_checkpoint,
+            cursor,
+            saved_search,
+            or_query,
+            flatten,
+            parallel,
+            unordered,
+        )
+        formatter = FileEventsOutputFormatter(
+            format,
+            checkpoint_func=checkpoint_func,
+            checkpoint_columns=_get_checkpoint_columns(state, flatten),
+        )
+        # sending to pager when checkpointing can be inaccurate due to pager buffering, so disallow pager
+        force_no_pager = use_checkpoint
+        formatter.echo_formatted_dataframes(
+            dfs, columns=columns, force_no_pager=force_no_pager
+        )
 
 
 @security_data.command(cls=SendToCommand)
@@ -502,6 +548,8 @@ def send_to(
     use_checkpoint,
     saved_search,
     or_query,
+    parallel,
+    unordered,
     columns,
     **kwargs,
 ):
@@ -513,35 +561,37 @@ def send_to(
         deprecation_warning(DEPRECATION_TEXT)
 
     flatten = format in (OutputFormat.TABLE, OutputFormat.CSV)
+    cursor = (
+        _get_file_event_cursor_store(state.profile.name) if use_checkpoint else None
+    )
+    # checkpoints are only written for events that have been sent
+    flush = partial(flush_logger, state.logger)
+    with checkpoint_writer(cursor, before_flush=flush) as cursor:
+        dfs, checkpoint_func = _get_file_events_and_checkpoint_func(
+            state,
+            begin,
+            end,
+            advanced_query,
+            use_checkpoint,
+            cursor,
+            saved_search,
+            or_query,
+            flatten,
+            parallel,
+            unordered,
+        )
+        formatter = FileEventsOutputFormatter(
+            None,
+            checkpoint_func=checkpoint_func,
+            checkpoint_columns=_get_checkpoint_columns(state, flatten),
+        )
 
-    if use_checkpoint:
-        cursor = _get_file_event_cursor_store(state.profile.name)
-        checkpoint = _handle_timestamp_checkpoint(cursor.get(use_checkpoint), state)
-
-        if state.profile.use_v2_file_events == "True":
-
-            def checkpoint_func(event):
-                event_id = event["event.id"] if flatten else event["event"]["id"]
-                cursor.replace(use_checkpoint, event_id)
-
-        else:
-
-            def checkpoint_func(event):
-                cursor.replace(use_checkpoint, event["eventId"])
-
-    else:
-        checkpoint = checkpoint_func = None
-
-    query = _construct_query(state, begin, end, saved_search, advanced_query, or_query)
-    dfs = _get_all_file_events(state, query, checkpoint)
-    formatter = FileEventsOutputFormatter(None, checkpoint_func=checkpoint_func)
-
-    with warn_interrupt():
-        event = None
-        for event in formatter.iter_rows(dfs, columns=columns):
-            state.logger.info(event)
-        if event is None:  # generator was empty
-            click.echo("No results found.")
+        with warn_interrupt():
+            event = None
+            for event in formatter.iter_rows(dfs, columns=columns):
+                state.logger.info(event)
+            if event is None:  # generator was empty
+                click.echo("No results found.")
 
 
 @security_data.group(cls=OrderedGroup)
@@ -584,7 +634,211 @@ def show(state, search_id):
 
 
 def _get_file_event_cursor_store(profile_name):
-    return FileEventCursorStore(profile_name)
+    return get_file_event_cursor_store(profile_name)
+
+
+def _get_file_events_and_checkpoint_func(
+    state,
+    begin,
+    end,
+    advanced_query,
+    use_checkpoint,
+    cursor,
+    saved_search,
+    or_query,
+    flatten,
+    parallel,
+    unordered,
+):
+    if unordered and parallel == 1:
+        raise click.BadOptionUsage(
+            "unordered", "--unordered can only be used with --parallel."
+        )
+    checkpoint = cursor.get(use_checkpoint) if use_checkpoint else None
+    time_slices = _load_time_slices(checkpoint)
+    if parallel > 1 or time_slices:
+        if checkpoint is not None and not time_slices:
+            raise Code42CLIError(
+                f"Checkpoint '{use_checkpoint}' was created without --parallel, so it can't "
+                "be resumed with --parallel."
+            )
+        if parallel == 1:
+            raise Code42CLIError(
+                f"Checkpoint '{use_checkpoint}' was created with --parallel, so it can only be "
+                "resumed with --parallel."
+            )
+        return _get_file_events_in_time_slices(
+            state,
+            begin,
+            end,
+            or_query,
+            use_checkpoint,
+            cursor,
+            time_slices,
+            flatten,
+            parallel,
+            unordered,
+        )
+
+    if use_checkpoint:
+        checkpoint = _handle_timestamp_checkpoint(checkpoint, state)
+        get_event_id = _get_event_id_func(state, flatten)
+
+        def checkpoint_func(event):
+            cursor.replace(use_checkpoint, get_event_id(event))
+
+    else:
+        checkpoint_func = None
+
+    query = _construct_query(state, begin, end, saved_search, advanced_query, or_query)
+    return _get_all_file_events(state, query, checkpoint, flatten), checkpoint_func
+
+
+def _get_file_events_in_time_slices(
+    state,
+    begin,
+    end,
+    or_query,
+    use_checkpoint,
+    cursor,
+    time_slices,
+    flatten,
+    parallel,
+    unordered,
+):
+    # Slicing on the field the results are sorted by means that every event in a slice sorts
+    # after every event in the slices before it, so outputting the slices one after the other
+    # keeps the events in order.
+    use_v2 = state.profile.use_v2_file_events == "True"
+    if time_slices:
+        # resume with the same slices (and date range) as the run that created the checkpoint
+        begin, end = time_slices["begin"], time_slices["end"]
+    _construct_query(state, begin, end, None, None, or_query)
+    if not time_slices:
+        # V1 events are sorted by insertion time, which is never before the event time, so the
+        # last slice is left open to include events inserted after the end of the range.
+        time_slices = {
+            "begin": begin,
+            "end": end,
+            "slices": _split_time_range(begin, end, parallel, open_ended=not use_v2),
+        }
+        if use_checkpoint:
+            cursor.replace(use_checkpoint, json.dumps(time_slices))
+
+    slice_filter_class = (
+        v2_filters.timestamp.Timestamp if use_v2 else InsertionTimestamp
+    )
+    sdk = state.sdk
+    slice_pages = []
+    for index, (slice_begin, slice_end) in enumerate(time_slices["slices"]):
+        slice_filter = create_time_range_filter(
+            slice_filter_class, slice_begin, slice_end
+        )
+        query = _create_file_event_query(state, [*state.search_filters, slice_filter])
+        checkpoint = (
+            cursor.get(_get_time_slice_cursor_name(use_checkpoint, index))
+            if use_checkpoint
+            else None
+        )
+        slice_pages.append(_get_file_event_pages(sdk, query, checkpoint, flatten))
+
+    def iter_pages():
+        # In order, the later slices are searched while the earlier ones are output, and
+        # their pages are held in temporary files until it's their turn.
+        for _, df in prefetch_many(
+            slice_pages,
+            size=_FILE_EVENT_PAGES_AHEAD,
+            ordered=not unordered,
+            spill_to_disk=True,
+        ):
+            yield df
+
+    if use_checkpoint:
+        get_event_id = _get_event_id_func(state, flatten)
+        # Some formats combine every page before outputting any events, so the slice an event
+        # came from is found from its sort timestamp rather than from the page it was in.
+        sort_key = "@timestamp" if use_v2 else "insertionTimestamp"
+        slice_starts = [_to_milliseconds(start) for start, _ in time_slices["slices"]]
+
+        def checkpoint_func(event):
+            timestamp = _to_milliseconds(_parse_sort_timestamp(event[sort_key]))
+            index = max(bisect_right(slice_starts, timestamp) - 1, 0)
+            cursor_name = _get_time_slice_cursor_name(use_checkpoint, index)
+            cursor.replace(cursor_name, get_event_id(event))
+
+    else:
+        checkpoint_func = None
+
+    return iter_pages(), checkpoint_func
+
+
+def _split_time_range(begin, end, count, open_ended=False):
+    """Splits the range from `begin` to `end` (or now, if `end` is None) into at most `count`
+    contiguous `[begin, end]` slices of equal length. The slices don't overlap, at millisecond
+    precision. The last slice has no end if `end` is None or `open_ended` is True."""
+    begin_ms = _to_milliseconds(begin)
+    end_ms = _to_milliseconds(end if end is not None else time())
+    step = max((end_ms - begin_ms) // count, 1)
+    starts = list(range(begin_ms, end_ms, step))[:count] or [begin_ms]
+    slices = []
+    for index, start in enumerate(starts):
+        if index + 1 < len(starts):
+            # the range filter includes its end, so stop just short of the next slice
+            slice_end = (starts[index + 1] - 1) / 1000
+        else:
+            slice_end = None if open_ended else end
+        slices.append([start / 1000, slice_end])
+    return slices
+
+
+def _parse_sort_timestamp(value):
+    # Returns the POSIX timestamp of an event's sort timestamp. The API's ISO 8601 strings are
+    # parsed with `datetime.fromisoformat`, which is much faster than pandas' `to_datetime`, which
+    # is only used for strings it can't parse.
+    if isinstance(value, str):
+        try:
+            parsed = datetime.fromisoformat(
+                value[:-1] + "+00:00" if value.endswith("Z") else value
+            )
+        except ValueError:
+            parsed = to_datetime(value)
+    else:
+        parsed = value
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def _to_milliseconds(timestamp):
+    return int(round(timestamp * 1000))
+
+
+def _load_time_slices(checkpoint):
+    # Checkpoints from --parallel store the time slices as JSON, while others store an event ID.
+    try:
+        time_slices = json.loads(checkpoint)
+    except (TypeError, ValueError):
+        return None
+    return time_slices if isinstance(time_slices, dict) else None
+
+
+def _get_time_slice_cursor_name(checkpoint_name, index):
+    return f"{checkpoint_name}_slice{index}"
+
+
+def _get_checkpoint_columns(state, flatten):
+    # the event ID, and the sort timestamp that time-sliced checkpoints use
+    if state.profile.use_v2_file_events == "True":
+        return ["event.id" if flatten else "event", "@timestamp"]
+    return ["eventId", "insertionTimestamp"]
+
+
+def _get_event_id_func(state, flatten):
+    if state.profile.use_v2_file_events == "True":
+        if flatten:
+            return lambda event: event["event.id"]
+        return lambda event: event["event"]["id"]
+    return lambda event: event["eventId"]
 
 
 def _construct_query(state, begin, end, saved_search, advanced_query, or_query):
@@ -617,12 +871,16 @@ def _construct_query(state, begin, end, saved_search, advanced_query, or_query):
         )
         state.search_filters.append(severity_filter)
 
+    return _create_file_event_query(state, state.search_filters)
+
+
+def _create_file_event_query(state, filters):
     # construct a v2 model query if profile setting enabled
     if state.profile.use_v2_file_events == "True":
-        query = FileEventQueryV2(*state.search_filters)
+        query = FileEventQueryV2(*filters)
         query.sort_key = "@timestamp"
     else:
-        query = FileEventQuery(*state.search_filters)
+        query = FileEventQuery(*filters)
         query.sort_key = "insertionTimestamp"
     query.page_size = MAX_EVENT_PAGE_SIZE
     query.sort_direction = "asc"
@@ -630,28 +888,42 @@ def _construct_query(state, begin, end, saved_search, advanced_query, or_query):
 
 
 def _get_all_file_events(state, query, checkpoint="", flatten=False):
+    # The pages are fetched (and converted to DataFrames) in a background thread while the
+    # consumer handles the previous page. Checkpoints are still only saved by the consumer as it
+    # handles each event. The sdk is resolved here so that it's never created in the background
+    # thread, which might prompt for credentials.
+    return prefetch(
+        _get_file_event_pages(state.sdk, query, checkpoint, flatten),
+        size=_FILE_EVENT_PAGES_AHEAD,
+    )
+
+
+def _get_file_event_pages(sdk, query, checkpoint, flatten):
     if checkpoint is None:
         checkpoint = ""
     try:
-        response = state.sdk.securitydata.search_all_file_events(
-            query, page_token=checkpoint
-        )
+        response = sdk.securitydata.search_all_file_events(query, page_token=checkpoint)
     except Py42InvalidPageTokenError:
-        response = state.sdk.securitydata.search_all_file_events(query)
+        response = sdk.securitydata.search_all_file_events(query)
 
-    data = response["fileEvents"]
-    if data and flatten:
-        data = json_normalize(data)
-    yield DataFrame(data)
+    yield _get_file_event_page(response, flatten)
 
     while response["nextPgToken"]:
-        response = state.sdk.securitydata.search_all_file_events(
+        response = sdk.securitydata.search_all_file_events(
             query, page_token=response["nextPgToken"]
         )
-        data = response["fileEvents"]
-        if data and flatten:
-            data = json_normalize(data)
-        yield DataFrame(data)
+        yield _get_file_event_page(response, flatten)
+
+
+def _get_file_event_page(response, flatten):
+    # Only the tabular formats (which flatten events) need a DataFrame. The other formats and
+    # send-to output the API's event dicts as they are.
+    data = response["fileEvents"]
+    if not flatten:
+        return data
+    if data:
+        data = json_normalize(data)
+    return DataFrame(data)
 
 
 def _handle_timestamp_checkpoint(checkpoint, state):
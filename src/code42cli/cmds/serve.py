@@ -0,0 +1,45 @@
+import os
+import signal
+import sys
+
+import click
+
+from code42cli.daemon import create_command_server
+from code42cli.daemon_client import get_socket_path
+
+
+@click.command()
+@click.option(
+    "--socket",
+    "socket_path",
+    type=click.Path(dir_okay=False),
+    help="The path of the Unix domain socket to listen on. Defaults to the value of the "
+    "`CODE42CLI_SOCKET` environment variable, or else `~/.code42cli/serve.sock`.",
+)
+@click.pass_context
+def serve(ctx, socket_path):
+    """Run a daemon that runs the commands sent to it with `code42-client`.
+
+    The daemon keeps the CLI loaded and each profile logged in, so that commands run with
+    `code42-client` (which takes the same arguments as `code42`) start immediately. Commands run
+    one at a time in the daemon's environment and can't prompt for input, so use `--assume-yes`
+    with commands that would. `send-to` commands can't be run by the daemon. Stop the daemon
+    with Ctrl+C or SIGTERM.
+    """
+    socket_path = socket_path or get_socket_path()
+    os.makedirs(os.path.dirname(os.path.abspath(socket_path)), exist_ok=True)
+    cli = ctx.find_root().command
+    _import_commands(ctx.find_root(), cli)
+    server = create_command_server(socket_path, cli)
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    click.echo(f"Listening on {socket_path}.", err=True)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+
+
+def _import_commands(ctx, cli):
+    # Imports the lazily loaded commands up front, so that the first run of each one is fast too.
+    for name in cli.list_commands(ctx):
+        cli.get_command(ctx, name)
@@ -1,9 +1,90 @@
-from functools import lru_cache
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic
 
 from code42cli.errors import UserDoesNotExistError
 
+# Bulk commands whose rows name more distinct users than this resolve the users' IDs up front
+# with a paged sweep of all users, which takes fewer requests than looking each user up as their
+# row is processed.
+PREWARM_USER_THRESHOLD = 1000
+
+_MISSING = object()
+
+
+class TTLCache:
+    """A thread-safe LRU cache whose entries expire `ttl` seconds after they're added.
+
+    Args:
+        max_size (int): The max number of entries. Adding an entry to a full cache evicts the least
+            recently used entry.
+        ttl (float): The number of seconds an entry is valid for.
+    """
+
+    def __init__(self, max_size=10000, ttl=300):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = Lock()
+        self._key_locks = {}
+
+    def get(self, key, default=None):
+        """Returns the value for the key, or `default` if the key isn't cached or has expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            value, expires_at = entry
+            if expires_at <= monotonic():
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        """Caches the value for the key."""
+        with self._lock:
+            self._entries[key] = (value, monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def get_or_resolve(self, key, resolve):
+        """Returns the value for the key, calling `resolve(key)` to get and cache the value if it
+        isn't cached. Only one thread resolves a given key at a time, so threads that need the same
+        key at the same time share a single lookup. Errors from `resolve` are not cached."""
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        with self._get_key_lock(key):
+            value = self.get(key, _MISSING)
+            if value is _MISSING:
+                try:
+                    value = resolve(key)
+                    self.set(key, value)
+                finally:
+                    with self._lock:
+                        self._key_locks.pop(key, None)
+        return value
+
+    def clear(self):
+        """Removes all entries."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _get_key_lock(self, key):
+        with self._lock:
+            return self._key_locks.setdefault(key, Lock())
+
+
+# Keyed by (sdk, username) so that different profiles never share IDs.
+_users = TTLCache()
+_user_risk_profile_ids = TTLCache()
+
 
-@lru_cache(maxsize=None)
 def get_user_id(sdk, username):
     """Returns the user's UID.
     Raises `UserDoesNotExistError` if the user doesn't exist in the Code42 server.
@@ -15,7 +96,97 @@ def get_user_id(sdk, username):
     Returns:
          str: The user ID for the user with the given username.
     """
+    return _get_user(sdk, username)["userUid"]
+
+
+def get_legacy_user_id(sdk, username):
+    """Returns the user's legacy ID, as used by the user management APIs.
+    Raises `UserDoesNotExistError` if the user doesn't exist in the Code42 server.
+
+    Args:
+        sdk (py42.sdk.SDKClient): The py42 sdk.
+        username (str or unicode): The username of the user to get an ID for.
+
+    Returns:
+         int: The legacy user ID for the user with the given username.
+    """
+    return _get_user(sdk, username)["userId"]
+
+
+def get_user_risk_profile_id(sdk, username):
+    """Returns the user ID from the user's risk profile.
+
+    Args:
+        sdk (py42.sdk.SDKClient): The py42 sdk.
+        username (str or unicode): The username of the user to get an ID for.
+
+    Returns:
+         str: The risk profile user ID for the user with the given username.
+    """
+    return _user_risk_profile_ids.get_or_resolve(
+        (sdk, username),
+        lambda _: sdk.userriskprofile.get_by_username(username)["userId"],
+    )
+
+
+def prewarm_user_cache(sdk, rows, column="username"):
+    """Caches the IDs of the users in a bulk command's rows using one paged sweep of all users,
+    when the rows name more distinct users than `PREWARM_USER_THRESHOLD`. Only the users named
+    in the rows are cached.
+
+    Args:
+        sdk (py42.sdk.SDKClient): The py42 sdk.
+        rows (iterable): The bulk command's rows.
+        column (str): The column of the rows that contains usernames.
+    """
+    usernames = _get_usernames_to_prewarm(rows, column)
+    if not usernames:
+        return
+    for page in sdk.users.get_all():
+        for user in page["users"]:
+            if user["username"] in usernames:
+                _users.set((sdk, user["username"]), _get_user_ids(user))
+
+
+def prewarm_user_risk_profile_cache(sdk, rows, column="username"):
+    """Caches the risk profile IDs of the users in a bulk command's rows using one paged sweep of
+    all user risk profiles, when the rows name more distinct users than `PREWARM_USER_THRESHOLD`.
+    Only the users named in the rows are cached.
+
+    Args:
+        sdk (py42.sdk.SDKClient): The py42 sdk.
+        rows (iterable): The bulk command's rows.
+        column (str): The column of the rows that contains usernames.
+    """
+    usernames = _get_usernames_to_prewarm(rows, column)
+    if not usernames:
+        return
+    for page in sdk.userriskprofile.get_all():
+        for profile in page["userRiskProfiles"]:
+            if profile["username"] in usernames:
+                _user_risk_profile_ids.set(
+                    (sdk, profile["username"]), profile["userId"]
+                )
+
+
+def _get_usernames_to_prewarm(rows, column):
+    usernames = {row.get(column) for row in rows if row.get(column)}
+    if len(usernames) <= PREWARM_USER_THRESHOLD:
+        return None
+    return usernames
+
+
+def _get_user(sdk, username):
+    return _users.get_or_resolve((sdk, username), lambda _: _lookup_user(sdk, username))
+
+
+def _lookup_user(sdk, username):
     users = sdk.users.get_by_username(username)["users"]
     if not users:
         raise UserDoesNotExistError(username)
-    return users[0]["userUid"]
+    return _get_user_ids(users[0])
+
+
+def _get_user_ids(user):
+    # Only the IDs are kept so that cached users take up as little memory as possible.
+    return {"userId": user.get("userId"), "userUid": user.get("userUid")}
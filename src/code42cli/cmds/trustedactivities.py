@@ -7,6 +7,9 @@ from code42cli.click_ext.groups import OrderedGroup
 from code42cli.errors import Code42CLIError
 from code42cli.file_readers import read_csv_arg
 from code42cli.options import format_option
+from code42cli.options import max_workers_option
+from code42cli.options import rate_limit_option
+from code42cli.options import resume_option
 from code42cli.options import sdk_options
 from code42cli.output_formats import OutputFormatter
 from code42cli.util import deprecation_warning
@@ -144,8 +147,11 @@ bulk.add_command(trusted_activities_generate_template)
     f"Available `type` values are: {'|'.join(TrustedActivityType.choices())}",
 )
 @read_csv_arg(headers=TRUST_CREATE_HEADERS)
+@max_workers_option
+@resume_option
+@rate_limit_option
 @sdk_options()
-def bulk_create(state, csv_rows):
+def bulk_create(state, csv_rows, max_workers, journal, rate_limit):
     """Bulk create trusted activities."""
     sdk = state.sdk
 
@@ -165,6 +171,9 @@ def bulk_create(state, csv_rows):
         handle_row,
         csv_rows,
         progress_label="Creating trusting activities:",
+        max_workers=max_workers,
+        journal=journal,
+        rate_limit=rate_limit,
     )
 
 
@@ -174,8 +183,11 @@ def bulk_create(state, csv_rows):
     f"format: {','.join(TRUST_UPDATE_HEADERS)}.",
 )
 @read_csv_arg(headers=TRUST_UPDATE_HEADERS)
+@max_workers_option
+@resume_option
+@rate_limit_option
 @sdk_options()
-def bulk_update(state, csv_rows):
+def bulk_update(state, csv_rows, max_workers, journal, rate_limit):
     """Bulk update trusted activities."""
     sdk = state.sdk
 
@@ -187,7 +199,12 @@ def bulk_update(state, csv_rows):
         sdk.trustedactivities.update(resource_id, value, description)
 
     run_bulk_process(
-        handle_row, csv_rows, progress_label="Updating trusted activities:"
+        handle_row,
+        csv_rows,
+        progress_label="Updating trusted activities:",
+        max_workers=max_workers,
+        journal=journal,
+        rate_limit=rate_limit,
     )
 
 
@@ -197,8 +214,11 @@ def bulk_update(state, csv_rows):
     f"format: {','.join(TRUST_REMOVE_HEADERS)}.",
 )
 @read_csv_arg(headers=TRUST_REMOVE_HEADERS)
+@max_workers_option
+@resume_option
+@rate_limit_option
 @sdk_options()
-def bulk_remove(state, csv_rows):
+def bulk_remove(state, csv_rows, max_workers, journal, rate_limit):
     """Bulk remove trusted activities."""
     sdk = state.sdk
 
@@ -213,6 +233,9 @@ def bulk_remove(state, csv_rows):
         handle_row,
         csv_rows,
         progress_label="Removing trusted activities:",
+        max_workers=max_workers,
+        journal=journal,
+        rate_limit=rate_limit,
     )
 
 
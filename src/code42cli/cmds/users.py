@@ -2,7 +2,6 @@ import functools
 
 import click
 from pandas import DataFrame
-from pandas import json_normalize
 from py42.exceptions import Py42NotFoundError
 from py42.exceptions import Py42UserRiskProfileNotFound
 
@@ -10,10 +9,20 @@ from code42cli.bulk import generate_template_cmd_factory
 from code42cli.bulk import run_bulk_process
 from code42cli.click_ext.groups import OrderedGroup
 from code42cli.click_ext.options import incompatible_with
+from code42cli.cmds.shared import get_legacy_user_id
+from code42cli.cmds.shared import get_user_risk_profile_id
+from code42cli.cmds.shared import prewarm_user_cache
+from code42cli.cmds.shared import prewarm_user_risk_profile_cache
+from code42cli.cmds.shared import TTLCache
+from code42cli.custodian_index import get_custodian_index
+from code42cli.custodian_index import get_legal_hold_membership_dataframe
 from code42cli.errors import Code42CLIError
 from code42cli.errors import UserDoesNotExistError
 from code42cli.file_readers import read_csv_arg
 from code42cli.options import format_option
+from code42cli.options import max_workers_option
+from code42cli.options import rate_limit_option
+from code42cli.options import resume_option
 from code42cli.options import sdk_options
 from code42cli.output_formats import DataFrameOutputFormatter
 from code42cli.output_formats import OutputFormat
@@ -106,7 +115,7 @@ def list_users(
         state.sdk, columns, org_uid, role_id, active, include_roles
     )
     if include_legal_hold_membership:
-        df = _add_legal_hold_membership_to_user_dataframe(state.sdk, df)
+        df = _add_legal_hold_membership_to_user_dataframe(state.sdk, df, state.profile)
     formatter = DataFrameOutputFormatter(format)
     formatter.echo_formatted_dataframes(df)
 
@@ -126,7 +135,7 @@ def show_user(state, username, include_legal_hold_membership, format):
     response = state.sdk.users.get_by_username(username, incRoles=True)
     df = DataFrame.from_records(response["users"], columns=columns)
     if include_legal_hold_membership and not df.empty:
-        df = _add_legal_hold_membership_to_user_dataframe(state.sdk, df)
+        df = _add_legal_hold_membership_to_user_dataframe(state.sdk, df, state.profile)
     formatter = DataFrameOutputFormatter(format)
     formatter.echo_formatted_dataframes(df)
 
@@ -479,16 +488,20 @@ bulk.add_command(users_generate_template)
 )
 @read_csv_arg(headers=_bulk_user_update_headers)
 @format_option
+@max_workers_option
+@resume_option
+@rate_limit_option
 @sdk_options()
-def bulk_update(state, csv_rows, format):
+def bulk_update(state, csv_rows, format, max_workers, journal, rate_limit):
     """Update a list of users from the provided CSV."""
 
     # Initialize the SDK before starting any bulk processes
     # to prevent multiple instances and having to enter 2fa multiple times.
     sdk = state.sdk
 
-    csv_rows[0]["updated"] = "False"
-    formatter = OutputFormatter(format, {key: key for key in csv_rows[0].keys()})
+    formatter = OutputFormatter(
+        format, {key: key for key in [*csv_rows.headers, "updated"]}
+    )
     stats = create_worker_stats(len(csv_rows))
 
     def handle_row(**row):
@@ -508,6 +521,9 @@ def bulk_update(state, csv_rows, format):
         progress_label="Updating users:",
         stats=stats,
         raise_global_error=False,
+        max_workers=max_workers,
+        journal=journal,
+        rate_limit=rate_limit,
     )
     formatter.echo_formatted_list(result_rows)
 
@@ -519,17 +535,22 @@ def bulk_update(state, csv_rows, format):
 )
 @read_csv_arg(headers=_bulk_user_move_headers)
 @format_option
+@max_workers_option
+@resume_option
+@rate_limit_option
 @sdk_options()
-def bulk_move(state, csv_rows, format):
+def bulk_move(state, csv_rows, format, max_workers, journal, rate_limit):
     """Change the organization of the list of users from the provided CSV."""
 
     # Initialize the SDK before starting any bulk processes
     # to prevent multiple instances and having to enter 2fa multiple times.
     sdk = state.sdk
 
-    csv_rows[0]["moved"] = "False"
-    formatter = OutputFormatter(format, {key: key for key in csv_rows[0].keys()})
+    formatter = OutputFormatter(
+        format, {key: key for key in [*csv_rows.headers, "moved"]}
+    )
     stats = create_worker_stats(len(csv_rows))
+    prewarm_user_cache(sdk, csv_rows)
 
     def handle_row(**row):
         try:
@@ -548,6 +569,9 @@ def bulk_move(state, csv_rows, format):
         progress_label="Moving users:",
         stats=stats,
         raise_global_error=False,
+        max_workers=max_workers,
+        journal=journal,
+        rate_limit=rate_limit,
     )
     formatter.echo_formatted_list(result_rows)
 
@@ -558,17 +582,22 @@ def bulk_move(state, csv_rows, format):
 )
 @read_csv_arg(headers=_bulk_user_activation_headers)
 @format_option
+@max_workers_option
+@resume_option
+@rate_limit_option
 @sdk_options()
-def bulk_deactivate(state, csv_rows, format):
+def bulk_deactivate(state, csv_rows, format, max_workers, journal, rate_limit):
     """Deactivate a list of users."""
 
     # Initialize the SDK before starting any bulk processes
     # to prevent multiple instances and having to enter 2fa multiple times.
     sdk = state.sdk
 
-    csv_rows[0]["deactivated"] = "False"
-    formatter = OutputFormatter(format, {key: key for key in csv_rows[0].keys()})
+    formatter = OutputFormatter(
+        format, {key: key for key in [*csv_rows.headers, "deactivated"]}
+    )
     stats = create_worker_stats(len(csv_rows))
+    prewarm_user_cache(sdk, csv_rows)
 
     def handle_row(**row):
         try:
@@ -587,6 +616,9 @@ def bulk_deactivate(state, csv_rows, format):
         progress_label="Deactivating users:",
         stats=stats,
         raise_global_error=False,
+        max_workers=max_workers,
+        journal=journal,
+        rate_limit=rate_limit,
     )
     formatter.echo_formatted_list(result_rows)
 
@@ -597,17 +629,22 @@ def bulk_deactivate(state, csv_rows, format):
 )
 @read_csv_arg(headers=_bulk_user_activation_headers)
 @format_option
+@max_workers_option
+@resume_option
+@rate_limit_option
 @sdk_options()
-def bulk_reactivate(state, csv_rows, format):
+def bulk_reactivate(state, csv_rows, format, max_workers, journal, rate_limit):
     """Reactivate a list of users."""
 
     # Initialize the SDK before starting any bulk processes
     # to prevent multiple instances and having to enter 2fa multiple times.
     sdk = state.sdk
 
-    csv_rows[0]["reactivated"] = "False"
-    formatter = OutputFormatter(format, {key: key for key in csv_rows[0].keys()})
+    formatter = OutputFormatter(
+        format, {key: key for key in [*csv_rows.headers, "reactivated"]}
+    )
     stats = create_worker_stats(len(csv_rows))
+    prewarm_user_cache(sdk, csv_rows)
 
     def handle_row(**row):
         try:
@@ -626,6 +663,9 @@ def bulk_reactivate(state, csv_rows, format):
         progress_label="Reactivating users:",
         stats=stats,
         raise_global_error=False,
+        max_workers=max_workers,
+        journal=journal,
+        rate_limit=rate_limit,
     )
     formatter.echo_formatted_list(result_rows)
 
@@ -636,8 +676,11 @@ def bulk_reactivate(state, csv_rows, format):
 )
 @read_csv_arg(headers=_bulk_user_roles_headers)
 @format_option
+@max_workers_option
+@resume_option
+@rate_limit_option
 @sdk_options()
-def bulk_add_roles(state, csv_rows, format):
+def bulk_add_roles(state, csv_rows, format, max_workers, journal, rate_limit):
     """Bulk add roles to a list of users."""
 
     # Initialize the SDK before starting any bulk processes
@@ -645,9 +688,11 @@ def bulk_add_roles(state, csv_rows, format):
     sdk = state.sdk
     status_header = "role added"
 
-    csv_rows[0][status_header] = "False"
-    formatter = OutputFormatter(format, {key: key for key in csv_rows[0].keys()})
+    formatter = OutputFormatter(
+        format, {key: key for key in [*csv_rows.headers, status_header]}
+    )
     stats = create_worker_stats(len(csv_rows))
+    prewarm_user_cache(sdk, csv_rows)
 
     def handle_row(**row):
         try:
@@ -666,6 +711,9 @@ def bulk_add_roles(state, csv_rows, format):
         progress_label="Adding roles to users:",
         stats=stats,
         raise_global_error=False,
+        max_workers=max_workers,
+        journal=journal,
+        rate_limit=rate_limit,
     )
     formatter.echo_formatted_list(result_rows)
 
@@ -676,8 +724,11 @@ def bulk_add_roles(state, csv_rows, format):
 )
 @read_csv_arg(headers=_bulk_user_roles_headers)
 @format_option
+@max_workers_option
+@resume_option
+@rate_limit_option
 @sdk_options()
-def bulk_remove_roles(state, csv_rows, format):
+def bulk_remove_roles(state, csv_rows, format, max_workers, journal, rate_limit):
     """Bulk remove roles from a list of users."""
 
     # Initialize the SDK before starting any bulk processes
@@ -685,9 +736,11 @@ def bulk_remove_roles(state, csv_rows, format):
     sdk = state.sdk
     success_header = "role removed"
 
-    csv_rows[0][success_header] = "False"
-    formatter = OutputFormatter(format, {key: key for key in csv_rows[0].keys()})
+    formatter = OutputFormatter(
+        format, {key: key for key in [*csv_rows.headers, success_header]}
+    )
     stats = create_worker_stats(len(csv_rows))
+    prewarm_user_cache(sdk, csv_rows)
 
     def handle_row(**row):
         try:
@@ -706,6 +759,9 @@ def bulk_remove_roles(state, csv_rows, format):
         progress_label="Removing roles from users:",
         stats=stats,
         raise_global_error=False,
+        max_workers=max_workers,
+        journal=journal,
+        rate_limit=rate_limit,
     )
     formatter.echo_formatted_list(result_rows)
 
@@ -716,8 +772,11 @@ def bulk_remove_roles(state, csv_rows, format):
 )
 @read_csv_arg(headers=_bulk_user_alias_headers)
 @format_option
+@max_workers_option
+@resume_option
+@rate_limit_option
 @sdk_options()
-def bulk_add_alias(state, csv_rows, format):
+def bulk_add_alias(state, csv_rows, format, max_workers, journal, rate_limit):
     """Bulk add aliases to users"""
 
     # Initialize the SDK before starting any bulk processes
@@ -725,9 +784,11 @@ def bulk_add_alias(state, csv_rows, format):
     sdk = state.sdk
     success_header = "alias added"
 
-    csv_rows[0][success_header] = "False"
-    formatter = OutputFormatter(format, {key: key for key in csv_rows[0].keys()})
+    formatter = OutputFormatter(
+        format, {key: key for key in [*csv_rows.headers, success_header]}
+    )
     stats = create_worker_stats(len(csv_rows))
+    prewarm_user_risk_profile_cache(sdk, csv_rows)
 
     def handle_row(**row):
         try:
@@ -746,6 +807,9 @@ def bulk_add_alias(state, csv_rows, format):
         progress_label="Adding aliases to users:",
         stats=stats,
         raise_global_error=False,
+        max_workers=max_workers,
+        journal=journal,
+        rate_limit=rate_limit,
     )
     formatter.echo_formatted_list(result_rows)
 
@@ -756,8 +820,11 @@ def bulk_add_alias(state, csv_rows, format):
 )
 @read_csv_arg(headers=_bulk_user_alias_headers)
 @format_option
+@max_workers_option
+@resume_option
+@rate_limit_option
 @sdk_options()
-def bulk_remove_alias(state, csv_rows, format):
+def bulk_remove_alias(state, csv_rows, format, max_workers, journal, rate_limit):
     """Bulk remove aliases from users"""
 
     # Initialize the SDK before starting any bulk processes
@@ -765,9 +832,11 @@ def bulk_remove_alias(state, csv_rows, format):
     sdk = state.sdk
     success_header = "alias removed"
 
-    csv_rows[0][success_header] = "False"
-    formatter = OutputFormatter(format, {key: key for key in csv_rows[0].keys()})
+    formatter = OutputFormatter(
+        format, {key: key for key in [*csv_rows.headers, success_header]}
+    )
     stats = create_worker_stats(len(csv_rows))
+    prewarm_user_risk_profile_cache(sdk, csv_rows)
 
     def handle_row(**row):
         try:
@@ -786,6 +855,9 @@ def bulk_remove_alias(state, csv_rows, format):
         progress_label="Removing aliases from users:",
         stats=stats,
         raise_global_error=False,
+        max_workers=max_workers,
+        journal=journal,
+        rate_limit=rate_limit,
     )
     formatter.echo_formatted_list(result_rows)
 
@@ -802,16 +874,23 @@ def bulk_remove_alias(state, csv_rows, format):
     is_flag=True,
     help="Append provided note value to already existing note on a new line. Defaults to overwrite.",
 )
+@max_workers_option
+@resume_option
+@rate_limit_option
 @sdk_options()
-def bulk_update_risk_profile(state, csv_rows, format, append_notes):
+def bulk_update_risk_profile(
+    state, csv_rows, format, append_notes, max_workers, journal, rate_limit
+):
     """Bulk update User Risk Profile data."""
     sdk = state.sdk
 
     success_header = "updated_user"
     formatter = OutputFormatter(
-        format, {key: key for key in [*csv_rows[0].keys(), success_header]}
+        format, {key: key for key in [*csv_rows.headers, success_header]}
     )
     stats = create_worker_stats(len(csv_rows))
+    if not append_notes:
+        prewarm_user_risk_profile_cache(sdk, csv_rows)
 
     def handle_row(**row):
         try:
@@ -830,6 +909,9 @@ def bulk_update_risk_profile(state, csv_rows, format, append_notes):
         progress_label="Updating user risk profile data:",
         stats=stats,
         raise_global_error=False,
+        max_workers=max_workers,
+        journal=journal,
+        rate_limit=rate_limit,
     )
     formatter.echo_formatted_list(result_rows)
 
@@ -850,11 +932,7 @@ def _get_legacy_user_id(sdk, username):
     if not username:
         # py42 returns all users when passing `None` to `get_by_username()`.
         raise click.BadParameter("Username is required.")
-    user = sdk.users.get_by_username(username)["users"]
-    if len(user) == 0:
-        raise UserDoesNotExistError(username)
-    user_id = user[0]["userId"]
-    return user_id
+    return get_legacy_user_id(sdk, username)
 
 
 @functools.lru_cache()
@@ -880,43 +958,11 @@ def _get_users_dataframe(sdk, columns, org_uid, role_id, active, include_roles):
     return DataFrame.from_records(users_list, columns=columns)
 
 
-def _add_legal_hold_membership_to_user_dataframe(sdk, df):
-    columns = ["legalHold.legalHoldUid", "legalHold.name", "user.userUid"]
-
-    custodians = list(_get_all_active_hold_memberships(sdk))
-
-    if len(custodians) == 0:
+def _add_legal_hold_membership_to_user_dataframe(sdk, df, profile=None):
+    custodian_index = get_custodian_index(sdk, profile)
+    if not custodian_index:
         return df
-
-    legal_hold_member_dataframe = (
-        json_normalize(custodians)[columns]
-        .groupby(["user.userUid"])
-        .agg(",".join)
-        .rename(
-            {
-                "legalHold.legalHoldUid": "legalHoldUid",
-                "legalHold.name": "legalHoldName",
-            },
-            axis=1,
-        )
-    )
-    df = df.merge(
-        legal_hold_member_dataframe,
-        how="left",
-        left_on="userUid",
-        right_on="user.userUid",
-    )
-
-    return df
-
-
-def _get_all_active_hold_memberships(sdk):
-    for page in sdk.legalhold.get_all_matters(active=True):
-        for matter in page["legalHolds"]:
-            for _page in sdk.legalhold.get_all_matter_custodians(
-                legal_hold_uid=matter["legalHoldUid"], active=True
-            ):
-                yield from _page["legalHoldMemberships"]
+    return df.join(get_legal_hold_membership_dataframe(custodian_index), on="userUid")
 
 
 def _update_user(
@@ -948,9 +994,13 @@ def _change_organization(sdk, username, org_id):
     return sdk.users.change_org_assignment(user_id=int(user_id), org_id=int(org_id))
 
 
+_org_ids = TTLCache()
+
+
 def _get_org_id(sdk, org_id):
-    org = sdk.orgs.get_by_uid(org_id)
-    return org["orgId"]
+    return _org_ids.get_or_resolve(
+        (sdk, org_id), lambda _: sdk.orgs.get_by_uid(org_id)["orgId"]
+    )
 
 
 def _deactivate_user(sdk, username):
@@ -971,23 +1021,34 @@ def _get_user(sdk, username):
         raise UserDoesNotExistError(username)
 
 
+def _get_user_risk_profile_id(sdk, username):
+    # use when only the user's ID is needed, which is cached across rows of bulk commands
+    try:
+        return get_user_risk_profile_id(sdk, username)
+    except Py42UserRiskProfileNotFound:
+        raise UserDoesNotExistError(username)
+
+
 def _add_cloud_alias(sdk, username, alias):
-    user = _get_user(sdk, username)
-    sdk.userriskprofile.add_cloud_aliases(user["userId"], alias)
+    user_id = _get_user_risk_profile_id(sdk, username)
+    sdk.userriskprofile.add_cloud_aliases(user_id, alias)
 
 
 def _remove_cloud_alias(sdk, username, alias):
-    user = _get_user(sdk, username)
-    sdk.userriskprofile.delete_cloud_aliases(user["userId"], alias)
+    user_id = _get_user_risk_profile_id(sdk, username)
+    sdk.userriskprofile.delete_cloud_aliases(user_id, alias)
 
 
 def _update_userriskprofile(
     sdk, append_notes=False, username=None, start_date=None, end_date=None, notes=None
 ):
-    user = _get_user(sdk, username)
-    user_id = user["userId"]
     if append_notes and notes != "null":
+        # the current notes are needed, so the profile can't come from the cache
+        user = _get_user(sdk, username)
+        user_id = user["userId"]
         notes = user["notes"] + f"\n\n{notes}"
+    else:
+        user_id = _get_user_risk_profile_id(sdk, username)
 
     # py42 interprets empty string as "clear this value" for kwarg values. Since empty CSV columns
     # get parsed as "" we want to have user provide explicit 'null' string to indicate desire to
@@ -1,4 +1,5 @@
 import csv
+import functools
 
 import click
 from pandas import DataFrame
@@ -7,12 +8,19 @@ from py42.exceptions import Py42NotFoundError
 from py42.exceptions import Py42WatchlistNotFound
 
 from code42cli.bulk import generate_template_cmd_factory
+from code42cli.bulk import RowBatcher
 from code42cli.bulk import run_bulk_process
 from code42cli.click_ext.groups import OrderedGroup
 from code42cli.click_ext.options import incompatible_with
 from code42cli.click_ext.types import AutoDecodedFile
+from code42cli.cmds.shared import get_user_risk_profile_id
+from code42cli.cmds.shared import prewarm_user_risk_profile_cache
 from code42cli.errors import Code42CLIError
+from code42cli.options import batch_size_option
 from code42cli.options import format_option
+from code42cli.options import max_workers_option
+from code42cli.options import rate_limit_option
+from code42cli.options import resume_option
 from code42cli.options import sdk_options
 from code42cli.output_formats import DataFrameOutputFormatter
 from code42cli.util import deprecation_warning
@@ -174,8 +182,12 @@ bulk.add_command(watchlists_generate_template)
     type=AutoDecodedFile("r"),
     callback=lambda ctx, param, arg: csv.DictReader(arg),
 )
+@max_workers_option
+@resume_option
+@rate_limit_option
+@batch_size_option
 @sdk_options()
-def bulk_add(state, csv_rows):
+def bulk_add(state, csv_rows, max_workers, journal, rate_limit, batch_size):
     headers = csv_rows.fieldnames
     if "user_id" not in headers and "username" not in headers:
         raise Code42CLIError(
@@ -189,12 +201,13 @@ def bulk_add(state, csv_rows):
         )
 
     sdk = state.sdk
+    rows = list(csv_rows)
+    prewarm_user_risk_profile_cache(sdk, rows)
 
     def handle_row(
         watchlist_id=None, watchlist_type=None, user_id=None, username=None, **kwargs
     ):
-        if username and not user_id:
-            user_id = sdk.userriskprofile.get_by_username(username)["userId"]
+        user_id = _get_user_id(sdk, user_id=user_id, username=username)
         if watchlist_id:
             sdk.watchlists.add_included_users_by_watchlist_id(user_id, watchlist_id)
         elif watchlist_type:
@@ -211,10 +224,26 @@ def bulk_add(state, csv_rows):
                 "missing value for `watchlist_id` or `watchlist_type` columns."
             )
 
+    def handle_batch(key, user_ids):
+        column, value = key
+        if column == "watchlist_id":
+            sdk.watchlists.add_included_users_by_watchlist_id(user_ids, value)
+        else:
+            sdk.watchlists.add_included_users_by_watchlist_type(user_ids, value)
+
     run_bulk_process(
         handle_row,
-        list(csv_rows),
+        rows,
         progress_label="Adding users to Watchlists:",
+        max_workers=max_workers,
+        journal=journal,
+        rate_limit=rate_limit,
+        batcher=RowBatcher(
+            handle_batch,
+            _get_watchlist_batch_key,
+            size=batch_size,
+            resolve=functools.partial(_get_user_id, sdk),
+        ),
     )
 
 
@@ -230,8 +259,12 @@ def bulk_add(state, csv_rows):
     type=AutoDecodedFile("r"),
     callback=lambda ctx, param, arg: csv.DictReader(arg),
 )
+@max_workers_option
+@resume_option
+@rate_limit_option
+@batch_size_option
 @sdk_options()
-def bulk_remove(state, csv_rows):
+def bulk_remove(state, csv_rows, max_workers, journal, rate_limit, batch_size):
     headers = csv_rows.fieldnames
     if "user_id" not in headers and "username" not in headers:
         raise Code42CLIError(
@@ -245,12 +278,13 @@ def bulk_remove(state, csv_rows):
         )
 
     sdk = state.sdk
+    rows = list(csv_rows)
+    prewarm_user_risk_profile_cache(sdk, rows)
 
     def handle_row(
         watchlist_id=None, watchlist_type=None, user_id=None, username=None, **kwargs
     ):
-        if username and not user_id:
-            user_id = sdk.userriskprofile.get_by_username(username)["userId"]
+        user_id = _get_user_id(sdk, user_id=user_id, username=username)
         if watchlist_id:
             sdk.watchlists.remove_included_users_by_watchlist_id(user_id, watchlist_id)
         elif watchlist_type:
@@ -263,8 +297,44 @@ def bulk_remove(state, csv_rows):
                 "missing value for `watchlist_id` or `watchlist_type` columns."
             )
 
+    def handle_batch(key, user_ids):
+        column, value = key
+        if column == "watchlist_id":
+            sdk.watchlists.remove_included_users_by_watchlist_id(user_ids, value)
+        else:
+            sdk.watchlists.remove_included_users_by_watchlist_type(user_ids, value)
+
     run_bulk_process(
         handle_row,
-        list(csv_rows),
+        rows,
         progress_label="Adding users to Watchlists:",
+        max_workers=max_workers,
+        journal=journal,
+        rate_limit=rate_limit,
+        batcher=RowBatcher(
+            handle_batch,
+            _get_watchlist_batch_key,
+            size=batch_size,
+            resolve=functools.partial(_get_user_id, sdk),
+        ),
     )
+
+
+def _get_watchlist_batch_key(
+    watchlist_id=None, watchlist_type=None, user_id=None, username=None, **kwargs
+):
+    # Rows missing a user or with an invalid watchlist are handled on their own so that they
+    # fail with the row handler's error messages.
+    if not user_id and not username:
+        return None
+    if watchlist_id:
+        return "watchlist_id", watchlist_id
+    if watchlist_type in WatchlistType.choices():
+        return "watchlist_type", watchlist_type
+    return None
+
+
+def _get_user_id(sdk, user_id=None, username=None, **kwargs):
+    if username and not user_id:
+        return get_user_risk_profile_id(sdk, username)
+    return user_id
@@ -0,0 +1,188 @@
+"""An index of the active legal holds that each user is a custodian of, which the `users` and
+`devices` commands use to add legal hold membership to their output.
+
+The custodians of each active legal hold matter are fetched concurrently. Set the
+`CODE42CLI_LEGAL_HOLD_CACHE_TTL` environment variable to a number of seconds to cache each
+profile's index on disk for that long, so that consecutive commands reuse it instead of fetching
+the custodians again.
+"""
+import hashlib
+import json
+import os
+from os import environ
+from os import path
+from time import time
+
+from code42cli.errors import Code42CLIError
+from code42cli.util import get_user_project_path
+from code42cli.util import map_concurrently
+from code42cli.util import write_private_file
+
+LEGAL_HOLD_CACHE_TTL_ENV_VAR = "CODE42CLI_LEGAL_HOLD_CACHE_TTL"
+
+# The max number of matters whose custodians are fetched at once.
+DEFAULT_MAX_WORKERS = 8
+
+_CUSTODIAN_INDEX_CACHE_DIR = "legal_hold_cache"
+
+
+def get_cache_ttl():
+    """Returns the number of seconds to cache custodian indexes for, from the
+    `CODE42CLI_LEGAL_HOLD_CACHE_TTL` environment variable. 0 (the default) disables the cache."""
+    value = environ.get(LEGAL_HOLD_CACHE_TTL_ENV_VAR) or "0"
+    try:
+        ttl = float(value)
+    except ValueError:
+        ttl = -1
+    if ttl < 0:
+        raise Code42CLIError(
+            f"{LEGAL_HOLD_CACHE_TTL_ENV_VAR} must be a number of seconds, not '{value}'."
+        )
+    return ttl
+
+
+def _is_api_client(sdk):
+    return sdk._auth_flag == 1  # noqa: api client endpoints return lists directly
+
+
+def _get_active_matters(sdk):
+    for page in sdk.legalhold.get_all_matters(active=True):
+        yield from page.data if _is_api_client(sdk) else page["legalHolds"]
+
+
+def _get_matter_custodians(sdk, matter):
+    memberships = []
+    if _is_api_client(sdk):
+        for page in sdk.legalhold.get_all_matter_custodians(
+            legal_hold_matter_uid=matter["legalHoldUid"], active=True
+        ):
+            memberships.extend(page.data)
+    else:
+        for page in sdk.legalhold.get_all_matter_custodians(
+            legal_hold_uid=matter["legalHoldUid"], active=True
+        ):
+            memberships.extend(page["legalHoldMemberships"])
+    return memberships
+
+
+def build_custodian_index(sdk, max_workers=DEFAULT_MAX_WORKERS):
+    """Fetches the custodians of every active legal hold matter, up to `max_workers` matters at
+    once.
+
+    Returns:
+        dict: The `(legalHoldUid, name)` of each active legal hold that a user is a custodian of,
+        in the order the matters are listed, by the user's UID.
+    """
+    index = {}
+    matter_custodians = map_concurrently(
+        lambda matter: _get_matter_custodians(sdk, matter),
+        _get_active_matters(sdk),
+        max_workers,
+    )
+    for memberships in matter_custodians:
+        for membership in memberships:
+            legal_hold = membership["legalHold"]
+            index.setdefault(membership["user"]["userUid"], []).append(
+                (legal_hold["legalHoldUid"], legal_hold["name"])
+            )
+    return index
+
+
+def get_legal_hold_membership_dataframe(custodian_index):
+    """Returns a DataFrame of the comma-separated `legalHoldUid` and `legalHoldName` of the legal
+    holds in a custodian index, indexed by the user's UID."""
+    # Imported here so that importing this module (e.g. to delete a profile's cache) doesn't
+    # import pandas.
+    from pandas import DataFrame
+
+    return DataFrame(
+        [
+            (
+                ",".join(uid for uid, _ in legal_holds),
+                ",".join(name for _, name in legal_holds),
+            )
+            for legal_holds in custodian_index.values()
+        ],
+        index=list(custodian_index),
+        columns=["legalHoldUid", "legalHoldName"],
+    )
+
+
+class CustodianIndexCache:
+    """The file that caches a profile's custodian index.
+
+    Args:
+        profile_name (str): The name of the profile.
+        authority_url (str): The profile's Code42 server.
+        username (str): The profile's username (or API client ID).
+        ttl (float): The number of seconds to cache the index for.
+    """
+
+    def __init__(self, profile_name, authority_url, username, ttl=0):
+        self._identity = [profile_name, authority_url, username]
+        self.ttl = ttl
+        self._location = None
+
+    @property
+    def location(self):
+        if self._location is None:
+            cache_dir = get_user_project_path(_CUSTODIAN_INDEX_CACHE_DIR)
+            key = "\n".join(self._identity).encode("utf-8")
+            self._location = path.join(cache_dir, hashlib.sha256(key).hexdigest())
+        return self._location
+
+    def get(self):
+        """Returns the cached index, or None if there isn't one or it has expired."""
+        try:
+            with open(self.location, encoding="utf-8") as cache_file:
+                entry = json.load(cache_file)
+        except (FileNotFoundError, ValueError):
+            return None
+        if (
+            entry.get("identity") != self._identity
+            or entry.get("expires_at", 0) <= time()
+        ):
+            return None
+        return {
+            user_uid: [tuple(legal_hold) for legal_hold in legal_holds]
+            for user_uid, legal_holds in entry["index"].items()
+        }
+
+    def set(self, index):
+        """Caches the index for `ttl` seconds."""
+        entry = {
+            "identity": self._identity,
+            "expires_at": time() + self.ttl,
+            "index": index,
+        }
+        write_private_file(self.location, json.dumps(entry).encode("utf-8"))
+
+    def delete(self):
+        """Removes the cached index."""
+        try:
+            os.remove(self.location)
+        except FileNotFoundError:
+            pass
+
+
+def get_custodian_index(sdk, profile=None, max_workers=DEFAULT_MAX_WORKERS):
+    """Returns the custodian index (see :func:`build_custodian_index`). When a `profile` is given
+    and the `CODE42CLI_LEGAL_HOLD_CACHE_TTL` environment variable enables the cache, the profile's
+    cached index is returned if it hasn't expired, and a newly built index is cached.
+
+    Args:
+        sdk (py42.sdk.SDKClient): The profile's SDK client.
+        profile (Code42Profile): The profile to cache the index for.
+        max_workers (int): The max number of matters whose custodians are fetched at once.
+    """
+    ttl = get_cache_ttl()
+    if profile is None or not ttl:
+        return build_custodian_index(sdk, max_workers)
+    cache = CustodianIndexCache(
+        profile.name, profile.authority_url, profile.username, ttl
+    )
+    index = cache.get()
+    if index is None:
+        index = build_custodian_index(sdk, max_workers)
+        cache.set(index)
+    return index
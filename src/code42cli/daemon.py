@@ -0,0 +1,255 @@
+"""The daemon that `code42 serve` runs. It keeps the commands imported and each profile's py42 SDK
+client logged in, and runs the `code42` commands that `code42-client` sends it (see
+:mod:`code42cli.daemon_client` for the protocol), so that repeated commands don't pay for starting
+Python, importing the CLI and logging in each time.
+
+Commands run one at a time, in the daemon's process and environment, with the client's working
+directory. They can't read from the client's standard input, so commands that prompt need to be
+run with `--assume-yes`. `send-to` commands can't be run by the daemon, because their syslog
+loggers are shared by the whole process.
+"""
+import io
+import json
+import os
+import socket
+import socketserver
+import sys
+import traceback
+from contextlib import redirect_stderr
+from contextlib import redirect_stdout
+
+import click
+import py42.settings
+from py42.exceptions import Py42UnauthorizedError
+
+from code42cli.daemon_client import connect
+from code42cli.daemon_client import EXIT
+from code42cli.daemon_client import STDERR
+from code42cli.daemon_client import STDOUT
+from code42cli.daemon_client import write_frame
+from code42cli.errors import Code42CLIError
+from code42cli.options import CLIState
+
+# Commands that can only be run directly. A `send-to` command's logger is cached for the life of
+# the process, so a second `send-to` would send to the first one's server.
+UNSUPPORTED_COMMANDS = ("serve", "shell", "send-to")
+
+
+def _get_sdk_cache_key(profile):
+    # A profile whose settings change gets a new SDK client. One whose password changes gets a
+    # new client once the server rejects the old one (see `_run_command`).
+    return (
+        profile.name,
+        profile.authority_url,
+        profile.username,
+        profile.api_client_auth,
+        profile.ignore_ssl_errors,
+    )
+
+
+class WarmCLIState(CLIState):
+    """A `CLIState` that gets its profile's SDK client from a cache shared by every command the
+    daemon runs, creating (and logging in) the client only the first time the profile is used.
+    Commands run with `--debug` get a new client so that its creation is logged.
+
+    Args:
+        sdk_cache (dict): The SDK clients by their profile's settings.
+    """
+
+    def __init__(self, sdk_cache):
+        super().__init__()
+        self._sdk_cache = sdk_cache
+        self._sdk_cache_key = None
+
+    @property
+    def sdk(self):
+        if self._sdk is not None:
+            return self._sdk
+        self._sdk_cache_key = _get_sdk_cache_key(self.profile)
+        if not self.debug:
+            self._sdk = self._sdk_cache.get(self._sdk_cache_key)
+        if self._sdk is None:
+            self._sdk_cache[self._sdk_cache_key] = super().sdk
+        return self._sdk
+
+    def discard_sdk(self):
+        """Removes the command's SDK client from the cache, so that the next command using the
+        profile logs in again."""
+        if self._sdk_cache_key is not None:
+            self._sdk_cache.pop(self._sdk_cache_key, None)
+
+
+def run_command(cli, args, stdout, stderr, sdk_cache, cwd=None):
+    """Runs a command as if from the command line, writing its output to `stdout` and `stderr`.
+
+    Args:
+        cli (click.Group): The `code42` command group.
+        args (list): The command's arguments.
+        stdout: A text file object for the command's standard output.
+        stderr: A text file object for the command's standard error.
+        sdk_cache (dict): The SDK clients to share between commands (see :class:`WarmCLIState`).
+        cwd (str): The directory to run the command in. Defaults to the current directory.
+
+    Returns:
+        int: The command's exit code.
+    """
+    previous_cwd = os.getcwd()
+    previous_stdin = sys.stdin
+    previous_debug_level = py42.settings.debug.level
+    sys.stdin = io.StringIO()
+    try:
+        with redirect_stdout(stdout), redirect_stderr(stderr):
+            return _run_command(cli, args, sdk_cache, cwd)
+    finally:
+        sys.stdin = previous_stdin
+        os.chdir(previous_cwd)
+        py42.settings.debug.level = previous_debug_level
+
+
+def _get_command_path(cli, args):
+    # The names of the command and the groups it's in, e.g. ["alerts", "send-to"].
+    path = []
+    command = cli
+    for arg in args:
+        if arg.startswith("-"):
+            continue
+        if not isinstance(command, click.Group):
+            # an argument, or a command that doesn't exist
+            break
+        path.append(arg)
+        command = command.get_command(None, arg)
+    return path
+
+
+def _is_unauthorized_error(err):
+    # The CLI replaces py42's errors with its own, which keep the original as their context.
+    while err is not None:
+        if isinstance(err, Py42UnauthorizedError):
+            return True
+        err = err.__cause__ or err.__context__
+    return False
+
+
+def _run_command(cli, args, sdk_cache, cwd):
+    command_path = _get_command_path(cli, args)
+    if any(name in UNSUPPORTED_COMMANDS for name in command_path):
+        print(
+            f"Error: `code42 {' '.join(command_path)}` can't be run by the daemon.",
+            file=sys.stderr,
+        )
+        return 2
+    state = WarmCLIState(sdk_cache)
+    try:
+        if cwd:
+            os.chdir(cwd)
+        cli.main(args=args, prog_name="code42", obj=state)
+    except SystemExit as exit:
+        if _is_unauthorized_error(exit):
+            # e.g. the profile's password changed after its client logged in
+            state.discard_sdk()
+        if exit.code is None or isinstance(exit.code, int):
+            return exit.code or 0
+        print(exit.code, file=sys.stderr)
+        return 1
+    except Exception as err:
+        if _is_unauthorized_error(err):
+            state.discard_sdk()
+        traceback.print_exc()
+        return 1
+    return 0
+
+
+class _FrameWriter(io.RawIOBase):
+    def __init__(self, sock, channel):
+        super().__init__()
+        self._sock = sock
+        self._channel = channel
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        write_frame(self._sock, self._channel, bytes(data))
+        return len(data)
+
+
+def _open_output_stream(sock, channel):
+    return io.TextIOWrapper(
+        io.BufferedWriter(_FrameWriter(sock, channel)),
+        encoding="utf-8",
+        errors="replace",
+        line_buffering=True,
+    )
+
+
+class _CommandRequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            # e.g. a check for whether the daemon is running
+            return
+        stdout = _open_output_stream(self.connection, STDOUT)
+        stderr = _open_output_stream(self.connection, STDERR)
+        try:
+            self._handle_request(line, stdout, stderr)
+        except OSError:
+            # the client disconnected
+            pass
+
+    def _handle_request(self, line, stdout, stderr):
+        try:
+            request = json.loads(line)
+            args, cwd = request["args"], request.get("cwd")
+        except (KeyError, TypeError, ValueError):
+            print("Error: Invalid request.", file=stderr)
+            exit_code = 2
+        else:
+            exit_code = run_command(
+                self.server.cli, args, stdout, stderr, self.server.sdk_cache, cwd=cwd
+            )
+        stdout.flush()
+        stderr.flush()
+        write_frame(self.connection, EXIT, str(exit_code).encode("utf-8"))
+
+
+class CommandServer(socketserver.UnixStreamServer):
+    """Listens on a Unix domain socket that only the current user can connect to, and runs the
+    commands that clients send it, one at a time.
+
+    Args:
+        socket_path (str): The path of the socket to create.
+        cli (click.Group): The `code42` command group.
+    """
+
+    def __init__(self, socket_path, cli):
+        self.cli = cli
+        self.sdk_cache = {}
+        previous_umask = os.umask(0o177)
+        try:
+            super().__init__(socket_path, _CommandRequestHandler)
+        finally:
+            os.umask(previous_umask)
+
+    def server_close(self):
+        super().server_close()
+        try:
+            os.remove(self.server_address)
+        except FileNotFoundError:
+            pass
+
+
+def create_command_server(socket_path, cli):
+    """Creates a :class:`CommandServer`, first removing the socket left behind by a daemon that
+    stopped without cleaning up. Raises `Code42CLIError` if a daemon is already listening on the
+    socket or the platform doesn't support Unix domain sockets."""
+    if not hasattr(socket, "AF_UNIX"):
+        raise Code42CLIError(
+            "`code42 serve` requires Unix domain sockets, which aren't supported here."
+        )
+    if os.path.exists(socket_path):
+        sock = connect(socket_path)
+        if sock is not None:
+            sock.close()
+            raise Code42CLIError(f"A daemon is already listening on {socket_path}.")
+        os.remove(socket_path)
+    return CommandServer(socket_path, cli)
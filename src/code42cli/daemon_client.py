@@ -0,0 +1,131 @@
+"""The `code42-client` command, a thin client for the daemon that `code42 serve` runs. It sends its
+arguments to the daemon, which runs them as a `code42` command, and writes the command's output
+as the daemon streams it back before exiting with the command's exit code. If no daemon is
+listening, it runs the command itself, the same as `code42` would.
+
+This module only imports the standard library (until it has to run a command itself) so that
+the client starts as quickly as possible.
+
+The daemon listens on the Unix domain socket named by the `CODE42CLI_SOCKET` environment variable,
+or else `~/.code42cli/serve.sock`. A client sends one request per connection: a line of JSON with
+the command's `args` and the client's working directory (`cwd`). The daemon responds with frames,
+each a 1 byte channel (`STDOUT`, `STDERR` or `EXIT`), the 4 byte big-endian length of the payload,
+and the payload. The `EXIT` frame is last, and its payload is the exit code.
+"""
+import json
+import os
+import socket
+import struct
+import sys
+from os import environ
+from os import path
+
+SOCKET_ENV_VAR = "CODE42CLI_SOCKET"
+
+STDOUT = 1
+STDERR = 2
+EXIT = 3
+
+_FRAME_HEADER = struct.Struct(">BI")
+
+
+def get_socket_path():
+    """Returns the path of the daemon's socket: the value of the `CODE42CLI_SOCKET` environment
+    variable, or else `~/.code42cli/serve.sock`."""
+    return environ.get(SOCKET_ENV_VAR) or path.join(
+        path.expanduser("~"), ".code42cli", "serve.sock"
+    )
+
+
+def write_frame(sock, channel, payload):
+    """Sends a frame of the response to a command request."""
+    sock.sendall(_FRAME_HEADER.pack(channel, len(payload)) + payload)
+
+
+def read_frame(file):
+    """Reads the next frame of the response to a command request from a binary file object.
+
+    Returns:
+        tuple: The `(channel, payload)` of the frame, or `(None, None)` if the connection closed
+        before a whole frame was read.
+    """
+    header = file.read(_FRAME_HEADER.size)
+    if len(header) < _FRAME_HEADER.size:
+        return None, None
+    channel, length = _FRAME_HEADER.unpack(header)
+    payload = file.read(length)
+    if len(payload) < length:
+        return None, None
+    return channel, payload
+
+
+def connect(socket_path=None):
+    """Connects to the daemon.
+
+    Args:
+        socket_path (str): The path of the daemon's socket. Defaults to :func:`get_socket_path`.
+
+    Returns:
+        socket.socket: The connected socket, or None if no daemon is listening (or the platform
+        doesn't support Unix domain sockets).
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path or get_socket_path())
+    except (FileNotFoundError, ConnectionRefusedError):
+        sock.close()
+        return None
+    return sock
+
+
+def run_remote_command(sock, args, stdout=None, stderr=None):
+    """Runs a command in the daemon, writing its output to `stdout` and `stderr` as it's streamed
+    back.
+
+    Args:
+        sock (socket.socket): A socket connected to the daemon.
+        args (list): The command's arguments, e.g. `["users", "show", "user@example.com"]`.
+        stdout: A binary file object for the command's standard output. Defaults to
+            `sys.stdout.buffer`.
+        stderr: A binary file object for the command's standard error. Defaults to
+            `sys.stderr.buffer`.
+
+    Returns:
+        int: The command's exit code.
+    """
+    streams = {
+        STDOUT: stdout or sys.stdout.buffer,
+        STDERR: stderr or sys.stderr.buffer,
+    }
+    request = {"args": list(args), "cwd": os.getcwd()}
+    sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+    with sock.makefile("rb") as response:
+        while True:
+            channel, payload = read_frame(response)
+            if channel is None:
+                raise ConnectionError(
+                    "The code42 daemon closed the connection before the command finished."
+                )
+            if channel == EXIT:
+                return int(payload)
+            streams[channel].write(payload)
+            streams[channel].flush()
+
+
+def main(args=None):
+    """The entry point of `code42-client`."""
+    args = sys.argv[1:] if args is None else args
+    sock = connect()
+    if sock is None:
+        from code42cli.main import cli
+
+        return cli.main(args=args, prog_name="code42")
+    with sock:
+        try:
+            exit_code = run_remote_command(sock, args)
+        except ConnectionError as err:
+            print(f"Error: {err}", file=sys.stderr)
+            exit_code = 1
+    sys.exit(exit_code)
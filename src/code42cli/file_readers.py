@@ -1,21 +1,25 @@
 import csv
+import hashlib
+import io
 
 import click
 
 from code42cli.click_ext.types import AutoDecodedFile
 from code42cli.errors import Code42CLIError
 
+_FINGERPRINT_CHUNK_SIZE = 64 * 1024
+
 
 def read_csv_arg(headers):
     """Helper for defining arguments that read from a csv file. Automatically converts
-    the file name provided on command line to a list of csv rows (passed to command
-    function as `csv_rows` param).
+    the file name provided on command line to a :class:`CSVRows` iterable of csv rows (passed
+    to command function as `csv_rows` param).
     """
     return click.argument(
         "csv_rows",
         metavar="CSV_FILE",
         type=AutoDecodedFile("r"),
-        callback=lambda ctx, param, arg: read_csv(arg, headers=headers),
+        callback=lambda ctx, param, arg: CSVRows(arg, headers=headers),
     )
 
 
@@ -27,34 +31,86 @@ def read_csv(file, headers):
     If no header row is present in CSV, column count must match `headers` arg length or
     else error is raised.
     """
-    lines = file.readlines()
+    return list(CSVRows(file, headers))
+
 
-    # check if header is commented for flat-file backwards compatability
-    if lines[0].startswith("#"):
-        # strip comment line
-        lines.pop(0)
+class CSVRows:
+    """An iterable of the dict rows in a csv file object. The header row is validated when
+    created (see :func:`read_csv` for the rules), but the data rows are read lazily from the file
+    each time this is iterated, so the whole file never has to be in memory.
 
-    first_line = lines[0].strip().split(",")
+    `len()` counts the data rows with a separate pass over the file that parses the csv but
+    doesn't build any dicts.
+    """
 
-    # handle when first row has all of our expected headers
-    if all(field in first_line for field in headers):
-        reader = csv.DictReader(lines[1:], fieldnames=first_line)
-        csv_rows = [{key: row[key] for key in headers} for row in reader]
-        if not csv_rows:
+    def __init__(self, file, headers):
+        if not file.seekable():
+            # e.g. stdin, which has to be buffered to be read more than once.
+            file = io.StringIO(file.read())
+        self._file = file
+        self.headers = headers
+        self._length = None
+        self._fieldnames, self._has_header = self._read_header()
+        self._data_start = file.tell()
+        if self._has_header and not len(self):
             raise Code42CLIError("CSV contains no data rows.")
-        return csv_rows
 
-    # handle when first row has no expected headers
-    elif all(field not in first_line for field in headers):
-        #  only process header-less CSVs if we get exact expected column count
-        if len(first_line) == len(headers):
-            return list(csv.DictReader(lines, fieldnames=headers))
+    def __iter__(self):
+        self._file.seek(self._data_start)
+        reader = csv.DictReader(self._file, fieldnames=self._fieldnames)
+        if self._has_header:
+            for row in reader:
+                yield {key: row[key] for key in self.headers}
+        else:
+            yield from reader
+
+    def __len__(self):
+        if self._length is None:
+            self._file.seek(self._data_start)
+            # csv.DictReader skips blank rows, which csv.reader returns as empty lists.
+            self._length = sum(1 for row in csv.reader(self._file) if row)
+        return self._length
+
+    def fingerprint(self):
+        """Returns the SHA-256 hash of the whole file, including its header."""
+        digest = hashlib.sha256()
+        self._file.seek(0)
+        for chunk in iter(lambda: self._file.read(_FINGERPRINT_CHUNK_SIZE), ""):
+            digest.update(chunk.encode("utf8"))
+        return digest.hexdigest()
+
+    def _read_header(self):
+        line_start = self._file.tell()
+        line = self._file.readline()
+
+        # check if header is commented for flat-file backwards compatability
+        if line.startswith("#"):
+            # strip comment line
+            line_start = self._file.tell()
+            line = self._file.readline()
+
+        if not line:
+            raise Code42CLIError("CSV contains no data rows.")
+
+        first_line = line.strip().split(",")
+
+        # handle when first row has all of our expected headers
+        if all(field in first_line for field in self.headers):
+            return first_line, True
+
+        # handle when first row has no expected headers
+        elif all(field not in first_line for field in self.headers):
+            #  only process header-less CSVs if we get exact expected column count
+            if len(first_line) == len(self.headers):
+                # the first line is data, so start reading from it
+                self._file.seek(line_start)
+                return self.headers, False
+            else:
+                raise Code42CLIError(
+                    "CSV data is ambiguous. Column count must match expected columns exactly when no "
+                    f"header row is present. Expected columns: {self.headers}"
+                )
+        # handle when first row has some expected headers but not all
         else:
-            raise Code42CLIError(
-                "CSV data is ambiguous. Column count must match expected columns exactly when no "
-                f"header row is present. Expected columns: {headers}"
-            )
-    # handle when first row has some expected headers but not all
-    else:
-        missing = [field for field in headers if field not in first_line]
-        raise Code42CLIError(f"Missing required columns in csv: {missing}")
+            missing = [field for field in self.headers if field not in first_line]
+            raise Code42CLIError(f"Missing required columns in csv: {missing}")
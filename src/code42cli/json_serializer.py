@@ -0,0 +1,80 @@
+"""Serializes events to JSON with `ujson` when it's installed, which is faster than the standard
+library's `json`. Set the `CODE42CLI_JSON_LIBRARY` environment variable to `ujson` or `json` to
+choose the library (`json` is used if `ujson` isn't installed).
+
+Both libraries produce exactly the same JSON as `json.dumps()` with its default separators. If
+`ujson` can't serialize a value the same way (for example, a float with a negative exponent,
+which `ujson` writes as `1e-7` rather than `1e-07`), the event is serialized with `json` instead.
+"""
+import importlib
+import json
+from os import environ
+
+JSON_LIBRARY_ENV_VAR = "CODE42CLI_JSON_LIBRARY"
+
+_JSON_LIBRARIES = ("ujson", "json")
+_DEFAULT_SEPARATORS = (", ", ": ")
+
+
+def _json_dumps(obj, ensure_ascii=True):
+    return json.dumps(obj, ensure_ascii=ensure_ascii)
+
+
+def _json_dumps_bytes(obj, ensure_ascii=True):
+    return _json_dumps(obj, ensure_ascii).encode("utf-8")
+
+
+def _get_ujson_functions(ujson):
+    def dumps(obj, ensure_ascii=True):
+        try:
+            json_string = ujson.dumps(
+                obj,
+                ensure_ascii=ensure_ascii,
+                escape_forward_slashes=False,
+                separators=_DEFAULT_SEPARATORS,
+            )
+        except (TypeError, ValueError, OverflowError):
+            return _json_dumps(obj, ensure_ascii)
+        # `json` writes negative exponents with two digits and escapes DEL when `ensure_ascii`
+        # is set. "e-" can also be part of a string, which just means `json` is used needlessly.
+        if "e-" in json_string or (ensure_ascii and "\x7f" in json_string):
+            return _json_dumps(obj, ensure_ascii)
+        return json_string
+
+    def dumps_bytes(obj, ensure_ascii=True):
+        return dumps(obj, ensure_ascii).encode("utf-8")
+
+    return dumps, dumps_bytes
+
+
+_FUNCTION_FACTORIES = {
+    "ujson": _get_ujson_functions,
+}
+
+
+def load_json_library(name=None):
+    """Gets the `(name, dumps, dumps_bytes)` of a JSON library. `dumps` returns a `str` and
+    `dumps_bytes` returns UTF-8 encoded `bytes`. Both take an `ensure_ascii` argument, like
+    `json.dumps()`.
+
+    Args:
+        name (str): `ujson` or `json`. Defaults to the value of the `CODE42CLI_JSON_LIBRARY`
+            environment variable, or else the first of them that's installed.
+    """
+    name = name or environ.get(JSON_LIBRARY_ENV_VAR)
+    if name and name not in _JSON_LIBRARIES:
+        raise ValueError(
+            f"Unknown JSON library '{name}'. Expected one of {list(_JSON_LIBRARIES)}."
+        )
+    for library_name in [name] if name else _JSON_LIBRARIES:
+        if library_name == "json":
+            break
+        try:
+            library = importlib.import_module(library_name)
+        except ImportError:
+            continue
+        return (library_name, *_FUNCTION_FACTORIES[library_name](library))
+    return "json", _json_dumps, _json_dumps_bytes
+
+
+JSON_LIBRARY, dumps, dumps_bytes = load_json_library()
@@ -5,10 +5,14 @@ from logging.handlers import RotatingFileHandler
 from threading import Lock
 
 from code42cli.enums import FileEventsOutputFormat
+from code42cli.logger.enums import MessageFraming
 from code42cli.logger.formatters import FileEventDictToCEFFormatter
 from code42cli.logger.formatters import FileEventDictToJSONFormatter
 from code42cli.logger.formatters import FileEventDictToRawJSONFormatter
-from code42cli.logger.handlers import NoPrioritySysLogHandler
+from code42cli.logger.handlers import BatchingSysLogHandler
+from code42cli.logger.handlers import DEFAULT_MAX_BATCH_BYTES
+from code42cli.logger.handlers import DEFAULT_MAX_BATCH_LATENCY
+from code42cli.logger.handlers import FanOutHandler
 from code42cli.util import get_url_parts
 from code42cli.util import get_user_project_path
 
@@ -34,14 +38,26 @@ def _init_logger(logger, handler, output_format):
     return add_handler_to_logger(logger, handler, formatter)
 
 
-def get_logger_for_server(hostname, protocol, output_format, certs):
-    """Gets the logger that sends logs to a server for the given format.
+def get_logger_for_server(
+    hostname,
+    protocol,
+    output_format,
+    certs,
+    framing=MessageFraming.NEWLINE,
+    max_batch_bytes=DEFAULT_MAX_BATCH_BYTES,
+    max_batch_latency=DEFAULT_MAX_BATCH_LATENCY,
+):
+    """Gets the logger that sends logs to a server for the given format. Logs are sent in
+    batches, so call :func:`flush_logger` to make sure everything logged has been sent.
 
     Args:
         hostname: The hostname of the server. It may include the port.
         protocol: The transfer protocol for sending logs.
         output_format: CEF, JSON, or RAW_JSON. Each type results in a different logger instance.
         certs: Use for passing SSL/TLS certificates when connecting to the server.
+        framing: NEWLINE or OCTET-COUNTING, for how logs are delimited over TCP and TLS-TCP.
+        max_batch_bytes: The number of bytes of logs to send at once.
+        max_batch_latency: The max number of seconds to hold a log before sending it.
     """
     logger = logging.getLogger(f"code42_syslog_{output_format.lower()}")
     if logger_has_handlers(logger):
@@ -52,12 +68,101 @@ def get_logger_for_server(hostname, protocol, output_format, certs):
         hostname = url_parts[0]
         port = url_parts[1] or 514
         if not logger_has_handlers(logger):
-            handler = NoPrioritySysLogHandler(hostname, port, protocol, certs)
+            handler = BatchingSysLogHandler(
+                hostname,
+                port,
+                protocol,
+                certs,
+                framing=framing,
+                max_batch_bytes=max_batch_bytes,
+                max_batch_latency=max_batch_latency,
+            )
             handler.connect_socket()
             return _init_logger(logger, handler, output_format)
     return logger
 
 
+class SyslogServer:
+    """A server for :func:`get_logger_for_servers` to send logs to.
+
+    Args:
+        hostname: The hostname of the server. It may include the port.
+        protocol: The transfer protocol for sending logs.
+        output_format: CEF, JSON, or RAW_JSON.
+        certs: Use for passing SSL/TLS certificates when connecting to the server.
+        framing: NEWLINE or OCTET-COUNTING, for how logs are delimited over TCP and TLS-TCP.
+    """
+
+    __slots__ = ("hostname", "protocol", "output_format", "certs", "framing")
+
+    def __init__(
+        self, hostname, protocol, output_format, certs, framing=MessageFraming.NEWLINE
+    ):
+        self.hostname = hostname
+        self.protocol = protocol
+        self.output_format = output_format
+        self.certs = certs
+        self.framing = framing
+
+
+def get_logger_for_servers(
+    servers,
+    max_batch_bytes=DEFAULT_MAX_BATCH_BYTES,
+    max_batch_latency=DEFAULT_MAX_BATCH_LATENCY,
+):
+    """Gets a logger that sends each log to every one of the servers. Each log is formatted once
+    per output format, and sent to each server from its own thread. Call :func:`flush_logger` to
+    make sure everything logged has been sent to every server.
+
+    Args:
+        servers (list): The :class:`SyslogServer` instances to send logs to.
+        max_batch_bytes: The number of bytes of logs to send to a server at once.
+        max_batch_latency: The max number of seconds to hold a log before sending it.
+    """
+    logger = logging.getLogger("code42_syslog_fan_out")
+    if logger_has_handlers(logger):
+        return logger
+
+    with logger_deps_lock:
+        if logger_has_handlers(logger):
+            return logger
+        formatters = {}
+        destinations = []
+        try:
+            for server in servers:
+                if server.output_format not in formatters:
+                    formatters[server.output_format] = _get_formatter(
+                        server.output_format
+                    )
+                formatter = formatters[server.output_format]
+                url_parts = get_url_parts(server.hostname)
+                handler = BatchingSysLogHandler(
+                    url_parts[0],
+                    url_parts[1] or 514,
+                    server.protocol,
+                    server.certs,
+                    framing=server.framing,
+                    max_batch_bytes=max_batch_bytes,
+                    max_batch_latency=max_batch_latency,
+                )
+                destinations.append((formatter, handler))
+                handler.connect_socket()
+        except Exception:
+            for _, handler in destinations:
+                handler.close()
+            raise
+        logger.setLevel(logging.INFO)
+        logger.addHandler(FanOutHandler(destinations))
+    return logger
+
+
+def flush_logger(logger):
+    """Sends anything the logger's handlers are holding, such as the batched logs of a logger
+    from :func:`get_logger_for_server`."""
+    for handler in logger.handlers:
+        handler.flush()
+
+
 def _get_standard_formatter():
     return logging.Formatter("%(message)s")
 
@@ -5,3 +5,11 @@ class ServerProtocol:
 
     def __iter__(self):
         return iter([self.TCP, self.UDP, self.TLS_TCP])
+
+
+class MessageFraming:
+    NEWLINE = "NEWLINE"
+    OCTET_COUNTING = "OCTET-COUNTING"
+
+    def __iter__(self):
+        return iter([self.NEWLINE, self.OCTET_COUNTING])
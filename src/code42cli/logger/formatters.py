@@ -1,7 +1,8 @@
-import json
 from datetime import datetime
+from functools import lru_cache
 from logging import Formatter
 
+from code42cli import json_serializer
 from code42cli.maps import CEF_CUSTOM_FIELD_NAME_MAP
 from code42cli.maps import FILE_EVENT_TO_SIGNATURE_ID_MAP
 from code42cli.maps import JSON_TO_CEF_MAP
@@ -57,32 +58,56 @@ class FileEventDictToJSONFormatter(Formatter):
         Args:
             record (LogRecord): `record.msg` must be a `dict`.
         """
+        return json_serializer.dumps(self._get_file_event_dict(record))
+
+    def format_bytes(self, record):
+        """Formats the record as UTF-8 encoded JSON."""
+        return json_serializer.dumps_bytes(self._get_file_event_dict(record))
+
+    def _get_file_event_dict(self, record):
         file_event_dict = record.msg
-        file_event_dict = {
+        return {
             key: file_event_dict[key]
             for key in file_event_dict
             if file_event_dict[key] or file_event_dict[key] == 0
         }
-        return json.dumps(file_event_dict)
 
 
 class FileEventDictToRawJSONFormatter(Formatter):
     """Formats file event dicts into JSON format. Attach to a logger via `setFormatter` to use."""
 
     def format(self, record):
-        return json.dumps(record.msg)
+        return json_serializer.dumps(record.msg)
+
+    def format_bytes(self, record):
+        """Formats the record as UTF-8 encoded JSON."""
+        return json_serializer.dumps_bytes(record.msg)
 
 
 def _format_cef_kvp(cef_field_key, cef_field_value):
+    return get_cef_field_formatter(cef_field_key)(cef_field_value)
+
+
+@lru_cache(maxsize=None)
+def get_cef_field_formatter(cef_field_key):
+    """Returns a function that formats a value of the CEF field as the `key=value` pair(s) that
+    represent it in a CEF extension, so that what to do for the field is only worked out once."""
     if cef_field_key + "Label" in CEF_CUSTOM_FIELD_NAME_MAP:
-        return _format_custom_cef_kvp(cef_field_key, cef_field_value)
-
-    cef_field_value = _handle_nested_json_fields(cef_field_key, cef_field_value)
-    if isinstance(cef_field_value, list):
-        cef_field_value = _convert_list_to_csv(cef_field_value)
-    elif cef_field_key in CEF_TIMESTAMP_FIELDS:
-        cef_field_value = convert_file_event_timestamp_to_cef_timestamp(cef_field_value)
-    return f"{cef_field_key}={cef_field_value}"
+        return lambda value: _format_custom_cef_kvp(cef_field_key, value)
+
+    is_timestamp = cef_field_key in CEF_TIMESTAMP_FIELDS
+
+    def format_cef_kvp(cef_field_value):
+        cef_field_value = _handle_nested_json_fields(cef_field_key, cef_field_value)
+        if isinstance(cef_field_value, list):
+            cef_field_value = _convert_list_to_csv(cef_field_value)
+        elif is_timestamp:
+            cef_field_value = convert_file_event_timestamp_to_cef_timestamp(
+                cef_field_value
+            )
+        return f"{cef_field_key}={cef_field_value}"
+
+    return format_cef_kvp
 
 
 def _handle_nested_json_fields(cef_field_key, cef_field_value):
@@ -1,11 +1,29 @@
 import logging
+import queue
 import socket
 import ssl
 import sys
 from logging.handlers import SysLogHandler
+from threading import Event
+from threading import Thread
+from time import monotonic
+from time import sleep
 
+from code42cli.logger.enums import MessageFraming
 from code42cli.logger.enums import ServerProtocol
 
+# BatchingSysLogHandler sends its pending messages once they add up to this many bytes, or once
+# the oldest has waited this many seconds.
+DEFAULT_MAX_BATCH_BYTES = 64 * 1024
+DEFAULT_MAX_BATCH_LATENCY = 1.0
+
+# The number of formatted messages FanOutHandler queues for a server before waiting for it.
+DEFAULT_FAN_OUT_QUEUE_SIZE = 10000
+
+# The number of times BatchingSysLogHandler reconnects to try to send a batch before giving up.
+MAX_RECONNECT_ATTEMPTS = 5
+_RECONNECT_BACKOFF = 0.5
+
 
 class SyslogServerNetworkConnectionError(Exception):
     """An error raised when the connection is disrupted during logging."""
@@ -93,14 +111,17 @@ class NoPrioritySysLogHandler(SysLogHandler):
         super().handleError(record)
 
     def _send_record(self, record):
-        formatted_record = self.format(record)
-        msg = formatted_record + "\n"
-        msg = msg.encode("utf-8")
+        msg = self._format_bytes(record) + b"\n"
         if self.socktype == socket.SOCK_DGRAM:
             self.socket.sendto(msg, self.address)
         else:
             self.socket.sendall(msg)
 
+    def _format_bytes(self, record):
+        if self.formatter is None:
+            return self.format(record).encode("utf-8")
+        return format_record_bytes(self.formatter, record)
+
     def close(self):
         if self._wrap_socket:
             self.socket.unwrap()
@@ -108,6 +129,271 @@ class NoPrioritySysLogHandler(SysLogHandler):
         logging.Handler.close(self)
 
 
+class BatchingSysLogHandler(NoPrioritySysLogHandler):
+    """A :class:`NoPrioritySysLogHandler` that coalesces the messages sent over TCP and TLS-TCP
+    into large writes. Messages are sent once the pending messages add up to `max_batch_bytes`,
+    once the oldest pending message has waited `max_batch_latency` seconds, or when
+    :meth:`flush` is called. UDP messages are sent as soon as they're logged.
+
+    If sending a batch fails because the connection broke, the handler reconnects and sends the
+    batch again, up to `MAX_RECONNECT_ATTEMPTS` times, before raising
+    :class:`SyslogServerNetworkConnectionError`. Messages are only known to be sent once
+    :meth:`flush` returns.
+
+    Args:
+        hostname: The hostname of the syslog server to send log messages to.
+        port: The port of the syslog server to send log messages to.
+        protocol: The protocol over which to submit syslog messages. Accepts TCP, UDP, or TLS.
+        certs: Certs to specify when using TLS-TCP for the `protocol` argument. Use "ignore" for
+            ssl.CERT_NONE (ignoring certificate validation).
+        framing: How messages are delimited over TCP and TLS-TCP. NEWLINE ends each message with a
+            newline, and OCTET-COUNTING prefixes each message with its length in bytes
+            (RFC 6587).
+        max_batch_bytes (int): The number of bytes of pending messages to send at once. Use 0
+            to send each message as soon as it's logged.
+        max_batch_latency (float): The max number of seconds to hold a message before sending it.
+    """
+
+    def __init__(
+        self,
+        hostname,
+        port,
+        protocol,
+        certs,
+        framing=MessageFraming.NEWLINE,
+        max_batch_bytes=DEFAULT_MAX_BATCH_BYTES,
+        max_batch_latency=DEFAULT_MAX_BATCH_LATENCY,
+    ):
+        super().__init__(hostname, port, protocol, certs)
+        self._framing = framing
+        self._max_batch_bytes = max_batch_bytes
+        self._max_batch_latency = max_batch_latency
+        self._pending = []
+        self._pending_bytes = 0
+        self._pending_since = None
+        self._error = None
+        self._broken = False
+        self._closed = Event()
+        self._flusher = None
+
+    def emit(self, record):
+        if self.socktype == socket.SOCK_DGRAM:
+            super().emit(record)
+            return
+        try:
+            msg = self._format_bytes(record)
+        except Exception:
+            self.handleError(record)
+            return
+        # `logging` holds the handler's lock while this is called
+        self._raise_flusher_error()
+        frame = self._frame(msg)
+        if not self._pending:
+            self._pending_since = monotonic()
+        self._pending.append(frame)
+        self._pending_bytes += len(frame)
+        if (
+            self._pending_bytes >= self._max_batch_bytes
+            or monotonic() - self._pending_since >= self._max_batch_latency
+        ):
+            self._send_pending()
+        else:
+            self._start_flusher()
+
+    def flush(self):
+        """Sends the pending messages."""
+        with self.lock:
+            self._raise_flusher_error()
+            self._send_pending()
+
+    def close(self):
+        self._closed.set()
+        try:
+            if not self._broken:
+                self.flush()
+        finally:
+            if self.socket is None:
+                logging.Handler.close(self)
+            else:
+                super().close()
+
+    def _frame(self, msg):
+        if self._framing == MessageFraming.OCTET_COUNTING:
+            return b"%d %s" % (len(msg), msg)
+        return msg + b"\n"
+
+    def _send_pending(self):
+        if not self._pending:
+            return
+        if self._broken:
+            raise SyslogServerNetworkConnectionError()
+        batch = b"".join(self._pending)
+        for attempt in range(MAX_RECONNECT_ATTEMPTS + 1):
+            try:
+                if attempt:
+                    self._reconnect(attempt)
+                self.socket.sendall(batch)
+                break
+            except OSError as err:
+                if attempt == MAX_RECONNECT_ATTEMPTS:
+                    self._broken = True
+                    raise SyslogServerNetworkConnectionError() from err
+        self._pending = []
+        self._pending_bytes = 0
+        self._pending_since = None
+
+    def _reconnect(self, attempt):
+        sleep(_RECONNECT_BACKOFF * 2 ** (attempt - 1))
+        if self.socket is not None:
+            try:
+                self.socket.close()
+            except OSError:
+                pass
+            self.socket = None
+        self.connect_socket()
+
+    def _start_flusher(self):
+        if self._flusher is None and self._max_batch_latency > 0:
+            self._flusher = Thread(target=self._flush_on_latency, daemon=True)
+            self._flusher.start()
+
+    def _flush_on_latency(self):
+        # sends the pending messages when no more messages are logged to trigger it
+        while not self._closed.wait(self._max_batch_latency / 2):
+            with self.lock:
+                if self._error or self._pending_since is None:
+                    continue
+                if monotonic() - self._pending_since < self._max_batch_latency:
+                    continue
+                try:
+                    self._send_pending()
+                except Exception as err:
+                    self._error = err
+
+    def _raise_flusher_error(self):
+        if self._error is not None:
+            error = self._error
+            self._error = None
+            raise error
+
+
+class FanOutHandler(logging.Handler):
+    """Sends each log record to several handlers. Each record is formatted once per distinct
+    formatter, and the formatted messages are queued for each handler's own thread to send, so
+    that a slow server only holds up the others once its queue is full.
+
+    If a handler fails, the error is raised from the next call to `emit()` or :meth:`flush`.
+
+    Args:
+        destinations (list): `(formatter, handler)` tuples. Each handler is sent the messages
+            formatted by its formatter.
+        queue_size (int): The max number of messages to queue for each handler.
+    """
+
+    def __init__(self, destinations, queue_size=DEFAULT_FAN_OUT_QUEUE_SIZE):
+        super().__init__()
+        self._formatters = {}
+        self._workers = []
+        for formatter, handler in destinations:
+            worker = _FanOutWorker(handler, queue_size)
+            self._formatters.setdefault(formatter, []).append(worker)
+            self._workers.append(worker)
+
+    @property
+    def handlers(self):
+        return [worker.handler for worker in self._workers]
+
+    def emit(self, record):
+        for worker in self._workers:
+            worker.raise_error()
+        for formatter, workers in self._formatters.items():
+            try:
+                msg = format_record_bytes(formatter, record)
+            except Exception:
+                self.handleError(record)
+                return
+            for worker in workers:
+                worker.put(msg)
+
+    def flush(self):
+        """Waits for the queued messages to be sent."""
+        for worker in self._workers:
+            worker.flush()
+
+    def close(self):
+        try:
+            for worker in self._workers:
+                worker.close()
+        finally:
+            super().close()
+
+
+class _FanOutWorker:
+    def __init__(self, handler, queue_size):
+        self.handler = handler
+        # the messages are already formatted
+        handler.setFormatter(_FormattedMessageFormatter())
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._error = None
+        self._thread = Thread(target=self._send_queued, daemon=True)
+        self._thread.start()
+
+    def put(self, msg):
+        self._queue.put(msg)
+
+    def flush(self):
+        self._queue.join()
+        self.raise_error()
+        self.handler.flush()
+
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            self._queue.put(None)
+            self.handler.close()
+
+    def raise_error(self):
+        if self._error is not None:
+            raise self._error
+
+    def _send_queued(self):
+        while True:
+            msg = self._queue.get()
+            try:
+                if msg is None:
+                    return
+                # messages are dropped once the handler fails, but the error stops the command
+                if self._error is None:
+                    self.handler.handle(
+                        logging.LogRecord(
+                            self.handler.name, logging.INFO, "", 0, msg, None, None
+                        )
+                    )
+            except Exception as err:
+                self._error = err
+            finally:
+                self._queue.task_done()
+
+
+class _FormattedMessageFormatter(logging.Formatter):
+    def format(self, record):
+        return record.msg.decode("utf-8")
+
+    def format_bytes(self, record):
+        return record.msg
+
+
+def format_record_bytes(formatter, record):
+    """Formats the record as UTF-8 encoded bytes. Formatters with a `format_bytes()` method, such
+    as the JSON formatters, encode the record straight to bytes instead of encoding the string
+    from `format()`."""
+    format_bytes = getattr(formatter, "format_bytes", None)
+    if format_bytes is not None:
+        return format_bytes(record)
+    return formatter.format(record).encode("utf-8")
+
+
 def _wrap_socket_for_ssl(sock, certs, hostname):
     do_ignore_certs = certs and certs.lower() == "ignore"
     if do_ignore_certs:
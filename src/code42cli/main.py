@@ -3,28 +3,16 @@ import signal
 import site
 import sys
 import warnings
+from importlib import metadata
 
 import click
 from click_plugins import with_plugins
-from pkg_resources import iter_entry_points
 from py42.settings import set_user_agent_prefix
 
 from code42cli import BANNER
 from code42cli import PRODUCT_NAME
 from code42cli.__version__ import __version__
-from code42cli.click_ext.groups import ExceptionHandlingGroup
-from code42cli.cmds.alert_rules import alert_rules
-from code42cli.cmds.alerts import alerts
-from code42cli.cmds.auditlogs import audit_logs
-from code42cli.cmds.cases import cases
-from code42cli.cmds.devices import devices
-from code42cli.cmds.legal_hold import legal_hold
-from code42cli.cmds.profile import profile
-from code42cli.cmds.securitydata import security_data
-from code42cli.cmds.shell import shell
-from code42cli.cmds.trustedactivities import trusted_activities
-from code42cli.cmds.users import users
-from code42cli.cmds.watchlists import watchlists
+from code42cli.click_ext.groups import LazyGroup
 from code42cli.options import sdk_options
 
 warnings.simplefilter("ignore", DeprecationWarning)
@@ -47,10 +35,40 @@ CONTEXT_SETTINGS = {
     "max_content_width": 200,
 }
 
+PLUGINS_ENTRY_POINT_GROUP = "code42cli.plugins"
 
-@with_plugins(iter_entry_points("code42cli.plugins"))
+# The commands are only imported when they're run, so that running one command doesn't pay for
+# importing every other command's dependencies (e.g. `pandas`).
+COMMANDS = {
+    "alerts": "code42cli.cmds.alerts:alerts",
+    "alert-rules": "code42cli.cmds.alert_rules:alert_rules",
+    "audit-logs": "code42cli.cmds.auditlogs:audit_logs",
+    "cases": "code42cli.cmds.cases:cases",
+    "devices": "code42cli.cmds.devices:devices",
+    "legal-hold": "code42cli.cmds.legal_hold:legal_hold",
+    "profile": "code42cli.cmds.profile:profile",
+    "security-data": "code42cli.cmds.securitydata:security_data",
+    "serve": "code42cli.cmds.serve:serve",
+    "shell": "code42cli.cmds.shell:shell",
+    "users": "code42cli.cmds.users:users",
+    "trusted-activities": "code42cli.cmds.trustedactivities:trusted_activities",
+    "watchlists": "code42cli.cmds.watchlists:watchlists",
+}
+
+
+def get_plugin_entry_points():
+    """Returns the entry points of the installed CLI plugins."""
+    entry_points = metadata.entry_points()
+    if hasattr(entry_points, "select"):
+        return entry_points.select(group=PLUGINS_ENTRY_POINT_GROUP)
+    # Python 3.9 returns a dict of the entry points by group.
+    return entry_points.get(PLUGINS_ENTRY_POINT_GROUP, ())
+
+
+@with_plugins(get_plugin_entry_points())
 @click.group(
-    cls=ExceptionHandlingGroup,
+    cls=LazyGroup,
+    lazy_commands=COMMANDS,
     context_settings=CONTEXT_SETTINGS,
     help=BANNER,
     invoke_without_command=True,
@@ -81,17 +99,3 @@ def cli(state, python, script_dir):
             if "code42" in files or "code42.exe" in files:
                 print(root)
                 sys.exit(0)
-
-
-cli.add_command(alerts)
-cli.add_command(alert_rules)
-cli.add_command(audit_logs)
-cli.add_command(cases)
-cli.add_command(devices)
-cli.add_command(legal_hold)
-cli.add_command(profile)
-cli.add_command(security_data)
-cli.add_command(shell)
-cli.add_command(users)
-cli.add_command(trusted_activities)
-cli.add_command(watchlists)
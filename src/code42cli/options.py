@@ -1,5 +1,7 @@
 import click
 
+from code42cli.bulk import BulkJournal
+from code42cli.bulk import DEFAULT_BATCH_SIZE
 from code42cli.click_ext.types import MagicDate
 from code42cli.click_ext.types import TOTP
 from code42cli.cmds.search.options import AdvancedQueryAndSavedSearchIncompatible
@@ -13,6 +15,7 @@ from code42cli.errors import Code42CLIError
 from code42cli.logger.enums import ServerProtocol
 from code42cli.profile import get_profile
 from code42cli.sdk_client import create_sdk
+from code42cli.worker import DEFAULT_MAX_WORKERS
 
 
 def yes_option(hidden=False):
@@ -35,6 +38,47 @@ format_option = click.option(
     default=OutputFormat.TABLE,
 )
 
+max_workers_option = click.option(
+    "--max-workers",
+    type=click.IntRange(min=1),
+    default=DEFAULT_MAX_WORKERS,
+    help=f"The number of rows to process concurrently. Defaults to {DEFAULT_MAX_WORKERS}.",
+)
+
+rate_limit_option = click.option(
+    "--rate-limit",
+    type=click.FloatRange(min=0, min_open=True),
+    help="The max number of rows to start processing per second. Requests the server "
+    "throttles are retried regardless, but setting a limit avoids the throttling.",
+)
+
+batch_size_option = click.option(
+    "--batch-size",
+    type=click.IntRange(min=1),
+    default=DEFAULT_BATCH_SIZE,
+    help="The max number of rows to send to the server in a single request. "
+    f"Defaults to {DEFAULT_BATCH_SIZE}.",
+)
+
+
+def _get_bulk_journal(ctx, param, value):
+    if not value:
+        return BulkJournal()
+    try:
+        return BulkJournal.resume(value)
+    except Code42CLIError as err:
+        raise click.BadParameter(str(err))
+
+
+resume_option = click.option(
+    "--resume",
+    "journal",
+    metavar="JOB_ID",
+    callback=_get_bulk_journal,
+    help="Resume the bulk job with the given ID, skipping rows that already succeeded. "
+    "The job ID is printed when a bulk command starts.",
+)
+
 
 class CLIState:
     def __init__(self):
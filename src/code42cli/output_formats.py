@@ -1,18 +1,30 @@
 import csv
 import io
 import json
+from functools import lru_cache
 from itertools import chain
+from itertools import islice
+from itertools import repeat
 from typing import Generator
 
 import click
 from pandas import concat
+from pandas import DataFrame
 from pandas import notnull
+from pandas import Timedelta
+from pandas import Timestamp
+from pandas import to_datetime
 
+from code42cli import json_serializer
 from code42cli.enums import FileEventsOutputFormat
 from code42cli.enums import OutputFormat
 from code42cli.errors import Code42CLIError
 from code42cli.logger.formatters import CEF_TEMPLATE
+from code42cli.logger.formatters import CEF_TIMESTAMP_FIELDS
+from code42cli.logger.formatters import get_cef_field_formatter
 from code42cli.logger.formatters import map_event_to_cef
+from code42cli.maps import FILE_EVENT_TO_SIGNATURE_ID_MAP
+from code42cli.maps import JSON_TO_CEF_MAP
 from code42cli.util import find_format_width
 from code42cli.util import format_to_table
 
@@ -22,6 +34,12 @@ CEF_DEFAULT_SEVERITY_LEVEL = "5"
 # Uses method `echo_via_pager()` when 10 or more records.
 OUTPUT_VIA_PAGER_THRESHOLD = 10
 
+# Table output sizes its columns from (at least) this many rows, then streams the rest.
+TABLE_WIDTH_SAMPLE_SIZE = 1000
+
+# Streamed CSV output gets its header from this many rows.
+CSV_HEADER_SAMPLE_SIZE = 1000
+
 
 class OutputFormatter:
     def __init__(self, output_format, header=None):
@@ -62,13 +80,64 @@ class OutputFormatter:
             if self.output_format in [OutputFormat.TABLE]:
                 click.echo()
 
+    def echo_formatted_iterable(self, output):
+        """Outputs the items as they're read from `output` instead of reading every item first,
+        except for TABLE output, which is formatted with :meth:`echo_formatted_list` once every
+        item is read. Streamed CSV output gets its header from the first
+        `CSV_HEADER_SAMPLE_SIZE` items, and columns that first appear after them are left out.
+
+        Returns:
+            int: The number of items output.
+        """
+        if self.output_format == OutputFormat.TABLE:
+            output = list(output)
+            if output:
+                self.echo_formatted_list(output)
+            return len(output)
+
+        output = iter(output)
+        # read enough to know whether to use the pager, like `echo_formatted_list`
+        first_items = list(islice(output, OUTPUT_VIA_PAGER_THRESHOLD + 1))
+        item_count = 0
+
+        def iter_items():
+            nonlocal item_count
+            for item in chain(first_items, output):
+                item_count += 1
+                yield item
+
+        if self.output_format == OutputFormat.CSV:
+            formatted_output = _iter_csv(iter_items())
+        else:
+            formatted_output = (self._format_output(item) for item in iter_items())
+        if len(first_items) > OUTPUT_VIA_PAGER_THRESHOLD:
+            click.echo_via_pager(formatted_output)
+        else:
+            for formatted_item in formatted_output:
+                click.echo(formatted_item, nl=False)
+        return item_count
+
     @property
     def _requires_list_output(self):
         return self.output_format in (OutputFormat.TABLE, OutputFormat.CSV)
 
 
 class DataFrameOutputFormatter:
-    def __init__(self, output_format, checkpoint_func=None):
+    """Formats pandas DataFrames for output.
+
+    Pages of results can also be given as lists of dicts (records), which the JSON and CEF
+    formats output without building a DataFrame. TABLE and CSV output convert them to
+    DataFrames.
+
+    Args:
+        output_format (str): The format to output. Defaults to TABLE.
+        checkpoint_func (callable): Called with each row, as a dict, after the row is output.
+        checkpoint_columns (list): The columns `checkpoint_func` reads. If given, the rows
+            passed to `checkpoint_func` may only contain these columns, which is much faster
+            than building the whole row. Defaults to every column.
+    """
+
+    def __init__(self, output_format, checkpoint_func=None, checkpoint_columns=None):
         self.output_format = (
             output_format.upper() if output_format else OutputFormat.TABLE
         )
@@ -76,7 +145,12 @@ class DataFrameOutputFormatter:
             raise Code42CLIError(
                 f"DataFrameOutputFormatter received an invalid format: {self.output_format}"
             )
+        self._set_checkpoint_func(checkpoint_func, checkpoint_columns)
+
+    def _set_checkpoint_func(self, checkpoint_func, checkpoint_columns):
+        self._checkpointing = checkpoint_func is not None
         self.checkpoint_func = checkpoint_func or (lambda x: None)
+        self.checkpoint_columns = checkpoint_columns
 
     def _ensure_iterable(self, dfs):
         if not isinstance(dfs, (Generator, list, tuple)):
@@ -84,65 +158,119 @@ class DataFrameOutputFormatter:
         return dfs
 
     def _iter_table(self, dfs, columns=None, **kwargs):
-        dfs = self._ensure_iterable(dfs)
-        df = concat(dfs)
-        if df.empty:
+        dfs = iter(self._ensure_iterable(dfs))
+        # Size the columns from the first pages instead of holding every page in memory. Later
+        # pages are padded to the same widths, so a later value that's wider than its column
+        # only pushes the rest of its own row to the right.
+        sample = []
+        sample_size = 0
+        for df in dfs:
+            df = _to_dataframe(df)
+            sample.append(df)
+            sample_size += len(df)
+            if sample_size >= TABLE_WIDTH_SAMPLE_SIZE:
+                break
+        if not sample_size:
             return
-        # convert everything to strings so we can left-justify format
-        # applymap() is deprecated in favor of map() for pandas 2.0+ (method renamed)
-        # pandas only supports Python 3.8+, update this once we drop support for Python 3.7
-        df = df.fillna("").applymap(str)
+        df = concat(sample)
+        table = self._to_table_strings(df, columns)
+        table_columns = table.columns
         # set overrideable default kwargs
         kwargs = {
             "index": False,
             "justify": "left",
-            "formatters": make_left_aligned_formatter(df),
+            "formatters": make_left_aligned_formatter(table),
             **kwargs,
         }
-        if columns:
-            filtered = self._select_columns(df, columns)
-            formatted_rows = filtered.to_string(**kwargs).splitlines(keepends=True)
-        else:
-            formatted_rows = df.to_string(**kwargs).splitlines(keepends=True)
+        formatted_rows = table.to_string(**kwargs).splitlines(keepends=True)
+        # `to_string()` doesn't end its last row with a newline, which the next page's rows
+        # would be joined onto
+        if not formatted_rows[-1].endswith("\n"):
+            formatted_rows[-1] += "\n"
         # don't checkpoint the header row
         if kwargs.get("header") is not False:
             yield formatted_rows.pop(0)
-
         yield from self._checkpoint_and_iter_formatted_events(df, formatted_rows)
 
+        # `to_string()` would widen a column to fit its widest value on the page, so the rows of
+        # later pages are formatted with the sample's formatters directly.
+        formatters = [kwargs["formatters"][c] for c in table_columns]
+        for df in dfs:
+            df = _to_dataframe(df)
+            if df.empty:
+                continue
+            # columns that weren't in the sample pages aren't output
+            table = self._to_table_strings(df, columns).reindex(
+                columns=table_columns, fill_value=""
+            )
+            formatted_rows = [
+                " ".join(
+                    format_value(value)
+                    for format_value, value in zip(formatters, row)  # noqa: B905
+                )
+                + "\n"
+                for row in table.itertuples(index=False, name=None)
+            ]
+            yield from self._checkpoint_and_iter_formatted_events(df, formatted_rows)
+
+    def _to_table_strings(self, df, columns):
+        if columns:
+            df = self._select_columns(df, columns)
+        # convert everything to strings so we can left-justify format, after selecting the
+        # columns so that only the columns being output are converted
+        return df.fillna("").astype(str)
+
     def _iter_csv(self, dfs, columns=None, **kwargs):
         dfs = self._ensure_iterable(dfs)
         no_header = kwargs.get("header") is False
 
         for i, df in enumerate(dfs):
+            df = _to_dataframe(df)
             if df.empty:
                 continue
-            # convert null values to empty string
-            df.fillna("", inplace=True)
+            filtered = self._select_columns(df, columns) if columns else df
             # only add header on first df and if header=False was not passed in kwargs
             header = False if no_header else (i == 0)
             kwargs = {"index": False, "header": header, **kwargs}
-            if columns:
-                filtered = self._select_columns(df, columns)
-                formatted_rows = filtered.to_csv(**kwargs).splitlines(keepends=True)
-            else:
-                formatted_rows = df.to_csv(**kwargs).splitlines(keepends=True)
+            # convert null values to empty string
+            formatted_rows = (
+                filtered.fillna("").to_csv(**kwargs).splitlines(keepends=True)
+            )
             if header:
                 yield formatted_rows.pop(0)
 
             yield from self._checkpoint_and_iter_formatted_events(df, formatted_rows)
 
     def _iter_json(self, dfs, columns=None, **kwargs):
-        kwargs = {"ensure_ascii": False, **kwargs}
+        if kwargs:
+            # e.g. `indent`, which only the standard library's json supports
+            kwargs = {"ensure_ascii": False, **kwargs}
+            for event in self.iter_rows(dfs, columns=columns):
+                json_string = json.dumps(event, **kwargs)
+                yield f"{json_string}\n"
+            return
         for event in self.iter_rows(dfs, columns=columns):
-            json_string = json.dumps(event, **kwargs)
-            yield f"{json_string}\n"
+            yield f"{json_serializer.dumps(event, ensure_ascii=False)}\n"
 
     def _checkpoint_and_iter_formatted_events(self, df, formatted_rows):
-        for event, row in zip(df.to_dict("records"), formatted_rows):  # noqa: B905
+        if not self._checkpointing:
+            yield from formatted_rows
+            return
+        events = df
+        if isinstance(df, DataFrame):
+            events = self._iter_checkpoint_events(df)
+        for event, row in zip(events, formatted_rows):  # noqa: B905
             yield row
             self.checkpoint_func(event)
 
+    def _iter_checkpoint_events(self, df):
+        if self.checkpoint_columns is None:
+            return iter(_to_records(df))
+        # read each column as a whole rather than building every row of the DataFrame
+        columns = [c for c in self.checkpoint_columns if c in df.columns]
+        values = [_column_to_list(df[c]) for c in columns]
+        return (dict(zip(columns, row)) for row in zip(*values))  # noqa: B905
+
     def _echo_via_pager_if_over_threshold(self, gen):
         first_rows = []
         try:
@@ -157,43 +285,75 @@ class DataFrameOutputFormatter:
     def _select_columns(self, df, columns):
         if df.empty:
             return df
+        return df[self._get_column_names(df.columns, columns)]
+
+    def _get_column_names(self, available_columns, columns):
         if not isinstance(columns, (list, tuple)):
             raise Code42CLIError(
                 "'columns' parameter must be a list or tuple of column names."
             )
         # enable case-insensitive column selection
-        normalized_map = {c.lower(): c for c in df.columns}
+        normalized_map = {c.lower(): c for c in available_columns}
         try:
-            columns = [normalized_map[c.lower()] for c in columns]
-            return df[columns]
+            return [normalized_map[c.lower()] for c in columns]
         except KeyError as e:
             key = e.args[0]
             raise click.BadArgumentUsage(
-                f"'{key}' is not a valid column. Valid columns are: {list(df.columns)}"
+                f"'{key}' is not a valid column. Valid columns are: {list(available_columns)}"
             )
 
     def iter_rows(self, dfs, columns=None):
         """
-        Accepts a pandas DataFrame or list/generator of DataFrames and yields each
-        'row' of the DataFrame as a dict, calling the `checkpoint_func` on each row
-        after it has been yielded.
+        Accepts a pandas DataFrame or list/generator of DataFrames (or of pages of records)
+        and yields each 'row' of the DataFrame as a dict, calling the `checkpoint_func` on each
+        row after it has been yielded.
 
         Accepts an optional list of column names that filter
         columns in the yielded results.
         """
         dfs = self._ensure_iterable(dfs)
         for df in dfs:
-            # convert pandas' default null (numpy.NaN) to None
-            df = df.astype(object).where(notnull, None)
-            if columns:
-                filtered = self._select_columns(df, columns)
+            if not isinstance(df, DataFrame):
+                yield from self._iter_record_rows(df, columns)
+                continue
+            filtered = self._select_columns(df, columns) if columns else df
+            events = _to_records(filtered)
+            if not self._checkpointing:
+                yield from events
+                continue
+            if self._has_checkpoint_columns(df, filtered):
+                # the rows already have what `checkpoint_func` reads
+                checkpoint_events = events
             else:
-                filtered = df
-            for full_event, filtered_event in zip(  # noqa: B905
-                df.to_dict("records"), filtered.to_dict("records")
-            ):
-                yield filtered_event
-                self.checkpoint_func(full_event)
+                checkpoint_events = self._iter_checkpoint_events(df)
+            for event, checkpoint_event in zip(events, checkpoint_events):  # noqa: B905
+                yield event
+                self.checkpoint_func(checkpoint_event)
+
+    def _iter_record_rows(self, events, columns):
+        rows = events
+        if columns and events:
+            columns = self._select_record_columns(events, columns)
+            # like a DataFrame, events without a column get None for it
+            rows = [{c: event.get(c) for c in columns} for event in events]
+        if not self._checkpointing:
+            yield from rows
+            return
+        for row, event in zip(rows, events):  # noqa: B905
+            yield row
+            self.checkpoint_func(event)
+
+    def _select_record_columns(self, events, columns):
+        return self._get_column_names(_get_record_keys(events), columns)
+
+    def _has_checkpoint_columns(self, df, filtered):
+        if filtered is df:
+            return True
+        if self.checkpoint_columns is None:
+            return False
+        return all(
+            c in filtered.columns for c in self.checkpoint_columns if c in df.columns
+        )
 
     def get_formatted_output(self, dfs, columns=None, **kwargs):
         """
@@ -260,7 +420,7 @@ class DataFrameOutputFormatter:
 class FileEventsOutputFormatter(DataFrameOutputFormatter):
     """Class that adds CEF format output option to base DataFrameOutputFormatter."""
 
-    def __init__(self, output_format, checkpoint_func=None):
+    def __init__(self, output_format, checkpoint_func=None, checkpoint_columns=None):
         self.output_format = (
             output_format.upper() if output_format else OutputFormat.RAW
         )
@@ -268,16 +428,20 @@ class FileEventsOutputFormatter(DataFrameOutputFormatter):
             raise Code42CLIError(
                 f"FileEventsOutputFormatter received an invalid format: {self.output_format}"
             )
-        self.checkpoint_func = checkpoint_func or (lambda x: None)
+        self._set_checkpoint_func(checkpoint_func, checkpoint_columns)
 
     def _iter_cef(self, dfs, **kwargs):
         dfs = self._ensure_iterable(dfs)
         for df in dfs:
-            df = df.mask(df.isna(), other=None)
-            for _i, row in df.iterrows():
-                event = dict(row)
-                yield f"{_convert_event_to_cef(event)}\n"
-                self.checkpoint_func(event)
+            if not isinstance(df, DataFrame):
+                lines = _iter_cef_lines(*_get_record_columns(df))
+                yield from self._checkpoint_and_iter_formatted_events(df, lines)
+                continue
+            if df.empty:
+                continue
+            yield from self._checkpoint_and_iter_formatted_events(
+                df, _iter_cef_lines(*_get_dataframe_columns(df))
+            )
 
     def get_formatted_output(self, dfs, columns=None, **kwargs):
         if self.output_format == FileEventsOutputFormat.CEF:
@@ -299,6 +463,24 @@ def to_csv(output):
     return string_io.getvalue()
 
 
+def _iter_csv(output):
+    output = iter(output)
+    sample = list(islice(output, CSV_HEADER_SAMPLE_SIZE))
+    if not sample:
+        return
+    string_io = io.StringIO(newline=None)
+    fieldnames = list(dict.fromkeys(k for d in sample for k in d.keys()))
+    writer = csv.DictWriter(string_io, fieldnames=fieldnames, extrasaction="ignore")
+    writer.writeheader()
+    writer.writerows(sample)
+    yield string_io.getvalue()
+    for row in output:
+        string_io.seek(0)
+        string_io.truncate()
+        writer.writerow(row)
+        yield string_io.getvalue()
+
+
 def to_table(output, header, include_header=True):
     """Output is a list of records"""
     if not output:
@@ -310,7 +492,7 @@ def to_table(output, header, include_header=True):
 
 def to_json(output):
     """Output is a single record"""
-    return f"{json.dumps(output)}\n"
+    return f"{json_serializer.dumps(output)}\n"
 
 
 def to_formatted_json(output):
@@ -335,5 +517,154 @@ def _convert_event_to_cef(event):
     return cef_log
 
 
+def _to_dataframe(page):
+    return page if isinstance(page, DataFrame) else DataFrame(page)
+
+
+def _get_record_keys(events):
+    # the columns a DataFrame of the events would have, in the same order
+    return list(dict.fromkeys(key for event in events for key in event))
+
+
+def _to_records(df):
+    # Builds the rows from whole columns, which is faster than converting the DataFrame to
+    # objects and then calling `to_dict("records")`.
+    columns = df.columns.tolist()
+    if not columns:
+        return [{} for _ in range(len(df))]
+    values = [_column_to_list(df.iloc[:, i]) for i in range(len(columns))]
+    return [dict(zip(columns, row)) for row in zip(*values)]  # noqa: B905
+
+
+def _column_to_list(column):
+    if column.hasnans:
+        # convert pandas' default null (numpy.NaN) to None
+        return column.astype(object).where(notnull, None).tolist()
+    return column.tolist()
+
+
+_CEF_EPOCH = Timestamp(0, tz="UTC")
+
+
+def _get_dataframe_columns(df):
+    return (
+        df.columns.tolist(),
+        lambda position: _column_to_list(df.iloc[:, position]),
+        len(df),
+    )
+
+
+def _get_record_columns(events):
+    columns = _get_record_keys(events)
+    return (
+        columns,
+        lambda position: [event.get(columns[position]) for event in events],
+        len(events),
+    )
+
+
+def _iter_cef_lines(columns, get_column, length):
+    """Yields the CEF line of each file event in a page of events. Which CEF field each column
+    maps to is worked out once per set of columns, and the values are formatted a column at a
+    time (converting timestamp columns in one go), so each line is just joined from the
+    formatted values of its row.
+
+    Args:
+        columns (list): The names of the page's columns.
+        get_column (callable): Returns the values of the column at the given position as a list,
+            with None for missing values.
+        length (int): The number of events in the page.
+    """
+    sources, source_fields, shares_fields, event_type_position = _get_cef_plan(
+        tuple(columns)
+    )
+    formatted_columns = [
+        _format_cef_column(get_column(position), cef_field_key)
+        for position, cef_field_key in sources
+    ]
+    if event_type_position is None:
+        event_types = repeat("UNKNOWN", length)
+    else:
+        event_types = get_column(event_type_position)
+    rows = repeat((), length)
+    if formatted_columns:
+        rows = zip(*formatted_columns)  # noqa: B905
+    headers = {}
+    for event_type, row in zip(event_types, rows):  # noqa: B905
+        header = headers.get(event_type)
+        if header is None:
+            header = headers[event_type] = _get_cef_header(event_type)
+        if shares_fields:
+            # When several columns map to the same CEF field, the field goes where the first of
+            # them with a value is and gets the value of the last, as with `map_event_to_cef()`.
+            fields = {}
+            for field, kvp in zip(source_fields, row):  # noqa: B905
+                if kvp is not None:
+                    fields[field] = kvp
+            row = fields.values()
+        extension = " ".join(kvp for kvp in row if kvp is not None)
+        yield f"{header}{extension}\n"
+
+
+@lru_cache(maxsize=32)
+def _get_cef_plan(columns):
+    sources = []
+    fields = {}
+    for position, column in enumerate(columns):
+        cef_field_key = JSON_TO_CEF_MAP.get(column)
+        if cef_field_key is not None:
+            sources.append((position, cef_field_key))
+            fields.setdefault(cef_field_key, len(fields))
+    source_fields = [fields[cef_field_key] for _, cef_field_key in sources]
+    shares_fields = len(fields) < len(sources)
+    event_type_position = columns.index("eventType") if "eventType" in columns else None
+    return sources, source_fields, shares_fields, event_type_position
+
+
+def _get_cef_header(event_type):
+    return CEF_TEMPLATE.format(
+        productName=CEF_DEFAULT_PRODUCT_NAME,
+        signatureID=FILE_EVENT_TO_SIGNATURE_ID_MAP.get(event_type, "C42000"),
+        eventName=event_type,
+        severity=CEF_DEFAULT_SEVERITY_LEVEL,
+        extension="",
+    )
+
+
+def _format_cef_column(values, cef_field_key):
+    if cef_field_key in CEF_TIMESTAMP_FIELDS:
+        timestamps = [value for value in values if value is not None]
+        converted = None
+        if all(isinstance(timestamp, str) for timestamp in timestamps):
+            converted = _convert_timestamps_to_cef(timestamps)
+        if converted is not None:
+            converted = iter(converted)
+            return [
+                None if value is None else f"{cef_field_key}={next(converted)}"
+                for value in values
+            ]
+    format_kvp = get_cef_field_formatter(cef_field_key)
+    return [
+        None if value is None or value == [] else format_kvp(value) for value in values
+    ]
+
+
+def _convert_timestamps_to_cef(timestamps):
+    try:
+        times = to_datetime(timestamps, format="ISO8601", utc=True)
+        # the same arithmetic as `convert_file_event_timestamp_to_cef_timestamp()`, so that the
+        # milliseconds are rounded the same way
+        micros = (times - _CEF_EPOCH) // Timedelta(microseconds=1)
+        millis = (micros / 10**6 * 1000).round()
+        return millis.astype("int64").astype(str).tolist()
+    except (TypeError, ValueError):
+        # converting each value raises the error for the value that can't be converted
+        return None
+
+
 def make_left_aligned_formatter(df):
-    return {c: f"{{:<{df[c].str.len().max()}s}}".format for c in df.columns}
+    # pad to the header's width too, so that pages output without a header line up with it
+    return {
+        c: f"{{:<{max(df[c].str.len().max(), len(str(c)))}s}}".format
+        for c in df.columns
+    }
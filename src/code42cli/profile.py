@@ -1,11 +1,14 @@
 from click import style
 
 import code42cli.password as password
+from code42cli.cmds.search.cursor_store import delete_checkpoint_database
 from code42cli.cmds.search.cursor_store import get_all_cursor_stores_for_profile
 from code42cli.config import config_accessor
 from code42cli.config import ConfigAccessor
 from code42cli.config import NoConfigProfileError
+from code42cli.custodian_index import CustodianIndexCache
 from code42cli.errors import Code42CLIError
+from code42cli.token_cache import TokenCache
 
 
 class Code42Profile:
@@ -125,6 +128,9 @@ def delete_profile(profile_name):
     cursor_stores = get_all_cursor_stores_for_profile(profile_name)
     for store in cursor_stores:
         store.clean()
+    delete_checkpoint_database(profile_name)
+    TokenCache(profile_name, profile.authority_url, profile.username).delete()
+    CustodianIndexCache(profile_name, profile.authority_url, profile.username).delete()
     config_accessor.delete_profile(profile_name)
 
 
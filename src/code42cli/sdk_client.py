@@ -14,6 +14,9 @@ from code42cli.click_ext.types import TOTP
 from code42cli.errors import Code42CLIError
 from code42cli.errors import LoggedCLIError
 from code42cli.logger import get_main_cli_logger
+from code42cli.token_cache import create_sdk_from_token_cache
+from code42cli.token_cache import is_token_cache_enabled
+from code42cli.token_cache import TokenCache
 
 py42.settings.items_per_page = 500
 
@@ -38,15 +41,33 @@ def create_sdk(profile, is_debug_mode, password=None, totp=None, api_client=Fals
         )
         py42.settings.verify_ssl_certs = False
     password = password or profile.get_password()
+    token_cache = None
+    if is_token_cache_enabled():
+        token_cache = TokenCache(
+            profile.name, profile.authority_url, profile.username, password
+        )
     return _validate_connection(
-        profile.authority_url, profile.username, password, totp, api_client
+        profile.authority_url,
+        profile.username,
+        password,
+        totp,
+        api_client,
+        token_cache=token_cache,
     )
 
 
 def _validate_connection(
-    authority_url, username, password, totp=None, api_client=False
+    authority_url, username, password, totp=None, api_client=False, token_cache=None
 ):
     try:
+        if token_cache:
+            try:
+                return create_sdk_from_token_cache(
+                    token_cache, authority_url, username, password, totp, api_client
+                )
+            except Py42UnauthorizedError:
+                # Logs in again below, where py42 explains why logging in failed.
+                pass
         if api_client:
             return py42.sdk.from_api_client(authority_url, username, password)
         return py42.sdk.from_local_account(authority_url, username, password, totp=totp)
@@ -69,13 +90,17 @@ def _validate_connection(
                 totp = prompt(
                     "Multi-factor authentication required. Enter TOTP", type=TOTP()
                 )
-                return _validate_connection(authority_url, username, password, totp)
+                return _validate_connection(
+                    authority_url, username, password, totp, token_cache=token_cache
+                )
             else:
                 raise Code42CLIError(
                     f"Invalid credentials or TOTP token for user {username}."
                 )
         else:
             raise Code42CLIError(f"Invalid credentials for user {username}.")
+    except Code42CLIError:
+        raise
     except Exception as err:
         logger.log_error(err)
         raise LoggedCLIError("Unknown problem validating connection.")
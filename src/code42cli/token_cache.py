@@ -0,0 +1,202 @@
+"""An opt-in cache of the bearer tokens that profiles log in with, so that consecutive commands
+can reuse a token until it expires instead of logging in again. Set the `CODE42CLI_TOKEN_CACHE`
+environment variable to `1` to enable it.
+
+Each profile's token is stored in its own file under `~/.code42cli/token_cache` that only the
+current user can read. The file is encrypted (with `cryptography`'s Fernet) using a key derived
+from the profile's password, so the token can't be read without the password, and changing the
+password makes the cached token unreadable.
+"""
+import base64
+import hashlib
+import json
+import os
+from os import environ
+from os import path
+from time import time
+
+from py42.sdk import SDKClient
+from py42.services._auth import ApiClientAuth
+from py42.services._auth import BearerAuth
+from py42.services._auth import C42RenewableAuth
+from py42.services._connection import Connection
+from requests.auth import HTTPBasicAuth
+
+from code42cli.errors import Code42CLIError
+from code42cli.util import get_user_project_path
+from code42cli.util import write_private_file
+
+TOKEN_CACHE_ENV_VAR = "CODE42CLI_TOKEN_CACHE"
+
+# Cached tokens are treated as expired this many seconds before they expire, so that a command
+# doesn't start with a token that expires before its first request.
+TOKEN_EXPIRY_MARGIN = 60
+
+# How many seconds to cache a token for when its expiry can't be read from it.
+DEFAULT_TOKEN_LIFETIME = 600
+
+_TOKEN_CACHE_DIR = "token_cache"
+_SALT_SIZE = 16
+_SCRYPT_PARAMS = {"n": 2**14, "r": 8, "p": 1, "dklen": 32}
+
+
+def is_token_cache_enabled():
+    """Returns True if the `CODE42CLI_TOKEN_CACHE` environment variable enables the cache."""
+    return environ.get(TOKEN_CACHE_ENV_VAR, "").lower() in ("1", "true", "yes")
+
+
+def get_token_expiry(token):
+    """Returns the POSIX timestamp a bearer token should be cached until: `TOKEN_EXPIRY_MARGIN`
+    seconds before the expiry in its JWT `exp` claim. Tokens without a readable `exp` claim are
+    cached for `DEFAULT_TOKEN_LIFETIME` seconds.
+
+    Args:
+        token (str): The token, with or without its `Bearer ` prefix.
+    """
+    try:
+        payload = token.split()[-1].split(".")[1]
+        claims = json.loads(
+            base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4))
+        )
+        return float(claims["exp"]) - TOKEN_EXPIRY_MARGIN
+    except (IndexError, KeyError, TypeError, ValueError):
+        return time() + DEFAULT_TOKEN_LIFETIME
+
+
+class TokenCache:
+    """The encrypted file that caches a profile's bearer token.
+
+    Args:
+        profile_name (str): The name of the profile.
+        authority_url (str): The profile's Code42 server.
+        username (str): The profile's username (or API client ID).
+        password (str): The profile's password (or API client secret), which the token is
+            encrypted with. Only needed to get or set the token.
+    """
+
+    def __init__(self, profile_name, authority_url, username, password=None):
+        self._identity = [profile_name, authority_url, username]
+        self._password = password
+        self._location = None
+
+    @property
+    def location(self):
+        # Resolved lazily so that nothing is created on disk until the cache is used.
+        if self._location is None:
+            cache_dir = get_user_project_path(_TOKEN_CACHE_DIR)
+            key = "\n".join(self._identity).encode("utf-8")
+            self._location = path.join(cache_dir, hashlib.sha256(key).hexdigest())
+        return self._location
+
+    def get(self):
+        """Returns the cached token, or None if there isn't one, it has expired, or it can't be
+        decrypted with the password."""
+        try:
+            with open(self.location, "rb") as cache_file:
+                data = cache_file.read()
+        except FileNotFoundError:
+            return None
+        _, invalid_token_error = _import_fernet()
+        salt, encrypted = data[:_SALT_SIZE], data[_SALT_SIZE:]
+        try:
+            entry = json.loads(self._get_fernet(salt).decrypt(encrypted))
+        except (invalid_token_error, ValueError):
+            return None
+        if entry.get("identity") != self._identity or entry["expires_at"] <= time():
+            return None
+        return entry["token"]
+
+    def set(self, token):
+        """Caches the token until it expires (see :func:`get_token_expiry`)."""
+        salt = os.urandom(_SALT_SIZE)
+        entry = {
+            "identity": self._identity,
+            "token": token,
+            "expires_at": get_token_expiry(token),
+        }
+        encrypted = self._get_fernet(salt).encrypt(json.dumps(entry).encode("utf-8"))
+        write_private_file(self.location, salt + encrypted)
+
+    def delete(self):
+        """Removes the cached token."""
+        try:
+            os.remove(self.location)
+        except FileNotFoundError:
+            pass
+
+    def _get_fernet(self, salt):
+        fernet, _ = _import_fernet()
+        key = hashlib.scrypt(
+            self._password.encode("utf-8"), salt=salt, **_SCRYPT_PARAMS
+        )
+        return fernet(base64.urlsafe_b64encode(key))
+
+
+def _import_fernet():
+    try:
+        from cryptography.fernet import Fernet
+        from cryptography.fernet import InvalidToken
+    except ImportError:
+        raise Code42CLIError(
+            "The token cache requires the `cryptography` package. Install it with "
+            f'`pip install "code42cli[token-cache]"` or unset {TOKEN_CACHE_ENV_VAR}.'
+        )
+    return Fernet, InvalidToken
+
+
+class CachedTokenAuth(C42RenewableAuth):
+    """Authenticates requests with the token in a :class:`TokenCache`. If the cache has no valid
+    token, or the server rejects the cached token, it logs in with `auth` and caches the new
+    token.
+
+    Args:
+        auth (C42RenewableAuth): The py42 auth that logs in.
+        token_cache (TokenCache): The cache of the profile's token.
+    """
+
+    def __init__(self, auth, token_cache):
+        super().__init__()
+        self._auth = auth
+        self._token_cache = token_cache
+
+    def clear_credentials(self):
+        super().clear_credentials()
+        self._auth.clear_credentials()
+        self._token_cache.delete()
+
+    def _get_credentials(self):
+        token = self._token_cache.get()
+        if token is None:
+            token = self._auth.get_credentials()
+            self._token_cache.set(token)
+        return token
+
+
+def create_sdk_from_token_cache(
+    token_cache, authority_url, username, password, totp=None, api_client=False
+):
+    """Creates a py42 SDK client that authenticates with the token in the cache. If the cache has
+    no valid token, the client logs in before it's returned (raising the same errors that py42
+    does) and caches the new token.
+
+    Args:
+        token_cache (TokenCache): The cache of the profile's token.
+        authority_url (str): The Code42 server.
+        username (str): The username (or API client ID) to log in with.
+        password (str): The password (or API client secret) to log in with.
+        totp (str): The TOTP token to log in with, for accounts with MFA enabled.
+        api_client (bool): Set to True to log in as an API client.
+
+    Returns:
+        :class:`py42.sdk.SDKClient`
+    """
+    basic_auth = HTTPBasicAuth(username, password) if username and password else None
+    auth_connection = Connection.from_host_address(authority_url, auth=basic_auth)
+    if api_client:
+        auth = ApiClientAuth(auth_connection)
+    else:
+        auth = BearerAuth(auth_connection, totp)
+    cached_auth = CachedTokenAuth(auth, token_cache)
+    main_connection = Connection.from_host_address(authority_url, auth=cached_auth)
+    cached_auth.get_credentials()
+    return SDKClient(main_connection, cached_auth, auth_flag=1 if api_client else None)
@@ -1,6 +1,11 @@
 import json
 import os
+import pickle
+import queue
 import shutil
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import timezone
 from functools import wraps
 from hashlib import md5
@@ -8,6 +13,13 @@ from os import path
 from signal import getsignal
 from signal import SIGINT
 from signal import signal
+from tempfile import TemporaryFile
+from threading import Condition
+from threading import Event
+from threading import Lock
+from threading import Thread
+from time import perf_counter
+from uuid import uuid4
 
 import dateutil.parser
 from click import echo
@@ -16,6 +28,9 @@ from click import style
 
 _PADDING_SIZE = 3
 
+# Put on a prefetch buffer after the last item.
+_PREFETCH_DONE = object()
+
 
 def does_user_agree(prompt):
     """Prompts the user and checks if they said yes. If command has the `yes_option` flag, and
@@ -42,6 +57,20 @@ def get_user_project_path(*subdirs):
     return result_path
 
 
+def write_private_file(location, data):
+    """Writes `data` to the file at `location`, replacing it atomically, so that only the current
+    user can read the file or list its directory."""
+    directory = path.dirname(location)
+    os.chmod(directory, 0o700)
+    # A new temporary file is always created with the given permissions, which an existing file
+    # would keep.
+    temp_location = path.join(directory, f".{uuid4().hex}.tmp")
+    descriptor = os.open(temp_location, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(descriptor, "wb") as temp_file:
+        temp_file.write(data)
+    os.replace(temp_location, location)
+
+
 def find_format_width(records, header, include_header=True):
     """Fetches needed keys/items to be displayed based on header keys.
 
@@ -178,10 +207,22 @@ def _get_default_header(header_items):
 
 def hash_event(event):
     if isinstance(event, dict):
+        # always the standard library's json, so that the hashes stored in checkpoints match
+        # whichever JSON library is installed
         event = json.dumps(event, sort_keys=True)
     return md5(event.encode()).hexdigest()
 
 
+def hash_event_identity(event, id_key, timestamp_key):
+    """Returns a hash of the event's ID and timestamp, which is much cheaper to compute than
+    :func:`hash_event`. Events without an ID are hashed with :func:`hash_event` instead.
+    """
+    event_id = event.get(id_key)
+    if event_id is None:
+        return hash_event(event)
+    return md5(f"{event_id}|{event.get(timestamp_key)}".encode()).hexdigest()
+
+
 def print_numbered_list(items):
     """Outputs a numbered list of items to the user.
     For example, provide ["test", "foo"] to print "1. test\n2. foo".
@@ -202,3 +243,227 @@ def parse_timestamp(date_str):
 
 def deprecation_warning(text):
     echo(style(text, fg="red"), err=True)
+
+
+class _PrefetchError:
+    """Carries an exception raised while prefetching over to the consuming thread."""
+
+    __slots__ = ("error",)
+
+    def __init__(self, error):
+        self.error = error
+
+
+class _SpillingBuffer:
+    """A first-in, first-out buffer for :func:`prefetch_many` that never blocks the producer. Up
+    to `size` items are held in memory, and the rest are pickled to a temporary file until the
+    consumer reads them."""
+
+    def __init__(self, size):
+        self._size = size
+        # `(True, item)` for items in memory, or `(False, offset)` for items in the file
+        self._entries = deque()
+        self._in_memory = 0
+        self._spilled = 0
+        self._file = None
+        self._closed = False
+        self._condition = Condition()
+
+    def put(self, item, timeout=None):
+        _, value = item
+        with self._condition:
+            if self._closed:
+                return
+            # the markers are kept in memory, since they aren't events and can't be pickled
+            if (
+                self._in_memory < self._size
+                or value is _PREFETCH_DONE
+                or isinstance(value, _PrefetchError)
+            ):
+                self._entries.append((True, item))
+                self._in_memory += 1
+            else:
+                if self._file is None:
+                    self._file = TemporaryFile()
+                self._file.seek(0, os.SEEK_END)
+                self._entries.append((False, self._file.tell()))
+                pickle.dump(item, self._file, protocol=pickle.HIGHEST_PROTOCOL)
+                self._spilled += 1
+            self._condition.notify()
+
+    def get(self):
+        with self._condition:
+            while not self._entries:
+                self._condition.wait()
+            in_memory, entry = self._entries.popleft()
+            if in_memory:
+                self._in_memory -= 1
+                return entry
+            self._file.seek(entry)
+            item = pickle.load(self._file)
+            self._spilled -= 1
+            if not self._spilled:
+                # every spilled item has been read, so the file can start over
+                self._file.seek(0)
+                self._file.truncate()
+            return item
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def prefetch(iterable, size=2):
+    """Iterates over `iterable` in a background thread, reading up to `size` items ahead of the
+    consumer. This lets producing the next items (such as requesting the next page of search
+    results) overlap with processing the current one. Exceptions raised while iterating are
+    re-raised to the consumer, and if the consumer stops iterating early, the background thread
+    stops after producing its current item.
+
+    Args:
+        iterable (iterable): The items to read ahead of the consumer.
+        size (int): The max number of items to hold that the consumer hasn't read yet.
+    """
+    for _, item in prefetch_many([iterable], size=size):
+        yield item
+
+
+def prefetch_many(iterables, size=2, ordered=True, spill_to_disk=False):
+    """Like :func:`prefetch`, but reads each of `iterables` in its own background thread so that
+    they're all read concurrently. Yields `(index, item)` tuples, where `index` is the position in
+    `iterables` of the iterable that the item came from.
+
+    Args:
+        iterables (list): The iterables to read ahead of the consumer.
+        size (int): The max number of items to hold from each iterable that the consumer hasn't
+            read yet.
+        ordered (bool): If True, yields all the items from the first iterable, then all the items
+            from the second, and so on. Otherwise, yields items as soon as they're read from any
+            of the iterables.
+        spill_to_disk (bool): If True and `ordered` is True, the iterables after the one being
+            yielded don't wait for the consumer to reach them: the items each of them reads
+            beyond `size` are written to a temporary file until they're yielded.
+    """
+    if ordered and spill_to_disk:
+        buffers = [_SpillingBuffer(size) for _ in iterables]
+    elif ordered:
+        buffers = [queue.Queue(maxsize=size) for _ in iterables]
+    else:
+        shared_buffer = queue.Queue(maxsize=size * len(iterables))
+        buffers = [shared_buffer] * len(iterables)
+    stopped = Event()
+
+    def put(buffer, item):
+        # Time out regularly so that the thread notices when the consumer has stopped.
+        while not stopped.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce(index, iterable):
+        buffer = buffers[index]
+        try:
+            for item in iterable:
+                if not put(buffer, (index, item)):
+                    return
+        except Exception as err:
+            put(buffer, (index, _PrefetchError(err)))
+            return
+        put(buffer, (index, _PREFETCH_DONE))
+
+    for index, iterable in enumerate(iterables):
+        Thread(target=produce, args=(index, iterable), daemon=True).start()
+    try:
+        remaining = len(iterables)
+        buffer_index = 0
+        while remaining:
+            index, item = buffers[buffer_index].get()
+            if item is _PREFETCH_DONE:
+                remaining -= 1
+                if ordered:
+                    buffer_index += 1
+                continue
+            if isinstance(item, _PrefetchError):
+                raise item.error
+            yield index, item
+    finally:
+        stopped.set()
+        for buffer in buffers:
+            if isinstance(buffer, _SpillingBuffer):
+                buffer.close()
+
+
+def map_concurrently(func, iterable, max_workers):
+    """Like :func:`map`, but calls `func` on up to `max_workers` items at once in a thread pool.
+    Results are yielded in the order of `iterable`, and items are only read from `iterable` as
+    workers become free, so at most `max_workers` results are held at a time.
+
+    Args:
+        func (callable): Called with each item.
+        iterable (iterable): The items.
+        max_workers (int): The max number of calls to `func` to run at once.
+    """
+    pending = deque()
+    executor = ThreadPoolExecutor(max_workers)
+    try:
+        for item in iterable:
+            if len(pending) >= max_workers:
+                yield pending.popleft().result()
+            pending.append(executor.submit(func, item))
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+
+class StageTimer:
+    """Times the stages of a command, which may run concurrently in different threads. When
+    `enabled` (i.e. with `--debug`), :meth:`report` prints how long each stage took to stderr.
+
+    Args:
+        enabled (bool): Set to True to print the durations of the stages.
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.durations = {}
+        self._lock = Lock()
+        self._start = perf_counter()
+
+    @contextmanager
+    def time(self, stage):
+        """A context manager that times the code it wraps as the given stage."""
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.durations[stage] = perf_counter() - start
+
+    def timed(self, stage, func):
+        """Wraps `func` so that each call to it is timed as the given stage."""
+
+        @wraps(func)
+        def inner(*args, **kwargs):
+            with self.time(stage):
+                return func(*args, **kwargs)
+
+        return inner
+
+    def report(self):
+        """Prints the durations of the stages, and the time since the timer was created."""
+        if not self.enabled:
+            return
+        with self._lock:
+            durations = list(self.durations.items())
+        for stage, seconds in durations:
+            echo(f"{stage}: {seconds:.3f}s", err=True)
+        echo(f"Total: {perf_counter() - self._start:.3f}s", err=True)
@@ -1,6 +1,16 @@
 import queue
+from datetime import datetime
+from datetime import timezone
+from email.utils import parsedate_to_datetime
+from math import ceil
+from math import log
+from random import uniform
+from threading import Condition
+from threading import get_ident
 from threading import Lock
 from threading import Thread
+from time import monotonic
+from time import perf_counter
 from time import sleep
 
 from py42.exceptions import Py42ForbiddenError
@@ -9,92 +19,402 @@ from py42.exceptions import Py42HTTPError
 from code42cli.errors import Code42CLIError
 from code42cli.logger import get_main_cli_logger
 
+DEFAULT_MAX_WORKERS = 5
+DEFAULT_MAX_RETRIES = 4
+
+# Responses with these status codes mean the server is throttling or overloaded, so the request
+# is retried after a delay rather than counted as a failure.
+_RETRYABLE_STATUS_CODES = (429, 502, 503, 504)
+_BACKOFF_BASE_SECONDS = 0.5
+_BACKOFF_MAX_SECONDS = 30
+
+# How many pending tasks each thread may have queued before `do_async()` blocks the producer.
+_QUEUE_SIZE_PER_THREAD = 4
+
+# Placed on the queue once per thread to tell the threads to exit.
+_STOP = object()
+
 
 def create_worker_stats(total):
     return WorkerStats(total)
 
 
+class LatencyHistogram:
+    """A histogram of task durations with log-scale buckets. Each bucket is ~10% wider than the
+    last, so percentiles are accurate to within ~10% while the memory used stays fixed no matter
+    how many durations are recorded."""
+
+    _MIN_SECONDS = 0.0001
+    _GROWTH = 1.1
+
+    def __init__(self):
+        self._buckets = {}
+        self.count = 0
+
+    def record(self, seconds):
+        """Adds a duration (in seconds) to the histogram."""
+        index = self._get_bucket_index(seconds)
+        self._buckets[index] = self._buckets.get(index, 0) + 1
+        self.count += 1
+
+    def merge(self, other):
+        """Adds the counts from another histogram to this one."""
+        for index, count in other._buckets.items():
+            self._buckets[index] = self._buckets.get(index, 0) + count
+        self.count += other.count
+
+    def percentile(self, pct):
+        """Returns the upper bound (in seconds) of the bucket containing the given percentile,
+        or None if nothing has been recorded."""
+        if not self.count:
+            return None
+        rank = max(ceil(pct / 100 * self.count), 1)
+        seen = 0
+        for index in sorted(self._buckets):
+            seen += self._buckets[index]
+            if seen >= rank:
+                return self._MIN_SECONDS * self._GROWTH**index
+
+    def _get_bucket_index(self, seconds):
+        if seconds <= self._MIN_SECONDS:
+            return 0
+        return ceil(log(seconds / self._MIN_SECONDS, self._GROWTH))
+
+
+class TokenBucket:
+    """Limits the rate of requests made across all threads. Tokens are added to the bucket at
+    `rate` per second, up to `capacity`, and each request takes one.
+
+    Args:
+        rate (float): The number of tokens added per second.
+        capacity (float): The max number of tokens the bucket holds, i.e. the largest burst of
+            requests allowed. Defaults to one second's worth of tokens.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(rate, 1)
+        self._tokens = self.capacity
+        self._last_refill = monotonic()
+        self._lock = Lock()
+
+    def acquire(self):
+        """Takes a token from the bucket, blocking until one is available."""
+        while True:
+            with self._lock:
+                now = monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._last_refill) * self.rate
+                )
+                self._last_refill = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            sleep(wait)
+
+
+class AdaptiveConcurrencyLimit:
+    """Limits how many requests are in flight at once, adapting the limit with
+    additive-increase/multiplicative-decrease (AIMD): the limit goes up by one for every `limit`
+    successful requests and is halved when the server throttles a request. It stays between 1
+    and `max_limit`.
+
+    Args:
+        max_limit (int): The highest the limit can go, and the limit to start with.
+    """
+
+    # Throttled responses within this many seconds of the last decrease are most likely from the
+    # same burst of requests, so they don't decrease the limit again.
+    _DECREASE_INTERVAL_SECONDS = 1
+
+    def __init__(self, max_limit):
+        self.max_limit = max_limit
+        self._limit = float(max_limit)
+        self._active = 0
+        self._last_decrease = None
+        self._condition = Condition()
+
+    @property
+    def limit(self):
+        """The current number of requests allowed in flight at once."""
+        return int(self._limit)
+
+    def acquire(self):
+        """Takes a slot, blocking while the limit's worth of requests are in flight."""
+        with self._condition:
+            while self._active >= self.limit:
+                self._condition.wait()
+            self._active += 1
+
+    def release(self):
+        """Gives back a slot taken with `acquire()`."""
+        with self._condition:
+            self._active -= 1
+            self._condition.notify()
+
+    def on_success(self):
+        """Additively increases the limit."""
+        with self._condition:
+            if self._limit < self.max_limit:
+                self._limit = min(self.max_limit, self._limit + 1 / self._limit)
+                self._condition.notify_all()
+
+    def on_throttled(self):
+        """Multiplicatively decreases the limit."""
+        with self._condition:
+            now = monotonic()
+            if (
+                self._last_decrease is not None
+                and now - self._last_decrease < self._DECREASE_INTERVAL_SECONDS
+            ):
+                return
+            self._last_decrease = now
+            self._limit = max(1.0, self._limit / 2)
+
+
+def is_retryable_error(err):
+    """Whether the error is from a response that means the request should be retried later."""
+    status_code = getattr(err.response, "status_code", None)
+    return status_code in _RETRYABLE_STATUS_CODES
+
+
+def get_retry_delay(err, attempt):
+    """Returns how many seconds to wait before retrying the request that caused the error. This
+    is the response's `Retry-After` value if it has a valid one (capped at
+    `_BACKOFF_MAX_SECONDS`, so that a thread never holds its slot for long), otherwise an
+    exponential backoff with full jitter based on the number of attempts already retried."""
+    retry_after = _parse_retry_after(err.response.headers.get("Retry-After"))
+    if retry_after is not None:
+        return min(retry_after, _BACKOFF_MAX_SECONDS)
+    return uniform(0, min(_BACKOFF_MAX_SECONDS, _BACKOFF_BASE_SECONDS * 2**attempt))
+
+
+def _parse_retry_after(value):
+    # Retry-After is either a number of seconds or an HTTP date. Returns None for invalid values
+    # and dates in the past.
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return int(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    seconds = (retry_at - datetime.now(timezone.utc)).total_seconds()
+    return seconds if seconds >= 0 else None
+
+
+class _ThreadTally:
+    """The stats recorded by a single thread."""
+
+    __slots__ = ("processed", "errors", "retries", "results", "latencies")
+
+    def __init__(self):
+        self.processed = 0
+        self.errors = 0
+        self.retries = 0
+        self.results = []
+        self.latencies = LatencyHistogram()
+
+
 class WorkerStats:
-    """Stats about the tasks that have run."""
+    """Stats about the tasks that have run.
+
+    Each thread that records stats gets its own tally, which only that thread ever writes to, so
+    recording stats doesn't need any locks. The tallies are merged together when read.
+    """
 
     def __init__(self, total):
         self.total = total
-
-    _total_processed = 0
-    _total_errors = 0
-    _results = []
-    __total_processed_lock = Lock()
-    __total_errors_lock = Lock()
-    __results_lock = Lock()
+        self._tallies = {}
+        self._start_time = None
+        self._end_time = None
 
     @property
     def total_processed(self):
         """The total number of tasks executed."""
-        return self._total_processed
+        return sum(tally.processed for tally in self._get_all_tallies())
 
     @property
     def total_errors(self):
         """The amount of errors that occurred."""
-        return self._total_errors
+        return sum(tally.errors for tally in self._get_all_tallies())
+
+    @property
+    def total_retries(self):
+        """The amount of requests retried because the server throttled them."""
+        return sum(tally.retries for tally in self._get_all_tallies())
 
     @property
     def total_successes(self):
-        val = self._total_processed - self._total_errors
+        val = self.total_processed - self.total_errors
         return val if val >= 0 else 0
 
     @property
     def results(self):
-        return self._results
+        return [result for tally in self._get_all_tallies() for result in tally.results]
+
+    @property
+    def latencies(self):
+        """A :class:`LatencyHistogram` of how long each task took to execute."""
+        histogram = LatencyHistogram()
+        for tally in self._get_all_tallies():
+            histogram.merge(tally.latencies)
+        return histogram
+
+    @property
+    def elapsed(self):
+        """The seconds between the first task starting and the last task finishing."""
+        if self._start_time is None:
+            return 0
+        end_time = self._end_time if self._end_time is not None else perf_counter()
+        return end_time - self._start_time
+
+    @property
+    def throughput(self):
+        """The number of tasks executed per second."""
+        elapsed = self.elapsed
+        return self.total_processed / elapsed if elapsed else 0
 
     def __str__(self):
-        return f"{self.total_successes} succeeded, {self._total_errors} failed out of {self.total}"
+        return f"{self.total_successes} succeeded, {self.total_errors} failed out of {self.total}"
+
+    def get_summary(self):
+        """Returns a message describing the throughput and task latency percentiles."""
+        latencies = self.latencies
+        percentiles = ", ".join(
+            f"p{pct}: {latencies.percentile(pct) * 1000:.1f}ms" for pct in (50, 95, 99)
+        )
+        summary = (
+            f"Processed {self.total_processed} in {self.elapsed:.2f}s "
+            f"({self.throughput:.1f}/s). Latency {percentiles}."
+        )
+        retries = self.total_retries
+        if retries:
+            summary += f" Retried {retries} throttled requests."
+        return summary
 
-    def increment_total_processed(self):
-        """+1 to self.total_processed"""
-        with self.__total_processed_lock:
-            self._total_processed += 1
+    def increment_total_processed(self, count=1):
+        """+count to self.total_processed"""
+        self._get_tally().processed += count
 
-    def increment_total_errors(self):
-        """+1 to self.total_errors"""
-        with self.__total_errors_lock:
-            self._total_errors += 1
+    def increment_total_errors(self, count=1):
+        """+count to self.total_errors"""
+        self._get_tally().errors += count
+
+    def increment_total_retries(self):
+        """+1 to self.total_retries"""
+        self._get_tally().retries += 1
+
+    def get_total_errors_for_current_thread(self):
+        """The amount of errors recorded by the calling thread."""
+        return self._get_tally().errors
 
     def add_result(self, result):
         """add a result to the list"""
-        with self.__results_lock:
-            self._results.append(result)
+        self._get_tally().results.append(result)
+
+    def add_latency(self, seconds):
+        """Records how long a task took to execute."""
+        self._get_tally().latencies.record(seconds)
 
     def reset_results(self):
-        with self.__results_lock:
-            self._results = []
+        for tally in self._get_all_tallies():
+            tally.results = []
+
+    def start_timer(self):
+        """Marks the start of processing, if not already started."""
+        if self._start_time is None:
+            self._start_time = perf_counter()
+        self._end_time = None
+
+    def stop_timer(self):
+        """Marks the end of processing."""
+        self._end_time = perf_counter()
+
+    def _get_tally(self):
+        # Dict reads and `setdefault` are atomic, so each thread safely gets its own tally.
+        tally = self._tallies.get(get_ident())
+        if tally is None:
+            tally = self._tallies.setdefault(get_ident(), _ThreadTally())
+        return tally
+
+    def _get_all_tallies(self):
+        # Copy the values so that threads adding tallies don't break the iteration.
+        return list(self._tallies.values())
 
 
 class Worker:
-    def __init__(self, thread_count, expected_total, bar=None, stats=None):
-        self._queue = queue.Queue()
+    """Executes tasks on a pool of threads.
+
+    Args:
+        thread_count (int): The number of threads to process tasks with.
+        expected_total (int): The total number of tasks expected, used for the stats.
+        bar (click.progressbar): A progress bar to update after each task.
+        stats (WorkerStats): Pass in WorkerStats if doing error handling outside of the worker.
+        queue_size (int): The max number of pending tasks. `do_async()` blocks when the queue is
+            full so that producers can't get too far ahead of the threads. Defaults to
+            a small multiple of `thread_count`.
+        rate_limit (float): The max number of tasks to start per second across all threads.
+            Defaults to no limit.
+        max_retries (int): How many times to retry a task that fails because the server
+            throttled it (a 429, 502, 503 or 504 response). Retries wait for the response's
+            `Retry-After` or else an exponential backoff with jitter.
+
+    Tasks are also limited by an :class:`AdaptiveConcurrencyLimit`, so fewer of them run at once
+    while the server is throttling requests.
+    """
+
+    def __init__(
+        self,
+        thread_count,
+        expected_total,
+        bar=None,
+        stats=None,
+        queue_size=None,
+        rate_limit=None,
+        max_retries=DEFAULT_MAX_RETRIES,
+    ):
+        self._queue = queue.Queue(
+            maxsize=queue_size or thread_count * _QUEUE_SIZE_PER_THREAD
+        )
         self._thread_count = thread_count
+        self._rate_limiter = TokenBucket(rate_limit) if rate_limit else None
+        self._concurrency_limit = AdaptiveConcurrencyLimit(thread_count)
+        self._max_retries = max_retries
         self._bar = bar
         self._stats = stats or WorkerStats(expected_total)
-        self._tasks = 0
+        self._threads = []
         self.__started = False
         self.__start_lock = Lock()
         self._logger = get_main_cli_logger()
 
     def do_async(self, func, *args, **kwargs):
-        """Execute the given func asynchronously given *args and **kwargs.
+        """Execute the given func asynchronously given *args and **kwargs. Blocks while the
+        queue of pending tasks is full.
 
         Args:
             func (callable): The function to execute asynchronously.
             *args (iter): Positional args to pass to the function.
             **kwargs (dict): Key-value args to pass to the function.
         """
-        if not self.__started:
-            with self.__start_lock:
-                if not self.__started:
-                    self.__start()
-                    self.__started = True
-        self._queue.put({"func": func, "args": args, "kwargs": kwargs})
-        self._tasks += 1
+        self._put_task(func, args, kwargs, 1)
+
+    def do_async_batch(self, func, batch_size, *args, **kwargs):
+        """Like `do_async()`, but for a task that handles a batch of items at once. The task
+        counts as `batch_size` tasks in the stats and the progress bar.
+
+        Args:
+            func (callable): The function to execute asynchronously.
+            batch_size (int): The number of items the task handles.
+            *args (iter): Positional args to pass to the function.
+            **kwargs (dict): Key-value args to pass to the function.
+        """
+        self._put_task(func, args, kwargs, batch_size)
 
     @property
     def stats(self):
@@ -102,46 +422,105 @@ class Worker:
         return self._stats
 
     def wait(self):
-        """Wait for the tasks in the queue to complete. This should usually be called before
-        program termination."""
-        while self._stats.total_processed < self._tasks:
-            sleep(0.5)
+        """Wait for the tasks in the queue to complete and then stop the threads. This should
+        usually be called before program termination."""
+        self._queue.join()
+        self._stats.stop_timer()
+        with self.__start_lock:
+            if self.__started:
+                self.__stop()
+                self.__started = False
+
+    def log_error(self, err):
+        """Logs an error raised by a task. Call it from the `except` block that caught the error,
+        so that its traceback is logged."""
+        if isinstance(err, Code42CLIError):
+            self._logger.log_error(err)
+        elif isinstance(err, Py42ForbiddenError):
+            self._logger.log_verbose_error(http_request=err.response.request)
+            self._logger.log_error(
+                "You do not have the necessary permissions to perform this task. "
+                "Try using or creating a different profile."
+            )
+        elif isinstance(err, Py42HTTPError):
+            self._logger.log_verbose_error(http_request=err.response.request)
+        else:
+            self._logger.log_verbose_error()
+
+    def _put_task(self, func, args, kwargs, size):
+        if not self.__started:
+            with self.__start_lock:
+                if not self.__started:
+                    self.__start()
+                    self.__started = True
+        self._queue.put({"func": func, "args": args, "kwargs": kwargs, "size": size})
 
     def _process_queue(self):
         while True:
+            task = self._queue.get()
+            if task is _STOP:
+                self._queue.task_done()
+                return
+            start = perf_counter()
+            size = task["size"]
             try:
-                task = self._queue.get()
-                func = task["func"]
-                args = task["args"]
-                kwargs = task["kwargs"]
-                self._stats.add_result(func(*args, **kwargs))
-            except Code42CLIError as err:
-                self._increment_total_errors()
-                self._logger.log_error(err)
-            except Py42ForbiddenError as err:
-                self._increment_total_errors()
-                self._logger.log_verbose_error(http_request=err.response.request)
-                self._logger.log_error(
-                    "You do not have the necessary permissions to perform this task. "
-                    "Try using or creating a different profile."
-                )
-            except Py42HTTPError as err:
-                self._increment_total_errors()
-                self._logger.log_verbose_error(http_request=err.response.request)
-            except Exception:
-                self._increment_total_errors()
-                self._logger.log_verbose_error()
+                self._stats.add_result(self._run_task(task))
+            except Exception as err:
+                self._increment_total_errors(size)
+                try:
+                    self.log_error(err)
+                except Exception:
+                    # The thread must outlive a failure to log, or the tasks left in the queue
+                    # would never be processed and `wait()` would never return.
+                    pass
             finally:
-                self._stats.increment_total_processed()
+                self._stats.add_latency(perf_counter() - start)
+                self._stats.increment_total_processed(size)
                 if self._bar:
-                    self._bar.update(1)
+                    self._bar.update(size)
                 self._queue.task_done()
 
+    def _run_task(self, task):
+        func = task["func"]
+        args = task["args"]
+        kwargs = task["kwargs"]
+        attempt = 0
+        while True:
+            if self._rate_limiter:
+                self._rate_limiter.acquire()
+            self._concurrency_limit.acquire()
+            try:
+                result = func(*args, **kwargs)
+            except Py42HTTPError as err:
+                if not is_retryable_error(err):
+                    raise
+                self._concurrency_limit.on_throttled()
+                if attempt >= self._max_retries:
+                    raise
+                delay = get_retry_delay(err, attempt)
+            else:
+                self._concurrency_limit.on_success()
+                return result
+            finally:
+                self._concurrency_limit.release()
+            attempt += 1
+            self._stats.increment_total_retries()
+            sleep(delay)
+
     def __start(self):
+        self._stats.start_timer()
         for _ in range(0, self._thread_count):
             t = Thread(target=self._process_queue)
             t.daemon = True
             t.start()
+            self._threads.append(t)
+
+    def __stop(self):
+        for _ in self._threads:
+            self._queue.put(_STOP)
+        for t in self._threads:
+            t.join()
+        self._threads = []
 
-    def _increment_total_errors(self):
-        self._stats.increment_total_errors()
+    def _increment_total_errors(self, count):
+        self._stats.increment_total_errors(count)
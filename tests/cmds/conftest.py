@@ -14,9 +14,17 @@ from tests.conftest import TEST_ID
 
 from code42cli.cmds.search.cursor_store import FileEventCursorStore
 from code42cli.logger import CliLogger
+from code42cli.logger.enums import MessageFraming
+from code42cli.logger.handlers import DEFAULT_MAX_BATCH_BYTES
+from code42cli.logger.handlers import DEFAULT_MAX_BATCH_LATENCY
 
 
 TEST_EMPLOYEE = "risky employee"
+SEND_TO_LOGGER_DEFAULTS = {
+    "framing": MessageFraming.NEWLINE,
+    "max_batch_bytes": DEFAULT_MAX_BATCH_BYTES,
+    "max_batch_latency": DEFAULT_MAX_BATCH_LATENCY,
+}
 
 
 def get_user_not_on_list_side_effect(mocker, list_name):
@@ -1,23 +1,46 @@
+import os
+import sqlite3
+import threading
 from os import path
 
 import pytest
 
 from code42cli.cmds.search.cursor_store import AlertCursorStore
+from code42cli.cmds.search.cursor_store import AlertDatabaseCursorStore
 from code42cli.cmds.search.cursor_store import AuditLogCursorStore
+from code42cli.cmds.search.cursor_store import AuditLogDatabaseCursorStore
+from code42cli.cmds.search.cursor_store import checkpoint_writer
+from code42cli.cmds.search.cursor_store import CheckpointWriter
 from code42cli.cmds.search.cursor_store import Cursor
+from code42cli.cmds.search.cursor_store import dedupe_checkpointed_events
 from code42cli.cmds.search.cursor_store import FileEventCursorStore
+from code42cli.cmds.search.cursor_store import FileEventDatabaseCursorStore
+from code42cli.cmds.search.cursor_store import get_file_event_cursor_store
+from code42cli.cmds.search.cursor_store import migrate_to_checkpoint_database
 from code42cli.errors import Code42CLIError
+from code42cli.util import hash_event
+from code42cli.util import hash_event_identity
+from code42cli.util import parse_timestamp
 
 PROFILE_NAME = "testprofile"
 CURSOR_NAME = "testcursor"
 
 _NAMESPACE = "code42cli.cmds.search.cursor_store"
 
+# os.listdir is mocked for every test
+_listdir = os.listdir
+
 ALERT_CHECKPOINT_FOLDER_NAME = "alert_checkpoints"
 FILE_EVENT_CHECKPOINT_FOLDER_NAME = "file_event_checkpoints"
 AUDIT_LOG_CHECKPOINT_FOLDER_NAME = "audit_log_checkpoints"
 
 
+@pytest.fixture
+def cursor_dir(mocker, tmp_path):
+    mocker.patch(f"{_NAMESPACE}.get_user_project_path", return_value=str(tmp_path))
+    return tmp_path
+
+
 @pytest.fixture
 def mock_open(mocker):
     mock = mocker.patch("builtins.open", mocker.mock_open(read_data="123456789"))
@@ -89,23 +112,17 @@ class TestAlertCursorStore:
         )
         mock_open.assert_called_once_with(expected_path)
 
-    def test_replace_writes_to_expected_file(self, mock_open):
+    def test_replace_writes_to_expected_file(self, cursor_dir):
         store = AlertCursorStore(PROFILE_NAME)
         store.replace("checkpointname", 123)
-        user_path = path.join(path.expanduser("~"), ".code42cli")
-        expected_path = path.join(
-            user_path, ALERT_CHECKPOINT_FOLDER_NAME, PROFILE_NAME, "checkpointname"
-        )
-        mock_open.assert_called_once_with(expected_path, "w")
+        assert (cursor_dir / "checkpointname").is_file()
+        # the temporary file the value was written to first is gone
+        assert not list(cursor_dir.glob(".*"))
 
-    def test_replace_writes_expected_content(self, mock_open):
+    def test_replace_writes_expected_content(self, cursor_dir):
         store = AlertCursorStore(PROFILE_NAME)
         store.replace("checkpointname", 123)
-        user_path = path.join(path.expanduser("~"), ".code42cli")
-        path.join(
-            user_path, ALERT_CHECKPOINT_FOLDER_NAME, PROFILE_NAME, "checkpointname"
-        )
-        mock_open.return_value.write.assert_called_once_with("123")
+        assert (cursor_dir / "checkpointname").read_text() == "123"
 
     def test_delete_calls_remove_on_expected_file(self, mock_open, mock_remove):
         store = AlertCursorStore(PROFILE_NAME)
@@ -143,6 +160,14 @@ class TestAlertCursorStore:
         assert cursors[1].name == "filetwo"
         assert cursors[2].name == "filethree"
 
+    def test_get_all_cursors_skips_temporary_files(
+        self, mock_open, mock_listdir, mock_isfile
+    ):
+        mock_listdir.return_value = ["fileone", ".fileone.abc123.tmp"]
+        store = AlertCursorStore(PROFILE_NAME)
+        cursors = store.get_all_cursors()
+        assert [cursor.name for cursor in cursors] == ["fileone"]
+
 
 class TestFileEventCursorStore:
     def test_get_returns_expected_timestamp(self, mock_open):
@@ -166,23 +191,17 @@ class TestFileEventCursorStore:
         mock_open.side_effect = FileNotFoundError
         assert checkpoint is None
 
-    def test_replace_writes_to_expected_file(self, mock_open):
+    def test_replace_writes_to_expected_file(self, cursor_dir):
         store = FileEventCursorStore(PROFILE_NAME)
         store.replace("checkpointname", 123)
-        user_path = path.join(path.expanduser("~"), ".code42cli")
-        expected_path = path.join(
-            user_path, FILE_EVENT_CHECKPOINT_FOLDER_NAME, PROFILE_NAME, "checkpointname"
-        )
-        mock_open.assert_called_once_with(expected_path, "w")
+        assert (cursor_dir / "checkpointname").is_file()
+        # the temporary file the value was written to first is gone
+        assert not list(cursor_dir.glob(".*"))
 
-    def test_replace_writes_expected_content(self, mock_open):
+    def test_replace_writes_expected_content(self, cursor_dir):
         store = FileEventCursorStore(PROFILE_NAME)
         store.replace("checkpointname", 123)
-        user_path = path.join(path.expanduser("~"), ".code42cli")
-        path.join(
-            user_path, FILE_EVENT_CHECKPOINT_FOLDER_NAME, PROFILE_NAME, "checkpointname"
-        )
-        mock_open.return_value.write.assert_called_once_with("123")
+        assert (cursor_dir / "checkpointname").read_text() == "123"
 
     def test_delete_calls_remove_on_expected_file(self, mock_open, mock_remove):
         store = FileEventCursorStore(PROFILE_NAME)
@@ -241,23 +260,17 @@ class TestAuditLogCursorStore:
         mock_open.side_effect = FileNotFoundError
         assert checkpoint is None
 
-    def test_replace_writes_to_expected_file(self, mock_open):
+    def test_replace_writes_to_expected_file(self, cursor_dir):
         store = AuditLogCursorStore(PROFILE_NAME)
         store.replace("checkpointname", 123)
-        user_path = path.join(path.expanduser("~"), ".code42cli")
-        expected_path = path.join(
-            user_path, AUDIT_LOG_CHECKPOINT_FOLDER_NAME, PROFILE_NAME, "checkpointname"
-        )
-        mock_open.assert_called_once_with(expected_path, "w")
+        assert (cursor_dir / "checkpointname").is_file()
+        # the temporary file the value was written to first is gone
+        assert not list(cursor_dir.glob(".*"))
 
-    def test_replace_writes_expected_content(self, mock_open):
+    def test_replace_writes_expected_content(self, cursor_dir):
         store = AuditLogCursorStore(PROFILE_NAME)
         store.replace("checkpointname", 123)
-        user_path = path.join(path.expanduser("~"), ".code42cli")
-        path.join(
-            user_path, AUDIT_LOG_CHECKPOINT_FOLDER_NAME, PROFILE_NAME, "checkpointname"
-        )
-        mock_open.return_value.write.assert_called_once_with("123")
+        assert (cursor_dir / "checkpointname").read_text() == "123"
 
     def test_delete_calls_remove_on_expected_file(self, mock_open, mock_remove):
         store = AuditLogCursorStore(PROFILE_NAME)
@@ -321,28 +334,361 @@ class TestAuditLogCursorStore:
         event_list = store.get_events(CURSOR_NAME)
         assert event_list == []
 
-    def test_replace_events_writes_to_expected_file(self, mock_open):
+    def test_replace_events_writes_to_expected_file(self, cursor_dir):
         store = AuditLogCursorStore(PROFILE_NAME)
         store.replace_events("checkpointname", ["hash1", "hash2"])
-        user_path = path.join(path.expanduser("~"), ".code42cli")
-        expected_path = path.join(
-            user_path,
-            AUDIT_LOG_CHECKPOINT_FOLDER_NAME,
-            PROFILE_NAME,
-            "checkpointname_events",
-        )
-        mock_open.assert_called_once_with(expected_path, "w")
+        assert (cursor_dir / "checkpointname_events").is_file()
+        # the temporary file the value was written to first is gone
+        assert not list(cursor_dir.glob(".*"))
 
-    def test_replace_events_writes_expected_content(self, mock_open_events):
+    def test_replace_events_writes_expected_content(self, cursor_dir):
         store = AuditLogCursorStore(PROFILE_NAME)
         store.replace_events("checkpointname", ["hash1", "hash2"])
-        user_path = path.join(path.expanduser("~"), ".code42cli")
-        path.join(
-            user_path,
-            AUDIT_LOG_CHECKPOINT_FOLDER_NAME,
-            PROFILE_NAME,
-            "checkpointname_events",
+        assert (
+            cursor_dir / "checkpointname_events"
+        ).read_text() == '["hash1", "hash2"]'
+
+    def test_replace_with_hashes_writes_hashes_before_checkpoint(self, mocker):
+        store = AuditLogCursorStore(PROFILE_NAME)
+        calls = mocker.MagicMock()
+        mocker.patch.object(store, "replace_events", calls.replace_events)
+        mocker.patch.object(store, "replace", calls.replace)
+        store.replace_with_hashes("checkpointname", 123, ["hash1"])
+        assert calls.mock_calls == [
+            mocker.call.replace_events("checkpointname", ["hash1"]),
+            mocker.call.replace("checkpointname", 123),
+        ]
+
+
+class TestCheckpointWriter:
+    @pytest.fixture
+    def store(self, mocker):
+        return mocker.MagicMock(spec=AuditLogCursorStore)
+
+    def test_replace_does_not_write_until_flush_size_updates(self, store):
+        writer = CheckpointWriter(store, flush_size=3, flush_interval=60)
+        writer.replace("test", 1)
+        writer.replace("test", 2)
+        assert not store.replace.call_count
+        writer.replace("test", 3)
+        store.replace.assert_called_once_with("test", 3)
+
+    def test_replace_writes_when_flush_interval_has_passed(self, mocker, store):
+        mock_monotonic = mocker.patch(f"{_NAMESPACE}.monotonic")
+        mock_monotonic.return_value = 0
+        writer = CheckpointWriter(store, flush_size=100, flush_interval=1)
+        writer.replace("test", 1)
+        assert not store.replace.call_count
+        mock_monotonic.return_value = 1
+        writer.replace("test", 2)
+        store.replace.assert_called_once_with("test", 2)
+
+    def test_get_returns_pending_value(self, store):
+        store.get.return_value = "stored"
+        writer = CheckpointWriter(store, flush_size=100, flush_interval=60)
+        assert writer.get("test") == "stored"
+        writer.replace("test", "pending")
+        assert writer.get("test") == "pending"
+
+    def test_flush_calls_before_flush_before_writing(self, mocker, store):
+        calls = mocker.MagicMock()
+        calls.attach_mock(store.replace, "replace")
+        writer = CheckpointWriter(
+            store, flush_size=100, flush_interval=60, before_flush=calls.before_flush
         )
-        mock_open_events.return_value.write.assert_called_once_with(
-            '["hash1", "hash2"]'
+        writer.replace("test", 1)
+        writer.flush()
+        assert calls.mock_calls == [
+            mocker.call.before_flush(),
+            mocker.call.replace("test", 1),
+        ]
+
+    def test_flush_when_before_flush_raises_does_not_write(self, store):
+        def before_flush():
+            raise ConnectionError()
+
+        writer = CheckpointWriter(
+            store, flush_size=100, flush_interval=60, before_flush=before_flush
         )
+        writer.replace("test", 1)
+        with pytest.raises(ConnectionError):
+            writer.flush()
+        assert not store.replace.call_count
+
+    def test_exit_writes_latest_pending_values(self, store):
+        with CheckpointWriter(store, flush_size=100, flush_interval=60) as writer:
+            writer.replace("test", 1)
+            writer.replace("test", 2)
+            writer.replace_events("test", ["hash1"])
+        store.replace_with_hashes.assert_called_once_with("test", 2, ["hash1"])
+        assert not store.replace.call_count
+        assert not store.replace_events.call_count
+
+    def test_flush_when_only_checkpoint_or_hashes_pending_writes_them_separately(
+        self, store
+    ):
+        with CheckpointWriter(store, flush_size=100, flush_interval=60) as writer:
+            writer.replace("one", 1)
+            writer.replace_events("two", ["hash2"])
+        store.replace.assert_called_once_with("one", 1)
+        store.replace_events.assert_called_once_with("two", ["hash2"])
+        assert not store.replace_with_hashes.call_count
+
+    def test_exit_when_error_raised_writes_pending_values_and_reraises(self, store):
+        with pytest.raises(ValueError):
+            with CheckpointWriter(store, flush_size=100, flush_interval=60) as writer:
+                writer.replace("test", 1)
+                raise ValueError()
+        store.replace.assert_called_once_with("test", 1)
+
+    def test_replace_events_stores_copy_of_events_as_they_were_when_replaced(
+        self, store
+    ):
+        events = ["hash1"]
+        with CheckpointWriter(store, flush_size=100, flush_interval=60) as writer:
+            writer.replace_events("test", events)
+            events.append("hash2")
+            assert writer.get_events("test") == ["hash1"]
+        events.append("hash3")
+        store.replace_events.assert_called_once_with("test", ["hash1"])
+
+    def test_checkpoint_writer_when_store_is_none_returns_context_for_none(self):
+        with checkpoint_writer(None) as writer:
+            assert writer is None
+
+
+@pytest.fixture
+def project_dir(mocker, tmp_path):
+    def get_user_project_path(*subdirs):
+        result = tmp_path.joinpath(*subdirs)
+        result.mkdir(parents=True, exist_ok=True)
+        return str(result)
+
+    mocker.patch(f"{_NAMESPACE}.get_user_project_path", get_user_project_path)
+    return tmp_path
+
+
+class TestDatabaseCursorStore:
+    @pytest.fixture
+    def database_path(self, tmp_path):
+        return str(tmp_path / "checkpoints.db")
+
+    def test_get_when_checkpoint_does_not_exist_returns_none(self, database_path):
+        store = AlertDatabaseCursorStore(database_path)
+        assert store.get(CURSOR_NAME) is None
+
+    def test_replace_and_get_returns_expected_timestamp(self, database_path):
+        store = AlertDatabaseCursorStore(database_path)
+        store.replace(CURSOR_NAME, 123.5)
+        assert store.get(CURSOR_NAME) == 123.5
+
+    def test_file_event_store_get_returns_event_id(self, database_path):
+        store = FileEventDatabaseCursorStore(database_path)
+        store.replace(CURSOR_NAME, "0_event_id")
+        assert store.get(CURSOR_NAME) == "0_event_id"
+
+    def test_replace_events_and_get_events_returns_expected_hashes(self, database_path):
+        store = AuditLogDatabaseCursorStore(database_path)
+        assert store.get_events(CURSOR_NAME) == []
+        store.replace(CURSOR_NAME, 123)
+        store.replace_events(CURSOR_NAME, ["hash1", "hash2"])
+        assert store.get_events(CURSOR_NAME) == ["hash1", "hash2"]
+        assert store.get(CURSOR_NAME) == 123
+
+    def test_replace_with_hashes_writes_checkpoint_and_hashes_in_one_transaction(
+        self, mocker, database_path
+    ):
+        store = AuditLogDatabaseCursorStore(database_path)
+        store.replace(CURSOR_NAME, 1)
+        transaction = mocker.spy(store, "_transaction")
+        store.replace_with_hashes(CURSOR_NAME, 123, ["hash1", "hash2"])
+        assert transaction.call_count == 1
+        assert store.get(CURSOR_NAME) == 123
+        assert store.get_events(CURSOR_NAME) == ["hash1", "hash2"]
+
+    def test_alert_store_replace_with_hashes_writes_checkpoint_and_hashes(
+        self, database_path
+    ):
+        store = AlertDatabaseCursorStore(database_path)
+        store.replace_with_hashes(CURSOR_NAME, 123, ["hash"])
+        assert store.get(CURSOR_NAME) == 123
+        assert store.get_alerts(CURSOR_NAME) == ["hash"]
+
+    def test_stores_of_each_kind_keep_separate_checkpoints(self, database_path):
+        alert_store = AlertDatabaseCursorStore(database_path)
+        audit_log_store = AuditLogDatabaseCursorStore(database_path)
+        alert_store.replace(CURSOR_NAME, 1)
+        audit_log_store.replace(CURSOR_NAME, 2)
+        audit_log_store.clean()
+        assert alert_store.get(CURSOR_NAME) == 1
+        assert audit_log_store.get(CURSOR_NAME) is None
+
+    def test_delete_removes_checkpoint(self, database_path):
+        store = AlertDatabaseCursorStore(database_path)
+        store.replace(CURSOR_NAME, 1)
+        store.delete(CURSOR_NAME)
+        assert store.get(CURSOR_NAME) is None
+
+    def test_delete_when_checkpoint_does_not_exist_raises_cli_error(
+        self, database_path
+    ):
+        store = AlertDatabaseCursorStore(database_path)
+        with pytest.raises(Code42CLIError):
+            store.delete(CURSOR_NAME)
+
+    def test_get_all_cursors_returns_all_checkpoints(self, database_path):
+        store = FileEventDatabaseCursorStore(database_path)
+        store.replace("one", "0_one")
+        store.replace("two", "0_two")
+        cursors = store.get_all_cursors()
+        assert [(c.name, c.value) for c in cursors] == [
+            ("one", "0_one"),
+            ("two", "0_two"),
+        ]
+
+    def test_database_uses_write_ahead_log(self, database_path):
+        AlertDatabaseCursorStore(database_path).replace(CURSOR_NAME, 1)
+        connection = sqlite3.connect(database_path)
+        assert connection.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        connection.close()
+
+    def test_replace_records_update_count(self, database_path):
+        store = AlertDatabaseCursorStore(database_path)
+        store.replace(CURSOR_NAME, 1)
+        store.replace_alerts(CURSOR_NAME, ["hash"])
+        connection = sqlite3.connect(database_path)
+        row = connection.execute(
+            "SELECT update_count, updated_at FROM cursors WHERE name = ?",
+            (CURSOR_NAME,),
+        ).fetchone()
+        connection.close()
+        assert row[0] == 2
+        assert row[1] > 0
+
+    def test_stores_can_update_the_same_database_concurrently(self, database_path):
+        def update(index):
+            store = FileEventDatabaseCursorStore(database_path)
+            for value in range(20):
+                store.replace(f"cursor{index}", value)
+
+        threads = [threading.Thread(target=update, args=(i,)) for i in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        store = FileEventDatabaseCursorStore(database_path)
+        assert [c.value for c in store.get_all_cursors()] == ["19"] * 5
+
+
+class TestCheckpointDatabaseMigration:
+    @pytest.fixture(autouse=True)
+    def real_listdir(self, mock_listdir):
+        mock_listdir.side_effect = _listdir
+
+    def _write_checkpoint(self, project_dir, store_dir, name, value):
+        checkpoint_dir = project_dir / store_dir / PROFILE_NAME
+        checkpoint_dir.mkdir(parents=True, exist_ok=True)
+        (checkpoint_dir / name).write_text(value)
+        return str(checkpoint_dir / name)
+
+    def test_get_file_event_cursor_store_before_migrating_returns_file_store(
+        self, project_dir
+    ):
+        store = get_file_event_cursor_store(PROFILE_NAME)
+        assert isinstance(store, FileEventCursorStore)
+
+    def test_migrate_copies_checkpoints_to_database_and_removes_files(
+        self, project_dir, mock_remove
+    ):
+        locations = [
+            self._write_checkpoint(
+                project_dir, FILE_EVENT_CHECKPOINT_FOLDER_NAME, "events", "0_id"
+            ),
+            self._write_checkpoint(
+                project_dir, ALERT_CHECKPOINT_FOLDER_NAME, "alerts", "123.0"
+            ),
+            self._write_checkpoint(
+                project_dir, ALERT_CHECKPOINT_FOLDER_NAME, "alerts_alerts", '["hash"]'
+            ),
+        ]
+        assert migrate_to_checkpoint_database(PROFILE_NAME) == 3
+
+        store = get_file_event_cursor_store(PROFILE_NAME)
+        assert isinstance(store, FileEventDatabaseCursorStore)
+        assert store.get("events") == "0_id"
+        database_path = project_dir / "checkpoint_databases" / f"{PROFILE_NAME}.db"
+        alert_store = AlertDatabaseCursorStore(str(database_path))
+        assert alert_store.get("alerts") == 123.0
+        assert alert_store.get_alerts("alerts") == ["hash"]
+        removed = {call[0][0] for call in mock_remove.call_args_list}
+        assert removed == set(locations)
+
+    def test_migrate_when_already_migrated_raises_cli_error(self, project_dir):
+        migrate_to_checkpoint_database(PROFILE_NAME)
+        with pytest.raises(Code42CLIError):
+            migrate_to_checkpoint_database(PROFILE_NAME)
+
+
+class TestDedupeCheckpointedEvents:
+    TIMESTAMP_1 = "2020-01-01T00:00:00.000Z"
+    TIMESTAMP_2 = "2020-01-02T00:00:00.000Z"
+
+    @pytest.fixture
+    def store(self, tmp_path):
+        return AlertDatabaseCursorStore(str(tmp_path / "checkpoints.db"))
+
+    def _dedupe(self, store, events, max_hashes=10):
+        return list(
+            dedupe_checkpointed_events(
+                store,
+                CURSOR_NAME,
+                events,
+                store.get_alerts,
+                store.replace_alerts,
+                "id",
+                "createdAt",
+                max_hashes=max_hashes,
+            )
+        )
+
+    def _events(self, *ids_and_timestamps):
+        return [{"id": i, "createdAt": ts} for i, ts in ids_and_timestamps]
+
+    def test_stores_hashes_of_events_at_last_timestamp(self, store):
+        events = self._events(
+            ("a", self.TIMESTAMP_1), ("b", self.TIMESTAMP_2), ("c", self.TIMESTAMP_2)
+        )
+        assert self._dedupe(store, events) == events
+        assert store.get(CURSOR_NAME) == parse_timestamp(self.TIMESTAMP_2)
+        assert store.get_alerts(CURSOR_NAME) == [
+            hash_event_identity(event, "id", "createdAt") for event in events[1:]
+        ]
+
+    def test_next_run_skips_events_at_checkpoint_and_keeps_their_hashes(self, store):
+        first_run = self._events(("a", self.TIMESTAMP_1), ("b", self.TIMESTAMP_1))
+        self._dedupe(store, first_run)
+        second_run = self._events(
+            ("a", self.TIMESTAMP_1), ("b", self.TIMESTAMP_1), ("c", self.TIMESTAMP_1)
+        )
+        assert self._dedupe(store, second_run) == second_run[2:]
+        assert len(store.get_alerts(CURSOR_NAME)) == 3
+        assert self._dedupe(store, second_run) == []
+
+    def test_skips_events_matching_hashes_of_whole_events(self, store):
+        events = self._events(("a", self.TIMESTAMP_1), ("b", self.TIMESTAMP_1))
+        store.replace(CURSOR_NAME, parse_timestamp(self.TIMESTAMP_1))
+        store.replace_alerts(CURSOR_NAME, [hash_event(events[0])])
+        assert self._dedupe(store, events) == events[1:]
+
+    def test_does_not_skip_events_after_checkpoint_timestamp(self, store):
+        event = self._events(("a", self.TIMESTAMP_2))[0]
+        store.replace(CURSOR_NAME, parse_timestamp(self.TIMESTAMP_1))
+        store.replace_alerts(
+            CURSOR_NAME, [hash_event_identity(event, "id", "createdAt")]
+        )
+        assert self._dedupe(store, [event]) == [event]
+
+    def test_stores_at_most_max_hashes(self, store):
+        events = self._events(*((str(i), self.TIMESTAMP_1) for i in range(5)))
+        assert self._dedupe(store, events, max_hashes=3) == events
+        assert len(store.get_alerts(CURSOR_NAME)) == 3
@@ -9,6 +9,7 @@ from requests import Request
 from requests import Response
 from tests.conftest import create_mock_http_error
 from tests.conftest import create_mock_response
+from tests.conftest import patch_run_bulk_process
 
 from code42cli.main import cli
 
@@ -274,25 +275,29 @@ def test_show_rule_when_no_matching_rule_prints_no_rule_message(runner, cli_stat
 
 
 def test_add_bulk_users_uses_expected_arguments(runner, mocker, cli_state):
-    bulk_processor = mocker.patch("code42cli.cmds.alert_rules.run_bulk_process")
+    bulk_processor = patch_run_bulk_process(
+        mocker, "code42cli.cmds.alert_rules.run_bulk_process"
+    )
     with runner.isolated_filesystem():
         with open("test_add.csv", "w") as csv:
             csv.writelines(["rule_id,username\n", "test,value\n"])
         runner.invoke(
             cli, ["alert-rules", "bulk", "add", "test_add.csv"], obj=cli_state
         )
-    assert bulk_processor.call_args[0][1] == [{"rule_id": "test", "username": "value"}]
+    assert bulk_processor.rows == [{"rule_id": "test", "username": "value"}]
 
 
 def test_remove_bulk_users_uses_expected_arguments(runner, mocker, cli_state):
-    bulk_processor = mocker.patch("code42cli.cmds.alert_rules.run_bulk_process")
+    bulk_processor = patch_run_bulk_process(
+        mocker, "code42cli.cmds.alert_rules.run_bulk_process"
+    )
     with runner.isolated_filesystem():
         with open("test_remove.csv", "w") as csv:
             csv.writelines(["rule_id,username\n", "test,value\n"])
         runner.invoke(
             cli, ["alert-rules", "bulk", "add", "test_remove.csv"], obj=cli_state
         )
-    assert bulk_processor.call_args[0][1] == [{"rule_id": "test", "username": "value"}]
+    assert bulk_processor.rows == [{"rule_id": "test", "username": "value"}]
 
 
 def test_list_cmd_prints_no_rules_found_when_f_is_passed_and_response_is_empty(
@@ -1,3 +1,4 @@
+import json
 import logging
 
 import py42.sdk.queries.alerts.filters as f
@@ -7,8 +8,10 @@ from py42.sdk.queries.alerts.alert_query import AlertQuery
 from py42.sdk.queries.alerts.filters import AlertState
 from tests.cmds.conftest import filter_term_is_in_call_args
 from tests.cmds.conftest import get_mark_for_search_and_send_to
+from tests.cmds.conftest import SEND_TO_LOGGER_DEFAULTS
 from tests.conftest import create_mock_response
 from tests.conftest import get_test_date_str
+from tests.conftest import patch_run_bulk_process
 
 from code42cli import PRODUCT_NAME
 from code42cli.cmds.search.cursor_store import AlertCursorStore
@@ -443,15 +446,17 @@ def mock_alert_search_response(mocker):
         ],
     }
 
-    def response_gen():
-        yield data
-
-    return response_gen()
+    return data
 
 
 @pytest.fixture
 def search_all_alerts_success(cli_state, mock_alert_search_response):
-    cli_state.sdk.alerts.get_all_alert_details.return_value = mock_alert_search_response
+    cli_state.sdk.alerts.search_all_pages.return_value = iter(
+        [{"alerts": [{"id": mock_alert_search_response["id"]}]}]
+    )
+    cli_state.sdk.alerts.get_details.return_value = {
+        "alerts": [mock_alert_search_response]
+    }
 
 
 @search_and_send_to_test
@@ -462,7 +467,7 @@ def test_search_and_send_to_passes_query_object_when_searching_file_events(
         cli, [*command, "--advanced-query", ADVANCED_QUERY_JSON], obj=cli_state
     )
 
-    query = cli_state.sdk.alerts.get_all_alert_details.call_args[0][0]
+    query = cli_state.sdk.alerts.search_all_pages.call_args[0][0]
     assert isinstance(query, AlertQuery)
 
 
@@ -475,7 +480,7 @@ def test_search_and_send_to_when_advanced_query_passed_as_json_string_builds_exp
         [*command, "--advanced-query", ADVANCED_QUERY_JSON],
         obj=cli_state,
     )
-    query = cli_state.sdk.alerts.get_all_alert_details.call_args[0][0]
+    query = cli_state.sdk.alerts.search_all_pages.call_args[0][0]
     passed_filter_groups = query._filter_group_list
     expected_actor_filter = f.Actor.contains(ADVANCED_QUERY_VALUES["actor"])
     expected_actor_filter.filter_clause = "OR"
@@ -538,7 +543,7 @@ def test_search_and_send_to_when_given_begin_and_end_dates_uses_expected_query(
         [*command, "--begin", begin_date, "--end", end_date],
         obj=cli_state,
     )
-    query = cli_state.sdk.alerts.get_all_alert_details.call_args[0][0]
+    query = cli_state.sdk.alerts.search_all_pages.call_args[0][0]
     query_dict = dict(query)
 
     actual_begin = query_dict["groups"][0]["filters"][0]["value"]
@@ -563,7 +568,7 @@ def test_search_when_given_begin_and_end_date_and_times_uses_expected_query(
         [*command, "--begin", f"{begin_date} {time}", "--end", f"{end_date} {time}"],
         obj=cli_state,
     )
-    query = cli_state.sdk.alerts.get_all_alert_details.call_args[0][0]
+    query = cli_state.sdk.alerts.search_all_pages.call_args[0][0]
     query_dict = dict(query)
 
     actual_begin = query_dict["groups"][0]["filters"][0]["value"]
@@ -583,7 +588,7 @@ def test_search_when_given_begin_date_and_time_without_seconds_uses_expected_que
     date = get_test_date_str(days_ago=89)
     time = "15:33"
     runner.invoke(cli, [*command, "--begin", f"{date} {time}"], obj=cli_state)
-    query = cli_state.sdk.alerts.get_all_alert_details.call_args[0][0]
+    query = cli_state.sdk.alerts.search_all_pages.call_args[0][0]
     query_dict = dict(query)
     actual = query_dict["groups"][0]["filters"][0]["value"]
     expected = f"{date}T{time}:00.000000Z"
@@ -602,7 +607,7 @@ def test_search_and_send_to_when_given_end_date_and_time_uses_expected_query(
         [*command, "--begin", begin_date, "--end", f"{end_date} {time}"],
         obj=cli_state,
     )
-    query = cli_state.sdk.alerts.get_all_alert_details.call_args[0][0]
+    query = cli_state.sdk.alerts.search_all_pages.call_args[0][0]
     query_dict = dict(query)
     actual = query_dict["groups"][0]["filters"][1]["value"]
     expected = f"{end_date}T{time}:00.000000Z"
@@ -625,7 +630,7 @@ def test_search_and_send_to_when_given_begin_date_and_not_use_checkpoint_and_cur
 ):
     begin_date = get_test_date_str(days_ago=1)
     runner.invoke(cli, [*command, "--begin", begin_date], obj=cli_state)
-    query = cli_state.sdk.alerts.get_all_alert_details.call_args[0][0]
+    query = cli_state.sdk.alerts.search_all_pages.call_args[0][0]
     query_dict = dict(query)
     actual_ts = query_dict["groups"][0]["filters"][0]["value"]
     expected_ts = f"{begin_date}T00:00:00.000000Z"
@@ -653,7 +658,7 @@ def test_search_and_send_to_with_only_begin_calls_search_all_alerts_with_expecte
     cli_state, begin_option, runner, command, search_all_alerts_success
 ):
     res = runner.invoke(cli, [*command, "--begin", "1d"], obj=cli_state)
-    query = cli_state.sdk.alerts.get_all_alert_details.call_args[0][0]
+    query = cli_state.sdk.alerts.search_all_pages.call_args[0][0]
     query_dict = dict(query)
     expected_filter_groups = [
         {
@@ -697,7 +702,7 @@ def test_search_and_send_to_with_use_checkpoint_and_with_begin_and_without_check
         [*command, "--use-checkpoint", "test", "--begin", "1d"],
         obj=cli_state,
     )
-    query = cli_state.sdk.alerts.get_all_alert_details.call_args[0][0]
+    query = cli_state.sdk.alerts.search_all_pages.call_args[0][0]
     query_dict = dict(query)
     actual_begin = query_dict["groups"][0]["filters"][0]["value"]
 
@@ -715,7 +720,7 @@ def test_search_and_send_to_with_use_checkpoint_and_with_begin_and_with_stored_c
         [*command, "--use-checkpoint", "test", "--begin", "1h"],
         obj=cli_state,
     )
-    query = cli_state.sdk.alerts.get_all_alert_details.call_args[0][0]
+    query = cli_state.sdk.alerts.search_all_pages.call_args[0][0]
     assert result.exit_code == 0
     assert len(query._filter_group_list) == 1
     assert (
@@ -732,7 +737,7 @@ def test_search_and_send_to_when_given_actor_is_uses_username_filter(
     runner.invoke(
         cli, [*command, "--begin", "1h", "--actor", actor_name], obj=cli_state
     )
-    query = cli_state.sdk.alerts.get_all_alert_details.call_args[0][0]
+    query = cli_state.sdk.alerts.search_all_pages.call_args[0][0]
     assert f.Actor.is_in([actor_name]) in query._filter_group_list
 
 
@@ -746,7 +751,7 @@ def test_search_and_send_to_when_given_exclude_actor_uses_actor_filter(
         [*command, "--begin", "1h", "--exclude-actor", actor_name],
         obj=cli_state,
     )
-    query = cli_state.sdk.alerts.get_all_alert_details.call_args[0][0]
+    query = cli_state.sdk.alerts.search_all_pages.call_args[0][0]
     assert f.Actor.not_in([actor_name]) in query._filter_group_list
 
 
@@ -760,7 +765,7 @@ def test_search_and_send_to_when_given_rule_name_uses_rule_name_filter(
         [*command, "--begin", "1h", "--rule-name", rule_name],
         obj=cli_state,
     )
-    query = cli_state.sdk.alerts.get_all_alert_details.call_args[0][0]
+    query = cli_state.sdk.alerts.search_all_pages.call_args[0][0]
     assert f.RuleName.is_in([rule_name]) in query._filter_group_list
 
 
@@ -774,7 +779,7 @@ def test_search_and_send_to_when_given_exclude_rule_name_uses_rule_name_not_filt
         [*command, "--begin", "1h", "--exclude-rule-name", rule_name],
         obj=cli_state,
     )
-    query = cli_state.sdk.alerts.get_all_alert_details.call_args[0][0]
+    query = cli_state.sdk.alerts.search_all_pages.call_args[0][0]
     assert f.RuleName.not_in([rule_name]) in query._filter_group_list
 
 
@@ -788,7 +793,7 @@ def test_search_and_send_to_when_given_rule_type_uses_rule_name_filter(
         [*command, "--begin", "1h", "--rule-type", rule_type],
         obj=cli_state,
     )
-    query = cli_state.sdk.alerts.get_all_alert_details.call_args[0][0]
+    query = cli_state.sdk.alerts.search_all_pages.call_args[0][0]
     assert f.RuleType.is_in([rule_type]) in query._filter_group_list
 
 
@@ -802,7 +807,7 @@ def test_search_and_send_to_when_given_exclude_rule_type_uses_rule_name_not_filt
         [*command, "--begin", "1h", "--exclude-rule-type", rule_type],
         obj=cli_state,
     )
-    query = cli_state.sdk.alerts.get_all_alert_details.call_args[0][0]
+    query = cli_state.sdk.alerts.search_all_pages.call_args[0][0]
     assert f.RuleType.not_in([rule_type]) in query._filter_group_list
 
 
@@ -812,7 +817,7 @@ def test_search_and_send_to_when_given_rule_id_uses_rule_name_filter(
 ):
     rule_id = "departing employee"
     runner.invoke(cli, [*command, "--begin", "1h", "--rule-id", rule_id], obj=cli_state)
-    query = cli_state.sdk.alerts.get_all_alert_details.call_args[0][0]
+    query = cli_state.sdk.alerts.search_all_pages.call_args[0][0]
     assert f.RuleId.is_in([rule_id]) in query._filter_group_list
 
 
@@ -826,7 +831,7 @@ def test_search_and_send_to_when_given_exclude_rule_id_uses_rule_name_not_filter
         [*command, "--begin", "1h", "--exclude-rule-id", rule_id],
         obj=cli_state,
     )
-    query = cli_state.sdk.alerts.get_all_alert_details.call_args[0][0]
+    query = cli_state.sdk.alerts.search_all_pages.call_args[0][0]
     assert f.RuleId.not_in([rule_id]) in query._filter_group_list
 
 
@@ -840,7 +845,7 @@ def test_search_and_send_to_when_given_description_uses_description_filter(
         [*command, "--begin", "1h", "--description", description],
         obj=cli_state,
     )
-    query = cli_state.sdk.alerts.get_all_alert_details.call_args[0][0]
+    query = cli_state.sdk.alerts.search_all_pages.call_args[0][0]
     assert f.Description.contains(description) in query._filter_group_list
 
 
@@ -867,7 +872,7 @@ def test_search_and_send_to_when_given_multiple_search_args_uses_expected_filter
         ],
         obj=cli_state,
     )
-    query = cli_state.sdk.alerts.get_all_alert_details.call_args[0][0]
+    query = cli_state.sdk.alerts.search_all_pages.call_args[0][0]
     assert f.Actor.is_in([actor]) in query._filter_group_list
     assert f.Actor.not_in([exclude_actor]) in query._filter_group_list
     assert f.RuleName.is_in([rule_name]) in query._filter_group_list
@@ -921,22 +926,82 @@ def test_search_and_send_to_with_or_query_flag_produces_expected_query(
             },
         ],
         "pgNum": 0,
-        "pgSize": 25,
+        "pgSize": 100,
         "srtDirection": "asc",
         "srtKey": "CreatedAt",
     }
-    query = cli_state.sdk.alerts.get_all_alert_details.call_args[0][0]
+    query = cli_state.sdk.alerts.search_all_pages.call_args[0][0]
     actual_query = dict(query)
     assert actual_query == expected_query
 
 
+@search_and_send_to_test
+def test_search_and_send_to_requests_details_for_each_page_and_outputs_alerts_in_order(
+    runner, cli_state, send_to_logger_factory, command
+):
+    pages = [
+        {"alerts": [{"id": "1"}, {"id": "2"}]},
+        {"alerts": []},
+        {"alerts": [{"id": "3"}]},
+    ]
+    details = {
+        "1": {"id": "1", "createdAt": "2020-01-01T00:00:01.000Z"},
+        "2": {"id": "2", "createdAt": "2020-01-01T00:00:02.000Z"},
+        "3": {"id": "3", "createdAt": "2020-01-01T00:00:03.000Z"},
+    }
+    cli_state.sdk.alerts.search_all_pages.return_value = iter(pages)
+    cli_state.sdk.alerts.get_details.side_effect = lambda ids: {
+        # details aren't returned in the order they're requested in
+        "alerts": [details[i] for i in reversed(ids)]
+    }
+    if "search" in command:
+        command = [*command, "-f", "RAW-JSON"]
+    result = runner.invoke(cli, [*command, "--begin", "1d"], obj=cli_state)
+    requested_ids = [c[0][0] for c in cli_state.sdk.alerts.get_details.call_args_list]
+    assert requested_ids == [["1", "2"], ["3"]]
+    if "search" in command:
+        output = [line for line in result.stdout.splitlines() if line.startswith("{")]
+        assert [json.loads(line)["id"] for line in output] == ["1", "2", "3"]
+    else:
+        send_to_logger = send_to_logger_factory.return_value
+        sent = [c[0][0]["id"] for c in send_to_logger.info.call_args_list]
+        assert sent == ["1", "2", "3"]
+
+
+@search_and_send_to_test
+def test_search_and_send_to_when_details_are_missing_sort_key_outputs_them_last(
+    runner, cli_state, send_to_logger_factory, command
+):
+    details = [
+        {"id": "1"},
+        {"id": "2", "createdAt": "2020-01-01T00:00:02.000Z"},
+        {"id": "3", "createdAt": None},
+        {"id": "4", "createdAt": "2020-01-01T00:00:01.000Z"},
+    ]
+    cli_state.sdk.alerts.search_all_pages.return_value = iter(
+        [{"alerts": [{"id": alert["id"]} for alert in details]}]
+    )
+    cli_state.sdk.alerts.get_details.return_value = {"alerts": details}
+    if "search" in command:
+        command = [*command, "-f", "RAW-JSON"]
+    result = runner.invoke(cli, [*command, "--begin", "1d"], obj=cli_state)
+    if "search" in command:
+        output = [line for line in result.stdout.splitlines() if line.startswith("{")]
+        ids = [json.loads(line)["id"] for line in output]
+    else:
+        send_to_logger = send_to_logger_factory.return_value
+        ids = [c[0][0]["id"] for c in send_to_logger.info.call_args_list]
+    assert ids[:2] == ["4", "2"]
+    assert sorted(ids[2:]) == ["1", "3"]
+
+
 @search_and_send_to_test
 def test_search_and_send_to_handles_error_expected_message_logged_and_printed(
     runner, cli_state, caplog, command
 ):
     exception_msg = "Test Exception"
     expected_msg = "Unknown problem occurred"
-    cli_state.sdk.alerts.get_all_alert_details.side_effect = Exception(exception_msg)
+    cli_state.sdk.alerts.search_all_pages.side_effect = Exception(exception_msg)
     with caplog.at_level(logging.ERROR):
         result = runner.invoke(cli, [*command, "--begin", "1d"], obj=cli_state)
         assert "Error:" in result.output
@@ -1004,7 +1069,7 @@ def test_send_to_creates_expected_logger(cli_state, runner, send_to_logger_facto
         obj=cli_state,
     )
     send_to_logger_factory.assert_called_once_with(
-        "0.0.0.0", "TLS-TCP", "RAW-JSON", "certs/file"
+        "0.0.0.0", "TLS-TCP", "RAW-JSON", "certs/file", **SEND_TO_LOGGER_DEFAULTS
     )
 
 
@@ -1026,7 +1091,7 @@ def test_send_to_when_given_ignore_cert_validation_uses_certs_equal_to_ignore_st
         obj=cli_state,
     )
     send_to_logger_factory.assert_called_once_with(
-        "0.0.0.0", "TLS-TCP", "RAW-JSON", "ignore"
+        "0.0.0.0", "TLS-TCP", "RAW-JSON", "ignore", **SEND_TO_LOGGER_DEFAULTS
     )
 
 
@@ -1218,7 +1283,9 @@ def test_update_when_given_note_and_not_state_calls_py42_update_note(cli_state,
 
 
 def test_bulk_update_uses_expected_arguments(runner, mocker, cli_state_with_user):
-    bulk_processor = mocker.patch("code42cli.cmds.alerts.run_bulk_process")
+    bulk_processor = patch_run_bulk_process(
+        mocker, "code42cli.cmds.alerts.run_bulk_process"
+    )
     with runner.isolated_filesystem():
         with open("test_update.csv", "w") as csv:
             csv.writelines(
@@ -1229,7 +1296,167 @@ def test_bulk_update_uses_expected_arguments(runner, mocker, cli_state_with_user
             ["alerts", "bulk", "update", "test_update.csv"],
             obj=cli_state_with_user,
         )
-    assert bulk_processor.call_args[0][1] == [
+    assert bulk_processor.rows == [
         {"id": "1", "state": "PENDING", "note": "note1"},
         {"id": "2", "state": "IN_PROGRESS", "note": "note2"},
     ]
+
+
+def test_bulk_update_updates_alerts_with_same_state_and_note_in_one_request(
+    runner, cli_state_with_user
+):
+    with runner.isolated_filesystem():
+        with open("test_update.csv", "w") as csv:
+            csv.writelines(
+                [
+                    "id,state,note\n",
+                    "1,PENDING,note1\n",
+                    "2,PENDING,note1\n",
+                    "3,RESOLVED,\n",
+                    "4,,note2\n",
+                ]
+            )
+        res = runner.invoke(
+            cli,
+            ["alerts", "bulk", "update", "test_update.csv"],
+            obj=cli_state_with_user,
+        )
+    assert res.exit_code == 0
+    update_state = cli_state_with_user.sdk.alerts.update_state
+    assert update_state.call_count == 2
+    update_state.assert_any_call("PENDING", ["1", "2"], note="note1")
+    update_state.assert_any_call("RESOLVED", ["3"], note=None)
+    cli_state_with_user.sdk.alerts.update_note.assert_called_once_with("4", "note2")
+
+
+def test_bulk_update_when_batch_size_given_splits_alerts_into_batches_of_that_size(
+    runner, cli_state_with_user
+):
+    with runner.isolated_filesystem():
+        with open("test_update.csv", "w") as csv:
+            csv.writelines(["id,state,note\n", *[f"{i},PENDING,\n" for i in range(5)]])
+        res = runner.invoke(
+            cli,
+            ["alerts", "bulk", "update", "test_update.csv", "--batch-size", "2"],
+            obj=cli_state_with_user,
+        )
+    assert res.exit_code == 0
+    update_state = cli_state_with_user.sdk.alerts.update_state
+    assert sorted(len(c[0][1]) for c in update_state.call_args_list) == [1, 2, 2]
+
+
+@pytest.fixture
+def send_to_servers_logger_factory(mocker):
+    return mocker.patch("code42cli.cmds.search._try_get_logger_for_servers")
+
+
+def _get_server_args(server):
+    return (
+        server.hostname,
+        server.protocol,
+        server.output_format,
+        server.certs,
+        server.framing,
+    )
+
+
+def test_send_to_with_destinations_gets_logger_for_each_server(
+    cli_state, runner, send_to_logger_factory, send_to_servers_logger_factory
+):
+    res = runner.invoke(
+        cli,
+        [
+            "alerts",
+            "send-to",
+            "0.0.0.0",
+            "--begin",
+            "1d",
+            "--protocol",
+            "TCP",
+            "--format",
+            "JSON",
+            "--destination",
+            "siem.example.com:6514,protocol=tls-tcp,format=cef,certs=ignore",
+            "--destination",
+            "backup.example.com,framing=octet-counting",
+            "--max-batch-bytes",
+            "1024",
+        ],
+        obj=cli_state,
+    )
+    assert res.exit_code == 0
+    assert not send_to_logger_factory.call_count
+    servers = send_to_servers_logger_factory.call_args[0][0]
+    assert [_get_server_args(server) for server in servers] == [
+        ("0.0.0.0", "TCP", "JSON", None, "NEWLINE"),
+        ("siem.example.com:6514", "TLS-TCP", "CEF", "ignore", "NEWLINE"),
+        ("backup.example.com", "TCP", "JSON", None, "OCTET-COUNTING"),
+    ]
+    assert send_to_servers_logger_factory.call_args[1] == {
+        "max_batch_bytes": 1024,
+        "max_batch_latency": SEND_TO_LOGGER_DEFAULTS["max_batch_latency"],
+    }
+
+
+@pytest.mark.parametrize(
+    "destination,expected_error",
+    [
+        ("siem.example.com,port=6514", "Invalid setting 'port=6514'"),
+        ("siem.example.com,protocol", "Invalid setting 'protocol'"),
+        ("siem.example.com,protocol=ATM", "Invalid protocol 'ATM'"),
+        ("siem.example.com,format=TABLE", "Invalid format 'TABLE'"),
+        (",format=CEF", "Missing hostname"),
+        (
+            "siem.example.com,certs=ignore",
+            "`certs` setting of siem.example.com can only be used with `protocol=TLS-TCP`",
+        ),
+        (
+            "siem.example.com,protocol=UDP,framing=OCTET-COUNTING",
+            "`framing=OCTET-COUNTING` setting of siem.example.com can only be used",
+        ),
+    ],
+)
+def test_send_to_with_invalid_destination_errors(
+    cli_state, runner, send_to_servers_logger_factory, destination, expected_error
+):
+    res = runner.invoke(
+        cli,
+        [
+            "alerts",
+            "send-to",
+            "0.0.0.0",
+            "--begin",
+            "1d",
+            "--destination",
+            destination,
+        ],
+        obj=cli_state,
+    )
+    assert res.exit_code == 2
+    assert expected_error in res.output
+    assert not send_to_servers_logger_factory.call_count
+
+
+def test_send_to_with_destinations_when_a_server_fails_to_connect_errors(
+    cli_state, runner, mocker
+):
+    mocker.patch(
+        "code42cli.cmds.search.get_logger_for_servers",
+        side_effect=ConnectionRefusedError("refused"),
+    )
+    res = runner.invoke(
+        cli,
+        [
+            "alerts",
+            "send-to",
+            "0.0.0.0",
+            "--begin",
+            "1d",
+            "--destination",
+            "siem.example.com",
+        ],
+        obj=cli_state,
+    )
+    assert res.exit_code == 1
+    assert "Unable to connect to 0.0.0.0, siem.example.com" in res.output
+    assert "refused" in res.output
@@ -5,6 +5,7 @@ from logging import Logger
 
 import pytest
 from tests.cmds.conftest import get_mark_for_search_and_send_to
+from tests.cmds.conftest import SEND_TO_LOGGER_DEFAULTS
 from tests.conftest import create_mock_response
 
 from code42cli.click_ext.types import MagicDate
@@ -100,6 +101,7 @@ def send_to_logger_factory(mocker):
 @pytest.fixture
 def send_to_logger(mocker, send_to_logger_factory):
     mock_logger = mocker.MagicMock(spec=Logger)
+    mock_logger.handlers = []
     send_to_logger_factory.return_value = mock_logger
     return mock_logger
 
@@ -311,7 +313,7 @@ def test_send_to_creates_expected_logger(cli_state, runner, send_to_logger_facto
         obj=cli_state,
     )
     send_to_logger_factory.assert_called_once_with(
-        "0.0.0.0", "TLS-TCP", "RAW-JSON", "certs/file"
+        "0.0.0.0", "TLS-TCP", "RAW-JSON", "certs/file", **SEND_TO_LOGGER_DEFAULTS
     )
 
 
@@ -333,7 +335,7 @@ def test_send_to_when_given_ignore_cert_validation_uses_certs_equal_to_ignore_st
         obj=cli_state,
     )
     send_to_logger_factory.assert_called_once_with(
-        "0.0.0.0", "TLS-TCP", "RAW-JSON", "ignore"
+        "0.0.0.0", "TLS-TCP", "RAW-JSON", "ignore", **SEND_TO_LOGGER_DEFAULTS
     )
 
 
@@ -362,6 +364,125 @@ def test_send_to_emits_events_in_chronological_order(
     )
 
 
+def _mock_audit_log_window_responses(mocker, events):
+    def get_all(begin_time=None, end_time=None, **kwargs):
+        window_events = [
+            e
+            for e in events
+            # like the API, include events at the end of the window
+            if begin_time <= parse_timestamp(e["timestamp"]) <= end_time
+        ]
+        return iter([create_mock_response(mocker, data={"events": window_events})])
+
+    return get_all
+
+
+@search_and_send_to_test
+def test_search_and_send_to_when_streaming_requests_events_in_windows(
+    cli_state, runner, mocker, send_to_logger, command
+):
+    cli_state.sdk.auditlogs.get_all.side_effect = _mock_audit_log_window_responses(
+        mocker,
+        [
+            {"id": "1", "timestamp": "2020-01-01T00:30:00.000Z"},
+            {"id": "2", "timestamp": "2020-01-01T01:00:00.000Z"},
+            {"id": "3", "timestamp": "2020-01-01T02:30:00.000Z"},
+        ],
+    )
+    runner.invoke(
+        cli,
+        [
+            *command,
+            "-b",
+            "2020-01-01 00:00:00",
+            "-e",
+            "2020-01-01 04:00:00",
+            "--stream",
+        ],
+        obj=cli_state,
+    )
+    windows = [
+        (c[1]["begin_time"], c[1]["end_time"])
+        for c in cli_state.sdk.auditlogs.get_all.call_args_list
+    ]
+    begin = parse_timestamp("2020-01-01T00:00:00.000Z")
+    hour = 60 * 60
+    # windows grow while they return few events
+    assert windows == [
+        (begin, begin + hour),
+        (begin + hour, begin + 3 * hour),
+        (begin + 3 * hour, begin + 4 * hour),
+    ]
+
+
+def test_send_to_when_streaming_emits_each_event_once_in_chronological_order(
+    cli_state, runner, mocker, send_to_logger
+):
+    cli_state.sdk.auditlogs.get_all.side_effect = _mock_audit_log_window_responses(
+        mocker,
+        [
+            {"id": "3", "timestamp": "2020-01-01T02:30:00.000Z"},
+            {"id": "2", "timestamp": "2020-01-01T01:00:00.000Z"},
+            {"id": "1", "timestamp": "2020-01-01T00:30:00.000Z"},
+        ],
+    )
+    runner.invoke(
+        cli,
+        [
+            "audit-logs",
+            "send-to",
+            "localhost",
+            "-b",
+            "2020-01-01 00:00:00",
+            "-e",
+            "2020-01-01 04:00:00",
+            "--stream",
+        ],
+        obj=cli_state,
+    )
+    sent_ids = [c[0][0]["id"] for c in send_to_logger.info.call_args_list]
+    assert sent_ids == ["1", "2", "3"]
+
+
+def test_search_when_streaming_json_outputs_events(cli_state, runner, mocker):
+    cli_state.sdk.auditlogs.get_all.side_effect = _mock_audit_log_window_responses(
+        mocker, [{"id": "1", "timestamp": "2020-01-01T00:30:00.000Z"}]
+    )
+    result = runner.invoke(
+        cli,
+        [
+            "audit-logs",
+            "search",
+            "-b",
+            "2020-01-01 00:00:00",
+            "-e",
+            "2020-01-01 04:00:00",
+            "--stream",
+            "-f",
+            "RAW-JSON",
+        ],
+        obj=cli_state,
+    )
+    assert json.loads(result.stdout.splitlines()[-1]) == {
+        "id": "1",
+        "timestamp": "2020-01-01T00:30:00.000Z",
+    }
+
+
+def test_search_when_streaming_and_no_events_outputs_no_results(
+    cli_state, runner, mocker
+):
+    cli_state.sdk.auditlogs.get_all.side_effect = _mock_audit_log_window_responses(
+        mocker, []
+    )
+    result = runner.invoke(
+        cli,
+        ["audit-logs", "search", "-b", "2020-01-01", "-e", "2020-01-01", "--stream"],
+        obj=cli_state,
+    )
+    assert "No results found." in result.output
+
+
 @pytest.mark.parametrize("protocol", (ServerProtocol.UDP, ServerProtocol.TCP))
 def test_send_to_when_given_ignore_cert_validation_with_non_tls_protocol_fails_expectedly(
     cli_state, runner, protocol
@@ -423,8 +544,9 @@ def test_search_and_send_to_with_checkpoint_saves_expected_cursor_timestamp(
         [*command, "--begin", "1d", "--use-checkpoint", "test"],
         obj=cli_state,
     )
-    assert audit_log_cursor_with_checkpoint.replace.call_count == 4
-    assert audit_log_cursor_with_checkpoint.replace.call_args_list[3][0] == (
+    # the checkpoint updates for each event are coalesced into one write
+    assert audit_log_cursor_with_checkpoint.replace_with_hashes.call_count == 1
+    assert audit_log_cursor_with_checkpoint.replace_with_hashes.call_args[0][:2] == (
         "test",
         CURSOR_TIMESTAMP,
     )
@@ -482,13 +604,35 @@ def test_search_and_send_to_without_existing_checkpoint_writes_both_event_hashes
         [*command, "--begin", "1d", "--use-checkpoint", "test"],
         obj=cli_state,
     )
-    assert audit_log_cursor_with_checkpoint.replace_events.call_count == 2
-    assert audit_log_cursor_with_checkpoint.replace_events.call_args_list[1][0][1] == [
+    assert audit_log_cursor_with_checkpoint.replace_with_hashes.call_count == 1
+    assert audit_log_cursor_with_checkpoint.replace_with_hashes.call_args[0][2] == [
         hash_event(TEST_EVENTS_WITH_SAME_TIMESTAMP[0]),
         hash_event(TEST_EVENTS_WITH_SAME_TIMESTAMP[1]),
     ]
 
 
+def test_send_to_when_sending_fails_saves_checkpoint_of_last_sent_event(
+    cli_state,
+    runner,
+    send_to_logger,
+    mock_audit_log_response_with_only_same_timestamps,
+    audit_log_cursor_with_checkpoint,
+):
+    cli_state.sdk.auditlogs.get_all.return_value = (
+        mock_audit_log_response_with_only_same_timestamps
+    )
+    send_to_logger.info.side_effect = [None, ConnectionError()]
+    result = runner.invoke(
+        cli,
+        ["audit-logs", "send-to", "0.0.0.0", "-b", "1d", "--use-checkpoint", "test"],
+        obj=cli_state,
+    )
+    assert result.exit_code != 0
+    audit_log_cursor_with_checkpoint.replace_with_hashes.assert_called_once_with(
+        "test", 1577880000.0, [hash_event(TEST_EVENTS_WITH_SAME_TIMESTAMP[0])]
+    )
+
+
 @pytest.mark.parametrize(
     "protocol", (ServerProtocol.TLS_TCP, ServerProtocol.TLS_TCP, ServerProtocol.UDP)
 )
@@ -510,6 +654,86 @@ def test_send_when_given_unknown_protocol_fails(cli_state, runner):
     assert res.exit_code
 
 
+def test_send_to_when_udp_and_octet_counting_framing_fails(cli_state, runner):
+    res = runner.invoke(
+        cli,
+        [
+            "audit-logs",
+            "send-to",
+            "0.0.0.0",
+            "--begin",
+            "1d",
+            "--protocol",
+            "UDP",
+            "--framing",
+            "OCTET-COUNTING",
+        ],
+        obj=cli_state,
+    )
+    assert res.exit_code != 0
+    assert "'--framing OCTET-COUNTING' can only be used with TCP" in res.output
+
+
+def test_send_to_passes_batch_options_to_logger(
+    cli_state, runner, send_to_logger_factory
+):
+    runner.invoke(
+        cli,
+        [
+            "audit-logs",
+            "send-to",
+            "0.0.0.0",
+            "--begin",
+            "1d",
+            "--protocol",
+            "TCP",
+            "--framing",
+            "OCTET-COUNTING",
+            "--max-batch-bytes",
+            "1024",
+            "--max-batch-latency",
+            "0.5",
+        ],
+        obj=cli_state,
+    )
+    send_to_logger_factory.assert_called_once_with(
+        "0.0.0.0",
+        "TCP",
+        "RAW-JSON",
+        None,
+        framing="OCTET-COUNTING",
+        max_batch_bytes=1024,
+        max_batch_latency=0.5,
+    )
+
+
+def test_send_to_flushes_logger_before_saving_checkpoint_and_when_done(
+    cli_state,
+    runner,
+    mocker,
+    send_to_logger,
+    mock_audit_log_response_with_only_same_timestamps,
+    audit_log_cursor_with_checkpoint,
+):
+    calls = mocker.MagicMock()
+    handler = mocker.MagicMock()
+    send_to_logger.handlers = [handler]
+    calls.attach_mock(handler.flush, "flush")
+    calls.attach_mock(
+        audit_log_cursor_with_checkpoint.replace_with_hashes, "replace_with_hashes"
+    )
+    cli_state.sdk.auditlogs.get_all.return_value = (
+        mock_audit_log_response_with_only_same_timestamps
+    )
+    runner.invoke(
+        cli,
+        ["audit-logs", "send-to", "0.0.0.0", "-b", "1d", "--use-checkpoint", "test"],
+        obj=cli_state,
+    )
+    call_names = [c[0] for c in calls.mock_calls]
+    assert call_names == ["flush", "replace_with_hashes", "flush"]
+
+
 def test_send_to_certs_and_ignore_cert_validation_args_are_incompatible(
     cli_state, runner
 ):
@@ -549,8 +773,10 @@ def test_search_and_send_when_timestamps_missing_milliseconds_saves_checkpoint(
         [*command, "--begin", "1d", "--use-checkpoint", "test"],
         obj=cli_state,
     )
-    audit_log_cursor_with_checkpoint.replace.assert_called_once_with(
-        "test", 1577880000.0
+    assert audit_log_cursor_with_checkpoint.replace_with_hashes.call_count == 1
+    assert audit_log_cursor_with_checkpoint.replace_with_hashes.call_args[0][:2] == (
+        "test",
+        1577880000.0,
     )
 
 
@@ -571,8 +797,10 @@ def test_search_and_send_when_timestamps_have_microseconds_saves_checkpoint(
         [*command, "--begin", "1d", "--use-checkpoint", "test"],
         obj=cli_state,
     )
-    audit_log_cursor_with_checkpoint.replace.assert_called_once_with(
-        "test", 1625150833.093616
+    assert audit_log_cursor_with_checkpoint.replace_with_hashes.call_count == 1
+    assert audit_log_cursor_with_checkpoint.replace_with_hashes.call_args[0][:2] == (
+        "test",
+        1625150833.093616,
     )
 
 
@@ -593,7 +821,7 @@ def test_search_and_send_when_timestamps_have_nanoseconds_saves_checkpoint(
         [*command, "--begin", "1d", "--use-checkpoint", "test"],
         obj=cli_state,
     )
-    call_args = audit_log_cursor_with_checkpoint.replace.call_args
+    call_args = audit_log_cursor_with_checkpoint.replace_with_hashes.call_args
     assert call_args[0][0] == "test"
     assert call_args[0][1] == 1625150833.093616
 
@@ -614,8 +842,10 @@ def test_search_if_error_occurs_when_processing_event_timestamp_does_not_store_e
     )
 
     # Saved the timestamp from the good event but not the bad event
-    audit_log_cursor_with_checkpoint.replace.assert_called_once_with(
-        "test", 1577880000.0
+    assert audit_log_cursor_with_checkpoint.replace_with_hashes.call_count == 1
+    assert audit_log_cursor_with_checkpoint.replace_with_hashes.call_args[0][:2] == (
+        "test",
+        1577880000.0,
     )
 
 
@@ -703,6 +933,28 @@ def test_send_to_if_error_occurs_when_processing_event_timestamp_does_not_store_
     )
 
     # Saved the timestamp from the good event but not the bad event
-    audit_log_cursor_with_checkpoint.replace.assert_called_once_with(
-        "test", 1577880000.0
+    assert audit_log_cursor_with_checkpoint.replace_with_hashes.call_count == 1
+    assert audit_log_cursor_with_checkpoint.replace_with_hashes.call_args[0][:2] == (
+        "test",
+        1577880000.0,
+    )
+
+
+def test_send_to_with_destination_format_setting_errors(cli_state, runner, mocker):
+    logger_factory = mocker.patch("code42cli.cmds.search._try_get_logger_for_servers")
+    res = runner.invoke(
+        cli,
+        [
+            "audit-logs",
+            "send-to",
+            "0.0.0.0",
+            "--begin",
+            "1d",
+            "--destination",
+            "siem.example.com,format=CEF",
+        ],
+        obj=cli_state,
     )
+    assert res.exit_code == 2
+    assert "The `format` setting can't be used with this command" in res.output
+    assert not logger_factory.call_count
@@ -11,6 +11,7 @@ from py42.exceptions import Py42DescriptionLimitExceededError
 from py42.exceptions import Py42NotFoundError
 from py42.exceptions import Py42UpdateClosedCaseError
 from py42.response import Py42Response
+from tests.conftest import patch_run_bulk_process
 
 from code42cli.main import cli
 
@@ -505,7 +506,9 @@ def test_fileevents_when_event_id_is_already_associated_with_case_py42_raises_ex
 def test_add_bulk_file_events_to_cases_uses_expected_arguments(
     runner, mocker, cli_state_with_user
 ):
-    bulk_processor = mocker.patch("code42cli.cmds.cases.run_bulk_process")
+    bulk_processor = patch_run_bulk_process(
+        mocker, "code42cli.cmds.cases.run_bulk_process"
+    )
     with runner.isolated_filesystem():
         with open("test_add.csv", "w") as csv:
             csv.writelines(["number,event_id\n", "1,abc\n", "2,pqr\n"])
@@ -514,7 +517,7 @@ def test_add_bulk_file_events_to_cases_uses_expected_arguments(
             ["cases", "file-events", "bulk", "add", "test_add.csv"],
             obj=cli_state_with_user,
         )
-    assert bulk_processor.call_args[0][1] == [
+    assert bulk_processor.rows == [
         {"number": "1", "event_id": "abc"},
         {"number": "2", "event_id": "pqr"},
     ]
@@ -523,7 +526,9 @@ def test_add_bulk_file_events_to_cases_uses_expected_arguments(
 def test_remove_bulk_file_events_from_cases_uses_expected_arguments(
     runner, mocker, cli_state_with_user
 ):
-    bulk_processor = mocker.patch("code42cli.cmds.cases.run_bulk_process")
+    bulk_processor = patch_run_bulk_process(
+        mocker, "code42cli.cmds.cases.run_bulk_process"
+    )
     with runner.isolated_filesystem():
         with open("test_remove.csv", "w") as csv:
             csv.writelines(["number,event_id\n", "1,abc\n", "2,pqr\n"])
@@ -532,7 +537,7 @@ def test_remove_bulk_file_events_from_cases_uses_expected_arguments(
             ["cases", "file-events", "bulk", "remove", "test_remove.csv"],
             obj=cli_state_with_user,
         )
-    assert bulk_processor.call_args[0][1] == [
+    assert bulk_processor.rows == [
         {"number": "1", "event_id": "abc"},
         {"number": "2", "event_id": "pqr"},
     ]
@@ -1,5 +1,6 @@
 import json
 from datetime import date
+from datetime import datetime
 
 import numpy as np
 import pytest
@@ -12,12 +13,14 @@ from py42.exceptions import Py42ForbiddenError
 from py42.exceptions import Py42NotFoundError
 from py42.exceptions import Py42OrgNotFoundError
 from tests.conftest import create_mock_response
+from tests.conftest import patch_run_bulk_process
 
 from code42cli.cmds.devices import _add_backup_set_settings_to_dataframe
 from code42cli.cmds.devices import _add_legal_hold_membership_to_device_dataframe
 from code42cli.cmds.devices import _add_usernames_to_device_dataframe
 from code42cli.cmds.devices import _break_backup_usage_into_total_storage
 from code42cli.cmds.devices import _get_device_dataframe
+from code42cli.errors import Code42CLIError
 from code42cli.main import cli
 from code42cli.worker import WorkerStats
 
@@ -427,11 +430,21 @@ def matter_list_generator(mocker, api_client=False):
         yield create_mock_response(mocker, data=MATTER_RESPONSE)
 
 
-def custodian_list_generator(mocker, api_client=False):
+def custodian_list_generator(mocker, legal_hold_uid, api_client=False):
+    all_memberships = (
+        API_CLIENT_ALL_CUSTODIANS_RESPONSE
+        if api_client
+        else ALL_CUSTODIANS_RESPONSE["legalHoldMemberships"]
+    )
+    memberships = [
+        membership
+        for membership in all_memberships
+        if membership["legalHold"]["legalHoldUid"] == legal_hold_uid
+    ]
     if api_client:
-        yield create_mock_response(mocker, data=API_CLIENT_ALL_CUSTODIANS_RESPONSE)
+        yield create_mock_response(mocker, data=memberships)
     else:
-        yield create_mock_response(mocker, data=ALL_CUSTODIANS_RESPONSE)
+        yield create_mock_response(mocker, data={"legalHoldMemberships": memberships})
 
 
 @pytest.fixture
@@ -530,15 +543,17 @@ def get_api_client_all_matter_success(mocker, cli_state):
 
 @pytest.fixture
 def get_all_custodian_success(mocker, cli_state):
-    cli_state.sdk.legalhold.get_all_matter_custodians.return_value = (
-        custodian_list_generator(mocker)
+    cli_state.sdk.legalhold.get_all_matter_custodians.side_effect = (
+        lambda legal_hold_uid, active: custodian_list_generator(mocker, legal_hold_uid)
     )
 
 
 @pytest.fixture
 def get_api_client_all_custodian_success(mocker, cli_state):
-    cli_state.sdk.legalhold.get_all_matter_custodians.return_value = (
-        custodian_list_generator(mocker, api_client=True)
+    cli_state.sdk.legalhold.get_all_matter_custodians.side_effect = (
+        lambda legal_hold_matter_uid, active: custodian_list_generator(
+            mocker, legal_hold_matter_uid, api_client=True
+        )
     )
 
 
@@ -904,6 +919,88 @@ def test_list_include_legal_hold_membership_merges_in_and_concats_legal_hold_inf
     assert "123456789,987654321" in result.output
 
 
+def test_list_include_usernames_and_legal_hold_membership_joins_both(
+    runner,
+    cli_state,
+    get_all_devices_success,
+    get_all_users_success,
+    get_all_custodian_success,
+    get_all_matter_success,
+):
+    result = runner.invoke(
+        cli,
+        [
+            "devices",
+            "list",
+            "--include-usernames",
+            "--include-legal-hold-membership",
+            "-f",
+            "CSV",
+        ],
+        obj=cli_state,
+    )
+    assert "username" in result.output
+    assert "legalHoldName" in result.output
+    assert "Test legal hold matter,Another Matter" in result.output
+
+
+def test_add_legal_hold_membership_when_no_memberships_adds_empty_columns(
+    cli_state,
+):
+    cli_state.sdk.legalhold.get_all_matters.return_value = iter([])
+    testdf = DataFrame.from_records(
+        [{"userUid": "840103986007089121", "status": "Active"}]
+    )
+    result = _add_legal_hold_membership_to_device_dataframe(cli_state.sdk, testdf)
+    assert result["legalHoldUid"].isna().all()
+    assert result["legalHoldName"].isna().all()
+
+
+def test_list_with_debug_prints_stage_durations(
+    runner,
+    cli_state,
+    get_all_devices_success,
+    get_all_users_success,
+    get_all_custodian_success,
+    get_all_matter_success,
+):
+    cli_state.debug = True
+    result = runner.invoke(
+        cli,
+        [
+            "devices",
+            "list",
+            "--include-usernames",
+            "--include-legal-hold-membership",
+        ],
+        obj=cli_state,
+    )
+    assert "Getting devices: " in result.output
+    assert "Getting usernames: " in result.output
+    assert "Getting legal hold memberships: " in result.output
+    assert "Total: " in result.output
+
+
+def test_list_without_debug_does_not_print_stage_durations(
+    runner, cli_state, get_all_devices_success, get_all_users_success
+):
+    result = runner.invoke(
+        cli, ["devices", "list", "--include-usernames"], obj=cli_state
+    )
+    assert "Getting devices: " not in result.output
+
+
+def test_list_when_getting_usernames_fails_raises_error(
+    runner, cli_state, get_all_devices_success
+):
+    cli_state.sdk.users.get_all.side_effect = Code42CLIError("users failed")
+    result = runner.invoke(
+        cli, ["devices", "list", "--include-usernames"], obj=cli_state
+    )
+    assert result.exit_code == 1
+    assert "users failed" in result.output
+
+
 def test_list_invalid_org_uid_raises_error(runner, cli_state, custom_error):
     custom_error.response.text = "Unable to find org"
     invalid_org_uid = "invalid_org_uid"
@@ -1051,7 +1148,7 @@ def test_add_backup_set_settings_to_dataframe_returns_one_line_per_backup_set(
 
 
 def test_bulk_deactivate_uses_expected_arguments(runner, mocker, cli_state):
-    bulk_processor = mocker.patch(f"{_NAMESPACE}.run_bulk_process")
+    bulk_processor = patch_run_bulk_process(mocker, f"{_NAMESPACE}.run_bulk_process")
     with runner.isolated_filesystem():
         with open("test_bulk_deactivate.csv", "w") as csv:
             csv.writelines(["guid,username\n", "test,value\n"])
@@ -1060,12 +1157,9 @@ def test_bulk_deactivate_uses_expected_arguments(runner, mocker, cli_state):
             ["devices", "bulk", "deactivate", "test_bulk_deactivate.csv"],
             obj=cli_state,
         )
-    assert bulk_processor.call_args[0][1] == [
+    assert bulk_processor.rows == [
         {
             "guid": "test",
-            "deactivated": "False",
-            "change_device_name": False,
-            "purge_date": None,
         }
     ]
 
@@ -1073,7 +1167,7 @@ def test_bulk_deactivate_uses_expected_arguments(runner, mocker, cli_state):
 def test_bulk_deactivate_uses_expected_arguments_when_no_header(
     runner, mocker, cli_state
 ):
-    bulk_processor = mocker.patch(f"{_NAMESPACE}.run_bulk_process")
+    bulk_processor = patch_run_bulk_process(mocker, f"{_NAMESPACE}.run_bulk_process")
     with runner.isolated_filesystem():
         with open("test_bulk_deactivate.csv", "w") as csv:
             csv.writelines(["test_guid1\n"])
@@ -1082,18 +1176,15 @@ def test_bulk_deactivate_uses_expected_arguments_when_no_header(
             ["devices", "bulk", "deactivate", "test_bulk_deactivate.csv"],
             obj=cli_state,
         )
-    assert bulk_processor.call_args[0][1] == [
+    assert bulk_processor.rows == [
         {
             "guid": "test_guid1",
-            "deactivated": "False",
-            "change_device_name": False,
-            "purge_date": None,
         }
     ]
 
 
 def test_bulk_deactivate_ignores_blank_lines(runner, mocker, cli_state):
-    bulk_processor = mocker.patch(f"{_NAMESPACE}.run_bulk_process")
+    bulk_processor = patch_run_bulk_process(mocker, f"{_NAMESPACE}.run_bulk_process")
     with runner.isolated_filesystem():
         with open("test_bulk_deactivate.csv", "w") as csv:
             csv.writelines(["guid,username\n", "\n", "test,value\n\n"])
@@ -1102,12 +1193,9 @@ def test_bulk_deactivate_ignores_blank_lines(runner, mocker, cli_state):
             ["devices", "bulk", "deactivate", "test_bulk_deactivate.csv"],
             obj=cli_state,
         )
-    assert bulk_processor.call_args[0][1] == [
+    assert bulk_processor.rows == [
         {
             "guid": "test",
-            "deactivated": "False",
-            "change_device_name": False,
-            "purge_date": None,
         }
     ]
 
@@ -1123,7 +1211,7 @@ def test_bulk_deactivate_uses_handler_that_when_encounters_error_increments_tota
         return create_mock_response(mocker, data=TEST_DEVICE_RESPONSE)
 
     cli_state.sdk.devices.get_by_guid.side_effect = _get
-    bulk_processor = mocker.patch(f"{_NAMESPACE}.run_bulk_process")
+    bulk_processor = patch_run_bulk_process(mocker, f"{_NAMESPACE}.run_bulk_process")
     with runner.isolated_filesystem():
         with open("test_bulk_deactivate.csv", "w") as csv:
             csv.writelines(lines)
@@ -1138,8 +1226,36 @@ def test_bulk_deactivate_uses_handler_that_when_encounters_error_increments_tota
     assert worker_stats.increment_total_errors.call_count == 1
 
 
+def test_bulk_deactivate_uses_handler_that_passes_options_to_deactivate(
+    runner, mocker, cli_state
+):
+    deactivate_device = mocker.patch(f"{_NAMESPACE}._deactivate_device")
+    bulk_processor = patch_run_bulk_process(mocker, f"{_NAMESPACE}.run_bulk_process")
+    with runner.isolated_filesystem():
+        with open("test_bulk_deactivate.csv", "w") as csv:
+            csv.writelines(["guid\n", "test\n"])
+        runner.invoke(
+            cli,
+            [
+                "devices",
+                "bulk",
+                "deactivate",
+                "test_bulk_deactivate.csv",
+                "--change-device-name",
+                "--purge-date",
+                TEST_PURGE_DATE,
+            ],
+            obj=cli_state,
+        )
+    handler = bulk_processor.call_args[0][0]
+    handler(guid="test")
+    deactivate_device.assert_called_once_with(
+        cli_state.sdk, "test", True, datetime.strptime(TEST_PURGE_DATE, "%Y-%m-%d")
+    )
+
+
 def test_bulk_reactivate_uses_expected_arguments(runner, mocker, cli_state):
-    bulk_processor = mocker.patch(f"{_NAMESPACE}.run_bulk_process")
+    bulk_processor = patch_run_bulk_process(mocker, f"{_NAMESPACE}.run_bulk_process")
     with runner.isolated_filesystem():
         with open("test_bulk_reactivate.csv", "w") as csv:
             csv.writelines(["guid,username\n", "test,value\n"])
@@ -1148,13 +1264,13 @@ def test_bulk_reactivate_uses_expected_arguments(runner, mocker, cli_state):
             ["devices", "bulk", "reactivate", "test_bulk_reactivate.csv"],
             obj=cli_state,
         )
-    assert bulk_processor.call_args[0][1] == [{"guid": "test", "reactivated": "False"}]
+    assert bulk_processor.rows == [{"guid": "test"}]
 
 
 def test_bulk_reactivate_uses_expected_arguments_when_no_header(
     runner, mocker, cli_state
 ):
-    bulk_processor = mocker.patch(f"{_NAMESPACE}.run_bulk_process")
+    bulk_processor = patch_run_bulk_process(mocker, f"{_NAMESPACE}.run_bulk_process")
     with runner.isolated_filesystem():
         with open("test_bulk_reactivate.csv", "w") as csv:
             csv.writelines(["test_guid1\n"])
@@ -1163,13 +1279,13 @@ def test_bulk_reactivate_uses_expected_arguments_when_no_header(
             ["devices", "bulk", "reactivate", "test_bulk_reactivate.csv"],
             obj=cli_state,
         )
-    assert bulk_processor.call_args[0][1] == [
-        {"guid": "test_guid1", "reactivated": "False"},
+    assert bulk_processor.rows == [
+        {"guid": "test_guid1"},
     ]
 
 
 def test_bulk_reactivate_ignores_blank_lines(runner, mocker, cli_state):
-    bulk_processor = mocker.patch(f"{_NAMESPACE}.run_bulk_process")
+    bulk_processor = patch_run_bulk_process(mocker, f"{_NAMESPACE}.run_bulk_process")
     with runner.isolated_filesystem():
         with open("test_bulk_reactivate.csv", "w") as csv:
             csv.writelines(["guid,username\n", "\n", "test,value\n\n"])
@@ -1178,7 +1294,7 @@ def test_bulk_reactivate_ignores_blank_lines(runner, mocker, cli_state):
             ["devices", "bulk", "reactivate", "test_bulk_reactivate.csv"],
             obj=cli_state,
         )
-    assert bulk_processor.call_args[0][1] == [{"guid": "test", "reactivated": "False"}]
+    assert bulk_processor.rows == [{"guid": "test"}]
     bulk_processor.assert_called_once()
 
 
@@ -1193,7 +1309,7 @@ def test_bulk_reactivate_uses_handler_that_when_encounters_error_increments_tota
         return create_mock_response(mocker, data=TEST_DEVICE_RESPONSE)
 
     cli_state.sdk.devices.get_by_guid.side_effect = _get
-    bulk_processor = mocker.patch(f"{_NAMESPACE}.run_bulk_process")
+    bulk_processor = patch_run_bulk_process(mocker, f"{_NAMESPACE}.run_bulk_process")
     with runner.isolated_filesystem():
         with open("test_bulk_reactivate.csv", "w") as csv:
             csv.writelines(lines)
@@ -1209,7 +1325,7 @@ def test_bulk_reactivate_uses_handler_that_when_encounters_error_increments_tota
 
 
 def test_bulk_rename_uses_expected_arguments(runner, mocker, cli_state):
-    bulk_processor = mocker.patch(f"{_NAMESPACE}.run_bulk_process")
+    bulk_processor = patch_run_bulk_process(mocker, f"{_NAMESPACE}.run_bulk_process")
     with runner.isolated_filesystem():
         with open("test_bulk_rename.csv", "w") as csv:
             csv.writelines(["guid,name\n", "test-guid,test-name\n"])
@@ -1218,13 +1334,11 @@ def test_bulk_rename_uses_expected_arguments(runner, mocker, cli_state):
             ["devices", "bulk", "rename", "test_bulk_rename.csv"],
             obj=cli_state,
         )
-    assert bulk_processor.call_args[0][1] == [
-        {"guid": "test-guid", "name": "test-name", "renamed": "False"}
-    ]
+    assert bulk_processor.rows == [{"guid": "test-guid", "name": "test-name"}]
 
 
 def test_bulk_rename_ignores_blank_lines(runner, mocker, cli_state):
-    bulk_processor = mocker.patch(f"{_NAMESPACE}.run_bulk_process")
+    bulk_processor = patch_run_bulk_process(mocker, f"{_NAMESPACE}.run_bulk_process")
     with runner.isolated_filesystem():
         with open("test_bulk_rename.csv", "w") as csv:
             csv.writelines(["guid,name\n", "\n", "test-guid,test-name\n\n"])
@@ -1233,9 +1347,7 @@ def test_bulk_rename_ignores_blank_lines(runner, mocker, cli_state):
             ["devices", "bulk", "rename", "test_bulk_rename.csv"],
             obj=cli_state,
         )
-    assert bulk_processor.call_args[0][1] == [
-        {"guid": "test-guid", "name": "test-name", "renamed": "False"}
-    ]
+    assert bulk_processor.rows == [{"guid": "test-guid", "name": "test-name"}]
     bulk_processor.assert_called_once()
 
 
@@ -1248,7 +1360,7 @@ def test_bulk_rename_uses_handler_that_when_encounters_error_increments_total_er
         return create_mock_response(mocker, data=TEST_DEVICE_RESPONSE)
 
     cli_state.sdk.devices.get_settings = _get
-    bulk_processor = mocker.patch(f"{_NAMESPACE}.run_bulk_process")
+    bulk_processor = patch_run_bulk_process(mocker, f"{_NAMESPACE}.run_bulk_process")
     with runner.isolated_filesystem():
         with open("test_bulk_rename.csv", "w") as csv:
             csv.writelines(["guid,name\n", "1,2\n"])
@@ -5,6 +5,7 @@ from py42.exceptions import Py42BadRequestError
 from py42.response import Py42Response
 from requests import HTTPError
 from requests import Response
+from tests.conftest import patch_run_bulk_process
 
 from code42cli.cmds.legal_hold import _check_matter_is_accessible
 from code42cli.date_helper import convert_datetime_to_timestamp
@@ -577,27 +578,23 @@ def test_show_matter_does_not_print_preservation_policy(
 
 
 def test_add_bulk_users_uses_expected_arguments(runner, mocker, cli_state):
-    bulk_processor = mocker.patch(f"{_NAMESPACE}.run_bulk_process")
+    bulk_processor = patch_run_bulk_process(mocker, f"{_NAMESPACE}.run_bulk_process")
     with runner.isolated_filesystem():
         with open("test_add.csv", "w") as csv:
             csv.writelines(["matter_id,username\n", "test,value\n"])
         runner.invoke(cli, ["legal-hold", "bulk", "add", "test_add.csv"], obj=cli_state)
-    assert bulk_processor.call_args[0][1] == [
-        {"matter_id": "test", "username": "value"}
-    ]
+    assert bulk_processor.rows == [{"matter_id": "test", "username": "value"}]
 
 
 def test_remove_bulk_users_uses_expected_arguments(runner, mocker, cli_state):
-    bulk_processor = mocker.patch(f"{_NAMESPACE}.run_bulk_process")
+    bulk_processor = patch_run_bulk_process(mocker, f"{_NAMESPACE}.run_bulk_process")
     with runner.isolated_filesystem():
         with open("test_remove.csv", "w") as csv:
             csv.writelines(["matter_id,username\n", "test,value\n"])
         runner.invoke(
             cli, ["legal-hold", "bulk", "remove", "test_remove.csv"], obj=cli_state
         )
-        assert bulk_processor.call_args[0][1] == [
-            {"matter_id": "test", "username": "value"}
-        ]
+        assert bulk_processor.rows == [{"matter_id": "test", "username": "value"}]
 
 
 def test_list_with_format_csv_returns_csv_format(
@@ -772,3 +772,15 @@ def test_debug_option_passed_to_sdk_on_profile_cmds_that_init_sdk(
     )
     assert mock_create_sdk.call_args_list[0][1]["is_debug_mode"] is True
     assert mock_create_sdk.call_args_list[1][1]["is_debug_mode"] is True
+
+
+def test_migrate_checkpoints_migrates_checkpoints_of_profile(
+    runner, mocker, mock_cliprofile_namespace, profile
+):
+    mock_migrate = mocker.patch("code42cli.cmds.profile.migrate_to_checkpoint_database")
+    mock_migrate.return_value = 3
+    profile.name = "foo"
+    mock_cliprofile_namespace.get_profile.return_value = profile
+    result = runner.invoke(cli, ["profile", "migrate-checkpoints", "foo"])
+    mock_migrate.assert_called_once_with("foo")
+    assert "Migrated 3 checkpoint files for profile 'foo'" in result.output
@@ -1,5 +1,6 @@
 import json
 import logging
+import threading
 
 import pandas
 import py42.sdk.queries.fileevents.filters as f
@@ -12,10 +13,13 @@ from py42.sdk.queries.fileevents.filters.file_filter import FileCategory
 from py42.sdk.queries.fileevents.v2 import filters as v2_filters
 from tests.cmds.conftest import filter_term_is_in_call_args
 from tests.cmds.conftest import get_mark_for_search_and_send_to
+from tests.cmds.conftest import SEND_TO_LOGGER_DEFAULTS
 from tests.conftest import create_mock_response
 from tests.conftest import get_test_date_str
 
 from code42cli.cmds.search.cursor_store import FileEventCursorStore
+from code42cli.cmds.securitydata import _parse_sort_timestamp
+from code42cli.cmds.securitydata import _split_time_range
 from code42cli.logger.enums import ServerProtocol
 from code42cli.main import cli
 
@@ -1344,7 +1348,7 @@ def test_send_to_creates_expected_logger(
         obj=cli_state,
     )
     send_to_logger_factory.assert_called_once_with(
-        "0.0.0.0", "TLS-TCP", "RAW-JSON", "certs/file"
+        "0.0.0.0", "TLS-TCP", "RAW-JSON", "certs/file", **SEND_TO_LOGGER_DEFAULTS
     )
 
 
@@ -1366,7 +1370,7 @@ def test_send_to_when_given_ignore_cert_validation_uses_certs_equal_to_ignore_st
         obj=cli_state,
     )
     send_to_logger_factory.assert_called_once_with(
-        "0.0.0.0", "TLS-TCP", "RAW-JSON", "ignore"
+        "0.0.0.0", "TLS-TCP", "RAW-JSON", "ignore", **SEND_TO_LOGGER_DEFAULTS
     )
 
 
@@ -1538,3 +1542,301 @@ def test_search_and_send_to_builds_correct_query_when_v2_events_enabled(
     ]
     for filter_obj in filter_objs:
         assert filter_obj in query._filter_group_list
+
+
+TIME_SLICES_CHECKPOINT = json.dumps(
+    {
+        "begin": BEGIN_TIMESTAMP,
+        "end": None,
+        "slices": [[BEGIN_TIMESTAMP, 1578000000.0], [1578000000.001, None]],
+    }
+)
+
+
+@pytest.fixture
+def file_event_cursor_with_time_slices_checkpoint(mocker):
+    mock = mocker.patch("code42cli.cmds.securitydata._get_file_event_cursor_store")
+    mock_cursor = mocker.MagicMock(spec=FileEventCursorStore)
+    checkpoints = {"test": TIME_SLICES_CHECKPOINT, "test_slice1": "0_test2"}
+    mock_cursor.get.side_effect = checkpoints.get
+    mock.return_value = mock_cursor
+    return mock
+
+
+def _get_time_slice_filter(query):
+    return dict(query)["groups"][-1]["filters"]
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        "2020-01-01T00:00:00.123Z",
+        "2020-01-01T00:00:00.123+00:00",
+        "2020-01-01T00:00:00.123",
+        "2020-01-01T01:00:00.123000+01:00",
+        "2020-01-01T00:00:00.123456789Z",
+    ],
+)
+def test_parse_sort_timestamp_returns_posix_timestamp(value):
+    assert _parse_sort_timestamp(value) == pytest.approx(1577836800.123, abs=1e-3)
+
+
+def test_parse_sort_timestamp_when_timestamp_object_returns_posix_timestamp():
+    value = pandas.Timestamp("2020-01-01T00:00:00.123Z")
+    assert _parse_sort_timestamp(value) == pytest.approx(1577836800.123)
+
+
+@search_and_send_to_test
+def test_search_and_send_to_with_unordered_and_without_parallel_causes_usage_error(
+    runner, cli_state, command
+):
+    result = runner.invoke(cli, [*command, "-b", "1d", "--unordered"], obj=cli_state)
+    assert result.exit_code == 2
+    assert "--unordered can only be used with --parallel" in result.output
+
+
+def test_split_time_range_splits_range_into_contiguous_slices():
+    assert _split_time_range(0, 3, 3) == [[0, 0.999], [1, 1.999], [2, 3]]
+
+
+def test_split_time_range_when_open_ended_leaves_last_slice_without_end():
+    assert _split_time_range(0, 2, 2, open_ended=True) == [[0, 0.999], [1, None]]
+
+
+def test_split_time_range_when_range_is_shorter_than_count_returns_fewer_slices():
+    assert _split_time_range(0, 0.002, 5) == [[0, 0], [0.001, 0.002]]
+
+
+@search_and_send_to_test
+def test_search_and_send_to_with_parallel_searches_each_insertion_time_slice(
+    runner, cli_state, begin_option, command, search_all_file_events_success
+):
+    result = runner.invoke(
+        cli, [*command, "--begin", "1d", "--parallel", "3"], obj=cli_state
+    )
+    assert result.exit_code == 0
+    calls = cli_state.sdk.securitydata.search_all_file_events.call_args_list
+    assert len(calls) == 3
+    for call in calls:
+        slice_filters = _get_time_slice_filter(call[0][0])
+        assert all(f["term"] == "insertionTimestamp" for f in slice_filters)
+    # the last slice is open so that events inserted after the range are included
+    last_slice_filters = _get_time_slice_filter(calls[-1][0][0])
+    assert [f["operator"] for f in last_slice_filters] == ["ON_OR_AFTER"]
+
+
+def test_search_with_parallel_and_v2_events_slices_event_timestamps_up_to_end(
+    runner, cli_state, begin_option, search_all_file_events_success
+):
+    cli_state.profile.use_v2_file_events = "True"
+    result = runner.invoke(
+        cli,
+        [
+            *["security-data", "search", "-b", "1d", "-e", "2020-01-31"],
+            *["--parallel", "2", "-f", "JSON"],
+        ],
+        obj=cli_state,
+    )
+    cli_state.profile.use_v2_file_events = "False"
+    assert result.exit_code == 0
+    calls = cli_state.sdk.securitydata.search_all_file_events.call_args_list
+    assert len(calls) == 2
+    last_slice_filters = _get_time_slice_filter(calls[-1][0][0])
+    assert last_slice_filters[0]["term"] == "@timestamp"
+    assert last_slice_filters[-1]["value"].startswith("2020-01-31T23:59:59")
+
+
+@pytest.mark.parametrize("unordered", [(), ("--unordered",)])
+def test_search_with_parallel_outputs_events_from_every_slice(
+    runner, cli_state, begin_option, search_all_file_events_success, unordered
+):
+    result = runner.invoke(
+        cli,
+        ["security-data", "search", "-b", "1d", "--parallel", "2", "-f", "JSON"]
+        + list(unordered),
+        obj=cli_state,
+    )
+    assert result.exit_code == 0
+    assert result.output.count(TEST_FILE_EVENT_ID_2) == 2
+
+
+def test_search_with_parallel_and_ordered_output_searches_later_slices_while_earlier_slices_are_output(
+    runner, cli_state, begin_option, mock_file_event_response
+):
+    last_slice_pages_read = threading.Event()
+    pages_per_slice = 10
+
+    def search_all_file_events(query, page_token=""):
+        is_first_slice = len(_get_time_slice_filter(query)) == 2
+        if is_first_slice:
+            # holds up the first slice until the last slice has been searched to its end, which
+            # is more pages than are read ahead of the output
+            assert last_slice_pages_read.wait(5)
+            return mock_file_event_response
+        page = int(page_token or 0) + 1
+        if page == pages_per_slice:
+            last_slice_pages_read.set()
+        return {
+            "fileEvents": mock_file_event_response["fileEvents"],
+            "nextPgToken": str(page) if page < pages_per_slice else None,
+        }
+
+    cli_state.sdk.securitydata.search_all_file_events.side_effect = (
+        search_all_file_events
+    )
+    result = runner.invoke(
+        cli,
+        ["security-data", "search", "-b", "1d", "--parallel", "2", "-f", "JSON"],
+        obj=cli_state,
+    )
+    assert result.exit_code == 0
+    assert last_slice_pages_read.is_set()
+    assert result.output.count(TEST_FILE_EVENT_ID_2) == 1 + pages_per_slice
+
+
+@search_and_send_to_test
+def test_search_and_send_to_with_parallel_and_use_checkpoint_stores_time_slices_and_checkpoints_each_slice(
+    runner,
+    cli_state,
+    begin_option,
+    file_event_cursor_without_checkpoint,
+    command,
+    search_all_file_events_success,
+):
+    result = runner.invoke(
+        cli,
+        [*command, "-b", "1d", "--parallel", "2", "--use-checkpoint", "test"],
+        obj=cli_state,
+    )
+    assert result.exit_code == 0
+    cursor = file_event_cursor_without_checkpoint.return_value
+    replace_calls = [call[0] for call in cursor.replace.call_args_list]
+    name, time_slices = replace_calls[0]
+    assert name == "test"
+    assert json.loads(time_slices)["begin"] == BEGIN_TIMESTAMP
+    assert len(json.loads(time_slices)["slices"]) == 2
+
+
+@search_and_send_to_test
+def test_search_and_send_to_with_time_slices_checkpoint_resumes_each_slice(
+    runner,
+    cli_state,
+    file_event_cursor_with_time_slices_checkpoint,
+    command,
+    search_all_file_events_success,
+):
+    result = runner.invoke(
+        cli,
+        [*command, "-b", "1d", "--parallel", "5", "--use-checkpoint", "test"],
+        obj=cli_state,
+    )
+    assert result.exit_code == 0
+    calls = cli_state.sdk.securitydata.search_all_file_events.call_args_list
+    # the stored slices are used instead of --begin and --parallel
+    assert len(calls) == 2
+    page_tokens = {call[1]["page_token"] for call in calls}
+    assert page_tokens == {"", "0_test2"}
+
+
+@search_and_send_to_test
+def test_search_and_send_to_with_time_slices_checkpoint_checkpoints_events_in_their_slices(
+    runner,
+    cli_state,
+    file_event_cursor_with_time_slices_checkpoint,
+    command,
+    search_all_file_events_success,
+):
+    result = runner.invoke(
+        cli, [*command, "--parallel", "2", "--use-checkpoint", "test"], obj=cli_state
+    )
+    assert result.exit_code == 0
+    cursor = file_event_cursor_with_time_slices_checkpoint.return_value
+    replace_calls = {call[0] for call in cursor.replace.call_args_list}
+    # both slices return both events, but each event belongs to only one slice
+    assert replace_calls == {
+        ("test_slice0", TEST_FILE_EVENT_ID_1),
+        ("test_slice1", TEST_FILE_EVENT_ID_2),
+    }
+
+
+@search_and_send_to_test
+def test_search_and_send_to_without_parallel_and_with_time_slices_checkpoint_causes_expected_error(
+    runner, cli_state, file_event_cursor_with_time_slices_checkpoint, command
+):
+    result = runner.invoke(cli, [*command, "--use-checkpoint", "test"], obj=cli_state)
+    assert result.exit_code == 1
+    assert "can only be resumed with --parallel" in result.output
+
+
+@search_and_send_to_test
+def test_search_and_send_to_with_parallel_and_eventid_checkpoint_causes_expected_error(
+    runner, cli_state, file_event_cursor_with_eventid_checkpoint, command
+):
+    result = runner.invoke(
+        cli, [*command, "--parallel", "2", "--use-checkpoint", "test"], obj=cli_state
+    )
+    assert result.exit_code == 1
+    assert "can't be resumed with --parallel" in result.output
+
+
+def test_clear_checkpoint_with_time_slices_checkpoint_deletes_slice_checkpoints(
+    runner, cli_state, file_event_cursor_with_time_slices_checkpoint
+):
+    result = runner.invoke(
+        cli, ["security-data", "clear-checkpoint", "test"], obj=cli_state
+    )
+    assert result.exit_code == 0
+    cursor = file_event_cursor_with_time_slices_checkpoint.return_value
+    deleted = [call[0][0] for call in cursor.delete.call_args_list]
+    assert deleted == ["test", "test_slice0", "test_slice1"]
+
+
+def test_search_when_raw_json_outputs_events_without_building_a_dataframe(
+    runner, cli_state, mocker
+):
+    events = [
+        {"eventId": "1", "fileSize": 86, "fileName": "a.txt"},
+        {"eventId": "2", "fileName": "b.txt"},
+    ]
+    cli_state.sdk.securitydata.search_all_file_events.return_value = {
+        "fileEvents": events,
+        "nextPgToken": "",
+    }
+    mock_dataframe = mocker.patch("code42cli.cmds.securitydata.DataFrame")
+    result = runner.invoke(
+        cli,
+        ["security-data", "search", "--begin", "1d", "-f", "RAW-JSON"],
+        obj=cli_state,
+    )
+    assert result.exit_code == 0
+    assert not mock_dataframe.call_count
+    output = [
+        json.loads(line) for line in result.stdout.splitlines() if line.startswith("{")
+    ]
+    # the events are output as the API returned them, e.g. without turning ints into floats
+    assert output == events
+
+
+def test_search_when_table_builds_a_dataframe_of_flattened_events(
+    runner, cli_state, mocker
+):
+    cli_state.sdk.securitydata.search_all_file_events.return_value = {
+        "fileEvents": [{"eventId": "1", "file": {"name": "a.txt"}}],
+        "nextPgToken": "",
+    }
+    result = runner.invoke(
+        cli,
+        [
+            "security-data",
+            "search",
+            "--begin",
+            "1d",
+            "-f",
+            "TABLE",
+            "--columns",
+            "eventId,file.name",
+        ],
+        obj=cli_state,
+    )
+    assert result.exit_code == 0
+    assert "a.txt" in result.stdout
@@ -1,9 +1,119 @@
+import threading
+
 import pytest
 
+from code42cli.cmds import shared
+from code42cli.cmds.shared import get_legacy_user_id
 from code42cli.cmds.shared import get_user_id
+from code42cli.cmds.shared import get_user_risk_profile_id
+from code42cli.cmds.shared import prewarm_user_cache
+from code42cli.cmds.shared import prewarm_user_risk_profile_cache
+from code42cli.cmds.shared import TTLCache
 from code42cli.errors import UserDoesNotExistError
 
 
 def test_get_user_id_when_user_does_not_raise_error(sdk_without_user):
     with pytest.raises(UserDoesNotExistError):
         get_user_id(sdk_without_user, "risky employee")
+
+
+def test_get_user_id_when_called_again_for_same_user_uses_cached_id(sdk):
+    sdk.users.get_by_username.return_value = {
+        "users": [{"userId": 1, "userUid": "uid"}]
+    }
+    assert get_user_id(sdk, "test@example.com") == "uid"
+    assert get_legacy_user_id(sdk, "test@example.com") == 1
+    assert sdk.users.get_by_username.call_count == 1
+
+
+def test_get_user_id_when_user_does_not_exist_does_not_cache_error(sdk):
+    sdk.users.get_by_username.return_value = {"users": []}
+    with pytest.raises(UserDoesNotExistError):
+        get_user_id(sdk, "test@example.com")
+    sdk.users.get_by_username.return_value = {"users": [{"userUid": "uid"}]}
+    assert get_user_id(sdk, "test@example.com") == "uid"
+
+
+def test_get_user_risk_profile_id_when_called_again_for_same_user_uses_cached_id(
+    sdk,
+):
+    sdk.userriskprofile.get_by_username.return_value = {"userId": "id"}
+    assert get_user_risk_profile_id(sdk, "test@example.com") == "id"
+    assert get_user_risk_profile_id(sdk, "test@example.com") == "id"
+    assert sdk.userriskprofile.get_by_username.call_count == 1
+
+
+def test_prewarm_user_cache_when_users_over_threshold_caches_users_in_rows(mocker, sdk):
+    mocker.patch("code42cli.cmds.shared.PREWARM_USER_THRESHOLD", 1)
+    sdk.users.get_all.return_value = [
+        {"users": [{"username": "a", "userId": 1, "userUid": "uid-a"}]},
+        {"users": [{"username": "b", "userId": 2, "userUid": "uid-b"}]},
+    ]
+    prewarm_user_cache(sdk, [{"username": "a"}, {"username": "c"}])
+    assert get_user_id(sdk, "a") == "uid-a"
+    assert not sdk.users.get_by_username.call_count
+    assert len(shared._users) == 1
+
+
+def test_prewarm_user_cache_when_rows_not_over_threshold_does_nothing(sdk):
+    prewarm_user_cache(sdk, [{"username": "a"}])
+    assert not sdk.users.get_all.call_count
+
+
+def test_prewarm_user_cache_when_rows_over_threshold_but_users_not_does_nothing(
+    mocker, sdk
+):
+    mocker.patch("code42cli.cmds.shared.PREWARM_USER_THRESHOLD", 1)
+    prewarm_user_cache(sdk, [{"username": "a"}, {"username": "a"}, {"username": ""}])
+    assert not sdk.users.get_all.call_count
+
+
+def test_prewarm_user_risk_profile_cache_caches_users_in_rows(mocker, sdk):
+    mocker.patch("code42cli.cmds.shared.PREWARM_USER_THRESHOLD", 1)
+    sdk.userriskprofile.get_all.return_value = [
+        {"userRiskProfiles": [{"username": "a", "userId": "id-a"}]}
+    ]
+    prewarm_user_risk_profile_cache(sdk, [{"username": "a"}, {"username": "b"}])
+    assert get_user_risk_profile_id(sdk, "a") == "id-a"
+    assert not sdk.userriskprofile.get_by_username.call_count
+
+
+class TestTTLCache:
+    def test_get_when_key_missing_returns_default(self):
+        assert TTLCache().get("key", "default") == "default"
+
+    def test_get_when_entry_expired_returns_default(self, mocker):
+        mocker.patch("code42cli.cmds.shared.monotonic", side_effect=[0, 10])
+        cache = TTLCache(ttl=5)
+        cache.set("key", "value")
+        assert cache.get("key") is None
+
+    def test_set_when_full_evicts_least_recently_used_entry(self):
+        cache = TTLCache(max_size=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+
+    def test_get_or_resolve_when_threads_need_same_key_resolves_once(self):
+        cache = TTLCache()
+        calls = []
+        barrier = threading.Barrier(3, timeout=5)
+
+        def resolve(key):
+            calls.append(key)
+            return "value"
+
+        def get():
+            barrier.wait()
+            assert cache.get_or_resolve("key", resolve) == "value"
+
+        threads = [threading.Thread(target=get) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert calls == ["key"]
@@ -4,6 +4,7 @@ from py42.exceptions import Py42TrustedActivityConflictError
 from py42.exceptions import Py42TrustedActivityIdNotFound
 from py42.exceptions import Py42TrustedActivityInvalidCharacterError
 from tests.conftest import create_mock_response
+from tests.conftest import patch_run_bulk_process
 
 from code42cli.main import cli
 
@@ -333,7 +334,9 @@ def test_list_prints_expected_data(runner, cli_state, get_all_activities_respons
 def test_bulk_add_trusted_activities_uses_expected_arguments(
     runner, mocker, cli_state_with_user
 ):
-    bulk_processor = mocker.patch("code42cli.cmds.trustedactivities.run_bulk_process")
+    bulk_processor = patch_run_bulk_process(
+        mocker, "code42cli.cmds.trustedactivities.run_bulk_process"
+    )
     with runner.isolated_filesystem():
         with open("test_create.csv", "w") as csv:
             csv.writelines(
@@ -349,7 +352,7 @@ def test_bulk_add_trusted_activities_uses_expected_arguments(
             command,
             obj=cli_state_with_user,
         )
-    assert bulk_processor.call_args[0][1] == [
+    assert bulk_processor.rows == [
         {"type": "DOMAIN", "value": "test-domain", "description": ""},
         {"type": "SLACK", "value": "test-slack", "description": "desc"},
     ]
@@ -358,7 +361,9 @@ def test_bulk_add_trusted_activities_uses_expected_arguments(
 def test_bulk_update_trusted_activities_uses_expected_arguments(
     runner, mocker, cli_state_with_user
 ):
-    bulk_processor = mocker.patch("code42cli.cmds.trustedactivities.run_bulk_process")
+    bulk_processor = patch_run_bulk_process(
+        mocker, "code42cli.cmds.trustedactivities.run_bulk_process"
+    )
     with runner.isolated_filesystem():
         with open("test_update.csv", "w") as csv:
             csv.writelines(
@@ -375,7 +380,7 @@ def test_bulk_update_trusted_activities_uses_expected_arguments(
             command,
             obj=cli_state_with_user,
         )
-    assert bulk_processor.call_args[0][1] == [
+    assert bulk_processor.rows == [
         {"resource_id": "1", "value": "test-domain", "description": ""},
         {"resource_id": "2", "value": "test-slack", "description": "desc"},
         {"resource_id": "3", "value": "", "description": "desc"},
@@ -385,7 +390,9 @@ def test_bulk_update_trusted_activities_uses_expected_arguments(
 def test_bulk_remove_trusted_activities_uses_expected_arguments_when_no_header(
     runner, mocker, cli_state_with_user
 ):
-    bulk_processor = mocker.patch("code42cli.cmds.trustedactivities.run_bulk_process")
+    bulk_processor = patch_run_bulk_process(
+        mocker, "code42cli.cmds.trustedactivities.run_bulk_process"
+    )
     with runner.isolated_filesystem():
         with open("test_remove.csv", "w") as csv:
             csv.writelines(["1\n", "2\n"])
@@ -395,7 +402,7 @@ def test_bulk_remove_trusted_activities_uses_expected_arguments_when_no_header(
             command,
             obj=cli_state_with_user,
         )
-    assert bulk_processor.call_args[0][1] == [
+    assert bulk_processor.rows == [
         {"resource_id": "1"},
         {"resource_id": "2"},
     ]
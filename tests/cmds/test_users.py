@@ -13,6 +13,7 @@ from py42.exceptions import Py42OrgNotFoundError
 from py42.exceptions import Py42UserRiskProfileNotFound
 from tests.conftest import create_mock_http_error
 from tests.conftest import create_mock_response
+from tests.conftest import patch_run_bulk_process
 
 from code42cli.main import cli
 from code42cli.worker import WorkerStats
@@ -255,11 +256,11 @@ def get_user_id_failure(mocker, cli_state):
 
 @pytest.fixture
 def get_custodian_failure(mocker, cli_state):
-    def empty_custodian_list_generator():
+    def empty_custodian_list_generator(legal_hold_uid, active):
         yield create_mock_response(mocker, data=TEST_EMPTY_CUSTODIANS_RESPONSE)
 
-    cli_state.sdk.legalhold.get_all_matter_custodians.return_value = (
-        empty_custodian_list_generator()
+    cli_state.sdk.legalhold.get_all_matter_custodians.side_effect = (
+        empty_custodian_list_generator
     )
 
 
@@ -281,11 +282,16 @@ def get_all_matter_success(mocker, cli_state):
 
 @pytest.fixture
 def get_all_custodian_success(mocker, cli_state):
-    def custodian_list_generator():
-        yield create_mock_response(mocker, data=TEST_CUSTODIANS_RESPONSE)
+    def custodian_list_generator(legal_hold_uid, active):
+        memberships = [
+            membership
+            for membership in TEST_CUSTODIANS_RESPONSE["legalHoldMemberships"]
+            if membership["legalHold"]["legalHoldUid"] == legal_hold_uid
+        ]
+        yield create_mock_response(mocker, data={"legalHoldMemberships": memberships})
 
-    cli_state.sdk.legalhold.get_all_matter_custodians.return_value = (
-        custodian_list_generator()
+    cli_state.sdk.legalhold.get_all_matter_custodians.side_effect = (
+        custodian_list_generator
     )
 
 
@@ -519,6 +525,18 @@ def test_list_include_legal_hold_membership_merges_in_and_concats_legal_hold_inf
     assert "123456789,987654321" in result.output
 
 
+def test_list_include_legal_hold_membership_gets_custodian_index_for_profile(
+    mocker, runner, cli_state, get_all_users_success
+):
+    mock_get_custodian_index = mocker.patch(
+        "code42cli.cmds.users.get_custodian_index", return_value={}
+    )
+    runner.invoke(
+        cli, ["users", "list", "--include-legal-hold-membership"], obj=cli_state
+    )
+    mock_get_custodian_index.assert_called_once_with(cli_state.sdk, cli_state.profile)
+
+
 def test_list_prints_expected_data_if_include_roles(
     runner, cli_state, get_all_users_success
 ):
@@ -916,7 +934,7 @@ def test_reactivate_calls_reactivate_with_correct_parameters(
 def test_bulk_update_uses_expected_arguments_when_only_some_are_passed(
     runner, mocker, cli_state
 ):
-    bulk_processor = mocker.patch(f"{_NAMESPACE}.run_bulk_process")
+    bulk_processor = patch_run_bulk_process(mocker, f"{_NAMESPACE}.run_bulk_process")
     with runner.isolated_filesystem():
         with open("test_bulk_update.csv", "w") as csv:
             csv.writelines(
@@ -928,7 +946,7 @@ def test_bulk_update_uses_expected_arguments_when_only_some_are_passed(
         runner.invoke(
             cli, ["users", "bulk", "update", "test_bulk_update.csv"], obj=cli_state
         )
-    assert bulk_processor.call_args[0][1] == [
+    assert bulk_processor.rows == [
         {
             "user_id": "12345",
             "username": "",
@@ -938,7 +956,6 @@ def test_bulk_update_uses_expected_arguments_when_only_some_are_passed(
             "last_name": "",
             "notes": "",
             "archive_size_quota": "",
-            "updated": "False",
         }
     ]
 
@@ -946,7 +963,7 @@ def test_bulk_update_uses_expected_arguments_when_only_some_are_passed(
 def test_bulk_update_uses_expected_arguments_when_all_are_passed(
     runner, mocker, cli_state
 ):
-    bulk_processor = mocker.patch(f"{_NAMESPACE}.run_bulk_process")
+    bulk_processor = patch_run_bulk_process(mocker, f"{_NAMESPACE}.run_bulk_process")
     with runner.isolated_filesystem():
         with open("test_bulk_update.csv", "w") as csv:
             csv.writelines(
@@ -958,7 +975,7 @@ def test_bulk_update_uses_expected_arguments_when_all_are_passed(
         runner.invoke(
             cli, ["users", "bulk", "update", "test_bulk_update.csv"], obj=cli_state
         )
-    assert bulk_processor.call_args[0][1] == [
+    assert bulk_processor.rows == [
         {
             "user_id": "12345",
             "username": "test_username",
@@ -968,13 +985,12 @@ def test_bulk_update_uses_expected_arguments_when_all_are_passed(
             "last_name": "test_lname",
             "notes": "test notes",
             "archive_size_quota": "4321",
-            "updated": "False",
         }
     ]
 
 
 def test_bulk_update_ignores_blank_lines(runner, mocker, cli_state):
-    bulk_processor = mocker.patch(f"{_NAMESPACE}.run_bulk_process")
+    bulk_processor = patch_run_bulk_process(mocker, f"{_NAMESPACE}.run_bulk_process")
     with runner.isolated_filesystem():
         with open("test_bulk_update.csv", "w") as csv:
             csv.writelines(
@@ -988,7 +1004,7 @@ def test_bulk_update_ignores_blank_lines(runner, mocker, cli_state):
         runner.invoke(
             cli, ["users", "bulk", "update", "test_bulk_update.csv"], obj=cli_state
         )
-    assert bulk_processor.call_args[0][1] == [
+    assert bulk_processor.rows == [
         {
             "user_id": "12345",
             "username": "test_username",
@@ -998,7 +1014,6 @@ def test_bulk_update_ignores_blank_lines(runner, mocker, cli_state):
             "last_name": "test_lname",
             "notes": "test notes",
             "archive_size_quota": "4321",
-            "updated": "False",
         }
     ]
 
@@ -1017,7 +1032,7 @@ def test_bulk_update_uses_handler_that_when_encounters_error_increments_total_er
         return create_mock_response(mocker, data=TEST_USERS_RESPONSE)
 
     cli_state.sdk.users.update_user.side_effect = _update
-    bulk_processor = mocker.patch(f"{_NAMESPACE}.run_bulk_process")
+    bulk_processor = patch_run_bulk_process(mocker, f"{_NAMESPACE}.run_bulk_process")
     with runner.isolated_filesystem():
         with open("test_bulk_update.csv", "w") as csv:
             csv.writelines(lines)
@@ -1069,30 +1084,26 @@ def test_move_calls_change_org_assignment_with_correct_parameters(
 
 
 def test_bulk_move_uses_expected_arguments(runner, mocker, cli_state):
-    bulk_processor = mocker.patch(f"{_NAMESPACE}.run_bulk_process")
+    bulk_processor = patch_run_bulk_process(mocker, f"{_NAMESPACE}.run_bulk_process")
     with runner.isolated_filesystem():
         with open("test_bulk_move.csv", "w") as csv:
             csv.writelines(["username,org_id\n", f"{TEST_USERNAME},4321\n"])
         runner.invoke(
             cli, ["users", "bulk", "move", "test_bulk_move.csv"], obj=cli_state
         )
-    assert bulk_processor.call_args[0][1] == [
-        {"username": TEST_USERNAME, "org_id": "4321", "moved": "False"}
-    ]
+    assert bulk_processor.rows == [{"username": TEST_USERNAME, "org_id": "4321"}]
     bulk_processor.assert_called_once()
 
 
 def test_bulk_move_ignores_blank_lines(runner, mocker, cli_state):
-    bulk_processor = mocker.patch(f"{_NAMESPACE}.run_bulk_process")
+    bulk_processor = patch_run_bulk_process(mocker, f"{_NAMESPACE}.run_bulk_process")
     with runner.isolated_filesystem():
         with open("test_bulk_move.csv", "w") as csv:
             csv.writelines(["username,org_id\n\n\n", f"{TEST_USERNAME},4321\n\n\n"])
         runner.invoke(
             cli, ["users", "bulk", "move", "test_bulk_move.csv"], obj=cli_state
         )
-    assert bulk_processor.call_args[0][1] == [
-        {"username": TEST_USERNAME, "org_id": "4321", "moved": "False"}
-    ]
+    assert bulk_processor.rows == [{"username": TEST_USERNAME, "org_id": "4321"}]
     bulk_processor.assert_called_once()
 
 
@@ -1107,7 +1118,7 @@ def test_bulk_move_uses_handler_that_when_encounters_error_increments_total_erro
         return get_users_response
 
     cli_state.sdk.users.get_by_username.side_effect = _get
-    bulk_processor = mocker.patch(f"{_NAMESPACE}.run_bulk_process")
+    bulk_processor = patch_run_bulk_process(mocker, f"{_NAMESPACE}.run_bulk_process")
     with runner.isolated_filesystem():
         with open("test_bulk_move.csv", "w") as csv:
             csv.writelines(lines)
@@ -1125,7 +1136,7 @@ def test_bulk_move_uses_handler_that_when_encounters_error_increments_total_erro
 def test_bulk_move_uses_handle_than_when_called_and_row_has_missing_username_errors_at_row(
     runner, mocker, cli_state, worker_stats
 ):
-    bulk_processor = mocker.patch(f"{_NAMESPACE}.run_bulk_process")
+    bulk_processor = patch_run_bulk_process(mocker, f"{_NAMESPACE}.run_bulk_process")
     lines = ["username,org_id\n", ",123\n"]  # Missing username
     with runner.isolated_filesystem():
         with open("test_bulk_move.csv", "w") as csv:
@@ -1142,7 +1153,7 @@ def test_bulk_move_uses_handle_than_when_called_and_row_has_missing_username_err
 
 
 def test_bulk_deactivate_uses_expected_arguments(runner, mocker, cli_state):
-    bulk_processor = mocker.patch(f"{_NAMESPACE}.run_bulk_process")
+    bulk_processor = patch_run_bulk_process(mocker, f"{_NAMESPACE}.run_bulk_process")
     with runner.isolated_filesystem():
         with open("test_bulk_deactivate.csv", "w") as csv:
             csv.writelines(["username\n", f"{TEST_USERNAME}\n"])
@@ -1151,14 +1162,29 @@ def test_bulk_deactivate_uses_expected_arguments(runner, mocker, cli_state):
             ["users", "bulk", "deactivate", "test_bulk_deactivate.csv"],
             obj=cli_state,
         )
-    assert bulk_processor.call_args[0][1] == [
-        {"username": TEST_USERNAME, "deactivated": "False"}
-    ]
+    assert bulk_processor.rows == [{"username": TEST_USERNAME}]
     bulk_processor.assert_called_once()
 
 
+def test_bulk_deactivate_looks_up_each_username_once(
+    runner, cli_state, get_users_response
+):
+    cli_state.sdk.users.get_by_username.return_value = get_users_response
+    with runner.isolated_filesystem():
+        with open("test_bulk_deactivate.csv", "w") as csv:
+            csv.writelines(["username\n", *[f"{TEST_USERNAME}\n" for _ in range(5)]])
+        res = runner.invoke(
+            cli,
+            ["users", "bulk", "deactivate", "test_bulk_deactivate.csv"],
+            obj=cli_state,
+        )
+    assert res.exit_code == 0
+    assert cli_state.sdk.users.get_by_username.call_count == 1
+    assert cli_state.sdk.users.deactivate.call_count == 5
+
+
 def test_bulk_deactivate_ignores_blank_lines(runner, mocker, cli_state):
-    bulk_processor = mocker.patch(f"{_NAMESPACE}.run_bulk_process")
+    bulk_processor = patch_run_bulk_process(mocker, f"{_NAMESPACE}.run_bulk_process")
     with runner.isolated_filesystem():
         with open("test_bulk_deactivate.csv", "w") as csv:
             csv.writelines(["username\n\n\n", f"{TEST_USERNAME}\n\n\n"])
@@ -1167,9 +1193,7 @@ def test_bulk_deactivate_ignores_blank_lines(runner, mocker, cli_state):
             ["users", "bulk", "deactivate", "test_bulk_deactivate.csv"],
             obj=cli_state,
         )
-    assert bulk_processor.call_args[0][1] == [
-        {"username": TEST_USERNAME, "deactivated": "False"}
-    ]
+    assert bulk_processor.rows == [{"username": TEST_USERNAME}]
     bulk_processor.assert_called_once()
 
 
@@ -1184,7 +1208,7 @@ def test_bulk_deactivate_uses_handler_that_when_encounters_error_increments_tota
         return get_users_response
 
     cli_state.sdk.users.get_by_username.side_effect = _get
-    bulk_processor = mocker.patch(f"{_NAMESPACE}.run_bulk_process")
+    bulk_processor = patch_run_bulk_process(mocker, f"{_NAMESPACE}.run_bulk_process")
     with runner.isolated_filesystem():
         with open("test_bulk_deactivate.csv", "w") as csv:
             csv.writelines(lines)
@@ -1200,7 +1224,7 @@ def test_bulk_deactivate_uses_handler_that_when_encounters_error_increments_tota
 
 
 def test_bulk_reactivate_uses_expected_arguments(runner, mocker, cli_state):
-    bulk_processor = mocker.patch(f"{_NAMESPACE}.run_bulk_process")
+    bulk_processor = patch_run_bulk_process(mocker, f"{_NAMESPACE}.run_bulk_process")
     with runner.isolated_filesystem():
         with open("test_bulk_reactivate.csv", "w") as csv:
             csv.writelines(["username\n", f"{TEST_USERNAME}\n"])
@@ -1209,14 +1233,12 @@ def test_bulk_reactivate_uses_expected_arguments(runner, mocker, cli_state):
             ["users", "bulk", "reactivate", "test_bulk_reactivate.csv"],
             obj=cli_state,
         )
-    assert bulk_processor.call_args[0][1] == [
-        {"username": TEST_USERNAME, "reactivated": "False"}
-    ]
+    assert bulk_processor.rows == [{"username": TEST_USERNAME}]
     bulk_processor.assert_called_once()
 
 
 def test_bulk_reactivate_ignores_blank_lines(runner, mocker, cli_state):
-    bulk_processor = mocker.patch(f"{_NAMESPACE}.run_bulk_process")
+    bulk_processor = patch_run_bulk_process(mocker, f"{_NAMESPACE}.run_bulk_process")
     with runner.isolated_filesystem():
         with open("test_bulk_reactivate.csv", "w") as csv:
             csv.writelines(["username\n\n\n", f"{TEST_USERNAME}\n\n\n"])
@@ -1225,9 +1247,7 @@ def test_bulk_reactivate_ignores_blank_lines(runner, mocker, cli_state):
             ["users", "bulk", "reactivate", "test_bulk_reactivate.csv"],
             obj=cli_state,
         )
-    assert bulk_processor.call_args[0][1] == [
-        {"username": TEST_USERNAME, "reactivated": "False"}
-    ]
+    assert bulk_processor.rows == [{"username": TEST_USERNAME}]
     bulk_processor.assert_called_once()
 
 
@@ -1243,7 +1263,7 @@ def test_bulk_reactivate_uses_handler_that_when_encounters_error_increments_tota
         return get_users_response
 
     cli_state.sdk.users.get_by_username.side_effect = _get
-    bulk_processor = mocker.patch(f"{_NAMESPACE}.run_bulk_process")
+    bulk_processor = patch_run_bulk_process(mocker, f"{_NAMESPACE}.run_bulk_process")
     with runner.isolated_filesystem():
         with open("test_bulk_reactivate.csv", "w") as csv:
             csv.writelines(lines)
@@ -1259,7 +1279,7 @@ def test_bulk_reactivate_uses_handler_that_when_encounters_error_increments_tota
 
 
 def test_bulk_add_roles_uses_expected_arguments(runner, mocker, cli_state_with_user):
-    bulk_processor = mocker.patch(f"{_NAMESPACE}.run_bulk_process")
+    bulk_processor = patch_run_bulk_process(mocker, f"{_NAMESPACE}.run_bulk_process")
     with runner.isolated_filesystem():
         with open("test_bulk_add_roles.csv", "w") as csv:
             csv.writelines(
@@ -1271,14 +1291,14 @@ def test_bulk_add_roles_uses_expected_arguments(runner, mocker, cli_state_with_u
             command,
             obj=cli_state_with_user,
         )
-    assert bulk_processor.call_args[0][1] == [
-        {"username": TEST_USERNAME, "role_name": TEST_ROLE_NAME, "role added": "False"},
+    assert bulk_processor.rows == [
+        {"username": TEST_USERNAME, "role_name": TEST_ROLE_NAME},
     ]
     bulk_processor.assert_called_once()
 
 
 def test_bulk_add_roles_ignores_blank_lines(runner, mocker, cli_state):
-    bulk_processor = mocker.patch(f"{_NAMESPACE}.run_bulk_process")
+    bulk_processor = patch_run_bulk_process(mocker, f"{_NAMESPACE}.run_bulk_process")
     with runner.isolated_filesystem():
         with open("test_bulk_add_roles.csv", "w") as csv:
             csv.writelines(
@@ -1289,8 +1309,8 @@ def test_bulk_add_roles_ignores_blank_lines(runner, mocker, cli_state):
             ["users", "bulk", "add-roles", "test_bulk_add_roles.csv"],
             obj=cli_state,
         )
-    assert bulk_processor.call_args[0][1] == [
-        {"username": TEST_USERNAME, "role_name": TEST_ROLE_NAME, "role added": "False"},
+    assert bulk_processor.rows == [
+        {"username": TEST_USERNAME, "role_name": TEST_ROLE_NAME},
     ]
     bulk_processor.assert_called_once()
 
@@ -1309,7 +1329,7 @@ def test_bulk_add_roles_uses_handler_that_when_encounters_error_increments_total
         return get_users_response
 
     cli_state.sdk.users.get_by_username.side_effect = _get
-    bulk_processor = mocker.patch(f"{_NAMESPACE}.run_bulk_process")
+    bulk_processor = patch_run_bulk_process(mocker, f"{_NAMESPACE}.run_bulk_process")
     with runner.isolated_filesystem():
         with open("test_bulk_add_roles.csv", "w") as csv:
             csv.writelines(
@@ -1332,7 +1352,7 @@ def test_bulk_add_roles_uses_handler_that_when_encounters_error_increments_total
 
 
 def test_bulk_remove_roles_uses_expected_arguments(runner, mocker, cli_state_with_user):
-    bulk_processor = mocker.patch(f"{_NAMESPACE}.run_bulk_process")
+    bulk_processor = patch_run_bulk_process(mocker, f"{_NAMESPACE}.run_bulk_process")
     with runner.isolated_filesystem():
         with open("test_bulk_remove_roles.csv", "w") as csv:
             csv.writelines(
@@ -1344,18 +1364,17 @@ def test_bulk_remove_roles_uses_expected_arguments(runner, mocker, cli_state_wit
             command,
             obj=cli_state_with_user,
         )
-    assert bulk_processor.call_args[0][1] == [
+    assert bulk_processor.rows == [
         {
             "username": TEST_USERNAME,
             "role_name": TEST_ROLE_NAME,
-            "role removed": "False",
         },
     ]
     bulk_processor.assert_called_once()
 
 
 def test_bulk_remove_roles_ignores_blank_lines(runner, mocker, cli_state):
-    bulk_processor = mocker.patch(f"{_NAMESPACE}.run_bulk_process")
+    bulk_processor = patch_run_bulk_process(mocker, f"{_NAMESPACE}.run_bulk_process")
     with runner.isolated_filesystem():
         with open("test_bulk_remove_roles.csv", "w") as csv:
             csv.writelines(
@@ -1366,11 +1385,10 @@ def test_bulk_remove_roles_ignores_blank_lines(runner, mocker, cli_state):
             ["users", "bulk", "remove-roles", "test_bulk_remove_roles.csv"],
             obj=cli_state,
         )
-    assert bulk_processor.call_args[0][1] == [
+    assert bulk_processor.rows == [
         {
             "username": TEST_USERNAME,
             "role_name": TEST_ROLE_NAME,
-            "role removed": "False",
         },
     ]
     bulk_processor.assert_called_once()
@@ -1391,7 +1409,7 @@ def test_bulk_remove_roles_uses_handler_that_when_encounters_error_increments_to
         return get_users_response
 
     cli_state.sdk.users.get_by_username.side_effect = _get
-    bulk_processor = mocker.patch(f"{_NAMESPACE}.run_bulk_process")
+    bulk_processor = patch_run_bulk_process(mocker, f"{_NAMESPACE}.run_bulk_process")
     with runner.isolated_filesystem():
         with open("test_bulk_remove_roles.csv", "w") as csv:
             csv.writelines(
@@ -1641,7 +1659,7 @@ def test_remove_alias_raises_error_when_user_does_not_exist(
 
 
 def test_bulk_add_alias_uses_expected_arguments(runner, mocker, cli_state):
-    bulk_processor = mocker.patch(f"{_NAMESPACE}.run_bulk_process")
+    bulk_processor = patch_run_bulk_process(mocker, f"{_NAMESPACE}.run_bulk_process")
     with runner.isolated_filesystem():
         with open("test_add_alias.csv", "w") as csv:
             csv.writelines(["username,alias\n", f"{TEST_USERNAME},{TEST_ALIAS}\n"])
@@ -1650,14 +1668,12 @@ def test_bulk_add_alias_uses_expected_arguments(runner, mocker, cli_state):
             ["users", "bulk", "add-alias", "test_add_alias.csv"],
             obj=cli_state,
         )
-    assert bulk_processor.call_args[0][1] == [
-        {"username": TEST_USERNAME, "alias": TEST_ALIAS, "alias added": "False"}
-    ]
+    assert bulk_processor.rows == [{"username": TEST_USERNAME, "alias": TEST_ALIAS}]
     bulk_processor.assert_called_once()
 
 
 def test_bulk_add_alias_ignores_blank_lines(runner, mocker, cli_state):
-    bulk_processor = mocker.patch(f"{_NAMESPACE}.run_bulk_process")
+    bulk_processor = patch_run_bulk_process(mocker, f"{_NAMESPACE}.run_bulk_process")
     with runner.isolated_filesystem():
         with open("test_add_alias.csv", "w") as csv:
             csv.writelines(
@@ -1668,9 +1684,7 @@ def test_bulk_add_alias_ignores_blank_lines(runner, mocker, cli_state):
             ["users", "bulk", "add-alias", "test_add_alias.csv"],
             obj=cli_state,
         )
-    assert bulk_processor.call_args[0][1] == [
-        {"username": TEST_USERNAME, "alias": TEST_ALIAS, "alias added": "False"}
-    ]
+    assert bulk_processor.rows == [{"username": TEST_USERNAME, "alias": TEST_ALIAS}]
     bulk_processor.assert_called_once()
 
 
@@ -1685,7 +1699,7 @@ def test_bulk_add_alias_uses_handler_that_when_encounters_error_increments_total
         return get_user_response
 
     cli_state.sdk.userriskprofile.get_by_username.side_effect = _get
-    bulk_processor = mocker.patch(f"{_NAMESPACE}.run_bulk_process")
+    bulk_processor = patch_run_bulk_process(mocker, f"{_NAMESPACE}.run_bulk_process")
     with runner.isolated_filesystem():
         with open("test_add_alias.csv", "w") as csv:
             csv.writelines(lines)
@@ -1701,7 +1715,7 @@ def test_bulk_add_alias_uses_handler_that_when_encounters_error_increments_total
 
 
 def test_bulk_remove_alias_uses_expected_arguments(runner, mocker, cli_state):
-    bulk_processor = mocker.patch(f"{_NAMESPACE}.run_bulk_process")
+    bulk_processor = patch_run_bulk_process(mocker, f"{_NAMESPACE}.run_bulk_process")
     with runner.isolated_filesystem():
         with open("test_remove_alias.csv", "w") as csv:
             csv.writelines(["username,alias\n", f"{TEST_USERNAME},{TEST_ALIAS}\n"])
@@ -1710,14 +1724,12 @@ def test_bulk_remove_alias_uses_expected_arguments(runner, mocker, cli_state):
             ["users", "bulk", "remove-alias", "test_remove_alias.csv"],
             obj=cli_state,
         )
-    assert bulk_processor.call_args[0][1] == [
-        {"username": TEST_USERNAME, "alias": TEST_ALIAS, "alias removed": "False"}
-    ]
+    assert bulk_processor.rows == [{"username": TEST_USERNAME, "alias": TEST_ALIAS}]
     bulk_processor.assert_called_once()
 
 
 def test_bulk_remove_alias_ignores_blank_lines(runner, mocker, cli_state):
-    bulk_processor = mocker.patch(f"{_NAMESPACE}.run_bulk_process")
+    bulk_processor = patch_run_bulk_process(mocker, f"{_NAMESPACE}.run_bulk_process")
     with runner.isolated_filesystem():
         with open("test_remove_alias.csv", "w") as csv:
             csv.writelines(
@@ -1728,9 +1740,7 @@ def test_bulk_remove_alias_ignores_blank_lines(runner, mocker, cli_state):
             ["users", "bulk", "remove-alias", "test_remove_alias.csv"],
             obj=cli_state,
         )
-    assert bulk_processor.call_args[0][1] == [
-        {"username": TEST_USERNAME, "alias": TEST_ALIAS, "alias removed": "False"}
-    ]
+    assert bulk_processor.rows == [{"username": TEST_USERNAME, "alias": TEST_ALIAS}]
     bulk_processor.assert_called_once()
 
 
@@ -1745,7 +1755,7 @@ def test_bulk_remove_alias_uses_handler_that_when_encounters_error_increments_to
         return get_user_response
 
     cli_state.sdk.userriskprofile.get_by_username.side_effect = _get
-    bulk_processor = mocker.patch(f"{_NAMESPACE}.run_bulk_process")
+    bulk_processor = patch_run_bulk_process(mocker, f"{_NAMESPACE}.run_bulk_process")
     with runner.isolated_filesystem():
         with open("test_remove_alias.csv", "w") as csv:
             csv.writelines(lines)
@@ -583,7 +583,7 @@ class TestWatchlistBulkAddCmd:
                 )
             runner.invoke(cli, ["watchlists", "bulk", "add", "csv"], obj=cli_state)
             cli_state.sdk.watchlists.add_included_users_by_watchlist_id.assert_called_once_with(
-                "1234", "abcd"
+                ["1234"], "abcd"
             )
 
     def test_handle_row_when_passed_no_id_headers_uses_username_and_watchlist_type(
@@ -600,7 +600,92 @@ class TestWatchlistBulkAddCmd:
                 )
             runner.invoke(cli, ["watchlists", "bulk", "add", "csv"], obj=cli_state)
             cli_state.sdk.watchlists.add_included_users_by_watchlist_type.assert_called_once_with(
-                1234, "DEPARTING_EMPLOYEE"
+                [1234], "DEPARTING_EMPLOYEE"
+            )
+
+    def test_bulk_add_adds_users_for_same_watchlist_in_one_request(
+        self, mocker, runner, cli_state
+    ):
+        cli_state.sdk.userriskprofile.get_by_username.return_value = (
+            create_mock_response(mocker, data={"userId": 1234})
+        )
+        with runner.isolated_filesystem():
+            with open("csv", "w") as file:
+                file.write(
+                    "username,user_id,watchlist_id\n"
+                    ",5678,abcd\n"
+                    "test@example.com,,abcd\n"
+                    ",9012,efgh\n"
+                )
+            res = runner.invoke(
+                cli, ["watchlists", "bulk", "add", "csv"], obj=cli_state
+            )
+            assert res.exit_code == 0
+            add = cli_state.sdk.watchlists.add_included_users_by_watchlist_id
+            assert add.call_count == 2
+            add.assert_any_call(["5678", 1234], "abcd")
+            add.assert_any_call(["9012"], "efgh")
+
+    def test_bulk_add_when_username_unknown_fails_only_that_row(
+        self, mocker, custom_error, runner, cli_state
+    ):
+        def get_by_username(username):
+            if username == "unknown@example.com":
+                raise Py42UserRiskProfileNotFound(custom_error, username)
+            return create_mock_response(mocker, data={"userId": 1234})
+
+        custom_error.response.request = None
+        cli_state.sdk.userriskprofile.get_by_username.side_effect = get_by_username
+        with runner.isolated_filesystem():
+            with open("csv", "w") as file:
+                file.write(
+                    "username,watchlist_id\n"
+                    "test@example.com,abcd\n"
+                    "unknown@example.com,abcd\n"
+                )
+            res = runner.invoke(
+                cli, ["watchlists", "bulk", "add", "csv"], obj=cli_state
+            )
+        assert res.exit_code == 1
+        cli_state.sdk.watchlists.add_included_users_by_watchlist_id.assert_called_once_with(
+            [1234], "abcd"
+        )
+
+    def test_bulk_add_when_batch_request_fails_retries_each_row_on_its_own(
+        self, custom_error, runner, cli_state
+    ):
+        def add(user_ids, watchlist_id):
+            if isinstance(user_ids, list) and len(user_ids) > 1 or user_ids == "5678":
+                raise Py42NotFoundError(custom_error)
+
+        custom_error.response.request = None
+        cli_state.sdk.watchlists.add_included_users_by_watchlist_id.side_effect = add
+        with runner.isolated_filesystem():
+            with open("csv", "w") as file:
+                file.write("user_id,watchlist_id\n1234,abcd\n5678,abcd\n")
+            res = runner.invoke(
+                cli, ["watchlists", "bulk", "add", "csv"], obj=cli_state
+            )
+        assert res.exit_code == 1
+        add_mock = cli_state.sdk.watchlists.add_included_users_by_watchlist_id
+        add_mock.assert_any_call(["1234", "5678"], "abcd")
+        add_mock.assert_any_call("1234", "abcd")
+        add_mock.assert_any_call("5678", "abcd")
+
+    def test_bulk_add_when_watchlist_type_invalid_fails_only_that_row(
+        self, runner, cli_state
+    ):
+        with runner.isolated_filesystem():
+            with open("csv", "w") as file:
+                file.write(
+                    "user_id,watchlist_type\n1234,DEPARTING_EMPLOYEE\n5678,INVALID\n"
+                )
+            res = runner.invoke(
+                cli, ["watchlists", "bulk", "add", "csv"], obj=cli_state
+            )
+            assert res.exit_code == 1
+            cli_state.sdk.watchlists.add_included_users_by_watchlist_type.assert_called_once_with(
+                ["1234"], "DEPARTING_EMPLOYEE"
             )
 
 
@@ -645,7 +730,7 @@ class TestWatchlistBulkRemoveCmd:
                 )
             runner.invoke(cli, ["watchlists", "bulk", "remove", "csv"], obj=cli_state)
             cli_state.sdk.watchlists.remove_included_users_by_watchlist_id.assert_called_once_with(
-                "1234", "abcd"
+                ["1234"], "abcd"
             )
 
     def test_handle_row_when_passed_no_id_headers_uses_username_and_watchlist_type(
@@ -662,5 +747,5 @@ class TestWatchlistBulkRemoveCmd:
                 )
             runner.invoke(cli, ["watchlists", "bulk", "remove", "csv"], obj=cli_state)
             cli_state.sdk.watchlists.remove_included_users_by_watchlist_type.assert_called_once_with(
-                1234, "DEPARTING_EMPLOYEE"
+                [1234], "DEPARTING_EMPLOYEE"
             )
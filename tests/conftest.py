@@ -1,6 +1,7 @@
 import json
 from datetime import datetime
 from datetime import timedelta
+from unittest.mock import DEFAULT
 
 import pytest
 from click.testing import CliRunner
@@ -9,6 +10,7 @@ from py42.sdk import SDKClient
 from requests import HTTPError
 from requests import Response
 
+import code42cli.cmds.shared as shared
 import code42cli.errors as error_tracker
 from code42cli.config import ConfigAccessor
 from code42cli.options import CLIState
@@ -102,6 +104,20 @@ def create_profile_values_dict(
     }
 
 
+def patch_run_bulk_process(mocker, target):
+    """Patches `run_bulk_process` at the given target. CSV rows are read lazily from a file that
+    is closed when the command exits, so the rows are consumed during the call and stored on the
+    returned mock's `rows` attribute."""
+    mock = mocker.patch(target)
+
+    def consume_rows(row_handler, rows, *args, **kwargs):
+        mock.rows = list(rows)
+        return DEFAULT
+
+    mock.side_effect = consume_rows
+    return mock
+
+
 @pytest.fixture
 def sdk(mocker):
     return mocker.MagicMock(spec=SDKClient)
@@ -131,6 +147,7 @@ def cli_state(mocker, sdk, profile):
     mock_state.profile = profile
     mock_state.search_filters = []
     mock_state.totp = None
+    mock_state.debug = False
     mock_state.assume_yes = False
     return mock_state
 
@@ -169,6 +186,41 @@ def profile(mocker):
     return mock
 
 
+@pytest.fixture(autouse=True)
+def bulk_jobs_dir(mocker, tmp_path):
+    mocker.patch("code42cli.bulk.get_user_project_path", return_value=str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture(autouse=True)
+def token_cache_dir(mocker, tmp_path):
+    token_cache_dir = tmp_path / "token_cache"
+    token_cache_dir.mkdir()
+    mocker.patch(
+        "code42cli.token_cache.get_user_project_path",
+        return_value=str(token_cache_dir),
+    )
+    return token_cache_dir
+
+
+@pytest.fixture(autouse=True)
+def legal_hold_cache_dir(mocker, tmp_path):
+    legal_hold_cache_dir = tmp_path / "legal_hold_cache"
+    legal_hold_cache_dir.mkdir()
+    mocker.patch(
+        "code42cli.custodian_index.get_user_project_path",
+        return_value=str(legal_hold_cache_dir),
+    )
+    return legal_hold_cache_dir
+
+
+@pytest.fixture(autouse=True)
+def clear_user_caches():
+    yield
+    shared._users.clear()
+    shared._user_risk_profile_ids.clear()
+
+
 @pytest.fixture(autouse=True)
 def mock_makedirs(mocker):
     return mocker.patch("os.makedirs")
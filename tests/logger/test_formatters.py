@@ -512,6 +512,12 @@ class TestFileEventDictToJSONFormatter:
                 raise AssertionError()
         assert True
 
+    def test_format_bytes_returns_utf8_encoded_format(self, mock_file_event_log_record):
+        formatter = FileEventDictToJSONFormatter()
+        assert formatter.format_bytes(mock_file_event_log_record) == formatter.format(
+            mock_file_event_log_record
+        ).encode("utf-8")
+
 
 class TestFileEventDictToRawJSONFormatter:
     def test_format_returns_expected_number_of_fields(self, mock_file_event_log_record):
@@ -526,6 +532,13 @@ class TestFileEventDictToRawJSONFormatter:
             file_event_dict["actor"] is None
         )  # actor happens to be null in this case.
 
+    def test_format_bytes_returns_utf8_encoded_format(self, mock_file_event_log_record):
+        formatter = FileEventDictToRawJSONFormatter()
+        mock_file_event_log_record.msg["fileName"] = "résumé.pdf"
+        assert formatter.format_bytes(mock_file_event_log_record) == formatter.format(
+            mock_file_event_log_record
+        ).encode("utf-8")
+
 
 def get_cef_parts(cef_str):
     return cef_str.split("|")
@@ -1,4 +1,6 @@
+import logging
 import ssl
+import time
 from socket import IPPROTO_TCP
 from socket import IPPROTO_UDP
 from socket import SOCK_DGRAM
@@ -9,7 +11,11 @@ from socket import SocketKind
 import pytest
 
 from code42cli.logger import FileEventDictToRawJSONFormatter
+from code42cli.logger.enums import MessageFraming
 from code42cli.logger.enums import ServerProtocol
+from code42cli.logger.handlers import BatchingSysLogHandler
+from code42cli.logger.handlers import FanOutHandler
+from code42cli.logger.handlers import MAX_RECONNECT_ATTEMPTS
 from code42cli.logger.handlers import NoPrioritySysLogHandler
 from code42cli.logger.handlers import SyslogServerNetworkConnectionError
 
@@ -255,3 +261,205 @@ class TestNoPrioritySysLogHandler:
         handler.connect_socket()
         handler.close()
         assert global_close.call_count == 1
+
+
+def _create_log_record(msg):
+    return logging.LogRecord("test", logging.INFO, __file__, 1, msg, None, None)
+
+
+class TestBatchingSysLogHandler:
+    @pytest.fixture(autouse=True)
+    def mock_sleep(self, mocker):
+        return mocker.patch("code42cli.logger.handlers.sleep")
+
+    @pytest.fixture
+    def mock_create_socket(self, mocker):
+        # avoids resolving the test host
+        return mocker.patch.object(BatchingSysLogHandler, "_create_socket")
+
+    def _create_handler(self, mocker, protocol=ServerProtocol.TCP, **kwargs):
+        handler = BatchingSysLogHandler(
+            _TEST_HOST, _TEST_PORT, protocol, None, **kwargs
+        )
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        handler.socket = mocker.MagicMock(spec=ssl.SSLSocket)
+        return handler
+
+    def test_emit_holds_messages_until_batch_is_full(self, mocker):
+        handler = self._create_handler(mocker, max_batch_bytes=10, max_batch_latency=60)
+        handler.handle(_create_log_record("abcd"))
+        assert not handler.socket.sendall.call_count
+        handler.handle(_create_log_record("efgh"))
+        handler.socket.sendall.assert_called_once_with(b"abcd\nefgh\n")
+
+    def test_emit_when_formatter_formats_bytes_sends_them(self, mocker):
+        handler = self._create_handler(mocker, max_batch_bytes=0)
+        handler.setFormatter(FileEventDictToRawJSONFormatter())
+        mock_format = mocker.spy(handler.formatter, "format")
+        record = logging.LogRecord("test", logging.INFO, "", 0, {"a": "é"}, None, None)
+        handler.handle(record)
+        handler.socket.sendall.assert_called_once_with(b'{"a": "\\u00e9"}\n')
+        assert not mock_format.call_count
+
+    def test_emit_when_max_batch_bytes_is_zero_sends_each_message(self, mocker):
+        handler = self._create_handler(mocker, max_batch_bytes=0)
+        handler.handle(_create_log_record("abcd"))
+        handler.socket.sendall.assert_called_once_with(b"abcd\n")
+
+    def test_emit_when_octet_counting_prefixes_messages_with_their_length(self, mocker):
+        handler = self._create_handler(
+            mocker, framing=MessageFraming.OCTET_COUNTING, max_batch_latency=60
+        )
+        handler.handle(_create_log_record("abcd"))
+        handler.handle(_create_log_record("\u00e9"))
+        handler.flush()
+        handler.socket.sendall.assert_called_once_with(b"4 abcd2 \xc3\xa9")
+
+    def test_emit_when_udp_sends_each_message(self, mocker):
+        handler = self._create_handler(mocker, protocol=ServerProtocol.UDP)
+        handler.handle(_create_log_record("abcd"))
+        handler.socket.sendto.assert_called_once_with(
+            b"abcd\n", (_TEST_HOST, _TEST_PORT)
+        )
+
+    def test_pending_messages_are_sent_after_max_batch_latency(self, mocker):
+        handler = self._create_handler(mocker, max_batch_latency=0.05)
+        handler.handle(_create_log_record("abcd"))
+        deadline = time.monotonic() + 5
+        while not handler.socket.sendall.call_count and time.monotonic() < deadline:
+            time.sleep(0.01)
+        handler.socket.sendall.assert_called_once_with(b"abcd\n")
+        handler.close()
+
+    def test_flush_when_connection_breaks_reconnects_and_sends_batch_again(
+        self, mocker, mock_create_socket
+    ):
+        handler = self._create_handler(mocker, max_batch_latency=60)
+        broken_socket = handler.socket
+        broken_socket.sendall.side_effect = BrokenPipeError()
+        new_socket = mocker.MagicMock(spec=ssl.SSLSocket)
+        mock_create_socket.return_value = new_socket
+        handler.handle(_create_log_record("abcd"))
+        handler.handle(_create_log_record("efgh"))
+        handler.flush()
+        assert broken_socket.close.call_count == 1
+        new_socket.sendall.assert_called_once_with(b"abcd\nefgh\n")
+
+    def test_flush_when_reconnecting_keeps_failing_raises_network_error(
+        self, mocker, mock_create_socket, mock_sleep
+    ):
+        handler = self._create_handler(mocker, max_batch_latency=60)
+        handler.socket.sendall.side_effect = ConnectionResetError()
+        mock_create_socket.side_effect = ConnectionRefusedError()
+        handler.handle(_create_log_record("abcd"))
+        with pytest.raises(SyslogServerNetworkConnectionError):
+            handler.flush()
+        assert mock_sleep.call_count == MAX_RECONNECT_ATTEMPTS
+        # nothing is reported as sent once the connection is lost for good
+        with pytest.raises(SyslogServerNetworkConnectionError):
+            handler.flush()
+
+    def test_close_sends_pending_messages(self, mocker):
+        handler = self._create_handler(mocker, max_batch_latency=60)
+        sock = handler.socket
+        handler.handle(_create_log_record("abcd"))
+        handler.close()
+        sock.sendall.assert_called_once_with(b"abcd\n")
+        assert sock.close.call_count == 1
+
+
+class _RecordingHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+        self.closed = False
+
+    def emit(self, record):
+        self.messages.append(self.format(record))
+
+    def close(self):
+        self.closed = True
+        super().close()
+
+
+class _FailingHandler(logging.Handler):
+    def emit(self, record):
+        raise SyslogServerNetworkConnectionError()
+
+    def handleError(self, record):
+        raise
+
+
+class TestFanOutHandler:
+    def test_emit_sends_message_to_each_handler(self):
+        formatter = logging.Formatter("%(message)s!")
+        first = _RecordingHandler()
+        second = _RecordingHandler()
+        handler = FanOutHandler([(formatter, first), (formatter, second)])
+        handler.handle(_create_log_record("abcd"))
+        handler.flush()
+        assert first.messages == ["abcd!"]
+        assert second.messages == ["abcd!"]
+
+    def test_emit_formats_message_once_per_formatter(self, mocker):
+        json_formatter = logging.Formatter("json %(message)s")
+        cef_formatter = logging.Formatter("cef %(message)s")
+        json_format = mocker.spy(json_formatter, "format")
+        cef_format = mocker.spy(cef_formatter, "format")
+        json_handlers = [_RecordingHandler(), _RecordingHandler()]
+        cef_handler = _RecordingHandler()
+        handler = FanOutHandler(
+            [
+                (json_formatter, json_handlers[0]),
+                (cef_formatter, cef_handler),
+                (json_formatter, json_handlers[1]),
+            ]
+        )
+        handler.handle(_create_log_record("abcd"))
+        handler.flush()
+        assert json_format.call_count == 1
+        assert cef_format.call_count == 1
+        assert [h.messages for h in json_handlers] == [["json abcd"], ["json abcd"]]
+        assert cef_handler.messages == ["cef abcd"]
+
+    def test_emit_keeps_message_order(self):
+        recording_handler = _RecordingHandler()
+        handler = FanOutHandler([(logging.Formatter("%(message)s"), recording_handler)])
+        for msg in ("a", "b", "c"):
+            handler.handle(_create_log_record(msg))
+        handler.flush()
+        assert recording_handler.messages == ["a", "b", "c"]
+
+    def test_flush_when_a_handler_fails_raises_error_and_still_sends_to_others(self):
+        formatter = logging.Formatter("%(message)s")
+        recording_handler = _RecordingHandler()
+        handler = FanOutHandler(
+            [(formatter, _FailingHandler()), (formatter, recording_handler)]
+        )
+        handler.handle(_create_log_record("abcd"))
+        with pytest.raises(SyslogServerNetworkConnectionError):
+            handler.flush()
+        assert recording_handler.messages == ["abcd"]
+
+    def test_emit_after_a_handler_fails_raises_error(self):
+        handler = FanOutHandler([(logging.Formatter("%(message)s"), _FailingHandler())])
+        handler.handle(_create_log_record("abcd"))
+        with pytest.raises(SyslogServerNetworkConnectionError):
+            handler.flush()
+        with pytest.raises(SyslogServerNetworkConnectionError):
+            handler.handle(_create_log_record("efgh"))
+
+    def test_close_sends_queued_messages_and_closes_handlers(self):
+        recording_handler = _RecordingHandler()
+        handler = FanOutHandler([(logging.Formatter("%(message)s"), recording_handler)])
+        handler.handle(_create_log_record("abcd"))
+        handler.close()
+        assert recording_handler.messages == ["abcd"]
+        assert recording_handler.closed
+
+    def test_handlers_returns_each_handler(self):
+        formatter = logging.Formatter("%(message)s")
+        first = _RecordingHandler()
+        second = _RecordingHandler()
+        handler = FanOutHandler([(formatter, first), (formatter, second)])
+        assert handler.handlers == [first, second]
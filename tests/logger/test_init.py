@@ -10,19 +10,22 @@ from code42cli.enums import SendToFileEventsOutputFormat
 from code42cli.logger import add_handler_to_logger
 from code42cli.logger import CliLogger
 from code42cli.logger import get_logger_for_server
+from code42cli.logger import get_logger_for_servers
 from code42cli.logger import get_view_error_details_message
 from code42cli.logger import logger_has_handlers
+from code42cli.logger import SyslogServer
 from code42cli.logger.enums import ServerProtocol
 from code42cli.logger.formatters import FileEventDictToCEFFormatter
 from code42cli.logger.formatters import FileEventDictToJSONFormatter
 from code42cli.logger.formatters import FileEventDictToRawJSONFormatter
+from code42cli.logger.handlers import FanOutHandler
 from code42cli.logger.handlers import NoPrioritySysLogHandler
 from code42cli.util import get_user_project_path
 
 
 @pytest.fixture(autouse=True)
 def init_socket_mock(mocker):
-    return mocker.patch("code42cli.logger.NoPrioritySysLogHandler.connect_socket")
+    return mocker.patch("code42cli.logger.BatchingSysLogHandler.connect_socket")
 
 
 @pytest.fixture(autouse=True)
@@ -149,6 +152,107 @@ def test_get_logger_for_server_inits_socket(init_socket_mock):
     assert init_socket_mock.call_count == 1
 
 
+@pytest.fixture
+def fresh_fan_out_logger():
+    logger = logging.getLogger("code42_syslog_fan_out")
+    logger.handlers = []
+    yield
+    logger.handlers = []
+
+
+def _get_fan_out_servers():
+    return [
+        SyslogServer("example.com", ServerProtocol.TCP, OutputFormat.JSON, None),
+        SyslogServer(
+            "example.org:999", ServerProtocol.TLS_TCP, OutputFormat.JSON, "ignore"
+        ),
+        SyslogServer(
+            "example.net", ServerProtocol.UDP, SendToFileEventsOutputFormat.CEF, None
+        ),
+    ]
+
+
+@pytest.mark.usefixtures("fresh_fan_out_logger")
+class TestGetLoggerForServers:
+    def test_adds_one_fan_out_handler_with_a_handler_per_server(self):
+        logger = get_logger_for_servers(_get_fan_out_servers())
+        assert logger.level == logging.INFO
+        assert len(logger.handlers) == 1
+        assert isinstance(logger.handlers[0], FanOutHandler)
+        assert len(logger.handlers[0].handlers) == 3
+
+    def test_connects_each_server(self, init_socket_mock):
+        get_logger_for_servers(_get_fan_out_servers())
+        assert init_socket_mock.call_count == 3
+
+    def test_constructs_handlers_with_expected_args(self, mocker):
+        batching_handler = mocker.patch(
+            "code42cli.logger.handlers.BatchingSysLogHandler.__init__"
+        )
+        batching_handler.return_value = None
+        mocker.patch(
+            "code42cli.logger.handlers.FanOutHandler.__init__"
+        ).return_value = None
+        get_logger_for_servers(
+            _get_fan_out_servers(), max_batch_bytes=1024, max_batch_latency=0.5
+        )
+        batch_args = {"max_batch_bytes": 1024, "max_batch_latency": 0.5}
+        assert batching_handler.call_args_list == [
+            mocker.call(
+                "example.com",
+                514,
+                ServerProtocol.TCP,
+                None,
+                framing="NEWLINE",
+                **batch_args,
+            ),
+            mocker.call(
+                "example.org",
+                999,
+                ServerProtocol.TLS_TCP,
+                "ignore",
+                framing="NEWLINE",
+                **batch_args,
+            ),
+            mocker.call(
+                "example.net",
+                514,
+                ServerProtocol.UDP,
+                None,
+                framing="NEWLINE",
+                **batch_args,
+            ),
+        ]
+
+    def test_shares_formatters_between_servers_with_the_same_format(self, mocker):
+        fan_out_handler = mocker.patch(
+            "code42cli.logger.handlers.FanOutHandler.__init__"
+        )
+        fan_out_handler.return_value = None
+        get_logger_for_servers(_get_fan_out_servers())
+        destinations = fan_out_handler.call_args[0][0]
+        formatters = [formatter for formatter, _ in destinations]
+        assert formatters[0] is formatters[1]
+        assert isinstance(formatters[0], FileEventDictToJSONFormatter)
+        assert isinstance(formatters[2], FileEventDictToCEFFormatter)
+
+    def test_when_a_server_fails_to_connect_closes_each_handler_and_raises(
+        self, mocker, init_socket_mock
+    ):
+        def connect(*args):
+            if init_socket_mock.call_count == 2:
+                raise ConnectionRefusedError()
+
+        init_socket_mock.side_effect = connect
+        mock_close = mocker.patch(
+            "code42cli.logger.handlers.BatchingSysLogHandler.close"
+        )
+        with pytest.raises(ConnectionRefusedError):
+            get_logger_for_servers(_get_fan_out_servers())
+        assert mock_close.call_count == 2
+        assert not logging.getLogger("code42_syslog_fan_out").handlers
+
+
 class TestCliLogger:
     def test_init_creates_user_error_logger_with_expected_handlers(self):
         logger = CliLogger()
@@ -1,12 +1,23 @@
+import os
+import threading
 from collections import OrderedDict
+from time import time
 
 import pytest
+from py42.exceptions import Py42HTTPError
+from requests import HTTPError
+from requests import Response
 
 from code42cli import errors
 from code42cli import PRODUCT_NAME
+from code42cli.bulk import BulkJournal
 from code42cli.bulk import BulkProcessor
 from code42cli.bulk import generate_template_cmd_factory
+from code42cli.bulk import get_rows_fingerprint
+from code42cli.bulk import JOURNAL_MAX_AGE
+from code42cli.bulk import RowBatcher
 from code42cli.bulk import run_bulk_process
+from code42cli.errors import Code42CLIError
 from code42cli.logger import get_view_error_details_message
 
 _NAMESPACE = f"{PRODUCT_NAME}.bulk"
@@ -78,10 +89,108 @@ def test_run_bulk_process_creates_processor(bulk_processor_factory):
     rows = [1, 2]
     run_bulk_process(func_with_one_arg, rows)
     bulk_processor_factory.assert_called_once_with(
-        func_with_one_arg, rows, None, stats=None, raise_global_error=True
+        func_with_one_arg,
+        rows,
+        None,
+        stats=None,
+        raise_global_error=True,
+        max_workers=None,
+        journal=None,
+        rate_limit=None,
+        batcher=None,
     )
 
 
+def test_run_bulk_process_passes_max_workers_to_processor(bulk_processor_factory):
+    errors.ERRORED = False
+    rows = [1, 2]
+    run_bulk_process(func_with_one_arg, rows, max_workers=10)
+    assert bulk_processor_factory.call_args[1]["max_workers"] == 10
+
+
+class TestBulkJournal:
+    def test_record_buffers_outcomes_until_flush_size_reached(self, bulk_jobs_dir):
+        journal = BulkJournal("job", flush_size=2)
+        journal.record(0, True)
+        assert not (bulk_jobs_dir / "job").exists()
+        journal.record(1, False)
+        assert (bulk_jobs_dir / "job").read_text() == "0,succeeded\n1,failed\n"
+
+    def test_flush_writes_buffered_outcomes(self, bulk_jobs_dir):
+        journal = BulkJournal("job")
+        journal.record(0, True)
+        journal.flush()
+        assert (bulk_jobs_dir / "job").read_text() == "0,succeeded\n"
+
+    def test_get_succeeded_rows_returns_only_succeeded_indices(self, bulk_jobs_dir):
+        (bulk_jobs_dir / "job").write_text("0,succeeded\n1,failed\n2,succeeded\n3,su")
+        assert BulkJournal("job").get_succeeded_rows() == {0, 2}
+
+    def test_get_succeeded_rows_when_no_journal_file_returns_empty_set(self):
+        assert BulkJournal("job").get_succeeded_rows() == set()
+
+    def test_resume_when_job_does_not_exist_raises_cli_error(self):
+        with pytest.raises(Code42CLIError) as err:
+            BulkJournal.resume("missing")
+        assert err.value.message == "No bulk job with ID 'missing' exists."
+
+    def test_resume_when_job_exists_returns_journal_for_job(self, bulk_jobs_dir):
+        (bulk_jobs_dir / "job").write_text("0,succeeded\n")
+        assert BulkJournal.resume("job").job_id == "job"
+
+    def test_check_fingerprint_when_job_new_writes_fingerprint_first(
+        self, bulk_jobs_dir
+    ):
+        journal = BulkJournal("job")
+        journal.record(0, True)
+        journal.check_fingerprint("abc")
+        journal.flush()
+        assert (bulk_jobs_dir / "job").read_text() == "fingerprint,abc\n0,succeeded\n"
+
+    def test_check_fingerprint_when_fingerprint_matches_does_not_raise(
+        self, bulk_jobs_dir
+    ):
+        (bulk_jobs_dir / "job").write_text("fingerprint,abc\n0,succeeded\n")
+        journal = BulkJournal.resume("job")
+        journal.check_fingerprint("abc")
+        assert journal.get_succeeded_rows() == {0}
+
+    @pytest.mark.parametrize(
+        "contents", ["fingerprint,abc\n0,succeeded\n", "0,succeeded\n"]
+    )
+    def test_check_fingerprint_when_fingerprint_differs_raises_cli_error(
+        self, bulk_jobs_dir, contents
+    ):
+        (bulk_jobs_dir / "job").write_text(contents)
+        with pytest.raises(Code42CLIError):
+            BulkJournal.resume("job").check_fingerprint("def")
+
+    def test_prune_removes_only_other_expired_journals(
+        self, mocker, bulk_jobs_dir, mock_remove
+    ):
+        for job_id in ["job", "old", "new"]:
+            (bulk_jobs_dir / job_id).write_text("0,succeeded\n")
+        expired = time() - JOURNAL_MAX_AGE - 1
+        os.utime(bulk_jobs_dir / "job", (expired, expired))
+        os.utime(bulk_jobs_dir / "old", (expired, expired))
+        mocker.patch("os.listdir", return_value=["job", "old", "new"])
+        BulkJournal("job").prune()
+        mock_remove.assert_called_once_with(str(bulk_jobs_dir / "old"))
+
+
+class TestGetRowsFingerprint:
+    def test_when_rows_differ_returns_different_fingerprints(self):
+        assert get_rows_fingerprint([{"a": "1"}]) != get_rows_fingerprint([{"a": "2"}])
+
+    def test_when_rows_same_returns_same_fingerprint(self):
+        assert get_rows_fingerprint([{"a": "1"}]) == get_rows_fingerprint([{"a": "1"}])
+
+    def test_when_rows_have_fingerprint_uses_it(self, mocker):
+        rows = mocker.MagicMock()
+        rows.fingerprint.return_value = "abc"
+        assert get_rows_fingerprint(rows) == "abc"
+
+
 class TestBulkProcessor:
     def test_run_when_reader_returns_ordered_dict_process_kwargs(self):
         processed_rows = []
@@ -179,6 +288,41 @@ class TestBulkProcessor:
         assert (None, "foo") in processed_rows
         assert ("bar", None) in processed_rows
 
+    def test_run_when_max_workers_given_uses_that_many_threads(self):
+        thread_names = set()
+        barrier = threading.Barrier(3, timeout=5)
+
+        def func_for_bulk(test):
+            thread_names.add(threading.current_thread().name)
+            barrier.wait()
+
+        rows = [{"test": "row1"}, {"test": "row2"}, {"test": "row3"}]
+        processor = BulkProcessor(func_for_bulk, rows, max_workers=3)
+        processor.run()
+        assert len(thread_names) == 3
+
+    def test_run_reports_throughput_and_latency_to_stderr(self, capsys):
+        def func_for_bulk(test):
+            pass
+
+        rows = [{"test": "row1"}, {"test": "row2"}]
+        processor = BulkProcessor(func_for_bulk, rows)
+        processor.run()
+        output = capsys.readouterr()
+        assert "Processed 2 in" in output.err
+        assert "p99:" in output.err
+
+    def test_run_when_called_twice_in_same_process_does_not_share_stats(self):
+        def func_for_bulk(test):
+            return test
+
+        first = BulkProcessor(func_for_bulk, [{"test": "row1"}])
+        second = BulkProcessor(func_for_bulk, [{"test": "row2"}, {"test": "row3"}])
+        assert first.run() == ["row1"]
+        assert sorted(second.run()) == ["row2", "row3"]
+        assert first._stats.total_processed == 1
+        assert second._stats.total_processed == 2
+
     def test_processor_stores_results_in_stats(
         self,
     ):
@@ -191,3 +335,218 @@ class TestBulkProcessor:
         assert "row1" in processor._stats.results
         assert "row2" in processor._stats.results
         assert "row3" in processor._stats.results
+
+    def test_run_when_journal_given_skips_rows_that_already_succeeded(
+        self, bulk_jobs_dir
+    ):
+        processed_rows = []
+
+        def func_for_bulk(test):
+            processed_rows.append(test)
+
+        rows = [{"test": "row1"}, {"test": "row2"}, {"test": "row3"}]
+        (bulk_jobs_dir / "job").write_text(
+            f"fingerprint,{get_rows_fingerprint(rows)}\n0,succeeded\n1,failed\n"
+        )
+        processor = BulkProcessor(func_for_bulk, rows, journal=BulkJournal("job"))
+        processor.run()
+        assert sorted(processed_rows) == ["row2", "row3"]
+
+    def test_run_when_journal_started_with_different_rows_raises_cli_error(
+        self, bulk_jobs_dir
+    ):
+        rows = [{"test": "row1"}, {"test": "row2"}]
+        (bulk_jobs_dir / "job").write_text(
+            f"fingerprint,{get_rows_fingerprint(rows)}\n0,succeeded\n"
+        )
+        edited_rows = [{"test": "row2"}, {"test": "row1"}]
+        with pytest.raises(Code42CLIError) as err:
+            BulkProcessor(lambda test: None, edited_rows, journal=BulkJournal("job"))
+        assert "was started with a different file" in err.value.message
+
+    def test_run_when_journal_given_prunes_expired_journals(self, mocker):
+        journal = mocker.MagicMock(spec=BulkJournal("job"))
+        journal.get_succeeded_rows.return_value = set()
+        processor = BulkProcessor(
+            lambda test: None, [{"test": "row1"}], journal=journal
+        )
+        processor.run()
+        assert journal.prune.call_count == 1
+
+    def test_run_when_journal_given_and_no_errors_deletes_journal(self, mocker):
+        journal = mocker.MagicMock(spec=BulkJournal("job"))
+        journal.get_succeeded_rows.return_value = set()
+
+        def func_for_bulk(test):
+            pass
+
+        processor = BulkProcessor(func_for_bulk, [{"test": "row1"}], journal=journal)
+        processor.run()
+        journal.record.assert_called_once_with(0, True)
+        assert journal.delete.call_count == 1
+
+    def test_run_when_journal_given_and_row_fails_records_failure_and_keeps_journal(
+        self, mocker
+    ):
+        journal = mocker.MagicMock(spec=BulkJournal("job"))
+        journal.get_succeeded_rows.return_value = set()
+
+        def func_for_bulk(test):
+            raise Exception()
+
+        processor = BulkProcessor(func_for_bulk, [{"test": "row1"}], journal=journal)
+        with pytest.raises(errors.LoggedCLIError):
+            processor.run()
+        journal.record.assert_called_once_with(0, False)
+        assert journal.flush.call_count == 1
+        assert journal.delete.call_count == 0
+
+    def test_run_when_journal_given_and_handler_reports_error_records_failure(
+        self, mocker
+    ):
+        journal = mocker.MagicMock(spec=BulkJournal("job"))
+        journal.get_succeeded_rows.return_value = set()
+        processor = None
+
+        def func_for_bulk(test):
+            processor._stats.increment_total_errors()
+
+        processor = BulkProcessor(
+            func_for_bulk, [{"test": "row1"}], journal=journal, raise_global_error=False
+        )
+        processor.run()
+        journal.record.assert_called_once_with(0, False)
+
+    def test_run_when_batcher_given_handles_rows_with_same_key_in_batches(self):
+        batches = []
+        processed_rows = []
+
+        def func_for_bulk(test, group):
+            processed_rows.append(test)
+
+        def handle_batch(key, rows):
+            batches.append((key, [row["test"] for row in rows]))
+
+        batcher = RowBatcher(handle_batch, lambda test, group: group, size=2)
+        rows = [
+            {"test": "row1", "group": "a"},
+            {"test": "row2", "group": "b"},
+            {"test": "row3", "group": "a"},
+            {"test": "row4", "group": ""},
+            {"test": "row5", "group": "a"},
+        ]
+        processor = BulkProcessor(func_for_bulk, rows, batcher=batcher)
+        processor.run()
+        assert sorted(batches) == [
+            ("a", ["row1", "row3"]),
+            ("a", ["row5"]),
+            ("b", ["row2"]),
+        ]
+        assert processed_rows == ["row4"]
+        assert processor._stats.total_processed == 5
+
+    def test_run_when_batch_fails_retries_each_row_and_counts_only_failed_rows(
+        self, mocker
+    ):
+        journal = mocker.MagicMock(spec=BulkJournal("job"))
+        journal.get_succeeded_rows.return_value = set()
+        processed_rows = []
+
+        def func_for_bulk(test):
+            if test == "row2":
+                raise Exception()
+            processed_rows.append(test)
+
+        def handle_batch(key, rows):
+            raise Exception()
+
+        batcher = RowBatcher(handle_batch, lambda test: "key")
+        rows = [{"test": "row1"}, {"test": "row2"}, {"test": "row3"}]
+        processor = BulkProcessor(
+            func_for_bulk,
+            rows,
+            batcher=batcher,
+            journal=journal,
+            raise_global_error=False,
+        )
+        processor.run()
+        assert processed_rows == ["row1", "row3"]
+        assert processor._stats.total_errors == 1
+        assert processor._stats.total_processed == 3
+        journal.record.assert_any_call(0, True)
+        journal.record.assert_any_call(1, False)
+        journal.record.assert_any_call(2, True)
+
+    def test_run_when_batch_throttled_retries_batch_without_resolving_again(
+        self, mocker
+    ):
+        mocker.patch("code42cli.worker.sleep")
+        response = mocker.MagicMock(spec=Response)
+        response.status_code = 429
+        response.headers = {}
+        http_error = mocker.MagicMock(spec=HTTPError)
+        http_error.response = response
+        batches = []
+        resolve = mocker.MagicMock(side_effect=lambda test: test.upper())
+
+        def handle_batch(key, rows):
+            batches.append(rows)
+            if len(batches) == 1:
+                raise Py42HTTPError(http_error)
+
+        batcher = RowBatcher(handle_batch, lambda test: "key", resolve=resolve)
+        processor = BulkProcessor(None, [{"test": "a"}, {"test": "b"}], batcher=batcher)
+        processor.run()
+        assert batches == [["A", "B"], ["A", "B"]]
+        assert resolve.call_count == 2
+        assert processor._stats.total_errors == 0
+
+    def test_run_when_row_cannot_be_resolved_fails_only_that_row(self, mocker):
+        journal = mocker.MagicMock(spec=BulkJournal("job"))
+        journal.get_succeeded_rows.return_value = set()
+        batches = []
+
+        def resolve(test):
+            if test == "unknown":
+                raise Code42CLIError("unknown row")
+            return test.upper()
+
+        batcher = RowBatcher(
+            lambda key, rows: batches.append(rows), lambda test: "key", resolve=resolve
+        )
+        rows = [{"test": "a"}, {"test": "unknown"}, {"test": "b"}]
+        processor = BulkProcessor(
+            None, rows, batcher=batcher, journal=journal, raise_global_error=False
+        )
+        processor.run()
+        assert batches == [["A", "B"]]
+        assert processor._stats.total_errors == 1
+        journal.record.assert_any_call(1, False)
+        journal.record.assert_any_call(0, True)
+        journal.record.assert_any_call(2, True)
+
+    def test_run_when_row_cannot_be_resolved_and_batch_throttled_too_many_times_counts_each_row_once(
+        self, mocker
+    ):
+        mocker.patch("code42cli.worker.sleep")
+        response = mocker.MagicMock(spec=Response)
+        response.status_code = 429
+        response.headers = {}
+        response.request = None
+        http_error = mocker.MagicMock(spec=HTTPError)
+        http_error.response = response
+
+        def resolve(test):
+            if test == "unknown":
+                raise Code42CLIError("unknown row")
+            return test.upper()
+
+        def handle_batch(key, rows):
+            raise Py42HTTPError(http_error)
+
+        batcher = RowBatcher(handle_batch, lambda test: "key", resolve=resolve)
+        rows = [{"test": "a"}, {"test": "unknown"}, {"test": "b"}]
+        processor = BulkProcessor(None, rows, batcher=batcher, raise_global_error=False)
+        processor.run()
+        assert processor._stats.total_errors == 3
+        assert processor._stats.total_processed == 3
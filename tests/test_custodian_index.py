@@ -0,0 +1,236 @@
+import os
+import stat
+import threading
+import time
+
+import pytest
+from tests.conftest import create_mock_profile
+from tests.conftest import create_mock_response
+
+from code42cli.custodian_index import build_custodian_index
+from code42cli.custodian_index import CustodianIndexCache
+from code42cli.custodian_index import get_cache_ttl
+from code42cli.custodian_index import get_custodian_index
+from code42cli.custodian_index import get_legal_hold_membership_dataframe
+from code42cli.custodian_index import LEGAL_HOLD_CACHE_TTL_ENV_VAR
+from code42cli.errors import Code42CLIError
+
+MATTERS = [
+    {"legalHoldUid": "111", "name": "Matter 1"},
+    {"legalHoldUid": "222", "name": "Matter 2"},
+    {"legalHoldUid": "333", "name": "Matter 3"},
+]
+CUSTODIANS = {
+    "111": ["user-a", "user-b"],
+    "222": [],
+    "333": ["user-a"],
+}
+EXPECTED_INDEX = {
+    "user-a": [("111", "Matter 1"), ("333", "Matter 3")],
+    "user-b": [("111", "Matter 1")],
+}
+
+
+def _create_membership(matter, user_uid):
+    return {
+        "legalHold": {"legalHoldUid": matter["legalHoldUid"], "name": matter["name"]},
+        "user": {"userUid": user_uid, "username": f"{user_uid}@example.com"},
+    }
+
+
+def _get_memberships(legal_hold_uid):
+    matter = next(m for m in MATTERS if m["legalHoldUid"] == legal_hold_uid)
+    return [_create_membership(matter, uid) for uid in CUSTODIANS[legal_hold_uid]]
+
+
+@pytest.fixture
+def legal_hold_sdk(mocker, sdk):
+    def get_all_matters(active):
+        yield create_mock_response(mocker, data={"legalHolds": MATTERS})
+
+    def get_all_matter_custodians(legal_hold_uid, active):
+        memberships = _get_memberships(legal_hold_uid)
+        yield create_mock_response(mocker, data={"legalHoldMemberships": memberships})
+
+    sdk._auth_flag = None
+    sdk.legalhold.get_all_matters.side_effect = get_all_matters
+    sdk.legalhold.get_all_matter_custodians.side_effect = get_all_matter_custodians
+    return sdk
+
+
+@pytest.fixture
+def api_client_legal_hold_sdk(mocker, sdk):
+    def get_all_matters(active):
+        yield create_mock_response(mocker, data=MATTERS)
+
+    def get_all_matter_custodians(legal_hold_matter_uid, active):
+        yield create_mock_response(mocker, data=_get_memberships(legal_hold_matter_uid))
+
+    sdk._auth_flag = 1
+    sdk.legalhold.get_all_matters.side_effect = get_all_matters
+    sdk.legalhold.get_all_matter_custodians.side_effect = get_all_matter_custodians
+    return sdk
+
+
+@pytest.fixture
+def cache_enabled(mocker):
+    mocker.patch.dict("os.environ", {LEGAL_HOLD_CACHE_TTL_ENV_VAR: "300"})
+
+
+def test_get_cache_ttl_when_env_var_not_set_returns_zero(mocker):
+    mocker.patch.dict("os.environ", {LEGAL_HOLD_CACHE_TTL_ENV_VAR: ""})
+    assert get_cache_ttl() == 0
+
+
+def test_get_cache_ttl_returns_seconds_from_env_var(mocker):
+    mocker.patch.dict("os.environ", {LEGAL_HOLD_CACHE_TTL_ENV_VAR: "90"})
+    assert get_cache_ttl() == 90
+
+
+@pytest.mark.parametrize("value", ["soon", "-1"])
+def test_get_cache_ttl_when_env_var_invalid_raises_error(mocker, value):
+    mocker.patch.dict("os.environ", {LEGAL_HOLD_CACHE_TTL_ENV_VAR: value})
+    with pytest.raises(Code42CLIError):
+        get_cache_ttl()
+
+
+def test_build_custodian_index_indexes_holds_by_user_uid_in_matter_order(
+    legal_hold_sdk,
+):
+    assert build_custodian_index(legal_hold_sdk) == EXPECTED_INDEX
+
+
+def test_build_custodian_index_when_api_client_indexes_holds_by_user_uid(
+    api_client_legal_hold_sdk,
+):
+    assert build_custodian_index(api_client_legal_hold_sdk) == EXPECTED_INDEX
+
+
+def test_build_custodian_index_gets_only_active_custodians(legal_hold_sdk):
+    build_custodian_index(legal_hold_sdk)
+    legal_hold_sdk.legalhold.get_all_matters.assert_called_once_with(active=True)
+    for call in legal_hold_sdk.legalhold.get_all_matter_custodians.call_args_list:
+        assert call.kwargs["active"] is True
+
+
+def test_build_custodian_index_gets_custodians_of_matters_concurrently(
+    legal_hold_sdk,
+):
+    lock = threading.Lock()
+    running = [0]
+    max_running = [0]
+    get_all_matter_custodians = (
+        legal_hold_sdk.legalhold.get_all_matter_custodians.side_effect
+    )
+
+    def slow_get_all_matter_custodians(legal_hold_uid, active):
+        with lock:
+            running[0] += 1
+            max_running[0] = max(max_running[0], running[0])
+        time.sleep(0.05)
+        with lock:
+            running[0] -= 1
+        return list(get_all_matter_custodians(legal_hold_uid, active))
+
+    legal_hold_sdk.legalhold.get_all_matter_custodians.side_effect = (
+        slow_get_all_matter_custodians
+    )
+    assert build_custodian_index(legal_hold_sdk, max_workers=3) == EXPECTED_INDEX
+    assert max_running[0] > 1
+
+
+def test_build_custodian_index_when_no_matters_returns_empty_index(mocker, sdk):
+    sdk._auth_flag = None
+    sdk.legalhold.get_all_matters.return_value = iter(
+        [create_mock_response(mocker, data={"legalHolds": []})]
+    )
+    assert build_custodian_index(sdk) == {}
+
+
+def test_get_legal_hold_membership_dataframe_joins_holds_of_each_user():
+    df = get_legal_hold_membership_dataframe(EXPECTED_INDEX)
+    assert df.loc["user-a", "legalHoldUid"] == "111,333"
+    assert df.loc["user-a", "legalHoldName"] == "Matter 1,Matter 3"
+    assert df.loc["user-b", "legalHoldUid"] == "111"
+
+
+def test_get_legal_hold_membership_dataframe_when_index_empty_returns_empty_dataframe():
+    df = get_legal_hold_membership_dataframe({})
+    assert df.empty
+    assert list(df.columns) == ["legalHoldUid", "legalHoldName"]
+
+
+def test_custodian_index_cache_get_returns_index_that_was_set():
+    CustodianIndexCache("profile", "example.com", "user", ttl=300).set(EXPECTED_INDEX)
+    cache = CustodianIndexCache("profile", "example.com", "user", ttl=300)
+    assert cache.get() == EXPECTED_INDEX
+
+
+def test_custodian_index_cache_get_when_nothing_cached_returns_none():
+    assert CustodianIndexCache("profile", "example.com", "user").get() is None
+
+
+def test_custodian_index_cache_get_when_expired_returns_none(mocker):
+    cache = CustodianIndexCache("profile", "example.com", "user", ttl=300)
+    cache.set(EXPECTED_INDEX)
+    mocker.patch("code42cli.custodian_index.time", return_value=time.time() + 301)
+    assert cache.get() is None
+
+
+def test_custodian_index_cache_get_when_file_corrupt_returns_none():
+    cache = CustodianIndexCache("profile", "example.com", "user", ttl=300)
+    cache.set(EXPECTED_INDEX)
+    with open(cache.location, "w") as cache_file:
+        cache_file.write("{not json")
+    assert cache.get() is None
+
+
+def test_custodian_index_cache_keys_index_by_profile_server_and_user():
+    CustodianIndexCache("profile", "example.com", "user", ttl=300).set(EXPECTED_INDEX)
+    for identity in [
+        ("other", "example.com", "user"),
+        ("profile", "other.example.com", "user"),
+        ("profile", "example.com", "other"),
+    ]:
+        assert CustodianIndexCache(*identity, ttl=300).get() is None
+
+
+@pytest.mark.skipif(os.name == "nt", reason="POSIX file permissions")
+def test_custodian_index_cache_set_restricts_permissions_to_user():
+    cache = CustodianIndexCache("profile", "example.com", "user", ttl=300)
+    cache.set(EXPECTED_INDEX)
+    assert stat.S_IMODE(os.stat(cache.location).st_mode) == 0o600
+
+
+def test_custodian_index_cache_delete_removes_file(mock_remove):
+    cache = CustodianIndexCache("profile", "example.com", "user")
+    cache.delete()
+    mock_remove.assert_called_once_with(cache.location)
+
+
+def test_get_custodian_index_when_cache_disabled_does_not_cache(legal_hold_sdk):
+    profile = create_mock_profile()
+    get_custodian_index(legal_hold_sdk, profile)
+    get_custodian_index(legal_hold_sdk, profile)
+    assert legal_hold_sdk.legalhold.get_all_matters.call_count == 2
+    cache = CustodianIndexCache(
+        profile.name, profile.authority_url, profile.username, ttl=300
+    )
+    assert cache.get() is None
+
+
+def test_get_custodian_index_when_cache_enabled_reuses_cached_index(
+    legal_hold_sdk, cache_enabled
+):
+    profile = create_mock_profile()
+    assert get_custodian_index(legal_hold_sdk, profile) == EXPECTED_INDEX
+    assert get_custodian_index(legal_hold_sdk, profile) == EXPECTED_INDEX
+    assert legal_hold_sdk.legalhold.get_all_matters.call_count == 1
+
+
+def test_get_custodian_index_when_cache_enabled_and_no_profile_does_not_cache(
+    legal_hold_sdk, cache_enabled
+):
+    get_custodian_index(legal_hold_sdk)
+    get_custodian_index(legal_hold_sdk)
+    assert legal_hold_sdk.legalhold.get_all_matters.call_count == 2
@@ -0,0 +1,287 @@
+import io
+import os
+import socket
+import sys
+import tempfile
+from threading import Thread
+
+import click
+import pytest
+from click.testing import CliRunner
+from py42.exceptions import Py42UnauthorizedError
+
+from .conftest import create_mock_profile
+from code42cli.click_ext.groups import ExceptionHandlingGroup
+from code42cli.daemon import create_command_server
+from code42cli.daemon import run_command
+from code42cli.daemon import WarmCLIState
+from code42cli.daemon_client import connect
+from code42cli.daemon_client import run_remote_command
+from code42cli.errors import Code42CLIError
+from code42cli.main import cli
+
+pytestmark = pytest.mark.skipif(
+    not hasattr(socket, "AF_UNIX"), reason="requires Unix domain sockets"
+)
+
+
+@click.group()
+def _test_cli():
+    pass
+
+
+@_test_cli.command()
+def hello():
+    click.echo("hello")
+    click.echo("warning", err=True)
+
+
+@_test_cli.command()
+@click.argument("code", type=int)
+def fail(code):
+    sys.exit(code)
+
+
+@_test_cli.command()
+def error():
+    raise ValueError("test error")
+
+
+@_test_cli.command()
+def confirm():
+    click.confirm("Continue?", abort=True)
+    click.echo("continued")
+
+
+@_test_cli.command()
+def cwd():
+    click.echo(os.getcwd())
+
+
+@_test_cli.command()
+@click.pass_obj
+def state(state):
+    click.echo(type(state).__name__)
+
+
+@_test_cli.group()
+def events():
+    pass
+
+
+@events.command("send-to")
+@click.argument("hostname")
+def send_to(hostname):
+    click.echo(hostname)
+
+
+@pytest.fixture
+def socket_path():
+    # Unix domain socket paths have to be short.
+    with tempfile.TemporaryDirectory() as directory:
+        yield os.path.join(directory, "s.sock")
+
+
+@pytest.fixture
+def server(socket_path):
+    server = create_command_server(socket_path, _test_cli)
+    thread = Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+    )
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+@pytest.fixture
+def mock_create_sdk(mocker):
+    return mocker.patch(
+        "code42cli.options.create_sdk", side_effect=lambda *args, **kwargs: object()
+    )
+
+
+def _run_command(args, cwd=None):
+    stdout, stderr = io.StringIO(), io.StringIO()
+    exit_code = run_command(_test_cli, args, stdout, stderr, {}, cwd=cwd)
+    return exit_code, stdout.getvalue(), stderr.getvalue()
+
+
+def _run_remote_command(socket_path, args):
+    stdout, stderr = io.BytesIO(), io.BytesIO()
+    with connect(socket_path) as sock:
+        exit_code = run_remote_command(sock, args, stdout, stderr)
+    return exit_code, stdout.getvalue(), stderr.getvalue()
+
+
+def test_warm_cli_state_shares_sdk_between_commands(mock_create_sdk):
+    sdk_cache = {}
+    profile = create_mock_profile()
+    first_state = WarmCLIState(sdk_cache)
+    first_state.profile = profile
+    second_state = WarmCLIState(sdk_cache)
+    second_state.profile = profile
+    assert first_state.sdk is second_state.sdk
+    assert mock_create_sdk.call_count == 1
+
+
+def test_warm_cli_state_when_profile_differs_creates_new_sdk(mock_create_sdk):
+    sdk_cache = {}
+    first_state = WarmCLIState(sdk_cache)
+    first_state.profile = create_mock_profile("first")
+    second_state = WarmCLIState(sdk_cache)
+    second_state.profile = create_mock_profile("second")
+    assert first_state.sdk is not second_state.sdk
+    assert mock_create_sdk.call_count == 2
+
+
+def test_warm_cli_state_when_debug_creates_new_sdk(mock_create_sdk):
+    sdk_cache = {}
+    profile = create_mock_profile()
+    first_state = WarmCLIState(sdk_cache)
+    first_state.profile = profile
+    second_state = WarmCLIState(sdk_cache)
+    second_state.profile = profile
+    second_state.debug = True
+    assert first_state.sdk is not second_state.sdk
+    assert mock_create_sdk.call_count == 2
+
+
+def test_warm_cli_state_discard_sdk_removes_sdk_from_cache(mock_create_sdk):
+    sdk_cache = {}
+    profile = create_mock_profile()
+    first_state = WarmCLIState(sdk_cache)
+    first_state.profile = profile
+    first_sdk = first_state.sdk
+    first_state.discard_sdk()
+    second_state = WarmCLIState(sdk_cache)
+    second_state.profile = profile
+    assert second_state.sdk is not first_sdk
+    assert mock_create_sdk.call_count == 2
+
+
+@pytest.mark.parametrize("cli_cls", [click.Group, ExceptionHandlingGroup])
+def test_run_command_when_server_rejects_credentials_discards_sdk(
+    mocker, mock_create_sdk, cli_cls
+):
+    @click.group(cls=cli_cls)
+    def auth_cli():
+        pass
+
+    @auth_cli.command()
+    @click.pass_obj
+    def unauthorized(state):
+        state.profile = create_mock_profile()
+        assert state.sdk
+        raise Py42UnauthorizedError(mocker.MagicMock())
+
+    sdk_cache = {}
+    stdout, stderr = io.StringIO(), io.StringIO()
+    assert run_command(auth_cli, ["unauthorized"], stdout, stderr, sdk_cache) == 1
+    assert mock_create_sdk.call_count == 1
+    assert not sdk_cache
+
+
+def test_run_command_when_command_succeeds_keeps_sdk(mock_create_sdk):
+    @click.group()
+    def sdk_cli():
+        pass
+
+    @sdk_cli.command()
+    @click.pass_obj
+    def use_sdk(state):
+        state.profile = create_mock_profile()
+        assert state.sdk
+
+    sdk_cache = {}
+    stdout, stderr = io.StringIO(), io.StringIO()
+    assert run_command(sdk_cli, ["use-sdk"], stdout, stderr, sdk_cache) == 0
+    assert len(sdk_cache) == 1
+
+
+def test_run_command_returns_output_and_exit_code():
+    assert _run_command(["hello"]) == (0, "hello\n", "warning\n")
+    assert _run_command(["fail", "3"])[0] == 3
+
+
+def test_run_command_when_usage_error_returns_two():
+    exit_code, _, stderr = _run_command(["nosuch"])
+    assert exit_code == 2
+    assert "No such command 'nosuch'" in stderr
+
+
+def test_run_command_when_command_raises_returns_one_and_prints_traceback():
+    exit_code, _, stderr = _run_command(["error"])
+    assert exit_code == 1
+    assert "ValueError: test error" in stderr
+
+
+def test_run_command_when_command_prompts_aborts():
+    exit_code, stdout, stderr = _run_command(["confirm"])
+    assert exit_code == 1
+    assert "continued" not in stdout
+    assert "Aborted!" in stderr
+
+
+def test_run_command_runs_in_given_directory_and_restores_directory(tmp_path):
+    cwd = os.getcwd()
+    assert _run_command(["cwd"], cwd=str(tmp_path))[1] == f"{tmp_path}\n"
+    assert os.getcwd() == cwd
+
+
+def test_run_command_passes_warm_cli_state():
+    assert _run_command(["state"])[1] == "WarmCLIState\n"
+
+
+@pytest.mark.parametrize("command", ["serve", "shell"])
+def test_run_command_when_command_unsupported_returns_two(command):
+    exit_code, _, stderr = _run_command([command])
+    assert exit_code == 2
+    assert f"`code42 {command}` can't be run by the daemon" in stderr
+
+
+def test_run_command_when_subcommand_unsupported_returns_two():
+    exit_code, stdout, stderr = _run_command(["events", "send-to", "example.com"])
+    assert exit_code == 2
+    assert not stdout
+    assert "`code42 events send-to` can't be run by the daemon" in stderr
+
+
+def test_command_server_runs_commands_from_client(server, socket_path):
+    assert _run_remote_command(socket_path, ["hello"]) == (0, b"hello\n", b"warning\n")
+    assert _run_remote_command(socket_path, ["fail", "4"]) == (4, b"", b"")
+
+
+def test_command_server_socket_only_accessible_by_user(server, socket_path):
+    assert os.stat(socket_path).st_mode & 0o777 == 0o600
+
+
+def test_command_server_when_request_invalid_returns_two(server, socket_path):
+    with connect(socket_path) as sock:
+        sock.sendall(b"not json\n")
+        with sock.makefile("rb") as response:
+            data = response.read()
+    assert b"Invalid request" in data
+
+
+def test_create_command_server_when_daemon_listening_raises_error(server, socket_path):
+    with pytest.raises(Code42CLIError) as err:
+        create_command_server(socket_path, _test_cli)
+    assert str(err.value) == f"A daemon is already listening on {socket_path}."
+
+
+def test_create_command_server_when_socket_stale_replaces_it(mock_remove, socket_path):
+    stale_socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale_socket.bind(socket_path)
+    stale_socket.close()
+    mock_remove.side_effect = os.unlink
+    server = create_command_server(socket_path, _test_cli)
+    server.server_close()
+    assert mock_remove.call_count == 2
+
+
+def test_serve_when_daemon_listening_exits_with_error(server, socket_path):
+    result = CliRunner().invoke(cli, ["serve", "--socket", socket_path])
+    assert result.exit_code == 1
+    assert "A daemon is already listening" in result.output
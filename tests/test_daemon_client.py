@@ -0,0 +1,97 @@
+import io
+import socket
+
+import pytest
+
+from code42cli import daemon_client
+from code42cli.daemon_client import connect
+from code42cli.daemon_client import EXIT
+from code42cli.daemon_client import get_socket_path
+from code42cli.daemon_client import main
+from code42cli.daemon_client import read_frame
+from code42cli.daemon_client import run_remote_command
+from code42cli.daemon_client import SOCKET_ENV_VAR
+from code42cli.daemon_client import STDERR
+from code42cli.daemon_client import STDOUT
+from code42cli.daemon_client import write_frame
+
+pytestmark = pytest.mark.skipif(
+    not hasattr(socket, "AF_UNIX"), reason="requires Unix domain sockets"
+)
+
+
+@pytest.fixture
+def socket_pair():
+    client, server = socket.socketpair()
+    yield client, server
+    client.close()
+    server.close()
+
+
+def test_get_socket_path_when_env_var_set_returns_env_var(mocker):
+    mocker.patch.dict("os.environ", {SOCKET_ENV_VAR: "/tmp/test.sock"})
+    assert get_socket_path() == "/tmp/test.sock"
+
+
+def test_get_socket_path_defaults_to_user_project_dir(mocker):
+    mocker.patch.dict("os.environ", {SOCKET_ENV_VAR: ""})
+    assert get_socket_path().endswith(".code42cli/serve.sock")
+
+
+def test_read_frame_reads_written_frame(socket_pair):
+    client, server = socket_pair
+    write_frame(server, STDOUT, b"output")
+    write_frame(server, EXIT, b"0")
+    with client.makefile("rb") as response:
+        assert read_frame(response) == (STDOUT, b"output")
+        assert read_frame(response) == (EXIT, b"0")
+
+
+def test_read_frame_when_frame_incomplete_returns_none():
+    assert read_frame(io.BytesIO(b"\x01\x00\x00\x00\x10partial")) == (None, None)
+    assert read_frame(io.BytesIO(b"\x01")) == (None, None)
+
+
+def test_connect_when_no_daemon_listening_returns_none(tmp_path):
+    assert connect(str(tmp_path / "missing.sock")) is None
+
+
+def test_run_remote_command_writes_output_and_returns_exit_code(socket_pair):
+    client, server = socket_pair
+    write_frame(server, STDOUT, b"out\n")
+    write_frame(server, STDERR, b"err\n")
+    write_frame(server, STDOUT, b"more out\n")
+    write_frame(server, EXIT, b"3")
+    stdout, stderr = io.BytesIO(), io.BytesIO()
+    exit_code = run_remote_command(client, ["users", "list"], stdout, stderr)
+    assert exit_code == 3
+    assert stdout.getvalue() == b"out\nmore out\n"
+    assert stderr.getvalue() == b"err\n"
+    with server.makefile("rb") as request:
+        assert b'"args": ["users", "list"]' in request.readline()
+
+
+def test_run_remote_command_when_connection_closes_early_raises_connection_error(
+    socket_pair,
+):
+    client, server = socket_pair
+    write_frame(server, STDOUT, b"out\n")
+    server.close()
+    with pytest.raises(ConnectionError):
+        run_remote_command(client, ["users", "list"], io.BytesIO(), io.BytesIO())
+
+
+def test_main_when_no_daemon_listening_runs_command_itself(mocker):
+    mocker.patch.object(daemon_client, "connect", return_value=None)
+    mock_cli = mocker.patch("code42cli.main.cli")
+    main(["users", "list"])
+    mock_cli.main.assert_called_once_with(args=["users", "list"], prog_name="code42")
+
+
+def test_main_exits_with_remote_command_exit_code(mocker, socket_pair):
+    client, server = socket_pair
+    mocker.patch.object(daemon_client, "connect", return_value=client)
+    write_frame(server, EXIT, b"2")
+    with pytest.raises(SystemExit) as err:
+        main(["nosuch"])
+    assert err.value.code == 2
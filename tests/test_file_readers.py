@@ -1,9 +1,13 @@
+import io
+
 import click.exceptions
 import pytest
 
 from code42cli.click_ext.types import AutoDecodedFile
+from code42cli.click_ext.types import ENCODING_SAMPLE_SIZE
 from code42cli.click_ext.types import FileOrString
 from code42cli.errors import Code42CLIError
+from code42cli.file_readers import CSVRows
 from code42cli.file_readers import read_csv
 
 HEADERLESS_CSV = [
@@ -67,6 +71,89 @@ def test_read_csv_when_some_but_not_all_required_headers_present_raises(runner):
                 read_csv(file=csv, headers=HEADERS + ["extra_header"])
 
 
+def test_read_csv_when_headers_present_but_no_data_rows_raises(runner):
+    with runner.isolated_filesystem():
+        with open("test_csv.csv", "w") as csv:
+            csv.writelines(["header1,header2,header3\n", "\n"])
+        with open("test_csv.csv") as csv:
+            with pytest.raises(Code42CLIError) as err:
+                read_csv(file=csv, headers=HEADERS)
+    assert err.value.message == "CSV contains no data rows."
+
+
+def test_read_csv_when_header_is_commented_skips_comment(runner):
+    with runner.isolated_filesystem():
+        with open("test_csv.csv", "w") as csv:
+            csv.writelines(["# header1,header2,header3\n"] + HEADERLESS_CSV)
+        with open("test_csv.csv") as csv:
+            result_list = read_csv(file=csv, headers=HEADERS)
+    assert len(result_list) == 2
+    assert result_list[0]["header1"] == "col1_val1"
+
+
+def test_csv_rows_reads_rows_lazily():
+    class LineCountingFile(io.StringIO):
+        lines_read = 0
+
+        def __next__(self):
+            self.lines_read += 1
+            return super().__next__()
+
+    file = LineCountingFile("".join(HEADERLESS_CSV * 500))
+    rows = CSVRows(file, HEADERS)
+    file.lines_read = 0
+    first_row = next(iter(rows))
+    assert first_row["header1"] == "col1_val1"
+    assert file.lines_read == 1
+
+
+def test_csv_rows_len_counts_data_rows_without_blank_lines(runner):
+    with runner.isolated_filesystem():
+        with open("test_csv.csv", "w") as csv:
+            csv.writelines([HEADERED_CSV[0], "\n", HEADERED_CSV[1], "\n"])
+        with open("test_csv.csv") as csv:
+            rows = CSVRows(csv, HEADERS)
+            assert len(rows) == 2
+            assert len(list(rows)) == 2
+
+
+def test_csv_rows_can_be_iterated_more_than_once(runner):
+    with runner.isolated_filesystem():
+        with open("test_csv.csv", "w") as csv:
+            csv.writelines(HEADERLESS_CSV)
+        with open("test_csv.csv") as csv:
+            rows = CSVRows(csv, HEADERS)
+            assert list(rows) == list(rows)
+            assert len(list(rows)) == 2
+
+
+def test_csv_rows_headers_returns_expected_headers(runner):
+    with runner.isolated_filesystem():
+        with open("test_csv.csv", "w") as csv:
+            csv.writelines(HEADERED_CSV)
+        with open("test_csv.csv") as csv:
+            assert CSVRows(csv, HEADERS).headers == HEADERS
+
+
+def test_csv_rows_when_file_not_seekable_reads_rows(mocker):
+    file = mocker.MagicMock()
+    file.seekable.return_value = False
+    file.read.return_value = "".join(HEADERED_CSV)
+    assert len(list(CSVRows(file, HEADERS))) == 2
+
+
+def test_AutoDecodedFile_only_reads_sample_of_file_to_detect_encoding(runner, mocker):
+    detect = mocker.patch("code42cli.click_ext.types.chardet.detect")
+    detect.return_value = {"encoding": "utf-8"}
+    with runner.isolated_filesystem():
+        with open("test.csv", "w") as file:
+            file.write("header1,header2,header3\n" * ENCODING_SAMPLE_SIZE)
+        AutoDecodedFile("r").convert("test.csv", None, None).close()
+    sample = detect.call_args[0][0]
+    assert len(sample) <= ENCODING_SAMPLE_SIZE
+    assert sample.endswith(b"\n")
+
+
 @pytest.mark.parametrize(
     "encoding",
     ["utf8", "utf16", "latin_1"],
@@ -85,6 +172,28 @@ def test_read_csv_reads_various_encodings_automatically(runner, encoding):
         ]
 
 
+def test_AutoDecodedFile_when_sample_is_ascii_reads_non_ascii_after_sample(runner):
+    with runner.isolated_filesystem():
+        with open("test.csv", "w", encoding="utf-8") as file:
+            file.write("username\n")
+            file.write("user@example.com\n" * (ENCODING_SAMPLE_SIZE // 17 + 1))
+            file.write("josé@example.com\n")
+        with AutoDecodedFile("r").convert("test.csv", None, None) as csv:
+            lines = csv.read().splitlines()
+    assert lines[-1] == "josé@example.com"
+
+
+def test_AutoDecodedFile_when_encoding_not_detected_reads_as_utf8(runner, mocker):
+    mocker.patch("code42cli.click_ext.types.CliLogger")
+    detect = mocker.patch("code42cli.click_ext.types.chardet.detect")
+    detect.return_value = {"encoding": None}
+    with runner.isolated_filesystem():
+        with open("test.csv", "w", encoding="utf-8") as file:
+            file.write("josé@example.com\n")
+        with AutoDecodedFile("r").convert("test.csv", None, None) as csv:
+            assert csv.read() == "josé@example.com\n"
+
+
 def test_AutoDecodedFile_raises_expected_exception_when_file_not_exists(runner):
     with pytest.raises(click.exceptions.BadParameter):
         AutoDecodedFile("r").convert("not_a_file", None, None)
@@ -102,3 +211,16 @@ def test_FileOrString_arg_handles_various_encodings_automatically(runner, encodi
 
         result_data = FileOrString().convert("@test1.json", None, None)
         assert result_data == test_data
+
+
+def test_csv_rows_fingerprint_when_file_edited_changes():
+    rows = CSVRows(io.StringIO("username\nfoo@example.com\n"), ["username"])
+    edited = CSVRows(io.StringIO("username\nbar@example.com\n"), ["username"])
+    assert rows.fingerprint() != edited.fingerprint()
+
+
+def test_csv_rows_fingerprint_does_not_change_rows():
+    rows = CSVRows(io.StringIO("username\nfoo@example.com\n"), ["username"])
+    fingerprint = rows.fingerprint()
+    assert list(rows) == [{"username": "foo@example.com"}]
+    assert rows.fingerprint() == fingerprint
@@ -0,0 +1,128 @@
+import json
+
+import pytest
+
+from code42cli.json_serializer import JSON_LIBRARY_ENV_VAR
+from code42cli.json_serializer import load_json_library
+
+TEST_EVENT = {
+    "eventId": "0_1d71796f",
+    "fileName": "résumé.pdf",
+    "filePath": "/Users/test/Downloads/",
+    "fileSize": 86,
+    "sha256": None,
+    "sharedWith": [{"cloudUsername": "test@example.com"}],
+    "exposure": [],
+    "trusted": False,
+    "riskScore": 0.5,
+}
+
+EXPECTED_JSON = json.dumps(TEST_EVENT)
+
+
+def _get_installed_libraries():
+    libraries = ["json"]
+    try:
+        __import__("ujson")
+        libraries.append("ujson")
+    except ImportError:
+        pass
+    return libraries
+
+
+@pytest.fixture(params=_get_installed_libraries())
+def json_library(request):
+    return load_json_library(request.param)
+
+
+def test_load_json_library_loads_the_given_library(json_library):
+    name, _, _ = json_library
+    assert name in ("ujson", "json")
+
+
+def test_dumps_returns_same_json_as_json_dumps(json_library):
+    _, dumps, _ = json_library
+    assert dumps(TEST_EVENT) == EXPECTED_JSON
+
+
+def test_dumps_when_not_ensure_ascii_returns_same_json_as_json_dumps(json_library):
+    _, dumps, _ = json_library
+    expected = json.dumps(TEST_EVENT, ensure_ascii=False)
+    assert dumps(TEST_EVENT, ensure_ascii=False) == expected
+
+
+@pytest.mark.parametrize(
+    "value",
+    [1e-07, 1.5e-300, 1e16, 1e22, 0.1, 1 / 3, -0.0, float("nan"), float("inf")],
+)
+def test_dumps_floats_returns_same_json_as_json_dumps(json_library, value):
+    _, dumps, _ = json_library
+    assert dumps({"value": value}) == json.dumps({"value": value})
+
+
+def test_dumps_control_and_non_ascii_characters_returns_same_json_as_json_dumps(
+    json_library,
+):
+    _, dumps, _ = json_library
+    event = {"name": "".join(chr(i) for i in range(0x300)) + "\U0001F600 a/b"}
+    assert dumps(event) == json.dumps(event)
+    assert dumps(event, ensure_ascii=False) == json.dumps(event, ensure_ascii=False)
+
+
+def test_dumps_non_string_keys_returns_same_json_as_json_dumps(json_library):
+    _, dumps, _ = json_library
+    event = {1: "a", 1.5: "b", False: "c", None: "d"}
+    assert dumps(event) == json.dumps(event)
+
+
+def test_dumps_bytes_returns_utf8_encoded_json(json_library):
+    _, _, dumps_bytes = json_library
+    assert dumps_bytes(TEST_EVENT) == EXPECTED_JSON.encode("utf-8")
+
+
+def test_dumps_large_int_returns_same_json_as_json_dumps(json_library):
+    _, dumps, _ = json_library
+    event = {"id": 2**70}
+    assert dumps(event) == json.dumps(event)
+
+
+def test_dumps_when_value_is_not_serializable_raises_type_error(json_library):
+    _, dumps, _ = json_library
+    with pytest.raises(TypeError):
+        dumps({"id": object()})
+
+
+def test_load_json_library_when_given_unknown_library_raises_value_error():
+    with pytest.raises(ValueError):
+        load_json_library("simplejson")
+
+
+def test_load_json_library_uses_library_from_environment(monkeypatch):
+    monkeypatch.setenv(JSON_LIBRARY_ENV_VAR, "json")
+    name, dumps, _ = load_json_library()
+    assert name == "json"
+    assert dumps(TEST_EVENT) == EXPECTED_JSON
+
+
+def test_load_json_library_when_no_fast_library_is_installed_uses_json(mocker):
+    mocker.patch("importlib.import_module", side_effect=ImportError())
+    name, dumps, _ = load_json_library()
+    assert name == "json"
+    assert dumps(TEST_EVENT) == EXPECTED_JSON
+
+
+def test_json_library_is_the_first_installed_library(monkeypatch):
+    monkeypatch.delenv(JSON_LIBRARY_ENV_VAR, raising=False)
+    installed = _get_installed_libraries()
+    expected = next(name for name in ("ujson", "json") if name in installed)
+    assert load_json_library()[0] == expected
+
+
+def test_dumps_when_ujson_cant_serialize_value_falls_back_to_json(mocker):
+    ujson = mocker.MagicMock()
+    ujson.dumps.side_effect = OverflowError()
+    mocker.patch("importlib.import_module", return_value=ujson)
+    name, dumps, dumps_bytes = load_json_library("ujson")
+    assert name == "ujson"
+    assert dumps(TEST_EVENT) == EXPECTED_JSON
+    assert dumps_bytes(TEST_EVENT) == EXPECTED_JSON.encode("utf-8")
@@ -0,0 +1,73 @@
+import subprocess
+import sys
+
+from click.testing import CliRunner
+
+from code42cli import main
+from code42cli.main import cli
+from code42cli.main import COMMANDS
+from code42cli.main import get_plugin_entry_points
+from code42cli.main import PLUGINS_ENTRY_POINT_GROUP
+
+
+def _get_modules_imported_by(statement):
+    # `-X importtime` writes a line to stderr for each module imported, ending with its name.
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return {
+        line.rsplit("|", 1)[-1].strip()
+        for line in result.stderr.splitlines()
+        if line.startswith("import time:")
+    }
+
+
+def test_importing_cli_does_not_import_commands_or_pandas():
+    modules = _get_modules_imported_by("import code42cli.main")
+    assert "code42cli.main" in modules
+    assert "pandas" not in modules
+    assert "pkg_resources" not in modules
+    for import_path in COMMANDS.values():
+        assert import_path.partition(":")[0] not in modules
+
+
+def test_cli_lists_all_commands():
+    ctx = cli.make_context("code42", ["--python"], resilient_parsing=True)
+    assert set(COMMANDS).issubset(cli.list_commands(ctx))
+
+
+def test_cli_gets_each_command_by_name():
+    ctx = cli.make_context("code42", ["--python"], resilient_parsing=True)
+    for name in COMMANDS:
+        assert cli.get_command(ctx, name).name == name
+
+
+def test_cli_when_given_misspelled_command_suggests_commands():
+    result = CliRunner().invoke(cli, ["alert"])
+    assert "Did you mean alerts or alert-rules?" in result.output
+
+
+def test_cli_help_lists_commands():
+    result = CliRunner().invoke(cli, ["--help"])
+    for name in COMMANDS:
+        assert name in result.output
+
+
+def test_get_plugin_entry_points_selects_plugins_group(mocker):
+    entry_points = mocker.MagicMock()
+    mocker.patch.object(main.metadata, "entry_points", return_value=entry_points)
+    assert get_plugin_entry_points() == entry_points.select.return_value
+    entry_points.select.assert_called_once_with(group=PLUGINS_ENTRY_POINT_GROUP)
+
+
+def test_get_plugin_entry_points_when_entry_points_is_dict_gets_plugins_group(mocker):
+    plugin = mocker.MagicMock()
+    mocker.patch.object(
+        main.metadata,
+        "entry_points",
+        return_value={PLUGINS_ENTRY_POINT_GROUP: (plugin,), "other": ()},
+    )
+    assert get_plugin_entry_points() == (plugin,)
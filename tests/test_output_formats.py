@@ -1,9 +1,11 @@
 import json
 from collections import OrderedDict
 
+import click
 import pytest
 from numpy import nan as NaN
 from pandas import DataFrame
+from pandas import notnull
 
 import code42cli.output_formats as output_formats_module
 from code42cli.errors import Code42CLIError
@@ -317,6 +319,53 @@ class TestOutputFormatter:
             pass
         mock_to_table.assert_called_once_with("TEST", None, include_header=True)
 
+    def test_echo_formatted_iterable_when_json_outputs_items_before_reading_them_all(
+        self, capsys
+    ):
+        formatter = output_formats_module.OutputFormatter(
+            output_formats_module.OutputFormat.RAW
+        )
+        output_before_last_item = []
+
+        def items():
+            for i in range(30):
+                if i == 29:
+                    output_before_last_item.append(capsys.readouterr().out)
+                yield {"a": i}
+
+        assert formatter.echo_formatted_iterable(items()) == 30
+        assert '{"a": 0}\n' in output_before_last_item[0]
+        assert '{"a": 29}' not in output_before_last_item[0]
+
+    def test_echo_formatted_iterable_when_csv_streams_rows_with_header_from_first_rows(
+        self, capsys, mocker
+    ):
+        mocker.patch.object(output_formats_module, "CSV_HEADER_SAMPLE_SIZE", 2)
+        formatter = output_formats_module.OutputFormatter(
+            output_formats_module.OutputFormat.CSV
+        )
+        items = [{"a": 1}, {"a": 2, "b": 3}, {"a": 4, "c": 5}]
+        assert formatter.echo_formatted_iterable(iter(items)) == 3
+        assert capsys.readouterr().out.splitlines() == ["a,b", "1,", "2,3", "4,"]
+
+    def test_echo_formatted_iterable_when_table_outputs_all_items_together(
+        self, capsys
+    ):
+        formatter = output_formats_module.OutputFormatter(
+            output_formats_module.OutputFormat.TABLE
+        )
+        assert formatter.echo_formatted_iterable(iter([{"a": 1}, {"a": 2}])) == 2
+        output = capsys.readouterr().out
+        assert output.count("a") == 1
+        assert "1" in output and "2" in output
+
+    def test_echo_formatted_iterable_when_empty_returns_zero(self, capsys):
+        formatter = output_formats_module.OutputFormatter(
+            output_formats_module.OutputFormat.CSV
+        )
+        assert formatter.echo_formatted_iterable(iter([])) == 0
+        assert capsys.readouterr().out == ""
+
 
 def test_to_cef_returns_cef_tagged_string(mock_file_event):
     cef_out = to_cef(mock_file_event)
@@ -835,6 +884,114 @@ class TestDataFrameOutputFormatter:
         list(formatter.iter_rows(self.test_df))
         assert checkpointed == list(self.test_df.string_column.values)
 
+    @pytest.mark.parametrize("fmt", OutputFormat.choices())
+    def test_get_formatted_output_when_given_checkpoint_columns_calls_checkpoint_func_with_only_those_columns(
+        self, fmt
+    ):
+        checkpointed = []
+        formatter = DataFrameOutputFormatter(
+            fmt,
+            checkpoint_func=checkpointed.append,
+            checkpoint_columns=["string_column", "null_column"],
+        )
+        list(formatter.get_formatted_output(self.test_df, columns=["int_column"]))
+        assert checkpointed == [
+            {"string_column": "string1", "null_column": None},
+            {"string_column": "string2", "null_column": None},
+        ]
+
+    def test_iter_rows_when_selected_columns_include_checkpoint_columns_checkpoints_output_rows(
+        self,
+    ):
+        checkpointed = []
+        formatter = DataFrameOutputFormatter(
+            None,
+            checkpoint_func=checkpointed.append,
+            checkpoint_columns=["string_column"],
+        )
+        rows = list(
+            formatter.iter_rows(self.test_df, columns=["string_column", "int_column"])
+        )
+        assert rows == [
+            {"string_column": "string1", "int_column": 42},
+            {"string_column": "string2", "int_column": 43},
+        ]
+        assert all(c is r for c, r in zip(checkpointed, rows))  # noqa: B905
+
+    def test_iter_rows_converts_nulls_to_none(self):
+        df = DataFrame({"float_column": [1.5, NaN], "string_column": ["a", None]})
+        formatter = DataFrameOutputFormatter(None)
+        assert list(formatter.iter_rows(df)) == [
+            {"float_column": 1.5, "string_column": "a"},
+            {"float_column": None, "string_column": None},
+        ]
+
+    def test_table_formatter_when_more_rows_than_sample_size_aligns_later_pages_to_header(
+        self, mocker
+    ):
+        mocker.patch.object(output_formats_module, "TABLE_WIDTH_SAMPLE_SIZE", 1)
+        checkpointed = []
+        formatter = DataFrameOutputFormatter(
+            OutputFormat.TABLE, checkpoint_func=checkpointed.append
+        )
+        dfs = [
+            DataFrame([{"a_long_column_name": "x", "b": "short"}]),
+            DataFrame([{"a_long_column_name": "y", "b": "value"}]),
+        ]
+        output = list(formatter.get_formatted_output(dfs))
+        assert len(output) == 3
+        assert "a_long_column_name" in output[0]
+        assert output[2].index("value") == output[0].index("b")
+        assert [event["b"] for event in checkpointed] == ["short", "value"]
+
+    def test_table_formatter_when_given_generator_of_pages_outputs_each_row_on_its_own_line(
+        self, mocker
+    ):
+        mocker.patch.object(output_formats_module, "TABLE_WIDTH_SAMPLE_SIZE", 2)
+        formatter = DataFrameOutputFormatter(OutputFormat.TABLE)
+
+        def pages():
+            for page in range(3):
+                yield DataFrame(
+                    [{"a": f"x{page}{i}", "b": f"y{page}{i}"} for i in range(2)]
+                )
+
+        output = "".join(formatter.get_formatted_output(pages()))
+        assert output.splitlines() == [
+            "a   b  ",
+            "x00 y00",
+            "x01 y01",
+            "x10 y10",
+            "x11 y11",
+            "x20 y20",
+            "x21 y21",
+        ]
+        assert output.endswith("\n")
+
+    def test_table_formatter_when_later_page_has_wider_value_only_shifts_its_row(
+        self, mocker
+    ):
+        mocker.patch.object(output_formats_module, "TABLE_WIDTH_SAMPLE_SIZE", 1)
+        formatter = DataFrameOutputFormatter(OutputFormat.TABLE)
+        dfs = [
+            DataFrame([{"a": "x", "b": "first"}]),
+            DataFrame(
+                [{"a": "a_much_wider_value", "b": "second"}, {"a": "y", "b": "third"}]
+            ),
+        ]
+        output = list(formatter.get_formatted_output(dfs))
+        assert len(output) == 4
+        assert output[1].index("first") == output[0].index("b")
+        assert output[2].index("second") > output[0].index("b")
+        assert output[3].index("third") == output[0].index("b")
+
+    def test_table_formatter_when_given_columns_only_converts_selected_columns(self):
+        formatter = DataFrameOutputFormatter(OutputFormat.TABLE)
+        df = DataFrame([{"shown": 1, "hidden": object()}])
+        output = list(formatter.get_formatted_output(df, columns=["shown"]))
+        assert "hidden" not in output[0]
+        assert output[1].strip() == "1"
+
     @pytest.mark.parametrize("fmt", OutputFormat.choices())
     def test_echo_formatted_dataframes_prints_no_results_found_when_dataframes_empty(
         self, fmt, capsys
@@ -872,3 +1029,157 @@ class TestFileEventsOutputFormatter:
             next(output)
             == "CEF:0|Code42|Advanced Exfiltration Detection|1|C42203|READ_BY_APP|5|externalId=0_1d71796f-af5b-4231-9d8e-df6434da4663_912339407325443353_918253081700247636_16 end=1567996943851 rt=1568069262724 filePath=/Users/testtesterson/Downloads/About Downloads.lpdf/Contents/Resources/English.lproj/ fname=InfoPlist.strings fileType=UNCATEGORIZED fsize=86 fileHash=19b92e63beb08c27ab4489fcfefbbe44 fileCreateTime=1342923569000 fileModificationTime=1355886008000 suser=test.testerson+testair@example.com shost=Test's MacBook Air dvchost=192.168.0.3 src=71.34.4.22 deviceExternalId=912339407325443353 suid=912338501981077099 sourceServiceName=Endpoint reason=ApplicationRead spriv=testtesterson sproc=/Applications/Google Chrome.app/Contents/MacOS/Google Chrome\n"
         )
+
+
+class TestFileEventsOutputFormatterCEF:
+    events = [
+        AED_EVENT_DICT,
+        AED_CLOUD_ACTIVITY_EVENT_DICT,
+        AED_REMOVABLE_MEDIA_EVENT_DICT,
+        AED_EMAIL_EVENT_DICT,
+    ]
+
+    def test_get_formatted_output_matches_converting_each_event(self):
+        df = DataFrame(self.events)
+        formatter = FileEventsOutputFormatter(FileEventsOutputFormat.CEF)
+        output = list(formatter.get_formatted_output([df, df]))
+        events = df.astype(object).where(notnull, None).to_dict("records")
+        assert output == [to_cef(event) for event in events * 2]
+
+    def test_get_formatted_output_when_columns_share_a_cef_field_uses_first_position_and_last_value(
+        self,
+    ):
+        df = DataFrame(
+            [
+                {"actor": "a", "fileName": "f", "emailSender": "s"},
+                {"actor": None, "fileName": "f", "emailSender": "s"},
+                {"actor": "a", "fileName": "f", "emailSender": None},
+            ]
+        )
+        formatter = FileEventsOutputFormatter(FileEventsOutputFormat.CEF)
+        output = [line.split("|")[-1] for line in formatter.get_formatted_output(df)]
+        assert output == ["suser=s fname=f\n", "fname=f suser=s\n", "suser=a fname=f\n"]
+
+    def test_get_formatted_output_excludes_null_numbers(self):
+        df = DataFrame([{"fileSize": 1, "fileName": "a"}, {"fileSize": None}])
+        formatter = FileEventsOutputFormatter(FileEventsOutputFormat.CEF)
+        output = [line.split("|")[-1] for line in formatter.get_formatted_output(df)]
+        assert output == ["fsize=1.0 fname=a\n", "\n"]
+
+    def test_get_formatted_output_converts_timestamps_like_converting_each_event(self):
+        timestamps = [
+            "2020-01-01T00:00:00Z",
+            "2020-01-01T00:00:00.0005Z",
+            "2020-01-01T00:00:00.0015Z",
+            "2020-01-01T00:00:00.999999Z",
+            None,
+        ]
+        df = DataFrame({"eventTimestamp": timestamps})
+        formatter = FileEventsOutputFormatter(FileEventsOutputFormat.CEF)
+        output = list(formatter.get_formatted_output(df))
+        events = df.astype(object).where(notnull, None).to_dict("records")
+        assert output == [to_cef(event) for event in events]
+
+    def test_get_formatted_output_when_timestamp_is_invalid_raises_value_error(self):
+        df = DataFrame({"eventTimestamp": ["2020-01-01T00:00:00Z", "yesterday"]})
+        formatter = FileEventsOutputFormatter(FileEventsOutputFormat.CEF)
+        with pytest.raises(ValueError):
+            list(formatter.get_formatted_output(df))
+
+    def test_get_formatted_output_calls_checkpoint_func_after_each_event(self):
+        df = DataFrame(self.events)
+        checkpointed = []
+        formatter = FileEventsOutputFormatter(
+            FileEventsOutputFormat.CEF,
+            checkpoint_func=lambda event: checkpointed.append(event["eventId"]),
+            checkpoint_columns=["eventId"],
+        )
+        output = formatter.get_formatted_output(df)
+        next(output)
+        assert not checkpointed
+        list(output)
+        assert checkpointed == [event.get("eventId") for event in self.events]
+
+
+class TestDataFrameOutputFormatterRecordPages:
+    records = [
+        {"string_column": "string1", "int_column": 42, "list_column": ["a"]},
+        {"string_column": "string2", "null_column": None},
+    ]
+
+    def test_raw_formatter_outputs_each_record(self):
+        formatter = DataFrameOutputFormatter(OutputFormat.RAW)
+        output = list(formatter.get_formatted_output([self.records]))
+        assert [json.loads(line) for line in output] == self.records
+
+    def test_json_formatter_outputs_each_record(self):
+        formatter = DataFrameOutputFormatter(OutputFormat.JSON)
+        output = "".join(formatter.get_formatted_output([self.records]))
+        assert output == "".join(
+            f"{json.dumps(r, indent=4, ensure_ascii=False)}\n" for r in self.records
+        )
+
+    @pytest.mark.parametrize("fmt", [OutputFormat.TABLE, OutputFormat.CSV])
+    def test_tabular_formatters_output_records_like_a_dataframe(self, fmt):
+        formatter = DataFrameOutputFormatter(fmt)
+        output = list(formatter.get_formatted_output([self.records]))
+        expected = list(formatter.get_formatted_output([DataFrame(self.records)]))
+        assert output == expected
+
+    def test_iter_rows_when_given_columns_selects_them_case_insensitively(self):
+        formatter = DataFrameOutputFormatter(None)
+        rows = list(
+            formatter.iter_rows([self.records], columns=["Int_Column", "null_column"])
+        )
+        assert rows == [
+            {"int_column": 42, "null_column": None},
+            {"int_column": None, "null_column": None},
+        ]
+
+    def test_iter_rows_when_given_unknown_column_raises_bad_argument_usage(self):
+        formatter = DataFrameOutputFormatter(None)
+        with pytest.raises(click.BadArgumentUsage) as err:
+            list(formatter.iter_rows([self.records], columns=["nope"]))
+        assert "'nope' is not a valid column" in err.value.message
+
+    def test_iter_rows_when_given_columns_checkpoints_whole_records(self):
+        checkpointed = []
+        formatter = DataFrameOutputFormatter(None, checkpoint_func=checkpointed.append)
+        list(formatter.iter_rows([self.records], columns=["int_column"]))
+        assert checkpointed == self.records
+
+    def test_iter_rows_when_page_is_empty_yields_nothing(self):
+        formatter = DataFrameOutputFormatter(OutputFormat.RAW)
+        assert not list(formatter.iter_rows([[], []], columns=["int_column"]))
+
+
+def test_file_events_cef_formatter_outputs_records_like_a_dataframe():
+    # every event has the numeric fields, so that they aren't floats in the DataFrame
+    events = [
+        {
+            **event,
+            "fileSize": event.get("fileSize") or 1,
+            "removableMediaCapacity": event.get("removableMediaCapacity") or 1,
+        }
+        for event in TestFileEventsOutputFormatterCEF.events
+    ]
+    formatter = FileEventsOutputFormatter(FileEventsOutputFormat.CEF)
+    output = list(formatter.get_formatted_output([events, []]))
+    assert output == list(formatter.get_formatted_output([DataFrame(events)]))
+
+
+def test_file_events_cef_formatter_when_record_is_missing_a_number_keeps_other_ints():
+    events = [{"fileSize": 86, "fileName": "a"}, {"fileName": "b"}]
+    formatter = FileEventsOutputFormatter(FileEventsOutputFormat.CEF)
+    output = [line.split("|")[-1] for line in formatter.get_formatted_output([events])]
+    assert output == ["fsize=86 fname=a\n", "fname=b\n"]
+
+
+def test_file_events_cef_formatter_calls_checkpoint_func_with_each_record():
+    events = TestFileEventsOutputFormatterCEF.events
+    checkpointed = []
+    formatter = FileEventsOutputFormatter(
+        FileEventsOutputFormat.CEF, checkpoint_func=checkpointed.append
+    )
+    list(formatter.get_formatted_output([events]))
+    assert checkpointed == events
@@ -254,6 +254,24 @@ def test_delete_profile_deletes_password_if_exists(
     password_deleter.assert_called_once_with(profile)
 
 
+def test_delete_profile_deletes_cached_token(config_accessor, mocker):
+    profile = create_mock_profile("deleteme")
+    mock_get_profile = mocker.patch("code42cli.profile._get_profile")
+    mock_get_profile.return_value = profile
+    mock_delete = mocker.patch("code42cli.profile.TokenCache.delete")
+    cliprofile.delete_profile("deleteme")
+    assert mock_delete.call_count == 1
+
+
+def test_delete_profile_deletes_cached_custodian_index(config_accessor, mocker):
+    profile = create_mock_profile("deleteme")
+    mock_get_profile = mocker.patch("code42cli.profile._get_profile")
+    mock_get_profile.return_value = profile
+    mock_delete = mocker.patch("code42cli.profile.CustodianIndexCache.delete")
+    cliprofile.delete_profile("deleteme")
+    assert mock_delete.call_count == 1
+
+
 def test_delete_profile_clears_checkpoints(config_accessor, mocker):
     profile = create_mock_profile("deleteme")
     mock_get_profile = mocker.patch("code42cli.profile._get_profile")
@@ -15,6 +15,7 @@ from code42cli.errors import LoggedCLIError
 from code42cli.main import cli
 from code42cli.options import CLIState
 from code42cli.sdk_client import create_sdk
+from code42cli.token_cache import TOKEN_CACHE_ENV_VAR
 
 
 @pytest.fixture
@@ -187,3 +188,41 @@ def test_totp_option_when_passed_is_passed_to_sdk_initialization(
     mock_py42.assert_called_once_with(
         profile.authority_url, profile.username, "password", totp=totp
     )
+
+
+def test_create_sdk_when_token_cache_enabled_creates_sdk_from_token_cache(
+    mocker, mock_sdk_factory, mock_profile_with_password
+):
+    mocker.patch.dict("os.environ", {TOKEN_CACHE_ENV_VAR: "1"})
+    mock_create = mocker.patch("code42cli.sdk_client.create_sdk_from_token_cache")
+    sdk = create_sdk(mock_profile_with_password, False, totp="123456")
+    assert sdk == mock_create.return_value
+    token_cache, *args = mock_create.call_args[0]
+    assert token_cache.get() is None
+    assert args == ["example.com", "foo", "Test Password", "123456", False]
+    assert not mock_sdk_factory.call_count
+
+
+def test_create_sdk_when_token_cache_disabled_does_not_use_token_cache(
+    mocker, mock_sdk_factory, mock_profile_with_password
+):
+    mocker.patch.dict("os.environ", {TOKEN_CACHE_ENV_VAR: ""})
+    mock_create = mocker.patch("code42cli.sdk_client.create_sdk_from_token_cache")
+    create_sdk(mock_profile_with_password, False)
+    assert not mock_create.call_count
+    assert mock_sdk_factory.call_count == 1
+
+
+def test_create_sdk_when_token_cache_login_unauthorized_raises_py42_login_error(
+    mocker, mock_sdk_factory, mock_profile_with_password
+):
+    mocker.patch.dict("os.environ", {TOKEN_CACHE_ENV_VAR: "1"})
+    response = mocker.MagicMock(spec=Response)
+    mock_create = mocker.patch("code42cli.sdk_client.create_sdk_from_token_cache")
+    mock_create.side_effect = Py42UnauthorizedError(HTTPError(response=response))
+    exception = Py42UnauthorizedError(HTTPError(response=response))
+    exception.args = ("LoginConfig: LOCAL",)
+    mock_sdk_factory.side_effect = exception
+    with pytest.raises(Code42CLIError) as err:
+        create_sdk(mock_profile_with_password, False)
+    assert str(err.value) == "Invalid credentials for user foo."
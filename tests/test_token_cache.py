@@ -0,0 +1,195 @@
+import base64
+import json
+import os
+import stat
+from time import time
+
+import pytest
+from py42.sdk import SDKClient
+
+from code42cli.token_cache import CachedTokenAuth
+from code42cli.token_cache import create_sdk_from_token_cache
+from code42cli.token_cache import DEFAULT_TOKEN_LIFETIME
+from code42cli.token_cache import get_token_expiry
+from code42cli.token_cache import is_token_cache_enabled
+from code42cli.token_cache import TOKEN_CACHE_ENV_VAR
+from code42cli.token_cache import TOKEN_EXPIRY_MARGIN
+from code42cli.token_cache import TokenCache
+
+
+def _create_jwt(claims):
+    def encode(obj):
+        return base64.urlsafe_b64encode(json.dumps(obj).encode()).rstrip(b"=").decode()
+
+    return f"Bearer {encode({'alg': 'RS256'})}.{encode(claims)}.signature"
+
+
+@pytest.fixture
+def token_cache():
+    return TokenCache("profile", "example.com", "user@example.com", "password")
+
+
+@pytest.fixture
+def token():
+    return _create_jwt({"sub": "user", "exp": int(time()) + 3600})
+
+
+@pytest.mark.parametrize("value", ["1", "true", "True", "yes"])
+def test_is_token_cache_enabled_when_env_var_set_returns_true(mocker, value):
+    mocker.patch.dict("os.environ", {TOKEN_CACHE_ENV_VAR: value})
+    assert is_token_cache_enabled()
+
+
+@pytest.mark.parametrize("value", ["", "0", "false"])
+def test_is_token_cache_enabled_when_env_var_not_set_returns_false(mocker, value):
+    mocker.patch.dict("os.environ", {TOKEN_CACHE_ENV_VAR: value})
+    assert not is_token_cache_enabled()
+
+
+def test_get_token_expiry_returns_exp_claim_less_margin():
+    token = _create_jwt({"exp": 2000000000})
+    assert get_token_expiry(token) == 2000000000 - TOKEN_EXPIRY_MARGIN
+
+
+@pytest.mark.parametrize(
+    "token",
+    ["Bearer not-a-jwt", _create_jwt({"sub": "user"}), _create_jwt(["exp"]), ""],
+)
+def test_get_token_expiry_when_no_exp_claim_returns_default_lifetime(token):
+    expiry = get_token_expiry(token)
+    assert time() < expiry <= time() + DEFAULT_TOKEN_LIFETIME
+
+
+def test_token_cache_get_returns_token_that_was_set(token_cache, token):
+    token_cache.set(token)
+    cache = TokenCache("profile", "example.com", "user@example.com", "password")
+    assert cache.get() == token
+
+
+def test_token_cache_get_when_nothing_cached_returns_none(token_cache):
+    assert token_cache.get() is None
+
+
+def test_token_cache_get_when_token_expired_returns_none(token_cache):
+    token_cache.set(_create_jwt({"exp": int(time()) + TOKEN_EXPIRY_MARGIN - 1}))
+    assert token_cache.get() is None
+
+
+def test_token_cache_get_when_password_changed_returns_none(token_cache, token):
+    token_cache.set(token)
+    cache = TokenCache("profile", "example.com", "user@example.com", "new password")
+    assert cache.get() is None
+
+
+def test_token_cache_get_when_file_corrupt_returns_none(token_cache, token):
+    token_cache.set(token)
+    with open(token_cache.location, "r+b") as cache_file:
+        cache_file.seek(20)
+        cache_file.write(b"corrupt")
+    assert token_cache.get() is None
+
+
+def test_token_cache_keys_tokens_by_profile_server_and_user(token_cache, token):
+    token_cache.set(token)
+    for identity in [
+        ("other", "example.com", "user@example.com"),
+        ("profile", "other.example.com", "user@example.com"),
+        ("profile", "example.com", "other@example.com"),
+    ]:
+        assert TokenCache(*identity, "password").get() is None
+
+
+def test_token_cache_set_encrypts_token(token_cache, token):
+    token_cache.set(token)
+    with open(token_cache.location, "rb") as cache_file:
+        data = cache_file.read()
+    assert token.split()[-1].encode() not in data
+    assert b"user@example.com" not in data
+
+
+@pytest.mark.skipif(os.name == "nt", reason="POSIX file permissions")
+def test_token_cache_set_restricts_permissions_to_user(
+    token_cache, token, token_cache_dir
+):
+    token_cache.set(token)
+    assert stat.S_IMODE(os.stat(token_cache.location).st_mode) == 0o600
+    assert stat.S_IMODE(os.stat(token_cache_dir).st_mode) == 0o700
+
+
+def test_token_cache_delete_removes_file(token_cache, mock_remove):
+    token_cache.delete()
+    mock_remove.assert_called_once_with(token_cache.location)
+
+
+def test_token_cache_delete_when_nothing_cached_does_not_raise(
+    token_cache, mock_remove
+):
+    mock_remove.side_effect = FileNotFoundError
+    token_cache.delete()
+
+
+def test_cached_token_auth_when_token_cached_does_not_log_in(
+    mocker, token_cache, token
+):
+    token_cache.set(token)
+    auth = mocker.MagicMock()
+    assert CachedTokenAuth(auth, token_cache).get_credentials() == token
+    assert not auth.get_credentials.call_count
+
+
+def test_cached_token_auth_when_no_token_cached_logs_in_and_caches_token(
+    mocker, token_cache, token
+):
+    auth = mocker.MagicMock()
+    auth.get_credentials.return_value = token
+    assert CachedTokenAuth(auth, token_cache).get_credentials() == token
+    assert token_cache.get() == token
+
+
+def test_cached_token_auth_clear_credentials_clears_cache(mocker, token):
+    token_cache = mocker.MagicMock(spec=TokenCache)
+    token_cache.get.return_value = token
+    auth = mocker.MagicMock()
+    cached_auth = CachedTokenAuth(auth, token_cache)
+    cached_auth.get_credentials()
+    cached_auth.clear_credentials()
+    auth.clear_credentials.assert_called_once_with()
+    token_cache.delete.assert_called_once_with()
+    cached_auth.get_credentials()
+    assert token_cache.get.call_count == 2
+
+
+def test_create_sdk_from_token_cache_when_token_cached_does_not_log_in(
+    mocker, token_cache, token
+):
+    token_cache.set(token)
+    mock_bearer_auth = mocker.patch("code42cli.token_cache.BearerAuth")
+    sdk = create_sdk_from_token_cache(
+        token_cache, "example.com", "user@example.com", "password"
+    )
+    assert isinstance(sdk, SDKClient)
+    assert not mock_bearer_auth.return_value.get_credentials.call_count
+
+
+def test_create_sdk_from_token_cache_when_no_token_cached_logs_in(
+    mocker, token_cache, token
+):
+    mock_bearer_auth = mocker.patch("code42cli.token_cache.BearerAuth")
+    mock_bearer_auth.return_value.get_credentials.return_value = token
+    create_sdk_from_token_cache(
+        token_cache, "example.com", "user@example.com", "password", totp="123456"
+    )
+    assert mock_bearer_auth.call_args[0][1] == "123456"
+    assert token_cache.get() == token
+
+
+def test_create_sdk_from_token_cache_when_api_client_logs_in_as_api_client(
+    mocker, token_cache, token
+):
+    mock_api_client_auth = mocker.patch("code42cli.token_cache.ApiClientAuth")
+    mock_api_client_auth.return_value.get_credentials.return_value = token
+    sdk = create_sdk_from_token_cache(
+        token_cache, "example.com", "key-123", "secret", api_client=True
+    )
+    assert mock_api_client_auth.return_value.get_credentials.call_count == 1
+    assert sdk._auth_flag == 1
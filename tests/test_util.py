@@ -1,3 +1,6 @@
+import threading
+import time
+
 import pytest
 
 from code42cli.util import _PADDING_SIZE
@@ -5,6 +8,12 @@ from code42cli.util import does_user_agree
 from code42cli.util import find_format_width
 from code42cli.util import format_string_list_to_columns
 from code42cli.util import get_url_parts
+from code42cli.util import hash_event
+from code42cli.util import hash_event_identity
+from code42cli.util import map_concurrently
+from code42cli.util import prefetch
+from code42cli.util import prefetch_many
+from code42cli.util import StageTimer
 
 TEST_HEADER = {"key1": "Column 1", "key2": "Column 10", "key3": "Column 100"}
 
@@ -169,3 +178,223 @@ def test_url_parts():
     server, port = get_url_parts("127.0.0.1")
     assert server == "127.0.0.1"
     assert port is None
+
+
+def test_prefetch_yields_all_items_in_order():
+    assert list(prefetch(iter(range(10)), size=2)) == list(range(10))
+
+
+def test_prefetch_when_iterable_raises_reraises_error_to_consumer():
+    def pages():
+        yield 1
+        raise ValueError("test")
+
+    results = prefetch(pages())
+    assert next(results) == 1
+    with pytest.raises(ValueError):
+        next(results)
+
+
+def test_prefetch_reads_ahead_of_consumer():
+    produced = []
+    read_ahead = threading.Event()
+
+    def pages():
+        for page in range(3):
+            produced.append(page)
+            if page == 2:
+                read_ahead.set()
+            yield page
+
+    results = prefetch(pages(), size=2)
+    assert next(results) == 0
+    assert read_ahead.wait(1)
+    assert produced == [0, 1, 2]
+    results.close()
+
+
+def test_prefetch_when_consumer_stops_early_stops_reading_items():
+    produced = []
+
+    def pages():
+        for page in range(100):
+            produced.append(page)
+            yield page
+
+    results = prefetch(pages(), size=1)
+    next(results)
+    results.close()
+    # the thread may finish producing the item it was on when the consumer stopped
+    threading.Event().wait(0.3)
+    count = len(produced)
+    threading.Event().wait(0.3)
+    assert len(produced) == count < 5
+
+
+def test_prefetch_many_when_ordered_yields_items_of_each_iterable_in_turn():
+    results = prefetch_many([iter(range(3)), iter(range(3, 5))], size=1)
+    assert list(results) == [(0, 0), (0, 1), (0, 2), (1, 3), (1, 4)]
+
+
+def test_prefetch_many_reads_iterables_concurrently():
+    second_started = threading.Event()
+
+    def first():
+        # doesn't finish until the second iterable has started being read
+        assert second_started.wait(1)
+        yield "a"
+
+    def second():
+        second_started.set()
+        yield "b"
+
+    assert list(prefetch_many([first(), second()])) == [(0, "a"), (1, "b")]
+
+
+def test_prefetch_many_when_ordered_and_spilling_to_disk_reads_later_iterables_to_the_end():
+    second_finished = threading.Event()
+
+    def first():
+        # doesn't finish until the second iterable has been read to its end, far beyond `size`
+        assert second_finished.wait(2)
+        yield "a"
+
+    def second():
+        yield from range(20)
+        second_finished.set()
+
+    results = list(prefetch_many([first(), second()], size=2, spill_to_disk=True))
+    assert results == [(0, "a")] + [(1, i) for i in range(20)]
+
+
+def test_prefetch_many_when_spilling_to_disk_and_iterable_raises_reraises_error_in_order():
+    def pages():
+        yield from range(5)
+        raise ValueError("test")
+
+    results = prefetch_many([pages()], size=1, spill_to_disk=True)
+    assert [next(results) for _ in range(5)] == [(0, i) for i in range(5)]
+    with pytest.raises(ValueError):
+        next(results)
+
+
+def test_prefetch_many_when_unordered_yields_items_as_they_are_read():
+    first_may_finish = threading.Event()
+
+    def first():
+        assert first_may_finish.wait(1)
+        yield "a"
+
+    def second():
+        yield "b"
+
+    results = prefetch_many([first(), second()], ordered=False)
+    assert next(results) == (1, "b")
+    first_may_finish.set()
+    assert list(results) == [(0, "a")]
+
+
+def test_prefetch_many_when_an_iterable_raises_reraises_error_to_consumer():
+    def pages():
+        raise ValueError("test")
+        yield
+
+    with pytest.raises(ValueError):
+        list(prefetch_many([iter(range(3)), pages()], ordered=False))
+
+
+def test_hash_event_identity_only_depends_on_id_and_timestamp():
+    event = {"id": "a", "createdAt": "2020-01-01T00:00:00.000Z", "state": "OPEN"}
+    updated = {**event, "state": "RESOLVED"}
+    assert hash_event_identity(event, "id", "createdAt") == hash_event_identity(
+        updated, "id", "createdAt"
+    )
+    assert hash_event_identity(event, "id", "createdAt") != hash_event_identity(
+        {**event, "id": "b"}, "id", "createdAt"
+    )
+
+
+def test_hash_event_identity_when_event_has_no_id_hashes_whole_event():
+    event = {"actorId": "42", "timestamp": "2020-01-01T00:00:00.000Z"}
+    assert hash_event_identity(event, "id", "timestamp") == hash_event(event)
+
+
+def test_map_concurrently_yields_results_in_order():
+    def slow_for_small_numbers(n):
+        if n < 3:
+            time.sleep(0.05)
+        return n * 2
+
+    results = map_concurrently(slow_for_small_numbers, range(6), max_workers=3)
+    assert list(results) == [0, 2, 4, 6, 8, 10]
+
+
+def test_map_concurrently_runs_up_to_max_workers_calls_at_once():
+    lock = threading.Lock()
+    running = [0]
+    max_running = [0]
+
+    def func(n):
+        with lock:
+            running[0] += 1
+            max_running[0] = max(max_running[0], running[0])
+        time.sleep(0.02)
+        with lock:
+            running[0] -= 1
+        return n
+
+    assert list(map_concurrently(func, range(10), max_workers=3)) == list(range(10))
+    assert 1 < max_running[0] <= 3
+
+
+def test_map_concurrently_raises_errors_from_func():
+    def func(n):
+        if n == 2:
+            raise ValueError("bad item")
+        return n
+
+    with pytest.raises(ValueError):
+        list(map_concurrently(func, range(5), max_workers=2))
+
+
+def test_stage_timer_time_records_duration_of_stage():
+    timer = StageTimer()
+    with timer.time("stage"):
+        time.sleep(0.01)
+    assert timer.durations["stage"] >= 0.01
+
+
+def test_stage_timer_time_records_duration_when_stage_raises():
+    timer = StageTimer()
+    with pytest.raises(ValueError):
+        with timer.time("stage"):
+            raise ValueError()
+    assert "stage" in timer.durations
+
+
+def test_stage_timer_timed_records_each_call_and_returns_result():
+    timer = StageTimer()
+    assert timer.timed("double", lambda n: n * 2)(3) == 6
+    assert "double" in timer.durations
+
+
+def test_stage_timer_report_when_enabled_prints_durations_to_stderr(capsys):
+    timer = StageTimer(enabled=True)
+    with timer.time("first"):
+        pass
+    timer.timed("second", lambda: None)()
+    timer.report()
+    captured = capsys.readouterr()
+    assert not captured.out
+    lines = captured.err.splitlines()
+    assert lines[0].startswith("first: ")
+    assert lines[1].startswith("second: ")
+    assert lines[2].startswith("Total: ")
+
+
+def test_stage_timer_report_when_not_enabled_prints_nothing(capsys):
+    timer = StageTimer()
+    with timer.time("stage"):
+        pass
+    timer.report()
+    assert not capsys.readouterr().err
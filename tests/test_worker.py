@@ -1,15 +1,211 @@
+import threading
 import time
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from email.utils import format_datetime
 
+import pytest
+from py42.exceptions import Py42HTTPError
+from requests import HTTPError
+from requests import Response
+
+from code42cli.worker import AdaptiveConcurrencyLimit
+from code42cli.worker import get_retry_delay
+from code42cli.worker import LatencyHistogram
+from code42cli.worker import TokenBucket
 from code42cli.worker import Worker
 from code42cli.worker import WorkerStats
 
 
+@pytest.fixture
+def mock_sleep(mocker):
+    return mocker.patch("code42cli.worker.sleep")
+
+
+def create_http_error(mocker, status, headers=None):
+    response = mocker.MagicMock(spec=Response)
+    response.status_code = status
+    response.headers = headers or {}
+    response.request = None
+    http_error = mocker.MagicMock(spec=HTTPError)
+    http_error.response = response
+    return Py42HTTPError(http_error)
+
+
+class TestTokenBucket:
+    def test_acquire_when_tokens_available_does_not_wait(self, mock_sleep):
+        bucket = TokenBucket(2)
+        bucket.acquire()
+        bucket.acquire()
+        assert not mock_sleep.call_count
+
+    def test_acquire_when_bucket_empty_waits_for_next_token(self, mock_sleep):
+        bucket = TokenBucket(10, capacity=1)
+        bucket.acquire()
+        mock_sleep.side_effect = lambda seconds: time.sleep(seconds)
+        bucket.acquire()
+        assert 0 < mock_sleep.call_args[0][0] <= 0.1
+
+
+class TestAdaptiveConcurrencyLimit:
+    def test_on_throttled_halves_limit(self):
+        limit = AdaptiveConcurrencyLimit(8)
+        limit.on_throttled()
+        assert limit.limit == 4
+
+    def test_on_throttled_when_called_again_right_away_does_not_decrease_again(self):
+        limit = AdaptiveConcurrencyLimit(8)
+        limit.on_throttled()
+        limit.on_throttled()
+        assert limit.limit == 4
+
+    def test_on_throttled_never_decreases_below_one(self, mocker):
+        mocker.patch("code42cli.worker.monotonic", side_effect=[10, 20, 30, 40, 50])
+        limit = AdaptiveConcurrencyLimit(2)
+        for _ in range(5):
+            limit.on_throttled()
+        assert limit.limit == 1
+
+    def test_on_success_increases_limit_by_about_one_per_limit_successes(self):
+        limit = AdaptiveConcurrencyLimit(8)
+        limit.on_throttled()
+        for _ in range(3):
+            limit.on_success()
+        assert limit.limit == 4
+        for _ in range(2):
+            limit.on_success()
+        assert limit.limit == 5
+
+    def test_on_success_never_increases_above_max(self):
+        limit = AdaptiveConcurrencyLimit(2)
+        for _ in range(10):
+            limit.on_success()
+        assert limit.limit == 2
+
+    def test_acquire_when_limit_reached_blocks_until_release(self):
+        limit = AdaptiveConcurrencyLimit(1)
+        limit.acquire()
+        waiter = threading.Thread(target=limit.acquire)
+        waiter.start()
+        waiter.join(0.1)
+        assert waiter.is_alive()
+        limit.release()
+        waiter.join(1)
+        assert not waiter.is_alive()
+
+
+class TestGetRetryDelay:
+    def test_when_retry_after_is_seconds_returns_seconds(self, mocker):
+        err = create_http_error(mocker, 429, {"Retry-After": "7"})
+        assert get_retry_delay(err, 0) == 7
+
+    def test_when_retry_after_is_date_returns_seconds_until_date(self, mocker):
+        retry_at = datetime.now(timezone.utc) + timedelta(seconds=10)
+        err = create_http_error(
+            mocker, 503, {"Retry-After": format_datetime(retry_at, usegmt=True)}
+        )
+        assert 8 <= get_retry_delay(err, 0) <= 10
+
+    @pytest.mark.parametrize(
+        "retry_after", ["86400", format_datetime(datetime(2100, 1, 1), usegmt=False)]
+    )
+    def test_when_retry_after_exceeds_max_returns_max(self, mocker, retry_after):
+        err = create_http_error(mocker, 429, {"Retry-After": retry_after})
+        assert get_retry_delay(err, 0) == 30
+
+    @pytest.mark.parametrize(
+        "retry_after", ["Wed, 21 Oct 2015 07:28:00 GMT", "-5", "soon", "1.5e9"]
+    )
+    def test_when_retry_after_invalid_or_past_returns_backoff(
+        self, mocker, retry_after
+    ):
+        err = create_http_error(mocker, 503, {"Retry-After": retry_after})
+        assert 0 <= get_retry_delay(err, 1) <= 1
+
+    def test_when_no_retry_after_returns_jittered_exponential_backoff(self, mocker):
+        err = create_http_error(mocker, 503)
+        for attempt in range(3):
+            assert 0 <= get_retry_delay(err, attempt) <= 0.5 * 2**attempt
+
+
+class TestLatencyHistogram:
+    def test_percentile_when_empty_returns_none(self):
+        assert LatencyHistogram().percentile(50) is None
+
+    def test_percentile_returns_value_within_bucket_precision(self):
+        histogram = LatencyHistogram()
+        for ms in range(1, 101):
+            histogram.record(ms / 1000)
+        assert 0.050 <= histogram.percentile(50) <= 0.050 * 1.1
+        assert 0.095 <= histogram.percentile(95) <= 0.095 * 1.1
+        assert 0.099 <= histogram.percentile(99) <= 0.099 * 1.1
+
+    def test_merge_combines_counts(self):
+        first = LatencyHistogram()
+        second = LatencyHistogram()
+        first.record(0.001)
+        second.record(1)
+        first.merge(second)
+        assert first.count == 2
+        assert first.percentile(100) >= 1
+
+
 class TestWorkerStats:
     def test_successes_when_should_be_negative_returns_zero(self):
         stats = WorkerStats(100)
-        stats._total_errors = 101
+        for _ in range(101):
+            stats.increment_total_errors()
         assert not stats.total_successes
 
+    def test_stats_are_not_shared_between_instances(self):
+        first = WorkerStats(1)
+        second = WorkerStats(1)
+        first.increment_total_processed()
+        first.increment_total_errors()
+        first.add_result("result")
+        assert second.total_processed == 0
+        assert second.total_errors == 0
+        assert second.results == []
+
+    def test_merges_stats_recorded_by_multiple_threads(self):
+        stats = WorkerStats(4000)
+
+        def record():
+            for i in range(1000):
+                stats.increment_total_processed()
+                stats.add_result(i)
+
+        threads = [threading.Thread(target=record) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert stats.total_processed == 4000
+        assert len(stats.results) == 4000
+
+    def test_reset_results_clears_results_from_all_threads(self):
+        stats = WorkerStats(2)
+        stats.add_result(1)
+        t = threading.Thread(target=stats.add_result, args=(2,))
+        t.start()
+        t.join()
+        stats.reset_results()
+        assert stats.results == []
+
+    def test_get_summary_includes_throughput_and_percentiles(self):
+        stats = WorkerStats(1)
+        stats.start_timer()
+        stats.add_latency(0.01)
+        stats.increment_total_processed()
+        stats.stop_timer()
+        summary = stats.get_summary()
+        assert "Processed 1 in" in summary
+        assert "/s)" in summary
+        assert "p50:" in summary
+        assert "p95:" in summary
+        assert "p99:" in summary
+
 
 class TestWorker:
     def test_is_async(self):
@@ -25,3 +221,129 @@ class TestWorker:
         demo_ls.append(1)
         worker.wait()
         assert demo_ls == [1, 2]
+
+    def test_do_async_when_queue_is_full_blocks_until_a_task_completes(self):
+        release = threading.Event()
+        worker = Worker(1, 3, queue_size=1)
+        worker.do_async(release.wait)
+        worker.do_async(lambda: None)
+
+        producer = threading.Thread(target=worker.do_async, args=(lambda: None,))
+        producer.start()
+        producer.join(0.1)
+        assert producer.is_alive()
+
+        release.set()
+        producer.join(1)
+        assert not producer.is_alive()
+        worker.wait()
+        assert worker.stats.total_processed == 3
+
+    def test_wait_returns_as_soon_as_tasks_complete(self):
+        worker = Worker(5, 10)
+        for _ in range(10):
+            worker.do_async(lambda: None)
+        start = time.monotonic()
+        worker.wait()
+        assert time.monotonic() - start < 0.25
+        assert worker.stats.total_processed == 10
+
+    def test_wait_stops_worker_threads(self):
+        worker = Worker(3, 1)
+        worker.do_async(lambda: None)
+        threads = list(worker._threads)
+        worker.wait()
+        assert not any(t.is_alive() for t in threads)
+
+    def test_do_async_after_wait_restarts_threads(self):
+        worker = Worker(2, 2)
+        results = []
+        worker.do_async(results.append, 1)
+        worker.wait()
+        worker.do_async(results.append, 2)
+        worker.wait()
+        assert results == [1, 2]
+
+    def test_records_latency_and_elapsed_time_for_each_task(self):
+        worker = Worker(2, 4)
+        for _ in range(4):
+            worker.do_async(time.sleep, 0.01)
+        worker.wait()
+        assert worker.stats.latencies.count == 4
+        assert worker.stats.latencies.percentile(50) >= 0.01
+        assert worker.stats.elapsed >= 0.02
+        assert worker.stats.throughput > 0
+
+    def test_when_task_is_throttled_retries_until_it_succeeds(self, mocker, mock_sleep):
+        errors = [
+            create_http_error(mocker, 429, {"Retry-After": "3"}),
+            create_http_error(mocker, 503),
+        ]
+
+        def throttled_func():
+            if errors:
+                raise errors.pop(0)
+            return "done"
+
+        worker = Worker(2, 1)
+        worker.do_async(throttled_func)
+        worker.wait()
+        assert worker.stats.results == ["done"]
+        assert worker.stats.total_errors == 0
+        assert worker.stats.total_retries == 2
+        assert mock_sleep.call_args_list[0][0][0] == 3
+
+    def test_when_task_is_throttled_more_than_max_retries_counts_error(
+        self, mocker, mock_sleep
+    ):
+        def throttled_func():
+            raise create_http_error(mocker, 502)
+
+        worker = Worker(1, 1, max_retries=2)
+        worker.do_async(throttled_func)
+        worker.wait()
+        assert worker.stats.total_errors == 1
+        assert worker.stats.total_retries == 2
+
+    def test_when_task_fails_with_non_retryable_error_does_not_retry(
+        self, mocker, mock_sleep
+    ):
+        calls = []
+
+        def failing_func():
+            calls.append(1)
+            raise create_http_error(mocker, 400)
+
+        worker = Worker(1, 1)
+        worker.do_async(failing_func)
+        worker.wait()
+        assert len(calls) == 1
+        assert worker.stats.total_errors == 1
+        assert not mock_sleep.call_count
+
+    def test_when_logging_task_error_fails_keeps_processing_tasks(self, mocker):
+        mocker.patch.object(Worker, "log_error", side_effect=Exception("logger"))
+        calls = []
+
+        def failing_func():
+            calls.append(1)
+            raise Exception()
+
+        worker = Worker(1, 2)
+        worker.do_async(failing_func)
+        worker.do_async(failing_func)
+        waiter = threading.Thread(target=worker.wait, daemon=True)
+        waiter.start()
+        waiter.join(5)
+        assert not waiter.is_alive()
+        assert len(calls) == 2
+        assert worker.stats.total_errors == 2
+
+    def test_when_rate_limit_given_takes_token_for_each_task(self, mocker):
+        mock_bucket = mocker.patch("code42cli.worker.TokenBucket")
+        worker = Worker(2, 3, rate_limit=5)
+        for _ in range(3):
+            worker.do_async(lambda: None)
+        worker.wait()
+        mock_bucket.assert_called_once_with(5)
+        assert mock_bucket.return_value.acquire.call_count == 3